@@ -0,0 +1,69 @@
+import random
+from pathlib import Path
+from typing import List
+
+import fitz
+
+VOCABULARY = (
+    "compresseur évaporateur condenseur détendeur fluide frigorigène pression température "
+    "enthalpie entropie cycle surchauffe sous-refroidissement bouteille séparatrice huile "
+    "réservoir liquide vapeur débit massique puissance frigorifique coefficient performance "
+    "échangeur thermique isolation vanne régulation capteur alarme maintenance installation "
+    "ammoniac CO2 glycol saumure circuit basse haute étage injection aspiration refoulement "
+    "le la les des du de un une et ou pour avec dans sur par est sont doit peut entre"
+).split()
+
+
+def generate_page_text(rng: random.Random, paragraphs: int = 6, words_per_paragraph: int = 80) -> str:
+    """
+    Génère le texte d'une page: paragraphes de phrases pseudo-techniques
+
+    Args:
+        rng: Générateur aléatoire (seedé pour des corpus reproductibles)
+        paragraphs: Nombre de paragraphes
+        words_per_paragraph: Nombre de mots par paragraphe
+
+    Returns:
+        Texte de la page
+    """
+    blocks = []
+    for _ in range(paragraphs):
+        words = [rng.choice(VOCABULARY) for _ in range(words_per_paragraph)]
+        sentences = []
+        for i in range(0, len(words), 12):
+            sentence = " ".join(words[i:i + 12])
+            sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        blocks.append(" ".join(sentences))
+    return "\n\n".join(blocks)
+
+
+def generate_pdf_corpus(directory: Path, n_files: int = 10, pages_per_file: int = 10, seed: int = 42) -> List[Path]:
+    """
+    Crée un corpus de PDF synthétiques reproductible
+
+    Args:
+        directory: Dossier de destination
+        n_files: Nombre de fichiers
+        pages_per_file: Nombre de pages par fichier
+        seed: Graine aléatoire
+
+    Returns:
+        Chemins des PDF générés
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+
+    for file_index in range(n_files):
+        doc = fitz.open()
+        for page_index in range(pages_per_file):
+            page = doc.new_page()
+            text = f"Chapitre {page_index + 1}\n\n{generate_page_text(rng)}"
+            page.insert_textbox(fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50), text, fontsize=9)
+
+        path = directory / f"manuel_{file_index:04d}.pdf"
+        doc.save(str(path))
+        doc.close()
+        paths.append(path)
+
+    return paths
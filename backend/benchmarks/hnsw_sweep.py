@@ -0,0 +1,208 @@
+"""Balayage rappel / latence des paramètres HNSW sur les données d'un utilisateur
+
+    uv run python -m benchmarks.hnsw_sweep --user-id alice --ef-search 10,20,50,100,200
+    uv run python -m benchmarks.hnsw_sweep --user-id alice --m 16,32 --ef-construction 100,200 --output sweep.json
+
+Les vecteurs de l'utilisateur sont copiés dans une base temporaire, reconstruite pour
+chaque couple (M, ef_construction): la base de production n'est pas modifiée. Les
+requêtes sont des vecteurs de l'utilisateur légèrement bruités; la vérité terrain est
+une recherche exacte (force brute NumPy) avec la même distance que l'index.
+"""
+import argparse
+import json
+import logging
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import chromadb
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+
+from benchmarks.stats import latency_summary
+from src.domain.services.hnsw_index import HNSW_SPACES, current_hnsw_params
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def load_user_vectors(collection, user_id: str, page_size: int) -> Tuple[List[str], np.ndarray]:
+    """
+    Returns:
+        Tuple (IDs, matrice float32 des vecteurs de l'utilisateur)
+    """
+    ids: List[str] = []
+    vectors = []
+    offset = 0
+    while True:
+        page = collection.get(where={"user_id": {"$eq": user_id}}, limit=page_size, offset=offset,
+                              include=["embeddings"])
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        offset += len(page["ids"])
+    if not ids:
+        return ids, np.zeros((0, 0), dtype=np.float32)
+    return ids, np.vstack(vectors)
+
+
+def exact_top_k(matrix: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    """
+    Recherche exacte par force brute
+
+    Returns:
+        Indices (dans matrix) des k plus proches voisins de chaque requête
+    """
+    if space == "l2":
+        distances = (queries ** 2).sum(axis=1)[:, None] - 2 * queries @ matrix.T + (matrix ** 2).sum(axis=1)[None, :]
+    elif space == "cosine":
+        normed = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        normed_queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        distances = 1 - normed_queries @ normed.T
+    else:
+        distances = 1 - queries @ matrix.T
+
+    k = min(k, matrix.shape[0])
+    candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, candidates, axis=1).argsort(axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def make_queries(matrix: np.ndarray, count: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    """Vecteurs de l'utilisateur tirés au hasard, bruités de `noise` x leur norme moyenne par composante"""
+    picked = matrix[rng.choice(matrix.shape[0], size=count, replace=count > matrix.shape[0])]
+    scale = noise * float(np.linalg.norm(matrix, axis=1).mean()) / np.sqrt(matrix.shape[1])
+    return (picked + rng.normal(0, scale, size=picked.shape)).astype(np.float32)
+
+
+def build_index(client, name: str, ids: List[str], matrix: np.ndarray, user_id: str,
+                hnsw: Dict[str, Any], batch_size: int):
+    """Copie les vecteurs dans une collection temporaire construite avec les paramètres donnés"""
+    collection = client.create_collection(name, configuration={"hnsw": hnsw})
+    for start in range(0, len(ids), batch_size):
+        batch_ids = ids[start:start + batch_size]
+        collection.add(
+            ids=batch_ids,
+            embeddings=matrix[start:start + batch_size],
+            metadatas=[{"user_id": user_id}] * len(batch_ids)
+        )
+    return collection
+
+
+def sweep(ids: List[str], matrix: np.ndarray, user_id: str, space: str, m_values: List[int],
+          ef_construction_values: List[int], ef_search_values: List[int], queries: np.ndarray,
+          k: int) -> Dict[str, Any]:
+    """
+    Returns:
+        Latence de la force brute et, par combinaison de paramètres, rappel@k et latence HNSW
+    """
+    exact_samples = []
+    truth = []
+    for query in queries:
+        start = time.perf_counter()
+        truth.append(exact_top_k(matrix, query[None, :], k, space)[0])
+        exact_samples.append(time.perf_counter() - start)
+    truth_ids = [{ids[i] for i in row} for row in truth]
+
+    workdir = tempfile.mkdtemp(prefix="hnsw_sweep_")
+    client = chromadb.PersistentClient(path=workdir)
+    batch_size = client.get_max_batch_size()
+    where = {"user_id": {"$eq": user_id}}
+    results = []
+
+    for m in m_values:
+        for ef_construction in ef_construction_values:
+            name = f"sweep-m{m}-efc{ef_construction}"
+            build_start = time.perf_counter()
+            collection = build_index(client, name, ids, matrix, user_id,
+                                     {"space": space, "max_neighbors": m, "ef_construction": ef_construction},
+                                     batch_size)
+            build_time = time.perf_counter() - build_start
+
+            for ef_search in ef_search_values:
+                collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+                # L'index chargé garde son ef_search: rechargement depuis le disque
+                SharedSystemClient.clear_system_cache()
+                client = chromadb.PersistentClient(path=workdir)
+                collection = client.get_collection(name)
+                samples = []
+                recalls = []
+                for query, expected in zip(queries, truth_ids):
+                    start = time.perf_counter()
+                    found = collection.query(query_embeddings=[query], n_results=k, where=where, include=[])
+                    samples.append(time.perf_counter() - start)
+                    recalls.append(len(expected & set(found["ids"][0])) / len(expected))
+
+                results.append({
+                    "max_neighbors": m,
+                    "ef_construction": ef_construction,
+                    "ef_search": ef_search,
+                    "build_s": build_time,
+                    f"recall_at_{k}": float(np.mean(recalls)),
+                    "min_recall": float(np.min(recalls)),
+                    "latency": latency_summary(samples),
+                })
+                logging.info(f"M={m} ef_c={ef_construction} ef_s={ef_search}: "
+                             f"rappel={results[-1][f'recall_at_{k}']:.3f}, p99={results[-1]['latency']['p99_ms']:.2f} ms")
+
+            client.delete_collection(name)
+
+    return {"exact": latency_summary(exact_samples), "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rappel vs latence des paramètres HNSW")
+    parser.add_argument("--persist-dir", default="./chroma_db", help="Répertoire de la base Chroma")
+    parser.add_argument("--collection", default="documents", help="Nom de la collection")
+    parser.add_argument("--user-id", required=True, help="Utilisateur dont les données servent au balayage")
+    parser.add_argument("--space", choices=HNSW_SPACES, default=None, help="Distance (défaut: celle de la collection)")
+    parser.add_argument("--m", type=_int_list, default=[16], help="Valeurs de M")
+    parser.add_argument("--ef-construction", type=_int_list, default=[100], help="Valeurs de ef_construction")
+    parser.add_argument("--ef-search", type=_int_list, default=[10, 20, 50, 100, 200], help="Valeurs de ef_search")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes")
+    parser.add_argument("--k", type=int, default=5, help="Nombre de voisins (n_results)")
+    parser.add_argument("--noise", type=float, default=0.1, help="Bruit relatif ajouté aux requêtes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Fichier JSON de sortie (défaut: stdout)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    client = chromadb.PersistentClient(path=args.persist_dir)
+    collection = client.get_collection(args.collection)
+    space = args.space or current_hnsw_params(collection)["space"] or "l2"
+
+    ids, matrix = load_user_vectors(collection, args.user_id, client.get_max_batch_size())
+    if not ids:
+        parser.error(f"Aucun vecteur pour l'utilisateur {args.user_id}")
+
+    rng = np.random.default_rng(args.seed)
+    queries = make_queries(matrix, args.queries, args.noise, rng)
+
+    report = {
+        "meta": {
+            "started_at": datetime.now().isoformat(),
+            "collection": args.collection,
+            "user_id": args.user_id,
+            "vectors": len(ids),
+            "dimension": int(matrix.shape[1]),
+            "space": space,
+            "current_hnsw": current_hnsw_params(collection),
+            "params": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        **sweep(ids, matrix, args.user_id, space, args.m, args.ef_construction, args.ef_search, queries, args.k),
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
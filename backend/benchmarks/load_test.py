@@ -0,0 +1,180 @@
+"""Générateur de charge pour /ask et /upload-documents
+
+À lancer contre un serveur démarré avec le LLM et l'embedding simulés, pour trouver
+le point de saturation d'un worker sans consommer de crédits OpenAI:
+
+    AI_BACKEND=fake EMBEDDING_BACKEND=fake uv run uvicorn main:app --port 8000
+    uv run python -m benchmarks.load_test --scenario ask --concurrency 1,2,4,8,16,32 --duration 20
+
+Le rapport JSON donne, pour chaque niveau de concurrence, le débit, les percentiles
+de latence et le taux d'erreur, ainsi que le niveau à partir duquel le débit plafonne.
+"""
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+from benchmarks.corpus import generate_pdf_corpus
+from benchmarks.stats import latency_summary
+
+QUESTIONS = [
+    "Quel est le rôle de la bouteille séparatrice ?",
+    "Comment régler la surchauffe à l'aspiration du compresseur ?",
+    "Quelle pression de condensation viser pour l'ammoniac ?",
+    "Quelles sont les causes d'un retour d'huile insuffisant ?",
+    "Comment dimensionner le réservoir de liquide ?",
+]
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def make_ask_request(user_id: str, rng: random.Random) -> Callable[[httpx.Client], httpx.Response]:
+    def send(client: httpx.Client) -> httpx.Response:
+        return client.post("/ask", json={"user_id": user_id, "question": rng.choice(QUESTIONS)})
+    return send
+
+
+def make_upload_request(user_id: str, pdf_paths: List[Path], rng: random.Random) -> Callable[[httpx.Client], httpx.Response]:
+    def send(client: httpx.Client) -> httpx.Response:
+        path = rng.choice(pdf_paths)
+        with open(path, "rb") as f:
+            return client.post(
+                "/upload-documents",
+                data={"user_id": user_id},
+                files=[("files", (path.name, f.read(), "application/pdf"))]
+            )
+    return send
+
+
+def run_level(client: httpx.Client, make_request: Callable[[int], Callable], concurrency: int,
+              duration: float) -> Dict[str, Any]:
+    """
+    Exécute `concurrency` clients en boucle pendant `duration` secondes
+
+    Args:
+        client: Client HTTP partagé (pool dimensionné sur la concurrence max)
+        make_request: Fabrique de requête par worker
+        concurrency: Nombre de clients simultanés
+        duration: Durée du palier en secondes
+
+    Returns:
+        Débit, latences et erreurs du palier
+    """
+    samples: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_index: int) -> None:
+        send = make_request(worker_index)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = str(send(client).status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                if status == "200":
+                    samples.append(elapsed)
+                else:
+                    errors[status] = errors.get(status, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    total = len(samples) + sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "requests": total,
+        "throughput_rps": len(samples) / elapsed,
+        "error_rate": sum(errors.values()) / total if total else 0.0,
+        "errors": errors,
+        "latency": latency_summary(samples),
+    }
+
+
+def find_saturation(levels: List[Dict[str, Any]], min_gain: float = 0.1) -> int | None:
+    """Premier niveau de concurrence au-delà duquel le débit progresse de moins de `min_gain`"""
+    for previous, current in zip(levels, levels[1:]):
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain):
+            return previous["concurrency"]
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Test de charge du backend")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL du serveur")
+    parser.add_argument("--scenario", choices=["ask", "upload"], default="ask")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 2, 4, 8, 16, 32], help="Paliers de concurrence")
+    parser.add_argument("--duration", type=float, default=20.0, help="Durée de chaque palier en secondes")
+    parser.add_argument("--user-id", default="load_test", help="Utilisateur cible de /ask")
+    parser.add_argument("--seed-files", type=int, default=5, help="PDF à indexer avant le scénario ask (0 = aucun)")
+    parser.add_argument("--pages", type=int, default=5, help="Pages par PDF généré")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Timeout HTTP en secondes")
+    parser.add_argument("--output", default=None, help="Fichier JSON de sortie (défaut: stdout)")
+    args = parser.parse_args()
+
+    started_at = datetime.now().isoformat()
+    pdf_paths = generate_pdf_corpus(Path(tempfile.mkdtemp(prefix="load_")), max(args.seed_files, 1), args.pages)
+    max_concurrency = max(args.concurrency)
+
+    with httpx.Client(
+        base_url=args.url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    ) as client:
+        if args.scenario == "ask" and args.seed_files:
+            rng = random.Random(0)
+            seed = make_upload_request(args.user_id, pdf_paths, rng)
+            for _ in range(args.seed_files):
+                seed(client).raise_for_status()
+
+        if args.scenario == "ask":
+            def make_request(worker_index: int):
+                return make_ask_request(args.user_id, random.Random(worker_index))
+        else:
+            def make_request(worker_index: int):
+                return make_upload_request(f"{args.user_id}_{worker_index}", pdf_paths, random.Random(worker_index))
+
+        levels = []
+        for concurrency in args.concurrency:
+            level = run_level(client, make_request, concurrency, args.duration)
+            levels.append(level)
+            print(f"⚡ concurrence {concurrency}: {level['throughput_rps']:.1f} req/s, "
+                  f"p95 {level['latency'].get('p95_ms', 0):.0f} ms, erreurs {level['error_rate']:.1%}")
+
+    report = {
+        "meta": {
+            "started_at": started_at,
+            "url": args.url,
+            "scenario": args.scenario,
+            "duration_per_level_s": args.duration,
+        },
+        "levels": levels,
+        "saturation_concurrency": find_saturation(levels),
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"📊 Résultats écrits dans {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
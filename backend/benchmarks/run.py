@@ -0,0 +1,135 @@
+"""Suite de benchmarks du backend (ingestion et requêtes)
+
+    uv run python -m benchmarks.run --output bench.json
+    uv run python -m benchmarks.run --scenarios process_files,query --sizes 1000,20000 --tenants 1,20
+
+Chaque exécution produit un JSON (métadonnées + résultats par scénario) à comparer
+avant/après une mise à jour.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.corpus import generate_pdf_corpus
+from benchmarks import scenarios
+
+SCENARIOS = ("process_files", "add_chunks", "query", "ask")
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def _public(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Retire les objets internes (clés préfixées par _) avant sérialisation"""
+    return {key: value for key, value in result.items() if not key.startswith("_")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks ingestion / requêtes")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Scénarios à exécuter parmi {', '.join(SCENARIOS)}")
+    parser.add_argument("--files", type=int, default=10, help="Nombre de PDF synthétiques")
+    parser.add_argument("--pages", type=int, default=10, help="Pages par PDF")
+    parser.add_argument("--sizes", type=_int_list, default=[1000, 10000], help="Tailles de collection (query)")
+    parser.add_argument("--tenants", type=_int_list, default=[1, 10], help="Nombres de tenants (query)")
+    parser.add_argument("--queries", type=int, default=100, help="Requêtes par configuration")
+    parser.add_argument("--ask-requests", type=int, default=50, help="Requêtes /ask")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Modèle SentenceTransformer")
+    parser.add_argument("--workdir", default=None, help="Dossier de travail (défaut: dossier temporaire)")
+    parser.add_argument("--output", default=None, help="Fichier JSON de sortie (défaut: stdout)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Scénarios inconnus: {', '.join(sorted(unknown))}")
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "started_at": datetime.now().isoformat(),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "model": args.model,
+            "params": {key: value for key, value in vars(args).items() if key not in ("output", "workdir")},
+        },
+        "scenarios": {},
+    }
+
+    pdf_paths = generate_pdf_corpus(workdir / "corpus", args.files, args.pages)
+
+    # Avant tout chargement de modèle, pour que le pic RSS reflète l'ingestion seule
+    chunks = None
+    if "process_files" in selected or "add_chunks" in selected or "ask" in selected:
+        result = scenarios.bench_process_files(pdf_paths, args.pages)
+        chunks = result["_chunks"]
+        if "process_files" in selected:
+            report["scenarios"]["process_files"] = _public(result)
+
+    embedding_port = None
+    if {"add_chunks", "query", "ask"} & set(selected):
+        from src.application.adapters.embeding.localEmbeding import LocalEmbeddingAdapter
+        embedding_port = LocalEmbeddingAdapter(args.model)
+
+    store = None
+    if "add_chunks" in selected or "ask" in selected:
+        result = scenarios.bench_add_chunks(chunks, embedding_port, workdir / "add_chunks")
+        store = result["_store"]
+        if "add_chunks" in selected:
+            report["scenarios"]["add_chunks"] = _public(result)
+
+    if "query" in selected:
+        report["scenarios"]["query"] = scenarios.bench_query(
+            embedding_port, args.sizes, args.tenants, args.queries, workdir
+        )
+
+    if "ask" in selected:
+        os.environ.setdefault("PDF_PATH", str(workdir / "corpus"))
+        os.environ.setdefault("AI_BACKEND", "fake")
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            import main as app_module
+        finally:
+            os.chdir(cwd)
+
+        from src.application.adapters.ai_chat.fake import FakeAiConnector
+        from src.domain.services.ai_service import AiService
+        app_module.vector_store = store
+        app_module.ai_service = AiService(FakeAiConnector(latency=0, tokens_per_second=0))
+        report["scenarios"]["ask"] = scenarios.bench_ask(app_module, args.ask_requests)
+
+    report["meta"]["finished_at"] = datetime.now().isoformat()
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"📊 Résultats écrits dans {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.stats import latency_summary
+from src.domain.ports.embeding import EmbeddingPort
+from src.domain.services.vector_service import VectorStore
+from src.tools.document_processor import DocumentProcessor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class TimedEmbeddingPort(EmbeddingPort):
+    """Enveloppe un port d'embedding et cumule le temps passé dans encode"""
+
+    def __init__(self, inner: EmbeddingPort):
+        self.inner = inner
+        self.total_time = 0.0
+        self.calls = 0
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        try:
+            return self.inner.encode(texts)
+        finally:
+            self.total_time += time.perf_counter() - start
+            self.calls += 1
+
+    def get_model_name(self) -> str:
+        return self.inner.get_model_name()
+
+    def reset(self) -> None:
+        self.total_time = 0.0
+        self.calls = 0
+
+
+def peak_rss_mb() -> float | None:
+    """Pic de mémoire résidente du processus en Mo (None si indisponible)"""
+    if resource is None:
+        return None
+    # ru_maxrss est en Ko sous Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(fn: Callable[[], Any]) -> Dict[str, Any]:
+    """Exécute fn en mesurant durée, pic d'allocations Python et pic RSS"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak_alloc = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "result": result,
+        "elapsed_s": elapsed,
+        "peak_python_alloc_mb": peak_alloc / 1024 / 1024,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_process_files(pdf_paths: List[Path], pages_per_file: int) -> Dict[str, Any]:
+    """Chargement + découpage des PDF par DocumentProcessor.process_files"""
+    processor = DocumentProcessor(chunk_size=1000, chunk_overlap=200)
+    measured = measure(lambda: processor.process_files(pdf_paths))
+    chunks = measured.pop("result")
+    pages = len(pdf_paths) * pages_per_file
+
+    return {
+        "files": len(pdf_paths),
+        "pages": pages,
+        "chunks": len(chunks),
+        "pages_per_s": pages / measured["elapsed_s"],
+        "chunks_per_s": len(chunks) / measured["elapsed_s"],
+        **measured,
+        "_chunks": chunks,
+    }
+
+
+def bench_add_chunks(chunks: List, embedding_port: EmbeddingPort, persist_directory: Path) -> Dict[str, Any]:
+    """Ajout à la collection, temps séparé entre vectorisation et écriture Chroma
+
+    L'écriture d'un batch chevauche la vectorisation du suivant: write_s est le temps
+    non masqué par la vectorisation, pas la durée cumulée des écritures.
+    """
+    timed_port = TimedEmbeddingPort(embedding_port)
+    store = VectorStore(timed_port, persist_directory=str(persist_directory))
+
+    start = time.perf_counter()
+    report = store.add_chunks(chunks, "bench_user")
+    elapsed = time.perf_counter() - start
+
+    embed_time = timed_port.total_time
+    write_time = max(elapsed - embed_time, 1e-9)
+    return {
+        "chunks": len(chunks),
+        "elapsed_s": elapsed,
+        "chunks_per_s": len(chunks) / elapsed,
+        "embed_s": embed_time,
+        "embed_chunks_per_s": len(chunks) / embed_time if embed_time else None,
+        "write_s": write_time,
+        "write_chunks_per_s": len(chunks) / write_time,
+        "stored_chunks": store.collection.count(),
+        "dropped_chunks": len(report["dropped"]),
+        "batches": report["batches"],
+        "batch_sizes": report["batch_sizes"],
+        "_store": store,
+    }
+
+
+def _fill_collection(store: VectorStore, size: int, tenants: int, dimension: int, rng: random.Random) -> None:
+    """Remplit la collection de vecteurs aléatoires normalisés, répartis entre `tenants` utilisateurs"""
+    batch_size = store.client.get_max_batch_size()
+    for start in range(0, size, batch_size):
+        count = min(batch_size, size - start)
+        embeddings = []
+        for _ in range(count):
+            vector = [rng.gauss(0, 1) for _ in range(dimension)]
+            norm = sum(v * v for v in vector) ** 0.5
+            embeddings.append([v / norm for v in vector])
+        ids = [f"bench_{start + i}" for i in range(count)]
+        store.collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            documents=[f"Chunk synthétique {chunk_id} " * 40 for chunk_id in ids],
+            metadatas=[
+                {
+                    "user_id": f"tenant_{(start + i) % tenants}",
+                    "source_file": f"manuel_{(start + i) % 50:04d}.pdf",
+                    "page": (start + i) % 200,
+                    "chunk_id": start + i,
+                }
+                for i in range(count)
+            ]
+        )
+
+
+def bench_query(embedding_port: EmbeddingPort, sizes: List[int], tenant_counts: List[int], queries: int,
+                workdir: Path, seed: int = 42) -> List[Dict[str, Any]]:
+    """Latence de get_context_for_query selon la taille de la collection et le nombre de tenants"""
+    rng = random.Random(seed)
+    timed_port = TimedEmbeddingPort(embedding_port)
+    dimension = len(embedding_port.encode(["dimension"])[0])
+    questions = [f"Quelle est la pression de {rng.choice(['aspiration', 'refoulement', 'condensation'])} "
+                 f"du circuit {i} ?" for i in range(queries)]
+
+    results = []
+    for size in sizes:
+        for tenants in tenant_counts:
+            store = VectorStore(timed_port, collection_name=f"bench_{size}_{tenants}",
+                                persist_directory=str(workdir / f"query_{size}_{tenants}"))
+            fill_start = time.perf_counter()
+            _fill_collection(store, size, tenants, dimension, rng)
+            fill_time = time.perf_counter() - fill_start
+
+            total_samples = []
+            search_samples = []
+            for question in questions:
+                user_id = f"tenant_{rng.randrange(tenants)}"
+                timed_port.reset()
+                start = time.perf_counter()
+                store.get_context_for_query(question, user_id)
+                elapsed = time.perf_counter() - start
+                total_samples.append(elapsed)
+                search_samples.append(elapsed - timed_port.total_time)
+
+            results.append({
+                "collection_size": size,
+                "tenants": tenants,
+                "chunks_per_tenant": size // tenants,
+                "fill_s": fill_time,
+                "total": latency_summary(total_samples),
+                "search_and_pack": latency_summary(search_samples),
+            })
+
+    return results
+
+
+def bench_ask(app_module, requests_count: int, user_id: str = "bench_user") -> Dict[str, Any]:
+    """Latence de bout en bout de /ask via l'application FastAPI, avec un LLM simulé instantané"""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app_module.app)
+    samples = []
+    errors = 0
+    for i in range(requests_count):
+        start = time.perf_counter()
+        response = client.post("/ask", json={"user_id": user_id, "question": f"Quel est le rôle du compresseur {i} ?"})
+        samples.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors += 1
+
+    return {
+        "requests": requests_count,
+        "errors": errors,
+        "latency": latency_summary(samples),
+    }
@@ -0,0 +1,166 @@
+"""Parité et débit du découpage en chunks: RecursiveSpanSplitter contre RecursiveCharacterTextSplitter
+
+    uv run python -m benchmarks.splitter
+    uv run python -m benchmarks.splitter --pages 2000 --pdf-dir ./data/pdfs --output splitter.json
+
+Les textes de référence (pages synthétiques, cas limites, et les PDF de --pdf-dir) sont découpés
+par les deux splitters pour chaque couple (chunk_size, chunk_overlap): les chunks doivent être
+identiques, au caractère près. Le débit compare l'ancienne chaîne (split_documents LangChain puis
+boucle de hash MD5) à DocumentProcessor.split_documents. Code de sortie 1 si un écart est trouvé.
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from benchmarks.corpus import generate_page_text
+from src.tools.document_processor import DocumentProcessor
+from src.tools.text_splitter import DEFAULT_SEPARATORS
+
+EDGE_CASES = [
+    "",
+    "   \n\n  \n ",
+    "Court.",
+    "x" * 2500,
+    "mot " * 700,
+    "\n\n\n\n".join(["Paragraphe séparé par plusieurs sauts de ligne."] * 60),
+    "Ligne\n" * 400,
+    "Fin?! Vraiment?! Oui... ; , ; ,\n" * 80,
+    " | ".join(f"{i}.{i % 7},{i * 3}" for i in range(600)),
+    "\n".join(f"Tableau {i}\t{i * 2.5:.2f}\t{'x' * (i % 40)}" for i in range(300)),
+    "Unicode: été, œuvre, 温度, 🚀 émoji. " * 120,
+    ("Phrase longue sans ponctuation " * 50 + ".\n\n") * 10,
+]
+
+
+def _pair(value: str) -> Tuple[int, int]:
+    size, overlap = value.split(":")
+    return int(size), int(overlap)
+
+
+def load_fixtures(pages: int, seed: int, pdf_dir: Path = None) -> List[Document]:
+    """Pages de référence: synthétiques, cas limites et PDF réels éventuels"""
+    rng = random.Random(seed)
+    documents = [
+        Document(page_content=f"Chapitre {i + 1}\n\n{generate_page_text(rng)}", metadata={"page": i})
+        for i in range(pages)
+    ]
+    documents += [Document(page_content=text, metadata={"edge_case": i}) for i, text in enumerate(EDGE_CASES)]
+    if pdf_dir is not None:
+        processor = DocumentProcessor()
+        for path in sorted(pdf_dir.iterdir()):
+            try:
+                documents += processor.load_document(path)
+            except Exception:
+                continue
+    return documents
+
+
+def langchain_split(splitter: RecursiveCharacterTextSplitter, documents: List[Document]) -> List[Document]:
+    """Ancienne chaîne de DocumentProcessor.split_documents: découpage puis seconde boucle de hash"""
+    chunks = splitter.split_documents(documents)
+    for i, chunk in enumerate(chunks):
+        chunk.metadata.update({
+            'chunk_id': i,
+            'chunk_size': len(chunk.page_content),
+            'chunk_hash': hashlib.md5(chunk.page_content.encode()).hexdigest()
+        })
+    return chunks
+
+
+def check_parity(documents: List[Document], chunk_size: int, chunk_overlap: int) -> Dict[str, Any]:
+    reference = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                               separators=DEFAULT_SEPARATORS)
+    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    mismatches = []
+    for index, document in enumerate(documents):
+        expected = reference.split_text(document.page_content)
+        got = processor.text_splitter.split_text(document.page_content)
+        if expected != got:
+            first = next((i for i, (a, b) in enumerate(zip(expected, got)) if a != b), min(len(expected), len(got)))
+            mismatches.append({"document": index, "expected_chunks": len(expected), "chunks": len(got),
+                               "first_difference": first})
+
+    expected_docs = langchain_split(reference, documents)
+    got_docs = processor.split_documents(documents)
+    metadata_equal = [(d.page_content, d.metadata) for d in expected_docs] == \
+                     [(d.page_content, d.metadata) for d in got_docs]
+    return {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "documents": len(documents),
+        "chunks": len(got_docs),
+        "identical": not mismatches and metadata_equal,
+        "metadata_identical": metadata_equal,
+        "mismatches": mismatches[:20],
+    }
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def throughput(documents: List[Document], chunk_size: int, chunk_overlap: int, repeat: int) -> Dict[str, Any]:
+    reference = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                               separators=DEFAULT_SEPARATORS)
+    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    megabytes = sum(len(d.page_content.encode()) for d in documents) / 1024 / 1024
+
+    results = {}
+    for name, fn in (("langchain", lambda: langchain_split(reference, documents)),
+                     ("span_splitter", lambda: processor.split_documents(documents))):
+        elapsed = _best_of(fn, repeat)
+        results[name] = {"elapsed_s": elapsed, "pages_per_s": len(documents) / elapsed, "mb_per_s": megabytes / elapsed}
+    results["speedup"] = results["langchain"]["elapsed_s"] / results["span_splitter"]["elapsed_s"]
+    return {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "pages": len(documents), "mb": megabytes,
+            **results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parité et débit du découpage en chunks")
+    parser.add_argument("--pages", type=int, default=500, help="Pages synthétiques")
+    parser.add_argument("--pdf-dir", type=Path, default=None, help="Dossier de documents réels à ajouter")
+    parser.add_argument("--configs", type=lambda v: [_pair(p) for p in v.split(",")],
+                        default=[(1000, 200), (500, 100), (200, 50), (50, 0)],
+                        help="Couples chunk_size:chunk_overlap")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions du débit (meilleur temps)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Fichier JSON de sortie (défaut: stdout)")
+    args = parser.parse_args()
+
+    documents = load_fixtures(args.pages, args.seed, args.pdf_dir)
+    parity = [check_parity(documents, size, overlap) for size, overlap in args.configs]
+    report = {
+        "meta": {"started_at": datetime.now().isoformat(),
+                 "params": {key: str(value) for key, value in vars(args).items() if key != "output"}},
+        "parity": parity,
+        "throughput": [throughput(documents, size, overlap, args.repeat) for size, overlap in args.configs],
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if not all(result["identical"] for result in parity):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
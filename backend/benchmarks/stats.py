@@ -0,0 +1,29 @@
+import math
+from typing import Dict, List
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """
+    Args:
+        samples: Durées en secondes
+
+    Returns:
+        Statistiques en millisecondes (moyenne, min, max, p50, p95, p99)
+    """
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "min_ms": ordered[0] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+    }
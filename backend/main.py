@@ -1,21 +1,35 @@
-import logging, os
+import json, logging, os, shutil, tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 # ______________________________________________________________________________________________________________________
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Form, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 # ______________________________________________________________________________________________________________________
-from src.application.adapters.ai_chat.openAI import OpenAiConnector
-from src.application.adapters.embeding.localEmbeding import LocalEmbeddingAdapter
+from src.application.adapters.ai_chat.factory import create_ai_connector
+from src.application.adapters.embeding.factory import create_embedding_adapter
 from src.domain.services.ai_service import AiService
+from src.domain.services.background_jobs import BackgroundJobs
+from src.domain.services.bulk_ingestion import BulkIngestor
+from src.domain.services.embedding_scheduler import EmbeddingScheduler
+from src.domain.services.folder_watcher import FolderWatcher
+from src.domain.services.ingestion_checkpoint import IngestionCheckpoint
+from src.domain.services.ingestion_quota import UserChunkQuota
+from src.domain.services.prompt_registry import prompt_registry
+from src.domain.services.relevance import NO_RELEVANT_DOCUMENTS
 from src.api.schemas.chat_input import AskDataInput
+from src.api.schemas.batch import BatchAskInput, BatchAskResult
 from src.api.schemas.chat_response import AskDataResponse
 from src.api.schemas.history import HistoryMessage
+from src.api.schemas.search import SearchRequest, SearchResponse
 from src.domain.services.vector_service import VectorStore
 from src.tools.file import get_pdf_files
+from src.tools.metrics import registry as metrics_registry, collect_timings, IN_FLIGHT
 from src.api.schemas.pdf_input import LoadAllPdfInput, ProcessPdfByFileInput, DeleteFileInput
 # ______________________________________________________________________________________________________________________
 load_dotenv()
@@ -34,8 +48,58 @@ app.add_middleware(
     allow_credentials=True,
 )
 
-ai_service = AiService(OpenAiConnector())
-vector_store = VectorStore(LocalEmbeddingAdapter())
+prompt_registry.load()
+ai_service = AiService(create_ai_connector(os.getenv("AI_BACKEND", "openai")))
+# Un seul modèle d'embedding pour les questions et l'ingestion: les questions passent entre deux tranches d'ingestion
+embedding_scheduler = EmbeddingScheduler.from_env(create_embedding_adapter(os.getenv("EMBEDDING_BACKEND", "local")))
+# Résumés de documents par le LLM (DOCUMENT_SUMMARIES=llm) pour le routage des questions
+vector_store = VectorStore(embedding_scheduler, summarizer=ai_service.summarize)
+bulk_ingestor = BulkIngestor(
+    vector_store,
+    IngestionCheckpoint(os.getenv("INGESTION_CHECKPOINT_PATH", "./ingestion_checkpoint.db")),
+    UserChunkQuota(int(os.getenv("INGESTION_QUOTA_CHUNKS_PER_MINUTE", "0"))),
+    extensions=EXTENSIONS
+)
+vector_store.delete_listeners.append(bulk_ingestor.checkpoint.forget)
+background_jobs = BackgroundJobs()
+DELETE_BACKGROUND_THRESHOLD = int(os.getenv("DELETE_BACKGROUND_THRESHOLD", "20000"))
+NO_RELEVANT_ANSWER = os.getenv("RELEVANCE_NO_RESULT_MESSAGE", NO_RELEVANT_DOCUMENTS)
+folder_watcher = None
+if os.getenv("WATCH_PDF_FOLDER", "false").lower() == "true":
+    folder_watcher = FolderWatcher(
+        PDF_PATH,
+        vector_store,
+        user_id=os.getenv("WATCH_USER_ID", "default"),
+        state_path=Path(os.getenv("WATCH_STATE_PATH", "./watch_state.json")),
+        extensions=EXTENSIONS,
+        debounce=float(os.getenv("WATCH_DEBOUNCE_SECONDS", "2")),
+        poll_interval=float(os.getenv("WATCH_POLL_INTERVAL", "30")),
+        use_inotify=os.getenv("WATCH_FORCE_POLLING", "false").lower() != "true"
+    )
+    vector_store.delete_listeners.append(folder_watcher.exclude)
+
+
+@app.on_event("startup")
+def start_folder_watcher():
+    if folder_watcher is not None:
+        folder_watcher.start()
+
+
+@app.on_event("shutdown")
+def stop_folder_watcher():
+    if folder_watcher is not None:
+        folder_watcher.stop()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Métriques au format texte Prometheus"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/prompts/domains")
+def get_prompt_domains():
+    """Liste les domaines de templates de prompts disponibles"""
+    return {"domains": prompt_registry.domains()}
 
 @app.get("/stat")
 def get_stat(user_id: str):
@@ -44,27 +108,40 @@ def get_stat(user_id: str):
 @app.post("/ask", response_model=AskDataResponse)
 def ask(data: AskDataInput):
     try:
-        start_time = time.time()
-
-        context_result = vector_store.get_context_for_query(
-            query=data.question,
-            user_id=data.user_id,
-            max_context_length=data.max_context_length
-        )
-
-        history_context = data.get_formatted_history()
-
-        ai_response = ai_service.response(
-            question=data.question,
-            context=context_result["context"],
-            history=history_context
-        )
-
-        updated_history = data.historics.copy()
-        updated_history.append(HistoryMessage(role="user", content=data.question))
-        updated_history.append(HistoryMessage(role="assistant", content=ai_response))
-
-        processing_time = time.time() - start_time
+        with IN_FLIGHT.track_inprogress(job="ask"), collect_timings() as timings:
+            start_time = time.time()
+
+            context_result = vector_store.get_context_for_query(
+                query=data.question,
+                user_id=data.user_id,
+                max_context_length=data.max_context_length,
+                file_filter=data.pdf_filter
+            )
+            if context_result.get("error"):
+                # Une erreur de recherche n'est jamais envoyée au LLM comme contexte
+                raise HTTPException(status_code=500, detail=f"Erreur lors de la recherche: {context_result['error']}")
+
+            # Question hors sujet ou sans document proche: réponse immédiate, sans appel LLM.
+            # Avec un historique, une relance ("et le second ?") peut rester pertinente: le LLM répond
+            if context_result["relevant"] or data.historics:
+                history_context = data.get_formatted_history()
+
+                ai_response = ai_service.response(
+                    question=data.question,
+                    context=context_result["context"],
+                    history=history_context,
+                    domain=data.prompt_domain
+                )
+            else:
+                ai_response = NO_RELEVANT_ANSWER
+
+            updated_history = data.historics.copy()
+            updated_history.append(HistoryMessage(role="user", content=data.question))
+            updated_history.append(HistoryMessage(role="assistant", content=ai_response))
+
+            processing_time = time.time() - start_time
+
+        logging.info(f"⏱️ /ask {json.dumps({'user_id': data.user_id, 'total': processing_time, **timings})}")
 
         return AskDataResponse(
             question=data.question,
@@ -73,164 +150,242 @@ def ask(data: AskDataInput):
             context_length=len(context_result["context"]),
             sources_count=len(context_result["sources"]),
             sources=context_result["sources"],
+            relevant=context_result["relevant"],
             processing_time=processing_time,
+            timings=timings,
             updated_history=updated_history
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Erreur: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/pdfs/process-all")
-def process_all_pdfs(data: LoadAllPdfInput):
-    """Traite tous les PDFs du dossier configuré avec limitation
-    
-    Args:
-        user_id: ID unique de l'utilisateur
-        custom_pdf_path (str, optional): Chemin personnalisé vers le dossier contenant les PDFs
-    """
-    chunk_limit = 1000
+@app.post("/ask/batch")
+def ask_batch(data: BatchAskInput):
+    """Traite un lot de questions en une seule passe de recherche
 
+    Un seul encode et une seule requête Chroma multi-vecteurs pour tout le lot,
+    puis les appels LLM en parallèle (concurrence bornée). La réponse est en NDJSON:
+    une première ligne avec les chunks dédupliqués, puis une ligne par question
+    dans l'ordre de complétion.
+    """
     try:
-        user_id = data.user_id
-
-        if not user_id:
-            raise HTTPException(status_code=400, detail="user_id est requis")
+        batch_context = vector_store.get_contexts_for_queries(
+            queries=data.questions,
+            user_id=data.user_id,
+            max_context_length=data.max_context_length,
+            file_filter=data.pdf_filter
+        )
+    except Exception as e:
+        logging.error(f"Erreur recherche lot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        custom_pdf_path = data.custom_pdf_path
+    def answer(index: int, question: str, context_result: dict) -> BatchAskResult:
+        start_time = time.time()
+        if not context_result["relevant"]:
+            return BatchAskResult(
+                index=index,
+                question=question,
+                response=NO_RELEVANT_ANSWER,
+                relevant=False,
+                processing_time=time.time() - start_time
+            )
+        try:
+            ai_response = ai_service.response(
+                question=question,
+                context=context_result["context"],
+                history=[],
+                domain=data.prompt_domain
+            )
+            return BatchAskResult(
+                index=index,
+                question=question,
+                response=ai_response,
+                sources=context_result["sources"],
+                chunk_ids=context_result["chunk_ids"],
+                processing_time=time.time() - start_time
+            )
+        except Exception as e:
+            logging.error(f"Erreur question {index} du lot: {e}")
+            return BatchAskResult(
+                index=index,
+                question=question,
+                processing_time=time.time() - start_time,
+                error=str(e)
+            )
+
+    def stream():
+        yield json.dumps({"type": "contexts", "chunks": batch_context["chunks"]}, ensure_ascii=False) + "\n"
+
+        executor = ThreadPoolExecutor(max_workers=data.max_concurrency)
+        try:
+            futures = [
+                executor.submit(answer, index, question, context_result)
+                for index, (question, context_result) in enumerate(zip(data.questions, batch_context["results"]))
+            ]
+            for future in as_completed(futures):
+                yield json.dumps({"type": "result", **future.result().model_dump()}, ensure_ascii=False) + "\n"
+        finally:
+            # Client déconnecté: on n'entame pas les appels LLM restants
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/search", response_model=SearchResponse)
+def search(data: SearchRequest):
+    """Recherche vectorielle dans les documents de l'utilisateur, optionnellement limitée à un fichier"""
+    results = vector_store.search_with_metadata(
+        query=data.query,
+        user_id=data.user_id,
+        n_results=data.top_k,
+        file_filter=data.pdf_name
+    )
 
-        pdf_path = Path(custom_pdf_path) if custom_pdf_path else PDF_PATH
+    if "error" in results:
+        raise HTTPException(status_code=500, detail=results["error"])
 
-        if not pdf_path.exists():
-            raise HTTPException(status_code=404, detail="Dossier PDF non trouvé")
+    formatted_results = [
+        {
+            "id": chunk_id,
+            "document": document,
+            "metadata": metadata,
+            "distance": distance
+        }
+        for chunk_id, document, metadata, distance in zip(
+            results["ids"][0],
+            results["documents"][0],
+            results["metadatas"][0],
+            results["distances"][0]
+        )
+    ]
 
-        list_pdf: List[Path] = get_pdf_files(pdf_path, EXTENSIONS)
+    return SearchResponse(
+        query=data.query,
+        results_count=len(formatted_results),
+        results=formatted_results
+    )
 
-        all_chunks = []
-        for pdf_file in list_pdf:
-            if len(all_chunks) >= chunk_limit:
-                logging.info(f"Limite de {chunk_limit} chunks atteinte")
-                break
 
-            try:
-                file_chunks = vector_store.document_processor.process_file(pdf_file)
-                remaining_space = chunk_limit - len(all_chunks)
-                all_chunks.extend(file_chunks[:remaining_space])
-            except Exception as e:
-                logging.error(f"Erreur avec {pdf_file}: {e}")
-                continue
+def _resolve_pdf_path(custom_pdf_path: str | None) -> Path:
+    pdf_path = Path(custom_pdf_path) if custom_pdf_path else PDF_PATH
+    if not pdf_path.exists():
+        raise HTTPException(status_code=404, detail="Dossier PDF non trouvé")
+    return pdf_path
 
-        if all_chunks:
-            vector_store._add_chunks_to_collection(all_chunks, user_id)
 
-        stats = vector_store.document_processor.get_chunk_info(all_chunks)
-        return {"message": f"Traité {len(all_chunks)} chunks", "stats": stats}
+@app.post("/pdfs/process-all")
+def process_all_pdfs(data: LoadAllPdfInput):
+    """Traite tous les PDFs du dossier configuré, avec reprise sur interruption
 
+    Args:
+        user_id: ID unique de l'utilisateur
+        custom_pdf_path (str, optional): Chemin personnalisé vers le dossier contenant les PDFs
+        background (bool): Lance le traitement en tâche de fond
+        retry_failed (bool): Retraite les fichiers en échec
+    """
+    try:
+        with IN_FLIGHT.track_inprogress(job="ingestion"):
+            user_id = data.user_id
+
+            if not user_id:
+                raise HTTPException(status_code=400, detail="user_id est requis")
+
+            pdf_path = _resolve_pdf_path(data.custom_pdf_path)
+
+            if data.background:
+                started = bulk_ingestor.start(pdf_path, user_id, retry_failed=data.retry_failed)
+                message = "Ingestion lancée" if started["started"] else "Ingestion déjà en cours"
+                return {"message": message, **started}
+
+            run = bulk_ingestor.run(pdf_path, user_id, retry_failed=data.retry_failed)
+            return {
+                "message": f"Traité {run['processed']} fichiers",
+                "run_id": run["run_id"],
+                "files": run["files"],
+                "total_chunks": run["chunks"],
+                "failed": run["failed"]
+            }
+
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Erreur lors du traitement: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 
+@app.get("/pdfs/ingestion/status")
+def get_ingestion_status(user_id: str, custom_pdf_path: str | None = None):
+    """État du lot d'ingestion utilisateur + dossier (fichiers pending/done/failed)"""
+    pdf_path = Path(custom_pdf_path) if custom_pdf_path else PDF_PATH
+    return bulk_ingestor.status(pdf_path, user_id)
+
+
 @app.post("/pdfs/process-by-file")
 def process_pdfs_by_file(data: ProcessPdfByFileInput):
     """
-    Traite les PDFs fichier par fichier avec limitation
+    Traite les PDFs fichier par fichier, au plus max_files fichiers non encore traités par appel
     """
     try:
-        user_id = data.user_id
-
-        if not user_id:
-            raise HTTPException(status_code=400, detail="user_id est requis")
-
-        custom_pdf_path = data.custom_pdf_path
-
-        pdf_path = Path(custom_pdf_path) if custom_pdf_path else PDF_PATH
-
-        if not pdf_path.exists():
-            raise HTTPException(status_code=404, detail="Dossier PDF non trouvé")
-
-        list_pdf: List[Path] = get_pdf_files(PDF_PATH, EXTENSIONS)
-
-        if not list_pdf:
-            raise HTTPException(status_code=404, detail="Aucun fichier PDF trouvé")
-        
-        limited_files = list_pdf[:data.max_files]
-
-        results = []
-        total_chunks_added = 0
-
-        for pdf_file in limited_files:
-            try:
-                # Traite un fichier à la fois
-                chunks = vector_store.document_processor.process_file(pdf_file)
-
-                if chunks:
-                    # Ajoute à la collection
-                    vector_store._add_chunks_to_collection(chunks, user_id)
-
-                    results.append({
-                        "file": pdf_file.name,
-                        "chunks": len(chunks),
-                        "status": "success"
-                    })
-                    total_chunks_added += len(chunks)
-                else:
-                    results.append({
-                        "file": pdf_file.name,
-                        "chunks": 0,
-                        "status": "no_content"
-                    })
-
-            except Exception as e:
-                logging.error(f"Erreur avec {pdf_file}: {e}")
-                results.append({
-                    "file": pdf_file.name,
-                    "chunks": 0,
-                    "status": f"error: {str(e)}"
-                })
-
-        return {
-            "message": f"Traité {len(limited_files)} fichiers",
-            "total_chunks": total_chunks_added,
-            "results": results
-        }
+        with IN_FLIGHT.track_inprogress(job="ingestion"):
+            user_id = data.user_id
+
+            if not user_id:
+                raise HTTPException(status_code=400, detail="user_id est requis")
+
+            pdf_path = _resolve_pdf_path(data.custom_pdf_path)
+
+            if not get_pdf_files(pdf_path, EXTENSIONS):
+                raise HTTPException(status_code=404, detail="Aucun fichier PDF trouvé")
+
+            run = bulk_ingestor.run(pdf_path, user_id, max_files=data.max_files)
+
+            return {
+                "message": f"Traité {run['processed']} fichiers",
+                "total_chunks": sum(result["chunks"] for result in run["results"]),
+                "results": run["results"],
+                "remaining": run["files"]["pending"]
+            }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Erreur lors du traitement par fichier: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 
 @app.post("/upload-documents")
-async def upload_documents(
+def upload_documents(
     user_id: str = Form(...),
     files: List[UploadFile] = File(...)
 ):
-    """Upload et traitement de documents"""
+    """Upload et traitement de documents (handler synchrone: exécuté hors de la boucle d'événements)"""
     try:
-        if not user_id:
-            raise HTTPException(status_code=400, detail="user_id est requis")
+        with IN_FLIGHT.track_inprogress(job="ingestion"):
+            if not user_id:
+                raise HTTPException(status_code=400, detail="user_id est requis")
 
-        file_paths = []
-        for file in files:
-            temp_path = f"./temp/{file.filename}"
-            os.makedirs("./temp", exist_ok=True)
+            file_paths = []
+            for file in files:
+                temp_path = f"./temp/{file.filename}"
+                os.makedirs("./temp", exist_ok=True)
 
-            content = await file.read()
-            
-            with open(temp_path, "wb") as f:
-                f.write(content)
-            file_paths.append(temp_path)
+                with open(temp_path, "wb") as f:
+                    shutil.copyfileobj(file.file, f, length=1024 * 1024)
+                file_paths.append(temp_path)
 
-        stats = vector_store.add_documents_from_files(file_paths, user_id)
+            stats = vector_store.add_documents_from_files(file_paths, user_id)
 
-        for path in file_paths:
-            try:
-                os.remove(path)
-            except Exception as e:
-                logging.warning(f"Impossible de supprimer {path}: {e}")
+            for path in file_paths:
+                try:
+                    os.remove(path)
+                except Exception as e:
+                    logging.warning(f"Impossible de supprimer {path}: {e}")
 
-        return {"message": "Documents traités", "stats": stats}
+            return {"message": "Documents traités", "stats": stats}
 
     except Exception as e:
         logging.error(f"Erreur upload documents: {e}")
@@ -244,16 +399,106 @@ def get_collection_size(user_id: str):
     return {"collection_size": size}
 
 
+def _run_delete(kind: str, delete, user_id: str, file_name: str | None = None):
+    """Supprime tout de suite, ou en tâche de fond au-delà de DELETE_BACKGROUND_THRESHOLD chunks"""
+    size = vector_store.count_chunks(user_id, file_name, limit=DELETE_BACKGROUND_THRESHOLD + 1)
+    if size <= DELETE_BACKGROUND_THRESHOLD:
+        return delete()
+
+    def job():
+        if not delete():
+            raise RuntimeError("Suppression en échec")
+        return {"user_id": user_id, "file_name": file_name}
+
+    job_id = background_jobs.submit(kind, job, user_id=user_id, file_name=file_name)
+    return job_id
+
+
 @app.delete("/collection/clear")
 def clear_collection(user_id: str):
-    """Vide complètement la collection de l'utilisateur"""
-    success = vector_store.clear_collection(user_id)
-    if success:
+    """
+    Vide complètement la collection de l'utilisateur (en tâche de fond pour les gros volumes)
+
+    Les fichiers du dossier surveillé ne sont pas réingérés: voir POST /watcher/reingest
+    """
+    result = _run_delete("clear_collection", lambda: vector_store.clear_collection(user_id), user_id)
+    if isinstance(result, str):
+        return {"message": "Vidage lancé en tâche de fond", "job_id": result}
+    if result:
         return {"message": "Collection vidée avec succès"}
     else:
         raise HTTPException(status_code=500, detail="Erreur lors du vidage")
 
 
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """État d'une tâche de fond (suppression massive)"""
+    job = background_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche inconnue")
+    return job
+
+
+@app.get("/collection/export")
+def export_collection(user_id: str):
+    """Exporte les chunks, métadonnées et vecteurs de l'utilisateur (archive .vstore)"""
+    fd, archive_path = tempfile.mkstemp(suffix=".vstore")
+    os.close(fd)
+    try:
+        with IN_FLIGHT.track_inprogress(job="export"):
+            vector_store.export_user(user_id, archive_path)
+    except Exception as e:
+        os.remove(archive_path)
+        logging.error(f"Erreur export: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+    return FileResponse(
+        archive_path,
+        media_type="application/octet-stream",
+        filename=f"{user_id}.vstore",
+        background=BackgroundTask(os.remove, archive_path)
+    )
+
+
+@app.post("/collection/import")
+def import_collection(
+    user_id: str = Form(...),
+    file: UploadFile = File(...),
+    force: bool = Form(False)
+):
+    """Importe une archive .vstore sans re-vectorisation"""
+    fd, archive_path = tempfile.mkstemp(suffix=".vstore")
+    try:
+        with IN_FLIGHT.track_inprogress(job="ingestion"):
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(file.file, f, length=1024 * 1024)
+            report = vector_store.import_archive(archive_path, user_id=user_id, force=force)
+            return {"message": f"Importé {report['added']}/{report['count']} chunks", "report": report}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Erreur import: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+    finally:
+        os.remove(archive_path)
+
+
+@app.get("/watcher/status")
+def get_watcher_status():
+    """État du watcher de dossier (WATCH_PDF_FOLDER=true)"""
+    if folder_watcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **folder_watcher.status()}
+
+
+@app.post("/watcher/reingest")
+def reingest_watched_files(file_name: Optional[str] = None):
+    """Réingère les fichiers du dossier surveillé supprimés de la base par l'API (tous, ou un seul)"""
+    if folder_watcher is None:
+        raise HTTPException(status_code=404, detail="Watcher de dossier désactivé (WATCH_PDF_FOLDER)")
+    return folder_watcher.reingest(file_name)
+
+
 @app.get("/files")
 def get_files_list(user_id: str):
     """Liste tous les fichiers indexés de l'utilisateur"""
@@ -263,16 +508,22 @@ def get_files_list(user_id: str):
 
 @app.delete("/files")
 def delete_file(data: DeleteFileInput):
-    """Supprime tous les chunks d'un fichier spécifique de l'utilisateur"""
+    """
+    Supprime tous les chunks d'un fichier spécifique de l'utilisateur
+
+    Un fichier du dossier surveillé n'est pas réingéré tant qu'il n'y est pas modifié: voir POST /watcher/reingest
+    """
     user_id = data.user_id
     file_name = data.file_name
 
     if not user_id:
         raise HTTPException(status_code=400, detail="user_id est requis")
 
-    success = vector_store.delete_file_chunks(file_name, user_id)
-    
-    if success:
+    result = _run_delete("delete_file", lambda: vector_store.delete_file_chunks(file_name, user_id),
+                         user_id, file_name)
+    if isinstance(result, str):
+        return {"message": f"Suppression de {file_name} lancée en tâche de fond", "job_id": result}
+    if result:
         return {"message": f"Fichier {file_name} supprimé avec succès"}
     else:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la suppression de {file_name}")
@@ -0,0 +1,60 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+
+class BatchAskInput(BaseModel):
+    user_id: str = Field(
+        description="ID unique de l'utilisateur",
+        min_length=1
+    )
+    questions: List[str] = Field(
+        description="Questions à traiter en lot",
+        min_length=1,
+        max_length=1000
+    )
+
+    # Optional
+    max_context_length: int = Field(
+        default=4000,
+        description="Longueur maximale du contexte pour chaque question",
+        ge=1000,
+        le=8000
+    )
+    pdf_filter: Optional[str] = Field(
+        default=None,
+        description="Filtrer par nom de PDF spécifique"
+    )
+    prompt_domain: Optional[str] = Field(
+        default=None,
+        description="Domaine du template de prompt (défaut: default)"
+    )
+    max_concurrency: int = Field(
+        default=4,
+        description="Nombre maximum d'appels LLM simultanés",
+        ge=1,
+        le=32
+    )
+
+    @field_validator('questions')
+    @classmethod
+    def validate_questions(cls, v):
+        cleaned = []
+        for question in v:
+            if not question.strip():
+                raise ValueError("Les questions ne peuvent pas être vides")
+            if len(question) > 250:
+                raise ValueError("Une question ne peut pas dépasser 250 caractères")
+            cleaned.append(question.strip())
+        return cleaned
+
+
+class BatchAskResult(BaseModel):
+    """Résultat d'une question du lot, émis dès qu'il est disponible"""
+    index: int = Field(description="Position de la question dans le lot")
+    question: str = Field(description="Question posée")
+    response: Optional[str] = Field(default=None, description="Réponse de l'IA")
+    sources: List[str] = Field(default=[], description="Liste des sources utilisées")
+    chunk_ids: List[str] = Field(default=[], description="IDs des chunks du contexte (voir l'en-tête du lot)")
+    relevant: bool = Field(default=True, description="False si aucun document pertinent (sans appel au LLM)")
+    processing_time: float = Field(description="Temps de traitement du LLM en secondes")
+    error: Optional[str] = Field(default=None, description="Erreur éventuelle")
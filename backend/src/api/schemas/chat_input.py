@@ -34,6 +34,10 @@ class AskDataInput(BaseModel):
         default=None,
         description="Filtrer par nom de PDF spécifique"
     )
+    prompt_domain: Optional[str] = Field(
+        default=None,
+        description="Domaine du template de prompt (défaut: default)"
+    )
 
     @field_validator('question')
     @classmethod
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel, Field
 from src.api.schemas.history import HistoryMessage
 
@@ -11,10 +11,18 @@ class AskDataResponse(BaseModel):
     context_length: int = Field(description="Longueur du contexte")
     sources_count: int = Field(description="Nombre de sources utilisées")
     sources: List[str] = Field(description="Liste des sources utilisées")
+    relevant: bool = Field(
+        default=True,
+        description="False si aucun document pertinent n'a été trouvé (réponse donnée sans appel au LLM)"
+    )
     processing_time: Optional[float] = Field(
         default=None,
         description="Temps de traitement en secondes"
     )
+    timings: Dict[str, float] = Field(
+        default={},
+        description="Durée de chaque étape en secondes (query_embedding, vector_search, context_packing, llm_call)"
+    )
     updated_history: List[HistoryMessage] = Field(
         description="Historique mis à jour avec la nouvelle réponse"
     )
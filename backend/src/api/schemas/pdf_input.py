@@ -12,6 +12,14 @@ class LoadAllPdfInput(BaseModel):
         description="Chemin personnalisé vers le dossier contenant les PDFs",
         default=None
     )
+    background: bool = Field(
+        description="Lance l'ingestion en tâche de fond (suivi via /pdfs/ingestion/status)",
+        default=False
+    )
+    retry_failed: bool = Field(
+        description="Retraite les fichiers en échec lors d'une relance",
+        default=True
+    )
 
 class ProcessPdfByFileInput(BaseModel):
     user_id: str = Field(
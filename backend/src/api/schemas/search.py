@@ -1,14 +1,29 @@
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SearchRequest(BaseModel):
-    query: str
-    pdf_name: Optional[str] = None
-    top_k: int = 5
+    user_id: str = Field(
+        description="ID unique de l'utilisateur",
+        min_length=1
+    )
+    query: str = Field(
+        description="Texte de la recherche",
+        min_length=1
+    )
+    pdf_name: Optional[str] = Field(
+        default=None,
+        description="Restreindre la recherche à un fichier"
+    )
+    top_k: int = Field(
+        default=5,
+        description="Nombre de résultats à retourner",
+        ge=1,
+        le=50
+    )
     prefer_chapters: bool = True
 
 class SearchResponse(BaseModel):
     query: str
     results_count: int
-    results: List[dict]
\ No newline at end of file
+    results: List[dict]
@@ -1,9 +1,13 @@
 import os
 import requests
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 from src.domain.ports.ai import AiConnector
+from src.application.adapters.ai_chat.resilience import guard_from_env
+from src.domain.services.summarizer import summarizer_from_env
+from src.tools.metrics import record_llm_usage
 
 
 class LmStudioAdapter(AiConnector):
@@ -13,28 +17,29 @@ class LmStudioAdapter(AiConnector):
         self.base_url: Optional[str] = os.getenv('LM_STUDIO_URL')
         self.api_key: Optional[str] = os.getenv('LM_STUDIO_API_KEY')
 
-        self.timeout: int = kwargs.get('timeout', 120)
+        self.timeout: float = float(kwargs.get('timeout', os.getenv('LM_STUDIO_READ_TIMEOUT', 120)))
+        self.connect_timeout: float = float(kwargs.get('connect_timeout', os.getenv('LM_STUDIO_CONNECT_TIMEOUT', 5)))
         self.temperature: float = kwargs.get('temperature', 0.7)
         self.max_tokens: int = kwargs.get('max_tokens', 1000)
 
         self._check()
+        self.guard = guard_from_env("LM Studio", "LM_STUDIO", **kwargs)
+        self.session = self._init_session()
         self._health_check()
+        # Documents longs: sections résumées en parallèle puis réduites (cache par contenu)
+        self.summarizer = summarizer_from_env(self._complete, "LM_STUDIO", f"lmstudio:{self.model}", self.model,
+                                              self.guard.max_concurrency, final_max_tokens=self.max_tokens)
 
 
-    def summarize_text(self, file_name: str, text: str) -> str:
-        try:
-            logging.info(f"Envoi de la request {file_name}")
-
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                json=self._build_payload(text),
-                headers=self._get_headers(),
-                timeout=self.timeout
-            )
+    def summarize_text(self, file_name: str, text: str, domain: Optional[str] = None) -> str:
+        logging.info(f"Envoi de la request {file_name}")
+        return self.summarizer.summarize(file_name, text, domain)
 
-            response.raise_for_status()
 
-            response_data = response.json()
+    def _complete(self, system_prompt: str, content: str, max_tokens: int) -> str:
+        """Un appel de résumé (section, paquet de résumés partiels ou résumé final)"""
+        try:
+            response_data = self._post("/chat/completions", self._build_payload(system_prompt, content, max_tokens))
 
             if 'choices' in response_data and len(response_data['choices']) > 0:
                 summary = response_data['choices'][0]['message']['content']
@@ -47,9 +52,28 @@ class LmStudioAdapter(AiConnector):
             raise Exception(f"Erreur de communication avec LM Studio: {str(e)}")
 
 
-    def response_with_context(self, question: str, context: str, historic: str) -> str:
-        logging.info(f"Pas implémenter LM Studio response context")
-        return ""
+    def response_with_context(self, question: str, context: str, historic: List[Dict[str, str]] = None,
+                              domain: Optional[str] = None) -> str:
+        if historic is None:
+            historic = []
+
+        try:
+            response_data = self._post("/chat/completions", {
+                'model': self.model,
+                'messages': self._generate_message(question, context, historic, domain),
+                'temperature': self.temperature,
+                'max_tokens': self.max_tokens,
+                'stream': False
+            })
+
+            if 'choices' in response_data and len(response_data['choices']) > 0:
+                return self.clean_result(response_data['choices'][0]['message']['content'])
+
+            else:
+                raise Exception("Réponse invalide de l'API LM Studio")
+
+        except requests.exceptions.HTTPError as e:
+            raise Exception(f"Erreur de communication avec LM Studio: {str(e)}")
 
 
     def _check(self) -> None:
@@ -67,10 +91,9 @@ class LmStudioAdapter(AiConnector):
 
     def _health_check(self) -> bool:
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/models",
-                headers=self._get_headers(),
-                timeout=10
+                timeout=(self.connect_timeout, 10)
             )
 
             response.raise_for_status()
@@ -88,6 +111,33 @@ class LmStudioAdapter(AiConnector):
             return False
 
 
+    def _init_session(self) -> requests.Session:
+        """Session keep-alive dont le pool est dimensionné sur la concurrence autorisée"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.guard.max_concurrency, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self._get_headers())
+        return session
+
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST JSON via la session, avec retries/backoff, disjoncteur et limite de concurrence"""
+        def send() -> Dict[str, Any]:
+            response = self.session.post(
+                f"{self.base_url}{path}",
+                json=payload,
+                timeout=(self.connect_timeout, self.timeout)
+            )
+            response.raise_for_status()
+            return response.json()
+
+        response_data = self.guard.call(send)
+        usage = response_data.get('usage') or {}
+        record_llm_usage("lmstudio", usage.get('prompt_tokens'), usage.get('completion_tokens'))
+        return response_data
+
+
     def _get_headers(self) -> Dict[str, str]:
         return {
             'Content-Type': 'application/json',
@@ -95,13 +145,13 @@ class LmStudioAdapter(AiConnector):
         }
 
 
-    def _build_payload(self, prompt: str) -> Dict[str, Any]:
+    def _build_payload(self, system_prompt: str, prompt: str, max_tokens: int) -> Dict[str, Any]:
         return {
             'model': self.model,
             'messages': [
                 {
                     'role': 'system',
-                    'content': AiConnector.get_prompt()
+                    'content': system_prompt
                 },
                 {
                     'role': 'user',
@@ -109,6 +159,6 @@ class LmStudioAdapter(AiConnector):
                 }
             ],
             'temperature': self.temperature,
-            'max_tokens': self.max_tokens,
+            'max_tokens': max_tokens,
             'stream': False
         }
\ No newline at end of file
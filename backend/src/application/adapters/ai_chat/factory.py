@@ -0,0 +1,42 @@
+import os
+
+from src.domain.ports.ai import AiConnector
+
+AI_BACKENDS = ("openai", "lmstudio", "routed", "fake")
+
+
+def create_ai_connector(backend: str = None) -> AiConnector:
+    """
+    Instancie le connecteur d'IA choisi par configuration
+
+    Args:
+        backend: openai, lmstudio, routed ou fake (défaut: variable AI_BACKEND, sinon openai)
+
+    Returns:
+        Connecteur d'IA
+    """
+    backend = (backend or os.getenv("AI_BACKEND", "openai")).lower()
+
+    if backend == "openai":
+        from src.application.adapters.ai_chat.openAI import OpenAiConnector
+        return OpenAiConnector()
+
+    if backend == "lmstudio":
+        from src.application.adapters.ai_chat.LMStudio import LmStudioAdapter
+        return LmStudioAdapter()
+
+    if backend == "routed":
+        from src.application.adapters.ai_chat.openAI import OpenAiConnector
+        from src.application.adapters.ai_chat.LMStudio import LmStudioAdapter
+        from src.application.adapters.ai_chat.router import RoutingAiConnector
+        return RoutingAiConnector(
+            local=LmStudioAdapter(),
+            remote=OpenAiConnector(),
+            max_local_chars=int(os.getenv("AI_ROUTING_MAX_LOCAL_CHARS", 120))
+        )
+
+    if backend == "fake":
+        from src.application.adapters.ai_chat.fake import FakeAiConnector
+        return FakeAiConnector()
+
+    raise ValueError(f"Backend IA inconnu: '{backend}' (attendu: {', '.join(AI_BACKENDS)})")
@@ -0,0 +1,57 @@
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+from src.domain.ports.ai import AiConnector
+from src.tools.metrics import record_llm_usage
+
+
+class FakeAiConnector(AiConnector):
+    """Connecteur simulé pour les tests de charge: latence et débit de tokens configurables, sans appel réseau"""
+
+    def __init__(self, **kwargs):
+        """
+        Args (kwargs, sinon variables d'environnement):
+            latency: Délai avant le premier token en secondes (FAKE_LLM_LATENCY)
+            tokens_per_second: Débit de génération, 0 = instantané (FAKE_LLM_TOKENS_PER_SECOND)
+            completion_tokens: Nombre de tokens générés (FAKE_LLM_COMPLETION_TOKENS)
+        """
+        self.latency: float = float(kwargs.get('latency', os.getenv('FAKE_LLM_LATENCY', 0.5)))
+        self.tokens_per_second: float = float(kwargs.get('tokens_per_second', os.getenv('FAKE_LLM_TOKENS_PER_SECOND', 50)))
+        self.completion_tokens: int = int(kwargs.get('completion_tokens', os.getenv('FAKE_LLM_COMPLETION_TOKENS', 200)))
+        self._check()
+
+    def summarize_text(self, file_name: str, text: str, domain: Optional[str] = None) -> str:
+        return "".join(self._generate(f"Résumé de {file_name}", text))
+
+    def response_with_context(self, question: str, context: str, history: List[Dict[str, str]] = None,
+                              domain: Optional[str] = None) -> str:
+        return "".join(self.stream_response_with_context(question, context, history, domain))
+
+    def stream_response_with_context(self, question: str, context: str, history: List[Dict[str, str]] = None,
+                                     domain: Optional[str] = None) -> Iterator[str]:
+        """Version streaming: produit les tokens au rythme configuré"""
+        messages = self._generate_message(question, context, history or [], domain)
+        prompt = " ".join(message["content"] for message in messages)
+        yield from self._generate(f"<p>Réponse simulée à : {question}</p>", prompt)
+
+    def _generate(self, prefix: str, prompt: str) -> Iterator[str]:
+        time.sleep(self.latency)
+
+        words = prefix.split()
+        while len(words) < self.completion_tokens:
+            words.append("lorem")
+        words = words[:self.completion_tokens]
+
+        delay = 1 / self.tokens_per_second if self.tokens_per_second else 0
+        for i, word in enumerate(words):
+            if delay:
+                time.sleep(delay)
+            yield word if i == 0 else f" {word}"
+
+        # Estimation grossière: ~1 token par mot
+        record_llm_usage("fake", len(prompt.split()), len(words))
+
+    def _check(self) -> None:
+        if self.latency < 0 or self.tokens_per_second < 0 or self.completion_tokens < 1:
+            raise Exception("Paramètres du LLM simulé invalides")
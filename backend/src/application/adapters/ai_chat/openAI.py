@@ -1,13 +1,17 @@
 import os, logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+import httpx
 from dotenv import load_dotenv
 from openai import OpenAI
 from src.domain.ports.ai import AiConnector
+from src.application.adapters.ai_chat.resilience import guard_from_env
+from src.domain.services.summarizer import summarizer_from_env
+from src.tools.metrics import record_llm_usage
 
 
 class OpenAiConnector(AiConnector):
-    def __init__(self):
+    def __init__(self, **kwargs):
         load_dotenv()
 
         self.model: str|None = None
@@ -16,54 +20,65 @@ class OpenAiConnector(AiConnector):
 
         self.model = os.getenv("OPENAI_MODEL", "gpt-4-1106-preview")
         self.api_key = os.getenv("OPENAI_API_KEY")
-        self._check()
-        self._init_client()
+        self.base_url: str|None = os.getenv("OPENAI_BASE_URL")
 
-    def summarize_text(self, file_name: str, text: str) -> str:
-        print(f"✍️ Génération du résumé : {file_name}")
+        self.timeout: float = float(kwargs.get('timeout', os.getenv('OPENAI_READ_TIMEOUT', 120)))
+        self.connect_timeout: float = float(kwargs.get('connect_timeout', os.getenv('OPENAI_CONNECT_TIMEOUT', 5)))
 
-        chunks = [text[i:i + 8000] for i in range(0, len(text), 8000)]
+        self._check()
+        self.guard = guard_from_env("OpenAI", "OPENAI", **kwargs)
+        self._init_client()
+        # Documents longs: sections résumées en parallèle puis réduites (cache par contenu)
+        self.summarizer = summarizer_from_env(self._complete, "OPENAI", f"openai:{self.model}", self.model,
+                                              self.guard.max_concurrency, final_max_tokens=4000)
 
-        messages = [
-            {
-                "role": "system",
-                "content": AiConnector.get_prompt()
-            }
-        ]
+    def summarize_text(self, file_name: str, text: str, domain: Optional[str] = None) -> str:
+        logging.info(f"✍️ Génération du résumé : {file_name}")
+        return self.summarizer.summarize(file_name, text, domain)
 
-        for chunk in chunks[:2]:
-            messages.append(
-                {
-                    "role": "user",
-                    "content": f"Résume ce document :\n{chunk}"
-                }
-            )
 
-        response = self.client.chat.completions.create(
+    def _complete(self, system_prompt: str, content: str, max_tokens: int) -> str:
+        """Un appel de résumé (section, paquet de résumés partiels ou résumé final)"""
+        response = self.guard.call(lambda: self.client.chat.completions.create(
             model= self.model,
-            messages=messages, # type: ignore
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content}
+            ],
             temperature=0.3,
-            max_tokens=4000
-        )
+            max_tokens=max_tokens
+        ))
+        self._record_usage(response)
 
         return AiConnector.clean_result(response.choices[0].message.content)
 
 
-    def response_with_context(self, question: str, context: str, historic: List[Dict[str, str]] = None) -> str:
+    def response_with_context(self, question: str, context: str, historic: List[Dict[str, str]] = None,
+                              domain: Optional[str] = None) -> str:
 
         if historic is None:
             historic = []
 
-        response = self.client.chat.completions.create(
+        messages = self._generate_message(question, context, historic, domain)
+
+        response = self.guard.call(lambda: self.client.chat.completions.create(
             model= self.model,
-            messages=self._generate_message(question, context, historic), # type: ignore
+            messages=messages, # type: ignore
             temperature=0.3,
             max_tokens=4000
-        )
+        ))
+        self._record_usage(response)
 
         return AiConnector.clean_result(response.choices[0].message.content)
 
 
+    @staticmethod
+    def _record_usage(response) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            record_llm_usage("openai", usage.prompt_tokens, usage.completion_tokens)
+
+
     def _check(self) -> None:
         if self.model is None:
             logging.error("OpenAI model non trouvé !")
@@ -75,69 +90,19 @@ class OpenAiConnector(AiConnector):
 
     def _init_client(self) -> None:
         try:
-            self.client = OpenAI(api_key=self.api_key)
+            # Pool keep-alive dimensionné sur la concurrence autorisée, retries gérés par self.guard
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=self.guard.max_concurrency,
+                    max_keepalive_connections=self.guard.max_concurrency
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout)
+            )
+            self.client = OpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=http_client,
+                max_retries=0
+            )
         except Exception as e:
             logging.error(e)
-
-
-    @staticmethod
-    def _generate_message(question: str, context: str, historic: List[Dict[str, str]]) -> List[Dict[str, str]]:
-        """
-         Génère la liste des messages pour l'API OpenAI
-
-         Args:
-             question: Question actuelle
-             context: Contexte technique
-             historic: Historique des messages
-
-         Returns:
-             Liste des messages formatés pour OpenAI
-         """
-
-        system_message = {
-            "role": "system",
-            "content": """Tu es un assistant expert en technologie du froid industriel spécialisé dans les bouteilles séparatrices, 
-            les systèmes de réfrigération et les équipements associés.
-
-            Instructions :
-            - Tu dois répondre au format HTML avec des balises appropriées (<p>, <h3>, <ul>, <li>, etc.)
-            - Utilise l'historique de conversation pour maintenir la cohérence
-            - Sois précis et technique tout en restant accessible
-            - Si la question fait référence à des éléments précédents, utilise l'historique pour comprendre le contexte
-            - Structure tes réponses de manière claire et logique"""
-        }
-
-        if not historic or len(historic) == 0:
-            return [
-                system_message,
-                {
-                    "role": "user",
-                    "content": question
-                },
-                {
-                    "role": "system",
-                    "content": f"Contexte technique disponible :\n\n{context}"
-                }
-            ]
-
-        messages = [system_message]
-
-        limited_historic = historic[-8:] if len(historic) > 18 else historic
-
-        for msg in limited_historic:
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-
-        messages.append({
-            "role": "user",
-            "content": question
-        })
-
-        messages.append({
-            "role": "system",
-            "content": f"Contexte technique pertinent pour cette question :\n\n{context}"
-        })
-
-        return messages
\ No newline at end of file
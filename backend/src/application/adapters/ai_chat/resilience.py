@@ -0,0 +1,239 @@
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional, Tuple, TypeVar
+
+import httpx
+import openai
+import requests
+
+T = TypeVar("T")
+
+# Statuts HTTP pour lesquels une nouvelle tentative a un sens
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class UpstreamUnavailableError(Exception):
+    """Levée quand le circuit d'un upstream est ouvert"""
+    pass
+
+
+class CircuitBreaker:
+    """Disjoncteur: coupe les appels après trop d'échecs consécutifs
+
+    Après `failure_threshold` échecs, le circuit s'ouvre pendant `reset_timeout`
+    secondes, puis laisse passer un appel d'essai (semi-ouvert). Un succès le referme.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            UpstreamUnavailableError: si le circuit est ouvert
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_progress:
+                raise UpstreamUnavailableError("Circuit ouvert, upstream temporairement indisponible")
+            self._trial_in_progress = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def release_trial(self) -> None:
+        """Libère l'appel d'essai sans changer l'état du circuit (ex: erreur client)"""
+        with self._lock:
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_progress or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_progress = False
+
+
+class UpstreamGuard:
+    """Protège les appels vers un upstream LLM
+
+    Combine un limiteur de concurrence, un disjoncteur et des nouvelles tentatives
+    avec backoff exponentiel "full jitter" sur les erreurs réseau, 429 et 5xx.
+    """
+
+    def __init__(self,
+                 name: str,
+                 max_concurrency: int = 8,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 20.0,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0,
+                 acquire_timeout: Optional[float] = None
+        ):
+        """
+        Args:
+            name: Nom de l'upstream (pour les logs)
+            max_concurrency: Nombre maximum d'appels simultanés
+            max_retries: Nombre de nouvelles tentatives après le premier échec
+            backoff_base: Délai de base du backoff en secondes
+            backoff_max: Délai maximum entre deux tentatives
+            failure_threshold: Échecs consécutifs avant ouverture du circuit
+            reset_timeout: Durée d'ouverture du circuit en secondes
+            acquire_timeout: Attente max d'une place libre (None = illimitée)
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.acquire_timeout = acquire_timeout
+
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        Exécute `fn` sous la protection du limiteur, du disjoncteur et des retries
+
+        Args:
+            fn: Appel à exécuter (sans argument)
+
+        Returns:
+            Résultat de `fn`
+        """
+        attempt = 0
+        while True:
+            if self.breaker.state == "open":
+                raise UpstreamUnavailableError("Circuit ouvert, upstream temporairement indisponible")
+
+            if not self._semaphore.acquire(timeout=self.acquire_timeout):
+                raise UpstreamUnavailableError(f"{self.name}: trop d'appels simultanés")
+            try:
+                # Place obtenue avant de réserver l'appel d'essai (semi-ouvert): un essai réservé
+                # est toujours exécuté et conclu, sinon le circuit resterait bloqué
+                self.breaker.before_call()
+                try:
+                    result = fn()
+                except Exception as e:
+                    retryable, retry_after = classify_error(e)
+                    if retryable:
+                        self.breaker.record_failure()
+                    else:
+                        # Erreur client (4xx): ni succès ni panne de l'upstream, l'état du circuit ne change pas
+                        self.breaker.release_trial()
+
+                    if not retryable or attempt >= self.max_retries:
+                        raise
+
+                    delay = self._backoff_delay(attempt, retry_after)
+                    logging.warning(f"⚠️ {self.name}: tentative {attempt + 1} échouée ({e}), "
+                                    f"nouvel essai dans {delay:.2f}s")
+                    attempt += 1
+                else:
+                    self.breaker.record_success()
+                    return result
+            finally:
+                self._semaphore.release()
+
+            time.sleep(delay)
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+def classify_error(error: Exception) -> Tuple[bool, Optional[float]]:
+    """
+    Détermine si une erreur d'appel HTTP (requests, httpx ou openai) mérite un nouvel essai
+
+    Args:
+        error: Exception levée par l'appel
+
+    Returns:
+        Tuple (retry possible, délai Retry-After en secondes si fourni)
+    """
+    if isinstance(error, UpstreamUnavailableError):
+        return False, None
+
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+
+    if status is not None:
+        if status not in RETRYABLE_STATUS:
+            return False, None
+        return True, _parse_retry_after(getattr(response, "headers", None))
+
+    # Pas de statut HTTP: erreur réseau ou timeout
+    network_errors = (
+        requests.ConnectionError,
+        requests.Timeout,
+        httpx.TransportError,
+        openai.APIConnectionError,
+    )
+    return isinstance(error, network_errors), None
+
+
+def _parse_retry_after(headers) -> Optional[float]:
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def guard_from_env(name: str, prefix: str, **overrides) -> UpstreamGuard:
+    """
+    Construit un UpstreamGuard depuis les variables d'environnement `{prefix}_*`
+
+    Variables lues: MAX_CONCURRENCY, MAX_RETRIES, CIRCUIT_FAILURES, CIRCUIT_RESET, ACQUIRE_TIMEOUT.
+    Les arguments explicites sont prioritaires sur l'environnement.
+
+    Args:
+        name: Nom de l'upstream
+        prefix: Préfixe des variables (ex: OPENAI, LM_STUDIO)
+
+    Returns:
+        UpstreamGuard configuré
+    """
+    def setting(key: str, env_name: str, cast, default):
+        if overrides.get(key) is not None:
+            return cast(overrides[key])
+        value = os.getenv(f"{prefix}_{env_name}")
+        return cast(value) if value else default
+
+    return UpstreamGuard(
+        name=name,
+        max_concurrency=setting("max_concurrency", "MAX_CONCURRENCY", int, 8),
+        max_retries=setting("max_retries", "MAX_RETRIES", int, 3),
+        failure_threshold=setting("failure_threshold", "CIRCUIT_FAILURES", int, 5),
+        reset_timeout=setting("reset_timeout", "CIRCUIT_RESET", float, 30.0),
+        acquire_timeout=setting("acquire_timeout", "ACQUIRE_TIMEOUT", float, None),
+    )
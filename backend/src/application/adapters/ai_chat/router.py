@@ -0,0 +1,39 @@
+import logging
+from typing import Dict, List, Optional
+
+from src.domain.ports.ai import AiConnector
+
+
+class RoutingAiConnector(AiConnector):
+    """Route les questions courtes vers un modèle local et les longues vers un modèle distant"""
+
+    def __init__(self, local: AiConnector, remote: AiConnector, max_local_chars: int = 120):
+        """
+        Args:
+            local: Connecteur local (ex: LM Studio)
+            remote: Connecteur distant (ex: OpenAI)
+            max_local_chars: Longueur max d'une question traitée en local
+        """
+        self.local = local
+        self.remote = remote
+        self.max_local_chars = max_local_chars
+        self._check()
+
+    def summarize_text(self, file_name: str, text: str, domain: Optional[str] = None) -> str:
+        # Les résumés portent sur des documents entiers: toujours vers le modèle distant
+        return self.remote.summarize_text(file_name, text, domain)
+
+    def response_with_context(self, question: str, context: str, history: List[Dict[str, str]] = None,
+                              domain: Optional[str] = None) -> str:
+        connector = self._select(question)
+        logging.info(f"🔀 Question de {len(question)} caractères routée vers {type(connector).__name__}")
+        return connector.response_with_context(question, context, history, domain)
+
+    def _select(self, question: str) -> AiConnector:
+        if len(question) <= self.max_local_chars:
+            return self.local
+        return self.remote
+
+    def _check(self) -> None:
+        if self.local is None or self.remote is None:
+            raise Exception("Connecteurs local et distant requis pour le routage")
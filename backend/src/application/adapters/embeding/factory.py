@@ -0,0 +1,28 @@
+import os
+
+from src.domain.ports.embeding import EmbeddingPort
+
+EMBEDDING_BACKENDS = ("local", "fake")
+
+
+def create_embedding_adapter(backend: str = None) -> EmbeddingPort:
+    """
+    Instancie l'adaptateur d'embedding choisi par configuration
+
+    Args:
+        backend: local ou fake (défaut: variable EMBEDDING_BACKEND, sinon local)
+
+    Returns:
+        Adaptateur d'embedding
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "local")).lower()
+
+    if backend == "local":
+        from src.application.adapters.embeding.localEmbeding import LocalEmbeddingAdapter
+        return LocalEmbeddingAdapter()
+
+    if backend == "fake":
+        from src.application.adapters.embeding.fakeEmbeding import FakeEmbeddingAdapter
+        return FakeEmbeddingAdapter()
+
+    raise ValueError(f"Backend d'embedding inconnu: '{backend}' (attendu: {', '.join(EMBEDDING_BACKENDS)})")
@@ -0,0 +1,52 @@
+import hashlib
+import os
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from src.domain.ports.embeding import EmbeddingPort
+
+
+class FakeEmbeddingAdapter(EmbeddingPort):
+    """Adaptateur d'embedding déterministe pour les tests de charge, sans modèle"""
+
+    def __init__(self, dimension: int = None, cost_per_call: float = None, cost_per_text: float = None):
+        """
+        Args:
+            dimension: Taille des vecteurs (FAKE_EMBEDDING_DIM, défaut 384 comme all-MiniLM-L6-v2)
+            cost_per_call: Coût fixe simulé par appel en secondes (FAKE_EMBEDDING_COST_PER_CALL)
+            cost_per_text: Coût simulé par texte en secondes (FAKE_EMBEDDING_COST_PER_TEXT)
+        """
+        self.dimension = int(dimension or os.getenv('FAKE_EMBEDDING_DIM', 384))
+        self.cost_per_call = float(cost_per_call if cost_per_call is not None else os.getenv('FAKE_EMBEDDING_COST_PER_CALL', 0.005))
+        self.cost_per_text = float(cost_per_text if cost_per_text is not None else os.getenv('FAKE_EMBEDDING_COST_PER_TEXT', 0.001))
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """
+        Encode une liste de textes en vecteurs unitaires dérivés du hash du texte
+
+        Args:
+            texts: Liste des textes à encoder
+
+        Returns:
+            Liste des vecteurs d'embedding (identiques pour un même texte)
+        """
+        time.sleep(self.cost_per_call + self.cost_per_text * len(texts))
+
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.md5(text.encode('utf-8')).digest()[:8], 'little')
+            vectors[i] = np.random.default_rng(seed).standard_normal(self.dimension)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors.tolist()
+
+    def get_token_counter(self) -> Optional[Callable[[str], int]]:
+        # Un mot = un token: suffisant pour tester le découpage en tokens
+        return lambda text: len(text.split())
+
+    def get_max_tokens(self) -> Optional[int]:
+        return 256
+
+    def get_model_name(self) -> str:
+        return f"fake-{self.dimension}d"
@@ -1,36 +1,170 @@
+import logging
+import os
 from sentence_transformers import SentenceTransformer
-from typing import List
+from sentence_transformers.models import Transformer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import torch
+
 from src.domain.ports.embeding import EmbeddingPort
+from src.tools.metrics import stage, EMBEDDING_TRUNCATED
 
 class LocalEmbeddingAdapter(EmbeddingPort):
-    """Adaptateur local pour la vectorisation utilisant SentenceTransformer"""
-    
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    """Adaptateur local pour la vectorisation utilisant SentenceTransformer
+
+    Les textes sont tokenisés d'abord, triés par longueur en tokens puis regroupés
+    en lots dont le coût paddé (taille du lot x plus long texte) tient dans un budget
+    de tokens: les chunks courts (titres, tableaux) ne sont plus paddés à la longueur
+    de leurs voisins. Les vecteurs sont rendus dans l'ordre d'origine.
+    La tokenisation n'est faite qu'une fois: les lots sont paddés puis passés au modèle
+    (deux fois avec un tokenizer lent, pour repérer les textes tronqués).
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', token_budget: int = None,
+                 max_batch_size: int = None):
         """
         Initialise l'adaptateur avec un modèle spécifique
-        
+
         Args:
             model_name: Nom du modèle SentenceTransformer à utiliser
+            token_budget: Tokens (padding compris) par lot (EMBEDDING_TOKEN_BUDGET, défaut 2048)
+            max_batch_size: Nombre maximum de textes par lot (EMBEDDING_MAX_BATCH_SIZE, défaut 128)
         """
         self.model = SentenceTransformer(model_name)
         self._model_name = model_name
-        
+        self.token_budget = int(token_budget or os.getenv('EMBEDDING_TOKEN_BUDGET', 2048))
+        self.max_batch_size = int(max_batch_size or os.getenv('EMBEDDING_MAX_BATCH_SIZE', 128))
+
+    def _tokenize(self, texts: List[str]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Tokenise les textes comme SentenceTransformer (nettoyés, tronqués à la fenêtre du modèle)
+
+        Returns:
+            Tokens de chaque texte (non paddés) et nombre de textes tronqués
+        """
+        transformer: Transformer = self.model[0]
+        prepared = [str(text).strip() for text in texts]
+        if transformer.do_lower_case:
+            prepared = [text.lower() for text in prepared]
+
+        tokenizer = self.model.tokenizer
+        if not tokenizer.is_fast:
+            return self._tokenize_slow(prepared)
+
+        # Les débordements signalent les textes tronqués sans seconde tokenisation: chaque texte trop long
+        # produit une ligne par fenêtre, seule la première (celle que garde SentenceTransformer) est conservée
+        encoded = tokenizer(
+            prepared,
+            truncation=True,
+            max_length=self.model.max_seq_length,
+            return_overflowing_tokens=True,
+            verbose=False
+        )
+        sample_mapping = encoded.pop("overflow_to_sample_mapping")
+        features: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        truncated = set()
+        for row, sample in enumerate(sample_mapping):
+            if features[sample] is None:
+                features[sample] = {key: values[row] for key, values in encoded.items()}
+            else:
+                truncated.add(sample)
+        return features, len(truncated)
+
+    def _tokenize_slow(self, prepared: List[str]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Tokenisation avec un tokenizer lent (sans overflow_to_sample_mapping)
+
+        Les textes tronqués sont repérés par une seconde tokenisation, sans troncature ni tokens spéciaux.
+        """
+        tokenizer = self.model.tokenizer
+        encoded = tokenizer(prepared, truncation=True, max_length=self.model.max_seq_length, verbose=False)
+        features = [{key: values[row] for key, values in encoded.items()} for row in range(len(prepared))]
+
+        window = self.model.max_seq_length - tokenizer.num_special_tokens_to_add(pair=False)
+        full = tokenizer(prepared, add_special_tokens=False, truncation=False, return_attention_mask=False,
+                         verbose=False)["input_ids"]
+        return features, sum(len(ids) > window for ids in full)
+
+    def _batches(self, order: np.ndarray, lengths: List[int]) -> Iterator[List[int]]:
+        """Lots d'indices triés par longueur, bornés par le budget de tokens paddés"""
+        batch: List[int] = []
+        for index in order:
+            # Trié par longueur croissante: le texte courant est le plus long du lot
+            padded = (len(batch) + 1) * lengths[index]
+            if batch and (padded > self.token_budget or len(batch) >= self.max_batch_size):
+                yield batch
+                batch = []
+            batch.append(int(index))
+        if batch:
+            yield batch
+
+    def _pad(self, features: List[Dict[str, Any]]) -> Dict[str, torch.Tensor]:
+        """Padde un lot à son plus long texte (les textes du lot ont des longueurs proches)"""
+        width = max(len(feature["input_ids"]) for feature in features)
+        left = self.model.tokenizer.padding_side == "left"
+        padded = {}
+        for key in features[0]:
+            pad_value = self.model.tokenizer.pad_token_id if key == "input_ids" else 0
+            values = np.full((len(features), width), pad_value, dtype=np.int64)
+            for row, feature in enumerate(features):
+                tokens = feature[key]
+                if left:
+                    values[row, width - len(tokens):] = tokens
+                else:
+                    values[row, :len(tokens)] = tokens
+            padded[key] = torch.from_numpy(values).to(self.model.device)
+        return padded
+
     def encode(self, texts: List[str]) -> List[List[float]]:
         """
         Encode une liste de textes en vecteurs
-        
+
         Args:
             texts: Liste des textes à encoder
-            
+
         Returns:
-            Liste des vecteurs d'embedding
+            Liste des vecteurs d'embedding (dans l'ordre des textes)
         """
-        return self.model.encode(texts).tolist()
-    
+        if not texts:
+            return []
+
+        with stage("tokenize"):
+            features, truncated = self._tokenize(texts)
+
+        if truncated:
+            EMBEDDING_TRUNCATED.inc(truncated, model=self._model_name)
+            logging.warning(f"✂️ {truncated}/{len(texts)} texte(s) tronqué(s) à {self.model.max_seq_length} tokens")
+
+        lengths = [len(feature["input_ids"]) for feature in features]
+        order = np.argsort(lengths, kind="stable")
+
+        vectors = None
+        for batch in self._batches(order, lengths):
+            padded = self._pad([features[i] for i in batch])
+            with torch.inference_mode():
+                batch_vectors = self.model(padded)["sentence_embedding"].float().cpu().numpy()
+            if vectors is None:
+                vectors = np.empty((len(texts), batch_vectors.shape[1]), dtype=np.float32)
+            vectors[batch] = batch_vectors
+        return vectors.tolist()
+
+    def get_token_counter(self) -> Optional[Callable[[str], int]]:
+        tokenizer = self.model.tokenizer
+
+        def count_tokens(text: str) -> int:
+            return len(tokenizer(text, add_special_tokens=False, truncation=False,
+                                 return_attention_mask=False, verbose=False)["input_ids"])
+
+        return count_tokens
+
+    def get_max_tokens(self) -> Optional[int]:
+        return self.model.max_seq_length
+
     def get_model_name(self) -> str:
         """
         Retourne le nom du modèle utilisé
-        
+
         Returns:
             Nom du modèle
         """
@@ -1,26 +1,31 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from src.domain.services.prompt_registry import prompt_registry
 
 
 class AiConnector(ABC):
     """Interface abstraite (contrat) pour les connecteurs d'IA."""
 
     @abstractmethod
-    def summarize_text(self, file_name: str, text: str) -> str:
+    def summarize_text(self, file_name: str, text: str, domain: Optional[str] = None) -> str:
         """
         Summarize content of PDF
         :param file_name: file name
         :param text: content of pdf
+        :param domain: prompt template domain
         :return: summarized text
         """
         pass
 
     @abstractmethod
-    def response_with_context(self, question: str, context: str, history: List[Dict[str, str]]) -> str:
+    def response_with_context(self, question: str, context: str, history: List[Dict[str, str]],
+                              domain: Optional[str] = None) -> str:
         """
         :param question: question
         :param context: context embedding
         :param history: history conversation
+        :param domain: prompt template domain
         :return: response of LLM
         """
         pass
@@ -43,6 +48,63 @@ class AiConnector(ABC):
         return text
 
     @staticmethod
-    def get_prompt() -> str:
-        with open("prompt.txt") as f:
-            return f.read()
\ No newline at end of file
+    def get_prompt(name: str = "summary", domain: Optional[str] = None) -> str:
+        return prompt_registry.get(name, domain)
+
+    @staticmethod
+    def _generate_message(question: str, context: str, historic: List[Dict[str, str]],
+                          domain: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+         Génère la liste des messages pour les API compatibles OpenAI (OpenAI, LM Studio)
+
+         Args:
+             question: Question actuelle
+             context: Contexte technique
+             historic: Historique des messages
+             domain: Domaine du template de prompt
+
+         Returns:
+             Liste des messages formatés pour OpenAI
+         """
+
+        # Le template système vient en premier et ne contient aucune donnée de la requête:
+        # préfixe identique d'un appel à l'autre, donc éligible au cache de préfixe
+        system_message = {
+            "role": "system",
+            "content": AiConnector.get_prompt("chat", domain)
+        }
+
+        if not historic or len(historic) == 0:
+            return [
+                system_message,
+                {
+                    "role": "user",
+                    "content": question
+                },
+                {
+                    "role": "system",
+                    "content": f"Contexte technique disponible :\n\n{context}"
+                }
+            ]
+
+        messages = [system_message]
+
+        limited_historic = historic[-8:] if len(historic) > 18 else historic
+
+        for msg in limited_historic:
+            messages.append({
+                "role": msg["role"],
+                "content": msg["content"]
+            })
+
+        messages.append({
+            "role": "user",
+            "content": question
+        })
+
+        messages.append({
+            "role": "system",
+            "content": f"Contexte technique pertinent pour cette question :\n\n{context}"
+        })
+
+        return messages
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, List, Optional
 
 class EmbeddingPort(ABC):
     """Port pour la vectorisation de textes"""
@@ -26,3 +26,21 @@ class EmbeddingPort(ABC):
             Nom du modèle
         """
         pass
+
+    def get_token_counter(self) -> Optional[Callable[[str], int]]:
+        """
+        Retourne le compteur de tokens du modèle (pour découper les chunks en tokens)
+
+        Returns:
+            Fonction texte -> nombre de tokens (sans tokens spéciaux), None si non disponible
+        """
+        return None
+
+    def get_max_tokens(self) -> Optional[int]:
+        """
+        Retourne la fenêtre du modèle: au-delà, le texte est tronqué à l'encodage
+
+        Returns:
+            Nombre maximum de tokens par texte (tokens spéciaux compris), None si inconnu
+        """
+        return None
@@ -1,14 +1,17 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from src.domain.ports.ai import AiConnector
+from src.tools.metrics import stage
 
 
 class AiService:
     def __init__(self, connector: AiConnector):
         self.connector = connector
 
-    def summarize(self, file_name: str, text: str) -> str:
-        return self.connector.summarize_text(file_name, text)
+    def summarize(self, file_name: str, text: str, domain: Optional[str] = None) -> str:
+        with stage("llm_summarize"):
+            return self.connector.summarize_text(file_name, text, domain)
 
-    def response(self, question: str, context: str, history: List[Dict[str, str]]) -> str:
-        return self.connector.response_with_context(question, context, history)
\ No newline at end of file
+    def response(self, question: str, context: str, history: List[Dict[str, str]], domain: Optional[str] = None) -> str:
+        with stage("llm_call"):
+            return self.connector.response_with_context(question, context, history, domain)
\ No newline at end of file
@@ -0,0 +1,68 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+
+class BackgroundJobs:
+    """Exécution de traitements longs (suppressions massives) hors de la requête HTTP
+
+    Les tâches sont exécutées une à une dans l'ordre de soumission; leur état
+    (running, done, failed) reste consultable pour les `history` dernières.
+    """
+
+    def __init__(self, max_workers: int = 1, history: int = 100):
+        """
+        Args:
+            max_workers: Tâches exécutées en parallèle
+            history: Nombre de tâches terminées conservées
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background-job")
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._history = history
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[[], Any], **info) -> str:
+        """
+        Args:
+            kind: Type de tâche (ex: clear_collection)
+            fn: Traitement à exécuter
+            **info: Informations affichées avec l'état de la tâche
+
+        Returns:
+            ID de la tâche
+        """
+        job_id = uuid.uuid4().hex
+        job = {"id": job_id, "kind": kind, "status": "pending", "submitted_at": datetime.now().isoformat(), **info}
+
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self._history:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest["status"] in ("pending", "running"):
+                    break
+                self._jobs.pop(oldest_id)
+
+        def run() -> None:
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat()
+            try:
+                job["result"] = fn()
+                job["status"] = "done"
+            except Exception as e:
+                logging.error(f"❌ Tâche {kind} {job_id} en échec: {e}")
+                job["error"] = str(e)
+                job["status"] = "failed"
+            job["finished_at"] = datetime.now().isoformat()
+
+        self._executor.submit(run)
+        logging.info(f"🧵 Tâche {kind} {job_id} soumise")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
@@ -0,0 +1,158 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.domain.services.ingestion_checkpoint import IngestionCheckpoint, DONE, FAILED
+from src.domain.services.ingestion_quota import UserChunkQuota
+from src.tools.file import get_pdf_files
+from src.tools.metrics import stage
+
+
+class BulkIngestor:
+    """Ingestion en masse d'un dossier, reprenable après interruption
+
+    Pas de limite arbitraire de chunks: chaque fichier est chargé, découpé et écrit
+    puis marqué done/failed dans le point de reprise. Une relance du même lot
+    (utilisateur + dossier) saute les fichiers déjà terminés et inchangés.
+    Le quota par utilisateur ralentit l'ingestion au lieu de la tronquer.
+    """
+
+    def __init__(self, vector_store, checkpoint: IngestionCheckpoint, quota: UserChunkQuota,
+                 extensions: Iterable[str] = ("pdf",)):
+        """
+        Args:
+            vector_store: VectorStore alimenté
+            checkpoint: Point de reprise persistant
+            quota: Quota d'ingestion par utilisateur
+            extensions: Extensions des fichiers à ingérer
+        """
+        self.vector_store = vector_store
+        self.checkpoint = checkpoint
+        self.quota = quota
+        self.extensions = list(extensions)
+        self._running: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def _is_up_to_date(self, state: Optional[Dict[str, Any]], path: Path, size: int, mtime_ns: int) -> bool:
+        """Fichier déjà ingéré et inchangé (hash recalculé seulement si taille/mtime ont bougé)"""
+        if state is None or state["status"] != DONE:
+            return False
+        if state["size"] == size and state["mtime_ns"] == mtime_ns:
+            return True
+        return state["file_hash"] == self.vector_store.document_processor.get_file_hash(path)
+
+    def ingest_file(self, run_id: str, path: Path, user_id: str, folder: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Ingère un fichier et met à jour son statut
+
+        Args:
+            run_id: Identifiant du lot
+            path: Fichier à ingérer
+            user_id: ID unique de l'utilisateur
+            folder: Dossier du lot: le fichier est nommé par son chemin relatif
+                (deux fichiers de même nom dans des sous-dossiers restent distincts)
+
+        Returns:
+            Résultat du fichier: file, status (done, skipped, failed), chunks, error
+        """
+        stat = path.stat()
+        processor = self.vector_store.document_processor
+        source_file = processor.source_name(path, folder)
+        state = self.checkpoint.get(run_id, path)
+        if self._is_up_to_date(state, path, stat.st_size, stat.st_mtime_ns):
+            if (state["size"], state["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+                # Contenu identique (hash): on retient le nouvel état pour ne plus le rehasher
+                self.checkpoint.mark(run_id, path, DONE, stat.st_size, stat.st_mtime_ns, state["file_hash"],
+                                     state["chunks"])
+            return {"file": source_file, "status": "skipped", "chunks": state["chunks"]}
+
+        try:
+            # Reprise d'un fichier interrompu, en échec ou modifié: ses anciens chunks sont retirés
+            if self.vector_store.get_file_chunk_ids(user_id, source_file):
+                self.vector_store.delete_file_chunks(source_file, user_id)
+
+            chunks = processor.split_documents(processor.load_document(path, folder))
+            file_hash = chunks[0].metadata.get("file_hash") if chunks else processor.get_file_hash(path)
+
+            with stage("quota_wait"):
+                self.quota.acquire(user_id, len(chunks))
+
+            report = self.vector_store.add_chunks(chunks, user_id) if chunks else {
+                "added": 0, "dropped": []
+            }
+            if report["dropped"]:
+                raise RuntimeError(f"{len(report['dropped'])}/{len(chunks)} chunks non écrits")
+        except Exception as e:
+            logging.error(f"❌ Ingestion de {path} en échec: {e}")
+            self.checkpoint.mark(run_id, path, FAILED, stat.st_size, stat.st_mtime_ns, error=str(e))
+            return {"file": source_file, "status": "failed", "chunks": 0, "error": str(e)}
+
+        self.checkpoint.mark(run_id, path, DONE, stat.st_size, stat.st_mtime_ns, file_hash, report["added"])
+        return {"file": source_file, "status": "done", "chunks": report["added"]}
+
+    def run(self, folder: Path, user_id: str, max_files: Optional[int] = None,
+            retry_failed: bool = True) -> Dict[str, Any]:
+        """
+        Ingère (ou reprend) le lot utilisateur + dossier
+
+        Args:
+            folder: Dossier à ingérer
+            user_id: ID unique de l'utilisateur
+            max_files: Nombre max de fichiers à traiter lors de cet appel (les suivants restent pending)
+            retry_failed: Retraite les fichiers en échec lors d'une relance
+
+        Returns:
+            Résultats des fichiers traités et état du lot
+        """
+        run_id = IngestionCheckpoint.run_id(user_id, folder)
+        files = sorted(get_pdf_files(folder, self.extensions))
+        self.checkpoint.register(run_id, files)
+
+        results: List[Dict[str, Any]] = []
+        processed = 0
+        for path in files:
+            if max_files is not None and processed >= max_files:
+                break
+            if not retry_failed:
+                state = self.checkpoint.get(run_id, path)
+                if state and state["status"] == FAILED:
+                    continue
+            try:
+                result = self.ingest_file(run_id, path, user_id, folder)
+            except FileNotFoundError:
+                continue
+            if result["status"] != "skipped":
+                processed += 1
+                results.append(result)
+
+        summary = self.checkpoint.summary(run_id)
+        logging.info(f"📚 Lot {run_id}: {processed} fichier(s) traité(s), état {summary['files']}")
+        return {"run_id": run_id, "processed": processed, "results": results, **summary}
+
+    def start(self, folder: Path, user_id: str, retry_failed: bool = True) -> Dict[str, Any]:
+        """
+        Lance le lot en tâche de fond (un seul lot à la fois par utilisateur + dossier)
+
+        Returns:
+            run_id et indicateur started (False si le lot tourne déjà)
+        """
+        run_id = IngestionCheckpoint.run_id(user_id, folder)
+        with self._lock:
+            running = self._running.get(run_id)
+            if running is not None and running.is_alive():
+                return {"run_id": run_id, "started": False}
+            thread = threading.Thread(
+                target=self.run, args=(folder, user_id), kwargs={"retry_failed": retry_failed},
+                name=f"bulk-ingestion-{user_id}", daemon=True
+            )
+            self._running[run_id] = thread
+            thread.start()
+        return {"run_id": run_id, "started": True}
+
+    def status(self, folder: Path, user_id: str) -> Dict[str, Any]:
+        run_id = IngestionCheckpoint.run_id(user_id, folder)
+        with self._lock:
+            running = self._running.get(run_id)
+        return {"run_id": run_id, "running": running is not None and running.is_alive(),
+                **self.checkpoint.summary(run_id)}
@@ -0,0 +1,169 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.domain.ports.embeding import EmbeddingPort
+from src.tools.metrics import stage, INGESTED_CHUNKS
+
+
+class ChromaBulkWriter:
+    """Écriture en masse dans une collection Chroma
+
+    - taille de batch adaptée à la latence d'écriture mesurée (jusqu'au max de Chroma)
+    - vectorisation du batch N+1 pendant l'écriture du batch N
+    - nouvel essai des batchs en échec puis bisection pour isoler les enregistrements fautifs
+    - rapport des chunks perdus au lieu de les ignorer silencieusement
+    """
+
+    def __init__(self,
+                 collection,
+                 embedding_port: EmbeddingPort,
+                 max_batch_size: int,
+                 initial_batch_size: int = 128,
+                 min_batch_size: int = 16,
+                 target_batch_seconds: float = 1.0,
+                 max_retries: int = 1,
+                 retry_delay: float = 0.2
+        ):
+        """
+        Args:
+            collection: Collection Chroma cible
+            embedding_port: Port d'embedding
+            max_batch_size: Taille max d'un batch (client.get_max_batch_size())
+            initial_batch_size: Taille du premier batch
+            min_batch_size: Taille min d'un batch
+            target_batch_seconds: Durée d'écriture visée par batch
+            max_retries: Nouvelles tentatives d'un batch avant bisection
+            retry_delay: Pause entre deux tentatives en secondes
+        """
+        self.collection = collection
+        self.embedding_port = embedding_port
+        self.max_batch_size = max_batch_size
+        self.min_batch_size = min(min_batch_size, max_batch_size)
+        self.initial_batch_size = max(self.min_batch_size, min(initial_batch_size, max_batch_size))
+        self.target_batch_seconds = target_batch_seconds
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def write(self,
+              ids: List[str],
+              texts: List[str],
+              metadatas: List[Dict[str, Any]],
+              on_written: Optional[Callable[[List[str], List[Dict[str, Any]]], None]] = None,
+              embeddings: Optional[List[List[float]]] = None
+        ) -> Dict[str, Any]:
+        """
+        Vectorise et écrit les chunks
+
+        Args:
+            ids: IDs des chunks
+            texts: Textes des chunks
+            metadatas: Métadonnées des chunks
+            on_written: Appelé avec (ids, metadatas) de chaque sous-batch écrit
+            embeddings: Vecteurs déjà calculés (la vectorisation est alors sautée)
+
+        Returns:
+            Rapport: added, dropped (id, source_file, error), batches, batch_sizes
+        """
+        report: Dict[str, Any] = {"added": 0, "dropped": [], "batches": 0, "batch_sizes": []}
+        total = len(ids)
+        batch_size = self.initial_batch_size
+        position = 0
+        pending: Optional[Tuple[Future, int]] = None
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-writer")
+        try:
+            while position < total or pending is not None:
+                next_batch = None
+                if position < total:
+                    end = min(total, position + batch_size)
+                    if embeddings is None:
+                        # Pendant ce temps, le batch précédent s'écrit dans le thread d'écriture
+                        with stage("embed"):
+                            batch_embeddings = self.embedding_port.encode(texts[position:end])
+                    else:
+                        batch_embeddings = embeddings[position:end]
+                    next_batch = (position, end, batch_embeddings)
+                    position = end
+
+                if pending is not None:
+                    future, size = pending
+                    elapsed, added, dropped = future.result()
+                    report["added"] += added
+                    report["dropped"].extend(dropped)
+                    report["batches"] += 1
+                    report["batch_sizes"].append(size)
+                    batch_size = self._next_batch_size(size, elapsed, failed=bool(dropped) or added < size)
+                    pending = None
+
+                if next_batch is not None:
+                    start, end, batch_embeddings = next_batch
+                    future = executor.submit(
+                        self._write_batch,
+                        ids[start:end], texts[start:end], batch_embeddings, metadatas[start:end], on_written
+                    )
+                    pending = (future, end - start)
+        finally:
+            executor.shutdown(wait=True)
+
+        if report["dropped"]:
+            logging.error(f"❌ {len(report['dropped'])} chunk(s) non écrit(s) sur {total}")
+        logging.info(f"💾 {report['added']}/{total} chunks écrits en {report['batches']} batch(s)")
+        return report
+
+    def _next_batch_size(self, size: int, elapsed: float, failed: bool) -> int:
+        if failed:
+            return max(self.min_batch_size, size // 2)
+        if elapsed <= 0:
+            return min(self.max_batch_size, size * 2)
+        ideal = int(size / elapsed * self.target_batch_seconds)
+        # Croissance bornée à x2 par batch pour ne pas sur-réagir à une mesure isolée
+        return max(self.min_batch_size, min(self.max_batch_size, ideal, size * 2))
+
+    def _write_batch(self,
+                     ids: List[str],
+                     texts: List[str],
+                     embeddings: List[List[float]],
+                     metadatas: List[Dict[str, Any]],
+                     on_written: Optional[Callable]
+        ) -> Tuple[float, int, List[Dict[str, Any]]]:
+        """
+        Returns:
+            Tuple (durée, nombre de chunks écrits, chunks perdus)
+        """
+        start = time.perf_counter()
+        error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with stage("write_batch"):
+                    self.collection.add(ids=ids, documents=texts, embeddings=embeddings, metadatas=metadatas)
+                INGESTED_CHUNKS.inc(len(ids), status="ok")
+                if on_written is not None:
+                    on_written(ids, metadatas)
+                return time.perf_counter() - start, len(ids), []
+            except Exception as e:
+                error = e
+                logging.warning(f"⚠️ Échec d'écriture de {len(ids)} chunks (tentative {attempt + 1}): {e}")
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_delay)
+
+        if len(ids) == 1:
+            INGESTED_CHUNKS.inc(1, status="failed")
+            return time.perf_counter() - start, 0, [{
+                "id": ids[0],
+                "source_file": metadatas[0].get("source_file"),
+                "chunk_id": metadatas[0].get("chunk_id"),
+                "error": str(error),
+            }]
+
+        # Bisection: isole les enregistrements fautifs sans perdre le reste du batch
+        middle = len(ids) // 2
+        _, added_left, dropped_left = self._write_batch(
+            ids[:middle], texts[:middle], embeddings[:middle], metadatas[:middle], on_written
+        )
+        _, added_right, dropped_right = self._write_batch(
+            ids[middle:], texts[middle:], embeddings[middle:], metadatas[middle:], on_written
+        )
+        return time.perf_counter() - start, added_left + added_right, dropped_left + dropped_right
@@ -0,0 +1,167 @@
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+from src.domain.ports.embeding import EmbeddingPort
+from src.domain.services.hnsw_index import current_hnsw_params, rebuild_collection
+from src.tools.metrics import record_cache
+
+SUMMARY_MODES = ("off", "extract", "llm")
+
+
+def summaries_collection_name(collection_name: str) -> str:
+    return f"{collection_name}-summaries"
+
+
+def align_summaries_space(client, collection_name: str, space: str, page_size: Optional[int] = None) -> bool:
+    """
+    Reconstruit la collection des résumés dans la distance de la collection des chunks
+
+    Args:
+        client: Client Chroma
+        collection_name: Collection des chunks
+        space: Distance de la collection des chunks
+        page_size: Enregistrements copiés par page
+
+    Returns:
+        True si la collection des résumés a été reconstruite
+    """
+    name = summaries_collection_name(collection_name)
+    if name not in [existing.name for existing in client.list_collections()]:
+        return False
+    if (current_hnsw_params(client.get_collection(name))["space"] or "l2") == space:
+        return False
+    rebuild_collection(client, name, {"space": space}, page_size=page_size)
+    return True
+
+
+class DocumentSummaryIndex:
+    """Index de niveau document: un résumé vectorisé par (utilisateur, fichier)
+
+    Une question est d'abord comparée aux résumés pour choisir les documents les plus
+    proches, puis les chunks ne sont cherchés que dans ces documents. Les résumés vivent
+    dans une petite collection Chroma voisine de celle des chunks (même modèle, même
+    projection), la liste des fichiers résumés de chaque utilisateur est gardée en mémoire.
+    """
+
+    def __init__(self, client, collection_name: str, embedding_port: EmbeddingPort, space: str = "l2"):
+        """
+        Args:
+            client: Client Chroma
+            collection_name: Collection des chunks (les résumés vont dans `<nom>-summaries`)
+            embedding_port: Port d'embedding (celui de la collection des chunks)
+            space: Distance de l'index des résumés
+        """
+        self.collection = client.get_or_create_collection(
+            name=summaries_collection_name(collection_name),
+            configuration={"hnsw": {"space": space}}
+        )
+        self.embedding_port = embedding_port
+        self._files: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _id(user_id: str, source_file: str) -> str:
+        return f"{user_id}:{source_file}"
+
+    def _load(self, user_id: str) -> Set[str]:
+        with self._lock:
+            if user_id in self._files:
+                record_cache("summary_index", hit=True)
+                return self._files[user_id]
+
+        record_cache("summary_index", hit=False)
+        results = self.collection.get(where={"user_id": {"$eq": user_id}}, include=["metadatas"])
+        files = {metadata["source_file"] for metadata in results["metadatas"] or [] if metadata}
+        with self._lock:
+            return self._files.setdefault(user_id, files)
+
+    def files(self, user_id: str) -> Set[str]:
+        """Fichiers résumés de l'utilisateur"""
+        user_files = self._load(user_id)
+        with self._lock:
+            return set(user_files)
+
+    def add(self, user_id: str, source_file: str, summary: str, file_hash: Optional[str] = None,
+            method: str = "extract") -> None:
+        """
+        Enregistre (ou remplace) le résumé d'un fichier
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            source_file: Nom du fichier
+            summary: Résumé du document
+            file_hash: Hash du fichier résumé
+            method: Origine du résumé (extract ou llm)
+        """
+        metadata = {"user_id": user_id, "source_file": source_file, "summary_method": method}
+        if file_hash:
+            metadata["file_hash"] = file_hash
+        self.collection.upsert(
+            ids=[self._id(user_id, source_file)],
+            documents=[summary],
+            embeddings=self.embedding_port.encode([summary]),
+            metadatas=[metadata]
+        )
+        user_files = self._load(user_id)
+        with self._lock:
+            user_files.add(source_file)
+
+    def route(self, user_id: str, query_embeddings: List[List[float]], top_k: int) -> List[List[str]]:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+            query_embeddings: Vecteurs des requêtes
+            top_k: Nombre de documents retenus par requête
+
+        Returns:
+            Fichiers les plus proches de chaque requête, du plus proche au plus lointain
+        """
+        results = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            where={"user_id": {"$eq": user_id}},
+            include=["metadatas"]
+        )
+        return [[metadata["source_file"] for metadata in metadatas] for metadatas in results["metadatas"]]
+
+    def delete(self, user_id: str, file_name: Optional[str] = None) -> None:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Fichier dont supprimer le résumé (None = tous)
+        """
+        if file_name is None:
+            self.collection.delete(where={"user_id": {"$eq": user_id}})
+            with self._lock:
+                self._files[user_id] = set()
+            return
+        self.collection.delete(ids=[self._id(user_id, file_name)])
+        with self._lock:
+            if user_id in self._files:
+                self._files[user_id].discard(file_name)
+
+
+def summarize_document(source_file: str, text: str, mode: str, max_chars: int,
+                       summarizer: Optional[Callable[[str, str], str]] = None) -> tuple:
+    """
+    Résumé d'un document pour le routage
+
+    Args:
+        source_file: Nom du fichier
+        text: Texte du document (chunks dans l'ordre)
+        mode: extract (début du document) ou llm (summarizer, repli sur extract en cas d'échec)
+        max_chars: Longueur max du texte envoyé au LLM et de l'extrait
+        summarizer: Fonction (nom du fichier, texte) -> résumé
+
+    Returns:
+        Tuple (résumé, méthode effective)
+    """
+    if mode == "llm" and summarizer is not None:
+        try:
+            summary = summarizer(source_file, text[:max_chars])
+            if summary and summary.strip():
+                return f"{source_file}\n{summary.strip()}", "llm"
+        except Exception as e:
+            logging.warning(f"⚠️ Résumé LLM de {source_file} en échec, extrait utilisé: {e}")
+    return f"{source_file}\n{text[:max_chars]}", "extract"
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import logging
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.domain.ports.embeding import EmbeddingPort
+from src.domain.services.document_summaries import summaries_collection_name
+from src.domain.services.hnsw_index import rebuild_collection
+
+PROJECTION_METHODS = ("pca", "truncate")
+
+# Clé des métadonnées de collection: la projection avec laquelle ses vecteurs ont été réduits
+PROJECTION_METADATA_KEY = "embedding_projection"
+
+
+def projection_path(persist_directory: str, collection_name: str) -> Path:
+    return Path(persist_directory) / "projections" / f"{collection_name}.npz"
+
+
+def pending_projection_path(persist_directory: str, collection_name: str) -> Path:
+    """Projection enregistrée avant l'échange des collections, renommée une fois l'échange fait"""
+    return Path(persist_directory) / "projections" / f"{collection_name}.pending.npz"
+
+
+def load_projection(persist_directory: str, collection_name: str,
+                    expected: Optional[str]) -> Optional["EmbeddingProjection"]:
+    """
+    Projection enregistrée d'une collection; termine une projection interrompue
+
+    Args:
+        persist_directory: Répertoire de la base
+        collection_name: Nom de la collection
+        expected: Nom de projection inscrit dans les métadonnées de la collection
+
+    Returns:
+        La projection, None si la collection n'est pas projetée
+    """
+    path = projection_path(persist_directory, collection_name)
+    pending = pending_projection_path(persist_directory, collection_name)
+    if pending.exists():
+        if expected is not None and EmbeddingProjection.load(pending).name == expected:
+            # Interrompue après l'échange des collections: la projection en attente est celle des vecteurs
+            pending.replace(path)
+            logging.warning(f"⚠️ Projection {expected} de '{collection_name}' restaurée après interruption")
+        else:
+            # Interrompue avant l'échange: la collection n'a pas été modifiée
+            pending.unlink()
+    return EmbeddingProjection.load(path)
+
+
+class EmbeddingProjection:
+    """Réduction de dimension des embeddings: ACP apprise ou troncature Matryoshka
+
+    y = normalise((x - mean) @ components.T). La troncature (modèles entraînés Matryoshka)
+    garde les premières dimensions; l'ACP est apprise sur les vecteurs existants.
+    Le nom (méthode, dimension, empreinte des poids) versionne la projection: il est
+    inscrit dans les métadonnées de la collection projetée.
+    """
+
+    def __init__(self, method: str, mean: np.ndarray, components: np.ndarray, source_model: str,
+                 info: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            method: pca ou truncate
+            mean: Moyenne soustraite avant projection (dimension source)
+            components: Matrice (dimension cible x dimension source)
+            source_model: Modèle d'embedding des vecteurs d'origine
+            info: Informations de construction (variance expliquée, échantillon...)
+        """
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"Projection inconnue: {method} (attendu: {', '.join(PROJECTION_METHODS)})")
+        self.method = method
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.source_model = source_model
+        self.info = info or {}
+
+    @property
+    def dimension(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def source_dimension(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def name(self) -> str:
+        digest = hashlib.sha1(self.mean.tobytes() + self.components.tobytes()).hexdigest()[:8]
+        return f"{self.method}{self.dimension}-{digest}"
+
+    @classmethod
+    def fit_pca(cls, vectors: np.ndarray, dimension: int, source_model: str) -> "EmbeddingProjection":
+        """
+        Args:
+            vectors: Échantillon de vecteurs (n x dimension source)
+            dimension: Dimension cible
+            source_model: Modèle d'embedding des vecteurs
+
+        Returns:
+            Projection sur les `dimension` premiers axes principaux
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not 0 < dimension < vectors.shape[1]:
+            raise ValueError(f"Dimension cible {dimension} hors de ]0, {vectors.shape[1]}[")
+        if len(vectors) < dimension:
+            raise ValueError(f"{len(vectors)} vecteurs: au moins {dimension} nécessaires pour l'ACP")
+
+        mean = vectors.mean(axis=0)
+        _, singular_values, axes = np.linalg.svd(vectors - mean, full_matrices=False)
+        variance = singular_values ** 2
+        return cls("pca", mean, axes[:dimension], source_model, {
+            "explained_variance": float(variance[:dimension].sum() / variance.sum()),
+            "fitted_on": len(vectors),
+        })
+
+    @classmethod
+    def truncate(cls, source_dimension: int, dimension: int, source_model: str) -> "EmbeddingProjection":
+        """Troncature Matryoshka: premières dimensions du modèle, sans apprentissage"""
+        if not 0 < dimension < source_dimension:
+            raise ValueError(f"Dimension cible {dimension} hors de ]0, {source_dimension}[")
+        return cls("truncate", np.zeros(source_dimension), np.eye(source_dimension)[:dimension], source_model)
+
+    def apply(self, vectors) -> np.ndarray:
+        """
+        Args:
+            vectors: Vecteurs de dimension source
+
+        Returns:
+            Vecteurs projetés, normalisés (float32)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.method == "truncate":
+            projected = vectors[:, :self.dimension].copy()
+        else:
+            projected = (vectors - self.mean) @ self.components.T
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        projected /= np.maximum(norms, 1e-12)
+        return projected
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"method": self.method, "source_model": self.source_model, "name": self.name,
+                "created_at": datetime.now().isoformat(), **self.info}
+        temp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez(temp_path, mean=self.mean, components=self.components, meta=np.array(json.dumps(meta)))
+        temp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["EmbeddingProjection"]:
+        """Projection enregistrée, None si absente"""
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            projection = cls(meta.pop("method"), data["mean"], data["components"], meta.pop("source_model"), meta)
+        if meta.get("name") != projection.name:
+            raise ValueError(f"Projection {path} corrompue (empreinte {projection.name} != {meta.get('name')})")
+        return projection
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "method": self.method, "source_model": self.source_model,
+                "source_dimension": self.source_dimension, "dimension": self.dimension, **self.info}
+
+
+class ProjectedEmbeddingPort(EmbeddingPort):
+    """Port d'embedding qui projette les vecteurs du modèle (ingestion et requêtes)"""
+
+    def __init__(self, inner: EmbeddingPort, projection: EmbeddingProjection):
+        self.inner = inner
+        self.projection = projection
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self.projection.apply(self.inner.encode(texts)).tolist()
+
+    def get_model_name(self) -> str:
+        # Nom distinct du modèle seul: les archives de vecteurs projetés ne se mélangent pas aux autres
+        return f"{self.inner.get_model_name()}+{self.projection.name}"
+
+    def get_token_counter(self) -> Optional[Callable[[str], int]]:
+        return self.inner.get_token_counter()
+
+    def get_max_tokens(self) -> Optional[int]:
+        return self.inner.get_max_tokens()
+
+
+def _top_k(matrix: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    """Voisins exacts (indices) avec la distance de la collection"""
+    if space == "cosine":
+        matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    scores = queries @ matrix.T
+    if space == "l2":
+        scores = scores - 0.5 * np.einsum("ij,ij->i", matrix, matrix)[None, :]
+    k = min(k, matrix.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def recall_at_k(vectors: np.ndarray, queries: np.ndarray, projection: EmbeddingProjection, k: int = 5,
+                space: str = "l2") -> float:
+    """
+    Rappel de la recherche exacte dans l'espace projeté par rapport à la pleine dimension
+
+    Args:
+        vectors: Vecteurs indexés (dimension source)
+        queries: Vecteurs de requêtes (dimension source)
+        projection: Projection évaluée
+        k: Nombre de voisins
+        space: Distance de la collection (l2, cosine, ip)
+
+    Returns:
+        Part moyenne des k vrais voisins retrouvés
+    """
+    truth = _top_k(vectors, queries, k, space)
+    found = _top_k(projection.apply(vectors), projection.apply(queries), k, space)
+    hits = [len(set(expected) & set(got)) for expected, got in zip(truth.tolist(), found.tolist())]
+    return float(np.mean(hits) / truth.shape[1])
+
+
+def project_collection(client, name: str, projection: EmbeddingProjection, persist_directory: str,
+                       page_size: Optional[int] = None):
+    """
+    Réduit les vecteurs d'une collection et de ses résumés de documents (copie projetée puis
+    échange, comme rebuild_collection)
+
+    La projection est enregistrée à côté de la base et son nom inscrit dans les métadonnées
+    de la collection; l'index exact sur disque, en pleine dimension, est supprimé.
+    Elle est écrite avant l'échange des collections et renommée ensuite: après une interruption,
+    `load_projection` retrouve toujours la projection des vecteurs de la collection.
+    À lancer serveur arrêté. Revenir à la pleine dimension demande une réingestion.
+
+    Args:
+        client: Client Chroma
+        name: Nom de la collection
+        projection: Projection à appliquer
+        persist_directory: Répertoire de la base
+        page_size: Enregistrements copiés par page
+
+    Returns:
+        La collection projetée
+    """
+    current = (client.get_collection(name).metadata or {}).get(PROJECTION_METADATA_KEY)
+    if current:
+        raise ValueError(f"Collection '{name}' déjà projetée ({current}): réingérer pour changer de projection")
+
+    pending = pending_projection_path(persist_directory, name)
+    projection.save(pending)
+    collection = rebuild_collection(client, name, page_size=page_size, transform=projection.apply,
+                                    metadata={PROJECTION_METADATA_KEY: projection.name})
+    # Les résumés de documents (routage) sont comparés aux mêmes requêtes projetées
+    summaries = summaries_collection_name(name)
+    if summaries in [existing.name for existing in client.list_collections()]:
+        rebuild_collection(client, summaries, page_size=page_size, transform=projection.apply,
+                           metadata={PROJECTION_METADATA_KEY: projection.name})
+    pending.replace(projection_path(persist_directory, name))
+    shutil.rmtree(Path(persist_directory) / "exact_index" / name, ignore_errors=True)
+    logging.info(f"📉 Collection '{name}' projetée en {projection.dimension} dimensions ({projection.name})")
+    return collection
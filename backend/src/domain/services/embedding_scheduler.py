@@ -0,0 +1,173 @@
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.domain.ports.embeding import EmbeddingPort
+from src.tools.metrics import EMBEDDING_QUEUE_WAIT
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# (priorité, tenant) des appels à encode du contexte courant: interactif sauf mention contraire
+_current_priority: ContextVar[Tuple[str, Optional[str]]] = ContextVar("embedding_priority", default=(INTERACTIVE, None))
+
+
+@contextmanager
+def embedding_priority(priority: str, tenant: Optional[str] = None) -> Iterator[None]:
+    """
+    Classe les vectorisations du bloc (ex: ingestion en BULK pour un utilisateur)
+
+    Args:
+        priority: INTERACTIVE ou BULK
+        tenant: Utilisateur pour qui le travail BULK est fait (part équitable entre utilisateurs)
+    """
+    if priority not in (INTERACTIVE, BULK):
+        raise ValueError(f"Priorité d'embedding inconnue: {priority}")
+    token = _current_priority.set((priority, tenant))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "tenant", "sequence")
+
+    def __init__(self, priority: str, tenant: str, sequence: int):
+        self.priority = priority
+        self.tenant = tenant
+        self.sequence = sequence
+
+
+class EmbeddingScheduler(EmbeddingPort):
+    """Partage du modèle d'embedding entre les questions (interactif) et l'ingestion (bulk)
+
+    Le modèle ne traite qu'un lot à la fois. Les textes d'ingestion sont découpés en tranches
+    de `bulk_slice_size`: entre deux tranches, une question en attente passe en premier
+    (préemption aux frontières de lot). Une question attend donc au plus une tranche, quelle
+    que soit la taille de l'ingestion en cours, et le modèle ne reste jamais inactif.
+    Entre utilisateurs qui ingèrent en même temps, les tranches sont attribuées à part égale
+    de textes vectorisés (file équitable): un gros import ne bloque pas l'ingestion des autres.
+    Après `max_interactive_streak` questions consécutives servies pendant qu'une tranche
+    attend, la tranche passe: un flot de questions ne fige pas l'ingestion.
+    """
+
+    def __init__(self, inner: EmbeddingPort, bulk_slice_size: int = 64, max_interactive_streak: int = 16):
+        """
+        Args:
+            inner: Port d'embedding partagé (le modèle)
+            bulk_slice_size: Textes par tranche d'ingestion (latence max ajoutée à une question)
+            max_interactive_streak: Questions servies d'affilée au plus pendant qu'une tranche attend
+        """
+        self.inner = inner
+        self.bulk_slice_size = max(1, bulk_slice_size)
+        self.max_interactive_streak = max(1, max_interactive_streak)
+
+        self._condition = threading.Condition()
+        self._busy = False
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._interactive_streak = 0
+        # Textes vectorisés par tenant (temps virtuel de la file équitable)
+        self._served: Dict[str, float] = {}
+        self._virtual_time = 0.0
+
+    @classmethod
+    def from_env(cls, inner: EmbeddingPort) -> "EmbeddingScheduler":
+        """Variables lues: EMBEDDING_BULK_SLICE_SIZE, EMBEDDING_MAX_INTERACTIVE_STREAK"""
+        return cls(
+            inner,
+            bulk_slice_size=int(os.getenv("EMBEDDING_BULK_SLICE_SIZE", "64")),
+            max_interactive_streak=int(os.getenv("EMBEDDING_MAX_INTERACTIVE_STREAK", "16"))
+        )
+
+    def _next(self) -> Optional[_Waiter]:
+        """Prochain servi: question la plus ancienne, sinon tranche du tenant le moins servi"""
+        interactive = [waiter for waiter in self._waiters if waiter.priority == INTERACTIVE]
+        bulk = [waiter for waiter in self._waiters if waiter.priority == BULK]
+        if interactive and (not bulk or self._interactive_streak < self.max_interactive_streak):
+            return min(interactive, key=lambda waiter: waiter.sequence)
+        if bulk:
+            return min(bulk, key=lambda waiter: (self._served[waiter.tenant], waiter.sequence))
+        return None
+
+    @contextmanager
+    def _slot(self, priority: str, tenant: str, cost: int) -> Iterator[None]:
+        """Réserve le modèle pour un lot, dans l'ordre de l'ordonnanceur"""
+        started = time.perf_counter()
+        with self._condition:
+            waiter = _Waiter(priority, tenant, next(self._sequence))
+            if priority == BULK and not any(other.tenant == tenant for other in self._waiters
+                                            if other.priority == BULK):
+                # Un tenant qui (re)devient actif part du temps virtuel courant, sans crédit accumulé
+                self._served[tenant] = max(self._served.get(tenant, 0.0), self._virtual_time)
+            self._waiters.append(waiter)
+            try:
+                while self._busy or self._next() is not waiter:
+                    self._condition.wait()
+            finally:
+                # Servi ou interrompu: dans les deux cas, il ne doit plus bloquer la file
+                self._waiters.remove(waiter)
+                self._condition.notify_all()
+            self._busy = True
+
+            if priority == INTERACTIVE:
+                self._interactive_streak += 1
+            else:
+                self._interactive_streak = 0
+                self._virtual_time = self._served[tenant]
+                self._served[tenant] += cost
+                self._forget_idle_tenants()
+        EMBEDDING_QUEUE_WAIT.observe(time.perf_counter() - started, priority=priority)
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+    def _forget_idle_tenants(self) -> None:
+        """Oublie les tenants sans tranche en attente: ils repartiront du temps virtuel courant"""
+        active = {waiter.tenant for waiter in self._waiters if waiter.priority == BULK}
+        for tenant in [tenant for tenant in self._served if tenant not in active]:
+            if self._served[tenant] <= self._virtual_time:
+                del self._served[tenant]
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """
+        Encode les textes avec la priorité du contexte courant (voir embedding_priority)
+
+        Args:
+            texts: Liste des textes à encoder
+
+        Returns:
+            Liste des vecteurs d'embedding
+        """
+        if not texts:
+            return []
+
+        priority, tenant = _current_priority.get()
+        if priority == INTERACTIVE:
+            with self._slot(INTERACTIVE, "", len(texts)):
+                return self.inner.encode(texts)
+
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.bulk_slice_size):
+            part = texts[start:start + self.bulk_slice_size]
+            with self._slot(BULK, tenant or "", len(part)):
+                vectors.extend(self.inner.encode(part))
+        return vectors
+
+    def get_model_name(self) -> str:
+        return self.inner.get_model_name()
+
+    def get_token_counter(self) -> Optional[Callable[[str], int]]:
+        return self.inner.get_token_counter()
+
+    def get_max_tokens(self) -> Optional[int]:
+        return self.inner.get_max_tokens()
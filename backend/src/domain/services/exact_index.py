@@ -0,0 +1,295 @@
+import hashlib
+import json
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.domain.services.file_index import FileChunkIndex, ids_fingerprint
+from src.tools.metrics import record_cache
+
+
+class _TenantMatrix:
+    """Vecteurs d'un utilisateur en matrice float32 contiguë (memory-mappée) + IDs + enregistrements en mémoire"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.manifest = json.loads((directory / "manifest.json").read_text(encoding="utf-8"))
+        self.vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+        self.sq_norms = np.load(directory / "sq_norms.npy")
+        self.offsets = np.load(directory / "offsets.npy")
+        self.ids: List[str] = json.loads((directory / "ids.json").read_text(encoding="utf-8"))
+        self.row_of = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+        # Lus une fois: la recherche ne rouvre aucun fichier, une version supprimée entre-temps reste lisible
+        self.records = (directory / "records.jsonl").read_bytes()
+
+    def read_records(self, rows: List[int]) -> List[Dict[str, Any]]:
+        """Décode document + métadonnées des lignes demandées uniquement"""
+        return [json.loads(self.records[int(self.offsets[row]):int(self.offsets[row + 1])]) for row in rows]
+
+
+class ExactTenantIndex:
+    """Recherche exacte par force brute pour les petits utilisateurs
+
+    Sous `max_chunks` chunks, un produit matriciel sur une matrice contiguë est plus
+    rapide que la recherche HNSW filtrée de Chroma, avec un rappel parfait. La matrice
+    d'un utilisateur est construite à la demande depuis la collection et persistée sur
+    disque (rechargée en memory-map) dans un dossier de version nommé d'après l'empreinte
+    de ses IDs: une matrice n'est reprise que si elle correspond aux chunks actuels de
+    l'utilisateur (la base a pu être modifiée par un autre processus). Chaque version est
+    publiée par un renommage atomique; les anciennes sont supprimées à la construction
+    suivante, jamais pendant qu'une recherche peut les lire.
+    Pendant une écriture (`writing`), les recherches passent par Chroma et la matrice
+    n'est invalidée qu'une fois, à la fin.
+    Les distances renvoyées suivent la convention de Chroma pour l'espace de la collection.
+    """
+
+    FORMAT_VERSION = 3
+    # Dossier de construction abandonné (processus interrompu) au-delà de cet âge
+    STALE_BUILD_SECONDS = 3600
+
+    def __init__(self, collection, file_index: FileChunkIndex, directory: str, max_chunks: int = 5000,
+                 space: str = "l2"):
+        """
+        Args:
+            collection: Collection Chroma source
+            file_index: Index fichier -> chunks (compte des chunks par utilisateur)
+            directory: Dossier de persistance des matrices
+            max_chunks: Au-delà, la recherche passe par Chroma (0 = désactivé)
+            space: Distance de la collection (l2, cosine, ip)
+        """
+        self.collection = collection
+        self.file_index = file_index
+        self.directory = Path(directory)
+        self.max_chunks = max_chunks
+        self.space = space
+        self._tenants: Dict[str, _TenantMatrix] = {}
+        self._writers: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _user_dir(self, user_id: str) -> Path:
+        return self.directory / hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+
+    def _version_dir(self, user_id: str, fingerprint: str) -> Path:
+        return self._user_dir(user_id) / f"v{self.FORMAT_VERSION}-{self.space}-{fingerprint}"
+
+    def _build(self, user_id: str) -> _TenantMatrix:
+        """Extrait les chunks de l'utilisateur de la collection et publie une nouvelle version de sa matrice"""
+        results = self.collection.get(
+            where={"user_id": {"$eq": user_id}},
+            include=["embeddings", "documents", "metadatas"]
+        )
+        vectors = np.asarray(results["embeddings"], dtype=np.float32)
+        if self.space == "cosine":
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        fingerprint = ids_fingerprint(results["ids"])
+
+        user_dir = self._user_dir(user_id)
+        user_dir.mkdir(parents=True, exist_ok=True)
+        temp_dir = Path(tempfile.mkdtemp(prefix="build.", suffix=".tmp", dir=user_dir))
+
+        offsets = [0]
+        with open(temp_dir / "records.jsonl", "wb") as f:
+            for document, metadata in zip(results["documents"], results["metadatas"]):
+                line = json.dumps({"document": document, "metadata": metadata}, ensure_ascii=False).encode("utf-8")
+                f.write(line + b"\n")
+                offsets.append(offsets[-1] + len(line) + 1)
+
+        np.save(temp_dir / "vectors.npy", vectors)
+        np.save(temp_dir / "sq_norms.npy", (vectors ** 2).sum(axis=1))
+        np.save(temp_dir / "offsets.npy", np.asarray(offsets, dtype=np.int64))
+        (temp_dir / "ids.json").write_text(json.dumps(results["ids"]), encoding="utf-8")
+        (temp_dir / "manifest.json").write_text(json.dumps({
+            "version": self.FORMAT_VERSION,
+            "user_id": user_id,
+            "count": len(results["ids"]),
+            "fingerprint": fingerprint,
+            "space": self.space,
+        }), encoding="utf-8")
+
+        version_dir = self._version_dir(user_id, fingerprint)
+        try:
+            temp_dir.rename(version_dir)
+        except OSError:
+            # Même version déjà publiée par une construction concurrente: contenu identique
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        tenant = _TenantMatrix(version_dir)
+        self._collect_garbage(user_dir, keep=version_dir)
+        logging.info(f"🧮 Matrice exacte construite pour {user_id}: {len(results['ids'])} vecteurs")
+        return tenant
+
+    def _collect_garbage(self, user_dir: Path, keep: Path) -> None:
+        """Supprime les versions précédentes (déjà chargées, une matrice en mémoire ne relit rien)"""
+        for entry in user_dir.iterdir():
+            if entry == keep:
+                continue
+            if entry.name.endswith(".tmp"):
+                # Construction concurrente en cours, sauf si elle est abandonnée depuis longtemps
+                try:
+                    if time.time() - entry.stat().st_mtime < self.STALE_BUILD_SECONDS:
+                        continue
+                except OSError:
+                    continue
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink(missing_ok=True)
+
+    def _get(self, user_id: str) -> Optional[_TenantMatrix]:
+        """
+        Matrice de l'utilisateur: en mémoire, sinon rechargée du disque, sinon construite
+
+        Returns:
+            La matrice, ou None si les chunks ont changé pendant sa construction
+        """
+        with self._lock:
+            tenant = self._tenants.get(user_id)
+            generation = self._generations.get(user_id, 0)
+        if tenant is not None:
+            record_cache("exact_index", hit=True)
+            return tenant
+
+        record_cache("exact_index", hit=False)
+        fingerprint = self.file_index.fingerprint(user_id)
+        tenant = None
+        version_dir = self._version_dir(user_id, fingerprint)
+        if (version_dir / "manifest.json").exists():
+            try:
+                tenant = _TenantMatrix(version_dir)
+                manifest = tenant.manifest
+                if (manifest.get("version") != self.FORMAT_VERSION or manifest.get("fingerprint") != fingerprint
+                        or manifest.get("space") != self.space):
+                    tenant = None
+            except Exception as e:
+                logging.warning(f"⚠️ Matrice exacte illisible pour {user_id}, reconstruction: {e}")
+                tenant = None
+
+        if tenant is None:
+            try:
+                tenant = self._build(user_id)
+            except Exception as e:
+                # Version supprimée par une construction concurrente avant d'être chargée: Chroma répond
+                logging.warning(f"⚠️ Matrice exacte non construite pour {user_id}: {e}")
+                return None
+            if tenant.manifest.get("fingerprint") != fingerprint:
+                # Écriture concurrente pendant la construction: Chroma répond, la matrice sera reconstruite
+                return None
+
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation or user_id in self._writers:
+                # Invalidée pendant le chargement: servie pour cette recherche, pas gardée
+                return tenant
+            return self._tenants.setdefault(user_id, tenant)
+
+    def _distances(self, tenant: _TenantMatrix, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        vectors = tenant.vectors if rows is None else tenant.vectors[rows]
+        dots = queries @ vectors.T
+        if self.space == "cosine":
+            norms = np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+            return 1 - dots / norms
+        if self.space == "ip":
+            return 1 - dots
+        sq_norms = tenant.sq_norms if rows is None else tenant.sq_norms[rows]
+        return np.maximum((queries ** 2).sum(axis=1, keepdims=True) - 2 * dots + sq_norms[None, :], 0)
+
+    def search(self, user_id: str, query_embeddings: List[List[float]], n_results: int,
+               chunk_ids: Optional[List[str]] = None, include_embeddings: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+            query_embeddings: Vecteurs des requêtes
+            n_results: Nombre de résultats par requête
+            chunk_ids: Restreint la recherche à ces chunks (filtre fichier)
+            include_embeddings: Ajoute les vecteurs des résultats (une matrice par requête)
+
+        Returns:
+            Résultats au format de `collection.query` (une liste par requête),
+            ou None si l'utilisateur dépasse le seuil (recherche via Chroma)
+        """
+        if not self.max_chunks:
+            return None
+        if user_id in self._writers:
+            return None
+        count = self.file_index.count(user_id)
+        if count == 0 or count > self.max_chunks:
+            return None
+
+        tenant = self._get(user_id)
+        if tenant is None:
+            return None
+        if len(tenant.ids) != count:
+            # Chunks ajoutés ou supprimés depuis le chargement sans invalidation
+            self.invalidate(user_id)
+            return None
+
+        rows = None
+        if chunk_ids is not None:
+            rows = np.asarray([tenant.row_of[chunk_id] for chunk_id in chunk_ids if chunk_id in tenant.row_of],
+                              dtype=np.int64)
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        distances = self._distances(tenant, queries, rows)
+        k = min(n_results, distances.shape[1])
+
+        results: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if include_embeddings:
+            results["embeddings"] = []
+        if k == 0:
+            for key in results:
+                results[key] = [[] for _ in query_embeddings]
+            return results
+
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.take_along_axis(distances, top, axis=1).argsort(axis=1), axis=1)
+
+        for query_index, positions in enumerate(top):
+            matrix_rows = positions if rows is None else rows[positions]
+            records = tenant.read_records([int(row) for row in matrix_rows])
+            results["ids"].append([tenant.ids[row] for row in matrix_rows])
+            results["documents"].append([record["document"] for record in records])
+            results["metadatas"].append([record["metadata"] for record in records])
+            results["distances"].append(distances[query_index, positions].tolist())
+            if include_embeddings:
+                results["embeddings"].append(np.asarray(tenant.vectors[matrix_rows]))
+        return results
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Oublie la matrice en mémoire de l'utilisateur (à appeler après tout ajout ou suppression)
+
+        Les fichiers restent sur disque: une recherche en cours peut encore les lire,
+        la prochaine construction les supprime.
+
+        Args:
+            user_id: ID unique de l'utilisateur
+        """
+        with self._lock:
+            self._tenants.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    @contextmanager
+    def writing(self, user_id: str) -> Iterator[None]:
+        """
+        Encadre une écriture (ingestion, import, suppression): recherches via Chroma, invalidation à la fin
+
+        Args:
+            user_id: ID unique de l'utilisateur
+        """
+        with self._lock:
+            self._writers[user_id] = self._writers.get(user_id, 0) + 1
+        self.invalidate(user_id)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._writers[user_id] -= 1
+                if not self._writers[user_id]:
+                    del self._writers[user_id]
+            self.invalidate(user_id)
@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.tools.metrics import record_cache
+
+
+def ids_fingerprint(chunk_ids: Iterable[str]) -> str:
+    """Empreinte d'un ensemble d'IDs de chunks, indépendante de leur ordre"""
+    digest = hashlib.sha1()
+    for chunk_id in sorted(chunk_ids):
+        digest.update(chunk_id.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class FileChunkIndex:
+    """Index en mémoire fichier -> IDs de chunks, par utilisateur
+
+    Permet de restreindre une recherche à un seul document sans parcourir
+    tout le corpus de l'utilisateur. L'index d'un utilisateur est construit
+    à la demande depuis la collection puis maintenu lors des ajouts/suppressions.
+    """
+
+    def __init__(self, collection):
+        """
+        Args:
+            collection: Collection Chroma source
+        """
+        self.collection = collection
+        self._index: Dict[str, Dict[str, Set[str]]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, user_id: str) -> Dict[str, Set[str]]:
+        """
+        Retourne l'index de l'utilisateur, en le construisant si nécessaire
+
+        Args:
+            user_id: ID unique de l'utilisateur
+
+        Returns:
+            Dictionnaire nom de fichier -> IDs de chunks
+        """
+        with self._lock:
+            if user_id in self._index:
+                record_cache("file_index", hit=True)
+                return self._index[user_id]
+
+        record_cache("file_index", hit=False)
+
+        results = self.collection.get(
+            where={"user_id": {"$eq": user_id}},
+            include=["metadatas"]
+        )
+
+        user_index: Dict[str, Set[str]] = {}
+        for chunk_id, metadata in zip(results["ids"], results["metadatas"] or []):
+            if metadata and "source_file" in metadata:
+                user_index.setdefault(metadata["source_file"], set()).add(chunk_id)
+
+        with self._lock:
+            # Un autre thread a pu construire l'index entre-temps
+            user_index = self._index.setdefault(user_id, user_index)
+
+        logging.info(f"🗂️ Index fichiers chargé pour {user_id}: {len(user_index)} fichier(s)")
+        return user_index
+
+    def get_chunk_ids(self, user_id: str, file_name: str) -> List[str]:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Nom du fichier
+
+        Returns:
+            IDs des chunks du fichier (liste vide si inconnu)
+        """
+        user_index = self._load(user_id)
+        with self._lock:
+            return list(user_index.get(file_name, ()))
+
+    def peek_chunk_ids(self, user_id: str, file_name: str) -> Optional[List[str]]:
+        """
+        Comme get_chunk_ids, sans construire l'index
+
+        Returns:
+            IDs des chunks du fichier, ou None si l'index de l'utilisateur n'est pas chargé
+        """
+        with self._lock:
+            if user_id not in self._index:
+                return None
+            return list(self._index[user_id].get(file_name, ()))
+
+    def peek_count(self, user_id: str, file_name: Optional[str] = None) -> Optional[int]:
+        """
+        Returns:
+            Nombre de chunks de l'utilisateur (ou du fichier), None si l'index n'est pas chargé
+        """
+        with self._lock:
+            if user_id not in self._index:
+                return None
+            user_index = self._index[user_id]
+            if file_name is not None:
+                return len(user_index.get(file_name, ()))
+            return sum(len(chunk_ids) for chunk_ids in user_index.values())
+
+    def get_files(self, user_id: str) -> List[str]:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+
+        Returns:
+            Liste triée des fichiers indexés
+        """
+        user_index = self._load(user_id)
+        with self._lock:
+            return sorted(user_index.keys())
+
+    def add(self, user_id: str, file_names: Iterable[str], chunk_ids: Iterable[str]) -> None:
+        """
+        Enregistre des chunks nouvellement ajoutés à la collection
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_names: Nom du fichier de chaque chunk
+            chunk_ids: ID de chaque chunk
+        """
+        with self._lock:
+            # Si l'index n'est pas encore chargé, il sera construit depuis la collection
+            if user_id not in self._index:
+                return
+            user_index = self._index[user_id]
+            for file_name, chunk_id in zip(file_names, chunk_ids):
+                user_index.setdefault(file_name, set()).add(chunk_id)
+
+    def remove_file(self, user_id: str, file_name: str) -> None:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Nom du fichier supprimé
+        """
+        with self._lock:
+            if user_id in self._index:
+                self._index[user_id].pop(file_name, None)
+
+    def clear(self, user_id: str) -> None:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+        """
+        with self._lock:
+            self._index.pop(user_id, None)
+
+    def fingerprint(self, user_id: str) -> str:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+
+        Returns:
+            Empreinte des IDs de chunks de l'utilisateur (voir ids_fingerprint)
+        """
+        user_index = self._load(user_id)
+        with self._lock:
+            chunk_ids = [chunk_id for file_chunk_ids in user_index.values() for chunk_id in file_chunk_ids]
+        return ids_fingerprint(chunk_ids)
+
+    def count(self, user_id: str) -> int:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+
+        Returns:
+            Nombre de chunks de l'utilisateur
+        """
+        user_index = self._load(user_id)
+        with self._lock:
+            return sum(len(chunk_ids) for chunk_ids in user_index.values())
@@ -0,0 +1,306 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.tools.metrics import WATCHED_FILES
+
+try:
+    import watchfiles
+except ImportError:
+    watchfiles = None
+
+FileState = Tuple[int, int]  # (mtime_ns, taille)
+
+
+class FolderWatcher:
+    """Ingestion incrémentale continue d'un dossier de PDF
+
+    Les événements du système de fichiers (inotify via watchfiles, sinon scrutation
+    périodique) sont regroupés sur une fenêtre de `debounce` secondes, puis chaque
+    fichier concerné est comparé à l'état persisté (mtime, taille): seuls les fichiers
+    ajoutés, modifiés ou supprimés sont ingérés ou retirés de la base. L'état est
+    sauvegardé après chaque fichier traité: un redémarrage reprend sans réingérer.
+    Un fichier supprimé de la base par l'API (DELETE /files, vidage) reste exclu tant
+    qu'il n'est pas modifié dans le dossier ou réingéré explicitement (`reingest`).
+    Dans la base, un fichier est nommé par son chemin relatif au dossier (`sous/dossier/notice.pdf`):
+    deux fichiers de même nom dans des sous-dossiers différents ne se confondent pas.
+    """
+
+    def __init__(self,
+                 root: Path,
+                 vector_store,
+                 user_id: str,
+                 state_path: Path,
+                 extensions: Iterable[str] = ("pdf",),
+                 debounce: float = 2.0,
+                 poll_interval: float = 30.0,
+                 use_inotify: bool = True
+        ):
+        """
+        Args:
+            root: Dossier surveillé
+            vector_store: VectorStore alimenté
+            user_id: Utilisateur propriétaire des documents du dossier
+            state_path: Fichier d'état (fichiers déjà ingérés)
+            extensions: Extensions suivies
+            debounce: Fenêtre de regroupement des événements en secondes
+            poll_interval: Période de scrutation sans inotify, en secondes
+            use_inotify: Utilise watchfiles si disponible
+        """
+        self.root = Path(root)
+        self.vector_store = vector_store
+        self.user_id = user_id
+        self.state_path = Path(state_path)
+        self.extensions = {f".{extension.lower().lstrip('.')}" for extension in extensions}
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and watchfiles is not None
+
+        self._files: Dict[str, FileState] = {}
+        # Fichiers du dossier supprimés de la base par l'API: suivis, mais pas réingérés
+        self._excluded: Set[str] = set()
+        self._failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_sync: Optional[str] = None
+
+    # ------------------------------------------------------------------ état persisté
+
+    def _load_state(self) -> None:
+        if not self.state_path.exists():
+            return
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            if state.get("root") != str(self.root.resolve()) or state.get("user_id") != self.user_id:
+                logging.warning(f"⚠️ État {self.state_path} d'un autre dossier/utilisateur, ignoré")
+                return
+            self._files = {path: tuple(values) for path, values in state["files"].items()}
+            self._excluded = set(state.get("excluded", [])) & set(self._files)
+        except Exception as e:
+            logging.warning(f"⚠️ État du watcher illisible ({e}), resynchronisation complète")
+
+    def _save_state(self) -> None:
+        state = {
+            "version": 1,
+            "root": str(self.root.resolve()),
+            "user_id": self.user_id,
+            "updated_at": datetime.now().isoformat(),
+            "files": self._files,
+            "excluded": sorted(self._excluded),
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.state_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(temp_path, self.state_path)
+
+    # ------------------------------------------------------------------ détection
+
+    def _tracked(self, path: Path) -> bool:
+        return path.suffix.lower() in self.extensions and not path.name.startswith(".")
+
+    def _scan(self) -> Dict[str, FileState]:
+        """Stat de tous les fichiers suivis (scandir, sans ouvrir les fichiers)"""
+        found: Dict[str, FileState] = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+                        elif entry.is_file() and self._tracked(Path(entry.name)):
+                            stat = entry.stat()
+                            found[os.path.relpath(entry.path, self.root)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError as e:
+                logging.warning(f"⚠️ Dossier illisible {directory}: {e}")
+        return found
+
+    def _stat(self, relative_path: str) -> Optional[FileState]:
+        try:
+            stat = (self.root / relative_path).stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    # ------------------------------------------------------------------ traitement
+
+    def _process(self, relative_path: str, current: Optional[FileState]) -> Optional[str]:
+        """
+        Ingère / retire un fichier selon son état courant comparé à l'état persisté
+
+        Returns:
+            Action effectuée (added, modified, deleted) ou None si inchangé
+        """
+        known = self._files.get(relative_path)
+        if current == known:
+            return None
+
+        path = self.root / relative_path
+        file_name = Path(relative_path).as_posix()
+        if known is None:
+            action = "added"
+        elif current is None:
+            action = "deleted"
+        else:
+            action = "modified"
+
+        if current is not None and not self.use_inotify and time.time_ns() - current[0] < self.debounce * 1e9:
+            # Fichier encore en cours d'écriture: repris à la prochaine scrutation
+            return None
+
+        try:
+            if action in ("modified", "deleted"):
+                if not self.vector_store.delete_file_chunks(file_name, self.user_id):
+                    raise RuntimeError("suppression des anciens chunks en échec")
+            if action in ("added", "modified"):
+                self.vector_store.add_documents_from_files([path], self.user_id, root=self.root)
+        except Exception as e:
+            logging.error(f"❌ Watcher: {action} {relative_path} en échec: {e}")
+            WATCHED_FILES.inc(action=action, status="failed")
+            with self._lock:
+                self._failed[relative_path] = str(e)
+            return None
+
+        with self._lock:
+            self._failed.pop(relative_path, None)
+            # Nouvelle version (ou fichier retiré du dossier): l'exclusion ne porte plus
+            self._excluded.discard(relative_path)
+            if current is None:
+                self._files.pop(relative_path, None)
+            else:
+                self._files[relative_path] = current
+            self._save_state()
+        WATCHED_FILES.inc(action=action, status="ok")
+        logging.info(f"👀 Watcher: {relative_path} {action}")
+        return action
+
+    def sync(self, paths: Optional[Set[str]] = None) -> Dict[str, int]:
+        """
+        Rapproche la base de l'état du dossier
+
+        Args:
+            paths: Chemins relatifs à vérifier (défaut: tout le dossier)
+
+        Returns:
+            Nombre de fichiers par action
+        """
+        if paths is None:
+            current_files = self._scan()
+            candidates = set(current_files) | set(self._files)
+        else:
+            current_files = {path: self._stat(path) for path in paths}
+            candidates = set(paths)
+
+        counts = {"added": 0, "modified": 0, "deleted": 0}
+        for relative_path in sorted(candidates):
+            if self._stop.is_set():
+                break
+            action = self._process(relative_path, current_files.get(relative_path))
+            if action:
+                counts[action] += 1
+
+        self._last_sync = datetime.now().isoformat()
+        if any(counts.values()):
+            logging.info(f"👀 Watcher synchronisé: {counts}")
+        return counts
+
+    # ------------------------------------------------------------------ boucles
+
+    def _relative_changes(self, changes: Set[Tuple[Any, str]]) -> Set[str]:
+        paths = set()
+        for _, raw_path in changes:
+            path = Path(raw_path)
+            if self._tracked(path):
+                paths.add(os.path.relpath(path, self.root))
+            elif not path.suffix:
+                # Dossier déplacé/supprimé: ses fichiers connus sont à revérifier
+                prefix = os.path.relpath(path, self.root) + os.sep
+                paths.update(known for known in self._files if known.startswith(prefix))
+        return paths
+
+    def _run(self) -> None:
+        # Rattrapage des changements survenus pendant l'arrêt: stat seulement, rien n'est réingéré
+        self.sync()
+
+        if self.use_inotify:
+            logging.info(f"👀 Watcher inotify sur {self.root}")
+            for changes in watchfiles.watch(self.root, debounce=int(self.debounce * 1000),
+                                            stop_event=self._stop, raise_interrupt=False):
+                paths = self._relative_changes(changes)
+                if paths:
+                    self.sync(paths)
+        else:
+            logging.info(f"👀 Watcher par scrutation de {self.root} toutes les {self.poll_interval}s")
+            while not self._stop.wait(self.poll_interval):
+                self.sync()
+
+    def start(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load_state()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="folder-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _matching(self, paths: Iterable[str], file_name: Optional[str]) -> List[str]:
+        return [path for path in paths if file_name is None or Path(path).as_posix() == file_name]
+
+    def exclude(self, user_id: str, file_name: Optional[str] = None) -> None:
+        """
+        Rappel de suppression du VectorStore: les fichiers supprimés de la base restent suivis
+        (état inchangé) mais exclus, pour ne pas être réingérés à la prochaine synchronisation
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Chemin relatif du fichier dans le dossier (None = tous)
+        """
+        if user_id != self.user_id:
+            return
+        with self._lock:
+            excluded = self._matching(self._files, file_name)
+            self._excluded.update(excluded)
+            if excluded:
+                self._save_state()
+
+    def reingest(self, file_name: Optional[str] = None) -> Dict[str, int]:
+        """
+        Réingère des fichiers exclus après une suppression par l'API
+
+        Args:
+            file_name: Chemin relatif du fichier dans le dossier (None = tous les fichiers exclus)
+
+        Returns:
+            Nombre de fichiers par action
+        """
+        with self._lock:
+            paths = self._matching(self._excluded, file_name)
+            for path in paths:
+                self._excluded.discard(path)
+                self._files.pop(path, None)
+            if paths:
+                self._save_state()
+        return self.sync(set(paths))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "root": str(self.root),
+                "user_id": self.user_id,
+                "mode": "inotify" if self.use_inotify else "polling",
+                "running": self._thread is not None and self._thread.is_alive(),
+                "tracked_files": len(self._files),
+                "excluded_files": sorted(self._excluded),
+                "failed": dict(self._failed),
+                "last_sync": self._last_sync,
+            }
@@ -0,0 +1,150 @@
+import logging
+import os
+from typing import Any, Callable, Dict, Optional
+
+# Paramètre HNSW -> (variable d'environnement, type)
+HNSW_ENV = {
+    "space": ("CHROMA_HNSW_SPACE", str),
+    "ef_construction": ("CHROMA_HNSW_EF_CONSTRUCTION", int),
+    "ef_search": ("CHROMA_HNSW_EF_SEARCH", int),
+    "max_neighbors": ("CHROMA_HNSW_M", int),
+}
+
+# Paramètres fixés à la construction de l'index: les changer impose une reconstruction
+IMMUTABLE_PARAMS = ("space", "ef_construction", "max_neighbors")
+
+HNSW_SPACES = ("l2", "cosine", "ip")
+
+
+def hnsw_params_from_env(**overrides) -> Dict[str, Any]:
+    """
+    Paramètres HNSW configurés (seuls ceux renseignés, les autres gardent le défaut Chroma)
+
+    Args:
+        **overrides: Valeurs prioritaires sur l'environnement (None = ignorée)
+
+    Returns:
+        Dictionnaire pour `configuration={"hnsw": ...}`
+    """
+    params: Dict[str, Any] = {}
+    for name, (env_name, cast) in HNSW_ENV.items():
+        value = overrides.get(name)
+        if value is None and os.getenv(env_name):
+            value = cast(os.getenv(env_name))
+        if value is not None:
+            params[name] = value
+
+    if "space" in params and params["space"] not in HNSW_SPACES:
+        raise ValueError(f"Distance HNSW inconnue: {params['space']} (attendu: {', '.join(HNSW_SPACES)})")
+    return params
+
+
+def current_hnsw_params(collection) -> Dict[str, Any]:
+    """
+    Args:
+        collection: Collection Chroma
+
+    Returns:
+        Paramètres HNSW effectifs de la collection
+    """
+    hnsw = (collection.configuration or {}).get("hnsw") or {}
+    return {name: hnsw.get(name) for name in HNSW_ENV}
+
+
+def apply_hnsw_params(collection, params: Dict[str, Any]):
+    """
+    Applique les paramètres modifiables à chaud (ef_search) sur une collection existante
+
+    ef_search est persisté dans la configuration de la collection; Chroma garde en cache
+    l'index déjà chargé dans le processus: à appliquer avant la première requête (démarrage).
+    Les paramètres de construction différents de ceux de l'index sont signalés:
+    ils ne prennent effet qu'après `rebuild_collection`.
+
+    Args:
+        collection: Collection Chroma
+        params: Paramètres HNSW souhaités
+
+    Returns:
+        La collection
+    """
+    current = current_hnsw_params(collection)
+
+    stale = [name for name in IMMUTABLE_PARAMS if name in params and params[name] != current.get(name)]
+    if stale:
+        logging.warning(f"⚠️ Index HNSW '{collection.name}' construit avec "
+                        f"{ {name: current.get(name) for name in stale} }, configuré avec "
+                        f"{ {name: params[name] for name in stale} }: reconstruction nécessaire")
+
+    ef_search = params.get("ef_search")
+    if ef_search is not None and ef_search != current.get("ef_search"):
+        collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+        logging.info(f"🔧 ef_search={ef_search} appliqué à '{collection.name}'")
+    return collection
+
+
+def rebuild_collection(client, name: str, params: Optional[Dict[str, Any]] = None, page_size: Optional[int] = None,
+                       transform: Optional[Callable] = None, metadata: Optional[Dict[str, Any]] = None):
+    """
+    Reconstruit l'index d'une collection (nouveaux paramètres HNSW, compaction)
+
+    Copie les enregistrements (vecteurs compris, sans re-vectorisation) dans une
+    collection temporaire construite avec les nouveaux paramètres, puis l'échange
+    avec l'originale. Les suppressions accumulées disparaissent de l'index.
+    À lancer sans écriture concurrente sur la collection.
+
+    Args:
+        client: Client Chroma
+        name: Nom de la collection
+        params: Paramètres HNSW à changer (les autres sont conservés)
+        page_size: Enregistrements copiés par page (défaut: max batch du client)
+        transform: Transformation appliquée aux vecteurs copiés (ex: réduction de dimension)
+        metadata: Métadonnées ajoutées à la collection reconstruite
+
+    Returns:
+        La collection reconstruite
+    """
+    source = client.get_collection(name)
+    target_params = {key: value for key, value in current_hnsw_params(source).items() if value is not None}
+    target_params.update(params or {})
+    page_size = page_size or client.get_max_batch_size()
+
+    temp_name = f"{name}-rebuild"
+    old_name = f"{name}-old"
+    for leftover in (temp_name, old_name):
+        if leftover in [collection.name for collection in client.list_collections()]:
+            client.delete_collection(leftover)
+
+    # Les anciennes clés "hnsw:*" des métadonnées entreraient en conflit avec la configuration
+    target_metadata = {key: value for key, value in (source.metadata or {}).items() if not key.startswith("hnsw:")}
+    target_metadata.update(metadata or {})
+    target = client.create_collection(temp_name, configuration={"hnsw": target_params},
+                                      metadata=target_metadata or None)
+
+    total = source.count()
+    logging.info(f"🔁 Reconstruction de '{name}' ({total} enregistrements) avec {target_params}")
+
+    copied = 0
+    while copied < total:
+        page = source.get(limit=page_size, offset=copied, include=["embeddings", "documents", "metadatas"])
+        if not page["ids"]:
+            break
+        target.add(
+            ids=page["ids"],
+            embeddings=transform(page["embeddings"]) if transform else page["embeddings"],
+            documents=page["documents"],
+            metadatas=page["metadatas"]
+        )
+        copied += len(page["ids"])
+        logging.info(f"   📊 {copied}/{total} copiés")
+
+    if target.count() != total:
+        client.delete_collection(temp_name)
+        raise RuntimeError(f"Reconstruction de '{name}' incomplète: {target.count()}/{total} enregistrements")
+
+    # Échange: l'ancienne collection n'est supprimée qu'une fois la nouvelle en place
+    source.modify(name=old_name)
+    target.modify(name=name)
+    client.delete_collection(old_name)
+
+    logging.info(f"✅ Index de '{name}' reconstruit")
+    return client.get_collection(name)
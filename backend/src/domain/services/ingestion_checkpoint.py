@@ -0,0 +1,139 @@
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class IngestionCheckpoint:
+    """Point de reprise persistant de l'ingestion en masse, fichier par fichier
+
+    Chaque fichier d'un lot (utilisateur + dossier) a un statut pending/done/failed,
+    son hash et l'état (taille, mtime) qui a servi à le calculer. Un lot interrompu
+    reprend aux fichiers non terminés; un fichier terminé n'est retraité que s'il a changé.
+    Stocké dans SQLite: une mise à jour par fichier, sans réécrire tout l'état.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Fichier SQLite du point de reprise
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    run_id TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    file_hash TEXT,
+                    chunks INTEGER DEFAULT 0,
+                    error TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (run_id, path)
+                )
+            """)
+
+    @staticmethod
+    def run_id(user_id: str, folder: Path) -> str:
+        """Identifiant du lot: même utilisateur + même dossier = même point de reprise"""
+        return f"{user_id}:{Path(folder).resolve()}"
+
+    def register(self, run_id: str, paths: List[Path]) -> None:
+        """Ajoute les nouveaux fichiers du lot en pending (les fichiers connus gardent leur statut)"""
+        now = datetime.now().isoformat()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO files (run_id, path, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(run_id, str(path), PENDING, now) for path in paths]
+            )
+
+    def get(self, run_id: str, path: Path) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, size, mtime_ns, file_hash, chunks, error FROM files WHERE run_id = ? AND path = ?",
+                (run_id, str(path))
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("status", "size", "mtime_ns", "file_hash", "chunks", "error"), row))
+
+    def mark(self, run_id: str, path: Path, status: str, size: Optional[int] = None,
+             mtime_ns: Optional[int] = None, file_hash: Optional[str] = None, chunks: int = 0,
+             error: Optional[str] = None) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                """INSERT INTO files (run_id, path, status, size, mtime_ns, file_hash, chunks, error, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (run_id, path) DO UPDATE SET
+                       status = excluded.status, size = excluded.size, mtime_ns = excluded.mtime_ns,
+                       file_hash = excluded.file_hash, chunks = excluded.chunks, error = excluded.error,
+                       updated_at = excluded.updated_at""",
+                (run_id, str(path), status, size, mtime_ns, file_hash, chunks, error, datetime.now().isoformat())
+            )
+
+    def forget(self, user_id: str, file_name: Optional[str] = None) -> int:
+        """
+        Oublie des fichiers supprimés de la base: une relance du lot les réingérera
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Nom du fichier dans la base, chemin relatif au dossier du lot
+                (None = tous les fichiers de l'utilisateur)
+
+        Returns:
+            Nombre d'entrées retirées
+        """
+        prefix = f"{user_id}:"
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                "SELECT run_id, path FROM files WHERE substr(run_id, 1, ?) = ?", (len(prefix), prefix)
+            ).fetchall()
+            if file_name is not None:
+                rows = [(run_id, path) for run_id, path in rows if self._source_name(run_id, path) == file_name]
+            self._connection.executemany("DELETE FROM files WHERE run_id = ? AND path = ?", rows)
+        return len(rows)
+
+    @staticmethod
+    def _source_name(run_id: str, path: str) -> str:
+        """Nom du fichier dans la base: chemin relatif au dossier du lot (voir DocumentProcessor.source_name)"""
+        folder = run_id.split(":", 1)[1]
+        try:
+            return Path(path).resolve().relative_to(folder).as_posix()
+        except ValueError:
+            return Path(path).name
+
+    def summary(self, run_id: str) -> Dict[str, Any]:
+        """
+        Returns:
+            Nombre de fichiers et de chunks par statut, et les derniers fichiers en échec
+        """
+        with self._lock:
+            counts = self._connection.execute(
+                "SELECT status, COUNT(*), COALESCE(SUM(chunks), 0) FROM files WHERE run_id = ? GROUP BY status",
+                (run_id,)
+            ).fetchall()
+            failed = self._connection.execute(
+                "SELECT path, error FROM files WHERE run_id = ? AND status = ? ORDER BY updated_at DESC LIMIT 20",
+                (run_id, FAILED)
+            ).fetchall()
+
+        files = {PENDING: 0, DONE: 0, FAILED: 0}
+        chunks = 0
+        for status, count, status_chunks in counts:
+            files[status] = count
+            chunks += status_chunks
+        return {
+            "files": files,
+            "chunks": chunks,
+            "failed": [{"path": path, "error": error} for path, error in failed],
+        }
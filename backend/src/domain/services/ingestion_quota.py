@@ -0,0 +1,58 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class UserChunkQuota:
+    """Quota d'ingestion par utilisateur, en chunks par minute (seau à jetons)
+
+    Un lot qui dépasse le quota n'est pas tronqué: il attend que le seau se
+    remplisse (contre-pression). Le seau est partagé entre toutes les ingestions
+    d'un même utilisateur. Un fichier plus gros que le seau passe dès que le seau
+    est plein, en laissant une dette remboursée par les fichiers suivants.
+    """
+
+    def __init__(self, chunks_per_minute: int = 0, burst: Optional[int] = None):
+        """
+        Args:
+            chunks_per_minute: Débit autorisé par utilisateur (0 = illimité)
+            burst: Capacité du seau (défaut: une minute de débit)
+        """
+        self.rate = chunks_per_minute / 60.0
+        self.capacity = float(burst or chunks_per_minute)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id: str, chunks: int) -> float:
+        """
+        Bloque jusqu'à ce que l'utilisateur puisse ingérer `chunks` chunks
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            chunks: Nombre de chunks à ingérer
+
+        Returns:
+            Temps d'attente en secondes
+        """
+        if self.rate <= 0 or chunks <= 0:
+            return 0.0
+
+        waited = 0.0
+        needed = min(chunks, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, updated = self._buckets.get(user_id, (self.capacity, now))
+                tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+                if tokens >= needed:
+                    self._buckets[user_id] = (tokens - chunks, now)
+                    break
+                self._buckets[user_id] = (tokens, now)
+                delay = (needed - tokens) / self.rate
+
+            if waited == 0.0:
+                logging.info(f"⏳ Quota d'ingestion atteint pour {user_id}, attente {delay:.1f}s")
+            time.sleep(delay)
+            waited += delay
+        return waited
@@ -0,0 +1,59 @@
+from typing import List, Optional
+
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def mmr_select(query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float = 0.5,
+               costs: Optional[np.ndarray] = None, budget: Optional[float] = None) -> List[int]:
+    """
+    Sélection par pertinence marginale maximale (MMR), vectorisée
+
+    À chaque étape, le candidat retenu maximise
+    lambda * sim(question, candidat) - (1 - lambda) * max sim(candidat, déjà retenus),
+    similarités cosinus. La matrice des similarités entre candidats est calculée une fois;
+    seule la similarité max aux retenus est mise à jour (une colonne par étape).
+    Avec un budget, les candidats qui ne tiennent plus dans la place restante sont écartés:
+    le budget de contexte va aux chunks qui apportent le plus d'information nouvelle.
+
+    Args:
+        query: Vecteur de la requête
+        candidates: Vecteurs des candidats (n x dimension), dans l'ordre de la recherche
+        k: Nombre max de candidats retenus
+        lambda_mult: 1 = pertinence seule (ordre de la recherche), 0 = diversité seule
+        costs: Coût de chaque candidat dans le budget (ex: caractères dans le contexte)
+        budget: Budget total (None = pas de limite)
+
+    Returns:
+        Positions des candidats retenus, dans l'ordre de sélection
+    """
+    candidates = np.asarray(candidates, dtype=np.float32)
+    if candidates.ndim != 2 or not len(candidates) or k <= 0:
+        return []
+    vectors = _normalize(candidates)
+    relevance = vectors @ _normalize(np.asarray(query, dtype=np.float32))
+    similarity = vectors @ vectors.T
+
+    available = np.ones(len(vectors), dtype=bool)
+    remaining = float("inf") if budget is None or costs is None else float(budget)
+    costs = None if costs is None else np.asarray(costs, dtype=np.float64)
+    max_similarity = np.full(len(vectors), -np.inf, dtype=np.float32)
+    selected: List[int] = []
+
+    while len(selected) < k:
+        if costs is not None:
+            available &= costs <= remaining
+        if not available.any():
+            break
+        redundancy = np.zeros_like(relevance) if not selected else max_similarity
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[:, best])
+        if costs is not None:
+            remaining -= costs[best]
+    return selected
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+
+class MinHasher:
+    """Signatures MinHash de textes (3-grammes de mots normalisés), stables d'un processus à l'autre"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """
+        Args:
+            num_perm: Nombre de permutations (taille de la signature)
+            shingle_size: Mots par shingle
+            seed: Graine des permutations (à ne pas changer sur un index persisté)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Empreintes CRC32 des n-grammes de mots (minuscules, ponctuation ignorée)"""
+        words = _WORD.findall(text.lower())
+        size = self.shingle_size
+        if len(words) <= size:
+            grams = [" ".join(words)]
+        else:
+            grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+        return np.fromiter((zlib.crc32(gram.encode()) for gram in set(grams)), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Signature MinHash (uint32, num_perm valeurs)"""
+        hashes = self.shingles(text)
+        # Débordement uint64 voulu (comme datasketch): seuls les 32 bits de poids faible sont gardés
+        permuted = ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """Détection des chunks quasi identiques à l'ingestion (MinHash + LSH), par utilisateur
+
+    Chaque chunk indexé laisse sa signature et ses clés de bandes LSH dans SQLite. Un nouveau
+    chunk dont une bande coïncide avec celle d'un chunk existant (ou d'un chunk précédent du
+    même lot) et dont la similarité de Jaccard estimée atteint le seuil n'est ni vectorisé ni
+    stocké: il est lié à ce chunk canonique, avec son texte et ses métadonnées. Le canonique
+    peut appartenir à un autre fichier: un fichier couvre alors ses propres chunks plus les
+    canoniques de ses doublons liés (`canonical_ids`). Quand le fichier du chunk canonique
+    est supprimé, ses doublons liés sont rendus pour être réingérés.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.9, num_perm: int = 128, bands: int = 16):
+        """
+        Args:
+            path: Fichier SQLite de l'index
+            threshold: Similarité de Jaccard estimée à partir de laquelle un chunk est un doublon
+            num_perm: Taille des signatures MinHash
+            bands: Bandes LSH (num_perm / bands lignes par bande; plus de bandes = plus de candidats)
+        """
+        if num_perm % bands:
+            raise ValueError(f"{num_perm} permutations non divisibles en {bands} bandes")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS signatures (
+                    user_id TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    source_file TEXT,
+                    signature BLOB NOT NULL,
+                    PRIMARY KEY (user_id, chunk_id)
+                );
+                CREATE INDEX IF NOT EXISTS signatures_by_file ON signatures (user_id, source_file);
+                CREATE TABLE IF NOT EXISTS buckets (
+                    user_id TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    chunk_id TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS buckets_by_key ON buckets (user_id, bucket);
+                CREATE INDEX IF NOT EXISTS buckets_by_chunk ON buckets (user_id, chunk_id);
+                CREATE TABLE IF NOT EXISTS links (
+                    user_id TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    canonical_id TEXT NOT NULL,
+                    source_file TEXT,
+                    text TEXT NOT NULL,
+                    metadata TEXT,
+                    PRIMARY KEY (user_id, chunk_id)
+                );
+                CREATE INDEX IF NOT EXISTS links_by_canonical ON links (user_id, canonical_id);
+                CREATE INDEX IF NOT EXISTS links_by_file ON links (user_id, source_file);
+            """)
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        """Clés LSH (une par bande, entiers signés 64 bits pour SQLite)"""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(band.to_bytes(2, "big") + rows.tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "big", signed=True))
+        return keys
+
+    def _stored_candidates(self, user_id: str, keys: List[int]) -> Tuple[Dict[int, List[str]], Dict[str, np.ndarray]]:
+        """
+        Returns:
+            Tuple (clé -> chunks indexés qui la partagent, chunk -> signature)
+        """
+        by_key: Dict[int, List[str]] = {}
+        signatures: Dict[str, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # Par paquets: SQLite limite le nombre de paramètres d'une requête
+            for start in range(0, len(unique_keys), 500):
+                page = unique_keys[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT b.bucket, s.chunk_id, s.signature FROM buckets b "
+                    f"JOIN signatures s ON s.user_id = b.user_id AND s.chunk_id = b.chunk_id "
+                    f"WHERE b.user_id = ? AND b.bucket IN ({', '.join('?' * len(page))})",
+                    (user_id, *page)
+                ).fetchall()
+                for bucket, chunk_id, signature in rows:
+                    by_key.setdefault(bucket, []).append(chunk_id)
+                    if chunk_id not in signatures:
+                        signatures[chunk_id] = np.frombuffer(signature, dtype=np.uint32)
+        return by_key, signatures
+
+    def filter(self, user_id: str, ids: List[str], texts: List[str],
+               metadatas: List[Dict[str, Any]]) -> Tuple[List[int], Dict[str, Any]]:
+        """
+        Sépare les chunks à écrire des quasi-doublons (d'un chunk déjà indexé ou d'un chunk précédent du lot)
+
+        Rien n'est enregistré: appeler `register` avec le plan une fois les chunks écrits.
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            ids: IDs des chunks
+            texts: Textes des chunks
+            metadatas: Métadonnées des chunks
+
+        Returns:
+            Tuple (positions des chunks à écrire, plan d'enregistrement)
+        """
+        signatures = [self.hasher.signature(text) for text in texts]
+        keys = [self._buckets(signature) for signature in signatures]
+        stored_by_key, stored = self._stored_candidates(user_id, [key for chunk_keys in keys for key in chunk_keys])
+
+        kept: List[int] = []
+        links: List[Tuple[str, str, int]] = []
+        batch_by_key: Dict[int, List[int]] = {}
+        for position, (signature, chunk_keys) in enumerate(zip(signatures, keys)):
+            canonical = None
+            best = self.threshold
+            for key in chunk_keys:
+                for chunk_id in stored_by_key.get(key, ()):
+                    similarity = float(np.mean(stored[chunk_id] == signature))
+                    if similarity >= best:
+                        canonical, best = chunk_id, similarity
+                for other in batch_by_key.get(key, ()):
+                    similarity = float(np.mean(signatures[other] == signature))
+                    if similarity >= best:
+                        canonical, best = ids[other], similarity
+            if canonical is None:
+                kept.append(position)
+                for key in chunk_keys:
+                    batch_by_key.setdefault(key, []).append(position)
+            else:
+                links.append((ids[position], canonical, position))
+
+        plan = {
+            "signatures": {ids[position]: (signatures[position], keys[position], metadatas[position].get("source_file"))
+                           for position in kept},
+            "links": [(chunk_id, canonical, texts[position], metadatas[position])
+                      for chunk_id, canonical, position in links],
+        }
+        return kept, plan
+
+    def register(self, user_id: str, plan: Dict[str, Any], written_ids: Optional[set] = None) -> None:
+        """
+        Enregistre les chunks écrits et les doublons liés à un chunk canonique présent
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            plan: Plan retourné par `filter`
+            written_ids: IDs effectivement écrits (None = tous ceux du plan)
+        """
+        signatures = {chunk_id: value for chunk_id, value in plan["signatures"].items()
+                      if written_ids is None or chunk_id in written_ids}
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO signatures (user_id, chunk_id, source_file, signature) VALUES (?, ?, ?, ?)",
+                [(user_id, chunk_id, source_file, signature.tobytes())
+                 for chunk_id, (signature, _, source_file) in signatures.items()]
+            )
+            self._connection.executemany(
+                "INSERT INTO buckets (user_id, bucket, chunk_id) VALUES (?, ?, ?)",
+                [(user_id, key, chunk_id) for chunk_id, (_, keys, _) in signatures.items() for key in keys]
+            )
+            # Un doublon dont le canonique du lot n'a pas été écrit est perdu avec lui (fichier en échec)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO links (user_id, chunk_id, canonical_id, source_file, text, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(user_id, chunk_id, canonical, metadata.get("source_file"), text,
+                  json.dumps(metadata, ensure_ascii=False))
+                 for chunk_id, canonical, text, metadata in plan["links"]
+                 if canonical not in plan["signatures"] or canonical in signatures]
+            )
+
+    def count_links(self, user_id: str, file_name: Optional[str] = None) -> int:
+        """Nombre de chunks écartés comme doublons (de l'utilisateur ou d'un fichier)"""
+        with self._lock:
+            if file_name is None:
+                row = self._connection.execute("SELECT COUNT(*) FROM links WHERE user_id = ?", (user_id,)).fetchone()
+            else:
+                row = self._connection.execute("SELECT COUNT(*) FROM links WHERE user_id = ? AND source_file = ?",
+                                               (user_id, file_name)).fetchone()
+        return row[0]
+
+    def canonical_ids(self, user_id: str, file_name: str) -> List[str]:
+        """Chunks canoniques auxquels sont liés les doublons d'un fichier (éventuellement d'autres fichiers)"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT canonical_id FROM links WHERE user_id = ? AND source_file = ? ORDER BY canonical_id",
+                (user_id, file_name)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def linked_files(self, user_id: str) -> List[str]:
+        """Fichiers ayant des doublons liés (y compris ceux dont tous les chunks sont des doublons)"""
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT source_file FROM links WHERE user_id = ?",
+                                            (user_id,)).fetchall()
+        return [row[0] for row in rows if row[0]]
+
+    def delete(self, user_id: str, file_name: Optional[str] = None) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Oublie les chunks (et doublons liés) d'un fichier ou de tout l'utilisateur
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Fichier supprimé (None = tous)
+
+        Returns:
+            Doublons d'autres fichiers dont le chunk canonique a disparu: (id, texte, métadonnées),
+            à réingérer pour que leur contenu reste cherchable
+        """
+        with self._lock, self._connection:
+            if file_name is None:
+                for table in ("signatures", "buckets", "links"):
+                    self._connection.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+                return []
+
+            self._connection.execute("DELETE FROM links WHERE user_id = ? AND source_file = ?", (user_id, file_name))
+            orphans = self._connection.execute(
+                "SELECT l.chunk_id, l.text, l.metadata FROM links l "
+                "JOIN signatures s ON s.user_id = l.user_id AND s.chunk_id = l.canonical_id "
+                "WHERE l.user_id = ? AND s.source_file = ?",
+                (user_id, file_name)
+            ).fetchall()
+            self._connection.execute(
+                "DELETE FROM links WHERE user_id = ? AND canonical_id IN "
+                "(SELECT chunk_id FROM signatures WHERE user_id = ? AND source_file = ?)",
+                (user_id, user_id, file_name)
+            )
+            self._connection.execute(
+                "DELETE FROM buckets WHERE user_id = ? AND chunk_id IN "
+                "(SELECT chunk_id FROM signatures WHERE user_id = ? AND source_file = ?)",
+                (user_id, user_id, file_name)
+            )
+            self._connection.execute("DELETE FROM signatures WHERE user_id = ? AND source_file = ?",
+                                     (user_id, file_name))
+        return [(chunk_id, text, json.loads(metadata) if metadata else {}) for chunk_id, text, metadata in orphans]
@@ -0,0 +1,105 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class ParentStore:
+    """Textes parents (sections de page) des petits chunks indexés, par utilisateur et ID
+
+    Les chunks enfants sont vectorisés pour la précision de la recherche; leur parent,
+    plus large, est relu ici au moment de construire le contexte. Stocké dans SQLite
+    à côté de la base Chroma: une lecture par clé, sans passer par l'index vectoriel.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Fichier SQLite des parents
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS parents (
+                    user_id TEXT NOT NULL,
+                    parent_id TEXT NOT NULL,
+                    source_file TEXT,
+                    text TEXT NOT NULL,
+                    metadata TEXT,
+                    PRIMARY KEY (user_id, parent_id)
+                )
+            """)
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS parents_by_file ON parents (user_id, source_file)"
+            )
+
+    def put(self, user_id: str, parents: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """
+        Enregistre (ou remplace) des parents
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            parents: Tuples (parent_id, texte, métadonnées)
+
+        Returns:
+            Nombre de parents écrits
+        """
+        rows = [
+            (user_id, parent_id, metadata.get("source_file"), text, json.dumps(metadata, ensure_ascii=False))
+            for parent_id, text, metadata in parents
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO parents (user_id, parent_id, source_file, text, metadata) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def get_many(self, user_id: str, parent_ids: List[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+            parent_ids: IDs des parents
+
+        Returns:
+            parent_id -> (texte, métadonnées), pour les parents trouvés
+        """
+        if not parent_ids:
+            return {}
+        found: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        unique_ids = list(dict.fromkeys(parent_ids))
+        with self._lock:
+            # Par paquets: SQLite limite le nombre de paramètres d'une requête
+            for start in range(0, len(unique_ids), 500):
+                page = unique_ids[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT parent_id, text, metadata FROM parents "
+                    f"WHERE user_id = ? AND parent_id IN ({', '.join('?' * len(page))})",
+                    (user_id, *page)
+                ).fetchall()
+                for parent_id, text, metadata in rows:
+                    found[parent_id] = (text, json.loads(metadata) if metadata else {})
+        return found
+
+    def delete(self, user_id: str, file_name: Optional[str] = None) -> int:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Fichier dont supprimer les parents (None = tous)
+
+        Returns:
+            Nombre de parents supprimés
+        """
+        with self._lock, self._connection:
+            if file_name is None:
+                cursor = self._connection.execute("DELETE FROM parents WHERE user_id = ?", (user_id,))
+            else:
+                cursor = self._connection.execute(
+                    "DELETE FROM parents WHERE user_id = ? AND source_file = ?", (user_id, file_name)
+                )
+        return cursor.rowcount
@@ -0,0 +1,117 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PROMPTS_DIR = Path(__file__).resolve().parents[3] / "prompts"
+
+
+class PromptRegistry:
+    """Registre des templates de prompts, chargé une fois puis rechargé si les fichiers changent
+
+    Les templates sont rangés par domaine: `<dossier>/<domaine>/<nom>.txt`
+    (ex: prompts/default/chat.txt). Un domaine inconnu ou incomplet retombe sur
+    le domaine par défaut. Le texte retourné est toujours identique pour un même
+    template, ce qui permet au cache de préfixe des upstreams de s'appliquer.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, default_domain: str = "default",
+                 reload_interval: float = 2.0):
+        """
+        Args:
+            directory: Dossier racine des templates (défaut: PROMPTS_DIR, sinon backend/prompts)
+            default_domain: Domaine utilisé en repli
+            reload_interval: Délai minimum en secondes entre deux vérifications des fichiers
+        """
+        self._directory = directory
+        self.default_domain = default_domain
+        self.reload_interval = reload_interval
+
+        self._templates: Dict[Tuple[str, str], str] = {}
+        self._signature: Tuple = ()
+        self._last_check = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        return Path(self._directory or os.getenv("PROMPTS_DIR") or DEFAULT_PROMPTS_DIR)
+
+    def load(self) -> None:
+        """Charge (ou recharge) tous les templates du dossier"""
+        signature = self._scan()
+        templates: Dict[Tuple[str, str], str] = {}
+
+        for path, _, _ in signature:
+            file_path = Path(path)
+            domain, name = file_path.parent.name, file_path.stem
+            templates[(domain, name)] = file_path.read_text(encoding="utf-8").strip()
+
+        with self._lock:
+            self._templates = templates
+            self._signature = signature
+            self._last_check = time.monotonic()
+            self._loaded = True
+
+        logging.info(f"📝 {len(templates)} template(s) de prompt chargé(s) depuis {self.directory}")
+
+    def get(self, name: str, domain: Optional[str] = None) -> str:
+        """
+        Args:
+            name: Nom du template (ex: chat, summary)
+            domain: Domaine souhaité (défaut: domaine par défaut)
+
+        Returns:
+            Texte du template
+        """
+        self._maybe_reload()
+
+        with self._lock:
+            if domain and (domain, name) in self._templates:
+                return self._templates[(domain, name)]
+            if domain and domain != self.default_domain:
+                logging.warning(f"Template '{name}' absent du domaine '{domain}', repli sur '{self.default_domain}'")
+            try:
+                return self._templates[(self.default_domain, name)]
+            except KeyError:
+                raise KeyError(f"Template de prompt introuvable: {self.default_domain}/{name}")
+
+    def domains(self) -> List[str]:
+        self._maybe_reload()
+        with self._lock:
+            return sorted({domain for domain, _ in self._templates})
+
+    def _maybe_reload(self) -> None:
+        if not self._loaded:
+            self.load()
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_check < self.reload_interval:
+                return
+            self._last_check = now
+
+        if self._scan() != self._signature:
+            logging.info("📝 Modification des templates détectée, rechargement")
+            self.load()
+
+    def _scan(self) -> Tuple:
+        """Signature (chemin, mtime, taille) des fichiers de templates, sans les lire"""
+        entries = []
+        directory = self.directory
+        if not directory.exists():
+            return ()
+        for domain_entry in os.scandir(directory):
+            if not domain_entry.is_dir():
+                continue
+            for entry in os.scandir(domain_entry.path):
+                if entry.is_file() and entry.name.endswith(".txt"):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+
+
+prompt_registry = PromptRegistry()
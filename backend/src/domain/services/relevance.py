@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+NO_RELEVANT_DOCUMENTS = "Je n'ai trouvé aucun document pertinent pour répondre à cette question."
+
+
+def calibration_path(persist_directory: str) -> Path:
+    return Path(persist_directory) / "relevance_calibration.json"
+
+
+def calibration_key(model_name: str, space: str) -> str:
+    # Les distances dépendent du modèle (et de sa projection) et de la distance de la collection
+    return f"{model_name}|{space}"
+
+
+class RelevanceGate:
+    """Filtre de pertinence des résultats de recherche, par distance
+
+    Un résultat est gardé si sa distance ne dépasse pas `max_distance` (calibrée par modèle
+    d'embedding) et ne s'éloigne pas du meilleur résultat de plus de `drop_off`. Les résultats
+    arrivent triés: le premier rejeté arrête le contexte. Si même le plus proche est rejeté,
+    la question n'a pas de document pertinent et le LLM n'est pas appelé.
+    """
+
+    def __init__(self, max_distance: Optional[float] = None, drop_off: Optional[float] = None):
+        """
+        Args:
+            max_distance: Distance max d'un résultat pertinent (None = pas de seuil)
+            drop_off: Écart max au meilleur résultat (None = pas de coupure relative)
+        """
+        self.max_distance = max_distance
+        self.drop_off = drop_off
+
+    def keep(self, distances: List[float]) -> int:
+        """
+        Args:
+            distances: Distances des résultats d'une requête, croissantes
+
+        Returns:
+            Nombre de premiers résultats pertinents (0 = aucun)
+        """
+        if not distances:
+            return 0
+        limit = float("inf") if self.max_distance is None else self.max_distance
+        if self.drop_off is not None:
+            limit = min(limit, distances[0] + self.drop_off)
+        count = 0
+        for distance in distances:
+            if distance > limit:
+                break
+            count += 1
+        return count
+
+    @classmethod
+    def load(cls, path: Path, model_name: str, space: str) -> "RelevanceGate":
+        """
+        Seuils calibrés pour le modèle (voir src/tools/relevance_calibration.py),
+        RELEVANCE_MAX_DISTANCE et RELEVANCE_DROP_OFF étant prioritaires
+
+        Args:
+            path: Fichier de calibration
+            model_name: Modèle d'embedding de la collection
+            space: Distance de la collection
+
+        Returns:
+            RelevanceGate configuré
+        """
+        calibration: Dict[str, Any] = {}
+        if path.exists():
+            calibration = json.loads(path.read_text(encoding="utf-8")).get(calibration_key(model_name, space), {})
+
+        def setting(env_name: str, key: str) -> Optional[float]:
+            value = os.getenv(env_name)
+            if value:
+                return float(value)
+            return calibration.get(key)
+
+        gate = cls(setting("RELEVANCE_MAX_DISTANCE", "max_distance"), setting("RELEVANCE_DROP_OFF", "drop_off"))
+        if gate.max_distance is not None:
+            logging.info(f"🎯 Seuil de pertinence: distance <= {gate.max_distance:.4f}"
+                         + (f", écart au meilleur <= {gate.drop_off:.4f}" if gate.drop_off is not None else ""))
+        return gate
+
+
+def save_calibration(path: Path, model_name: str, space: str, values: Dict[str, Any]) -> None:
+    """Enregistre les seuils d'un modèle, sans toucher à ceux des autres"""
+    calibration = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    calibration[calibration_key(model_name, space)] = {**values, "calibrated_at": datetime.now().isoformat()}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_text(json.dumps(calibration, indent=2, ensure_ascii=False), encoding="utf-8")
+    temp_path.replace(path)
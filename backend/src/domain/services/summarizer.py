@@ -0,0 +1,260 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.domain.services.prompt_registry import prompt_registry
+from src.tools.metrics import record_cache, stage
+from src.tools.text_splitter import RecursiveSpanSplitter
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# (prompt système, contenu utilisateur, max_tokens de la réponse) -> texte généré
+CompleteFn = Callable[[str, str, int], str]
+
+
+def token_counter(model: Optional[str] = None) -> Callable[[str], int]:
+    """
+    Compteur de tokens du LLM: tiktoken si installé, sinon estimation (4 caractères par token)
+
+    Args:
+        model: Modèle dont utiliser l'encodage (repli sur cl100k_base)
+
+    Returns:
+        Fonction texte -> nombre de tokens
+    """
+    if tiktoken is None:
+        return lambda text: (len(text) + 3) // 4
+    try:
+        encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class SummaryCache:
+    """Résumés partiels par empreinte (modèle, prompt, contenu), dans SQLite
+
+    Un document modifié ne refait appel au LLM que pour les sections qui ont changé
+    (et les réductions qui en dépendent).
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Fichier SQLite du cache
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT NOT NULL)"
+            )
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8", "ignore"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, summary: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO summaries (key, summary) VALUES (?, ?)", (key, summary))
+
+
+class MapReduceSummarizer:
+    """Résumé de documents longs par map-reduce
+
+    Le texte est découpé en sections d'au plus `chunk_tokens` tokens; toutes les sections
+    sont résumées en parallèle (map), puis les résumés partiels sont regroupés par paquets
+    tenant dans le budget et résumés à nouveau, niveau par niveau, jusqu'à ce qu'un seul
+    appel final, avec le prompt `summary`, produise le résumé. Un texte court est résumé
+    en un seul appel. Un résumé partiel plus long que `map_max_tokens` (modèle qui ignore
+    max_tokens) est tronqué: chaque paquet regroupe alors au moins deux résumés et chaque
+    niveau divise au moins par deux leur nombre, la réduction se termine toujours.
+    Le parallélisme est borné par la concurrence de l'upstream (son UpstreamGuard
+    limite de toute façon les appels simultanés).
+    """
+
+    def __init__(self,
+                 complete: CompleteFn,
+                 namespace: str,
+                 count_tokens: Callable[[str], int],
+                 chunk_tokens: int = 3000,
+                 map_max_tokens: int = 800,
+                 final_max_tokens: int = 4000,
+                 max_concurrency: int = 4,
+                 cache: Optional[SummaryCache] = None
+        ):
+        """
+        Args:
+            complete: Appel au LLM (prompt système, contenu, max_tokens) -> texte
+            namespace: Identifie le modèle dans les clés du cache (ex: openai:gpt-4o)
+            count_tokens: Compteur de tokens du LLM
+            chunk_tokens: Budget d'entrée de chaque appel (section ou paquet de résumés)
+            map_max_tokens: Longueur max d'un résumé partiel
+            final_max_tokens: Longueur max du résumé final
+            max_concurrency: Appels simultanés au plus
+            cache: Cache des résumés partiels (None = désactivé)
+        """
+        if map_max_tokens * 2 > chunk_tokens:
+            raise ValueError(f"Budget de {chunk_tokens} tokens trop petit pour réduire des résumés "
+                             f"de {map_max_tokens} tokens par paires")
+        self.complete = complete
+        self.namespace = namespace
+        self.count_tokens = count_tokens
+        self.chunk_tokens = chunk_tokens
+        self.map_max_tokens = map_max_tokens
+        self.final_max_tokens = final_max_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache
+        self.splitter = RecursiveSpanSplitter(chunk_size=chunk_tokens, chunk_overlap=0, length_function=count_tokens)
+        self.truncator = RecursiveSpanSplitter(chunk_size=map_max_tokens, chunk_overlap=0,
+                                               length_function=count_tokens)
+
+    def _call(self, prompt_name: str, domain: Optional[str], content: str, max_tokens: int) -> str:
+        system_prompt = prompt_registry.get(prompt_name, domain)
+        key = None
+        if self.cache is not None:
+            key = SummaryCache.key(self.namespace, system_prompt, str(max_tokens), content)
+            cached = self.cache.get(key)
+            record_cache("summary", hit=cached is not None)
+            if cached is not None:
+                return cached
+
+        summary = self.complete(system_prompt, content, max_tokens)
+        if key is not None:
+            self.cache.put(key, summary)
+        return summary
+
+    def _map(self, prompt_name: str, domain: Optional[str], contents: List[str], max_tokens: int) -> List[str]:
+        """Un appel par contenu, en parallèle, résultats dans l'ordre"""
+        if len(contents) == 1:
+            return [self._call(prompt_name, domain, contents[0], max_tokens)]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(contents))) as executor:
+            return list(executor.map(lambda content: self._call(prompt_name, domain, content, max_tokens), contents))
+
+    def _truncate(self, partials: List[str]) -> List[str]:
+        """Ramène chaque résumé partiel à map_max_tokens (début du texte, coupé aux séparateurs)"""
+        truncated = []
+        for partial in partials:
+            if self.count_tokens(partial) > self.map_max_tokens:
+                logging.warning(f"⚠️ Résumé partiel de plus de {self.map_max_tokens} tokens tronqué")
+                partial = next(iter(self.truncator.split_text(partial)), "")
+            truncated.append(partial)
+        return truncated
+
+    def _group(self, partials: List[str]) -> List[str]:
+        """Regroupe les résumés partiels consécutifs en paquets tenant dans le budget (au moins 2 par paquet)"""
+        groups: List[List[str]] = []
+        total = 0
+        for partial in partials:
+            size = self.count_tokens(partial)
+            if groups and (len(groups[-1]) < 2 or total + size <= self.chunk_tokens):
+                groups[-1].append(partial)
+                total += size
+            else:
+                groups.append([partial])
+                total = size
+        return ["\n\n".join(group) for group in groups]
+
+    def summarize(self, file_name: str, text: str, domain: Optional[str] = None) -> str:
+        """
+        Args:
+            file_name: Nom du document
+            text: Texte complet du document
+            domain: Domaine des templates de prompt
+
+        Returns:
+            Résumé du document
+        """
+        if self.count_tokens(text) <= self.chunk_tokens:
+            return self._call("summary", domain, f"Résume ce document :\n{text}", self.final_max_tokens)
+
+        sections = self.splitter.split_text(text)
+        logging.info(f"✍️ Résumé de {file_name}: {len(sections)} sections")
+        with stage("summary_map"):
+            # Contenu indépendant de la position de la section: une section inchangée reste en cache
+            partials = self._truncate(self._map("summary_map", domain,
+                                                [f"Section de {file_name} :\n{section}" for section in sections],
+                                                self.map_max_tokens))
+
+        level = 0
+        while self.count_tokens("\n\n".join(partials)) > self.chunk_tokens:
+            level += 1
+            groups = self._group(partials)
+            logging.info(f"🔁 Réduction niveau {level}: {len(partials)} résumés partiels en {len(groups)} paquets")
+            with stage("summary_reduce"):
+                partials = self._truncate(self._map("summary_map", domain,
+                                                    [f"Résumés partiels consécutifs de {file_name} :\n{group}"
+                                                     for group in groups],
+                                                    self.map_max_tokens))
+
+        with stage("summary_reduce"):
+            return self._call("summary", domain,
+                              f"Résume ce document à partir des résumés de ses sections :\n" + "\n\n".join(partials),
+                              self.final_max_tokens)
+
+
+_cache: Dict[str, SummaryCache] = {}
+_cache_lock = threading.Lock()
+
+
+def summarizer_from_env(complete: CompleteFn, prefix: str, namespace: str, model: Optional[str],
+                        max_concurrency: int, final_max_tokens: int = 4000) -> MapReduceSummarizer:
+    """
+    Construit un MapReduceSummarizer depuis les variables d'environnement
+
+    Variables lues: SUMMARY_CHUNK_TOKENS, SUMMARY_MAP_MAX_TOKENS (chacune surchargeable par
+    upstream, ex: LM_STUDIO_SUMMARY_CHUNK_TOKENS pour un modèle local à petite fenêtre) et
+    SUMMARY_CACHE_PATH (vide = sans cache).
+
+    Args:
+        complete: Appel au LLM du connecteur
+        prefix: Préfixe des variables de l'upstream (ex: OPENAI, LM_STUDIO)
+        namespace: Identifiant backend:modèle pour le cache
+        model: Modèle, pour le compteur de tokens
+        max_concurrency: Concurrence de l'upstream
+        final_max_tokens: Longueur max du résumé final
+
+    Returns:
+        MapReduceSummarizer configuré
+    """
+    def setting(name: str, default: str) -> int:
+        return int(os.getenv(f"{prefix}_{name}", os.getenv(name, default)))
+
+    cache = None
+    cache_path = os.getenv("SUMMARY_CACHE_PATH", "./summary_cache.sqlite3")
+    if cache_path:
+        with _cache_lock:
+            # Un seul cache (une connexion) par fichier, partagé entre connecteurs
+            cache = _cache.get(cache_path)
+            if cache is None:
+                cache = _cache[cache_path] = SummaryCache(cache_path)
+
+    return MapReduceSummarizer(
+        complete,
+        namespace=namespace,
+        count_tokens=token_counter(model),
+        chunk_tokens=setting("SUMMARY_CHUNK_TOKENS", "3000"),
+        map_max_tokens=setting("SUMMARY_MAP_MAX_TOKENS", "800"),
+        final_max_tokens=final_max_tokens,
+        max_concurrency=max_concurrency,
+        cache=cache
+    )
@@ -0,0 +1,171 @@
+"""Archive colonnaire des chunks d'un utilisateur (export/import sans re-vectorisation)
+
+Format du fichier (`.vstore`):
+
+    MAGIC | bloc 1 | bloc 2 | ... | pied JSON | taille du pied (uint64) | MAGIC
+
+Chaque bloc contient jusqu'à `block_rows` chunks:
+- vecteurs: tableau float32 brut (lignes x dimension), aligné sur 64 octets,
+  lisible directement par `np.memmap`
+- ids, documents, métadonnées: colonnes JSON compressées zlib; les métadonnées
+  sont stockées clé par clé (valeurs répétées -> bonne compression)
+
+Le pied décrit les blocs (offsets, tailles), le modèle d'embedding et la dimension.
+Il est écrit en dernier: l'export se fait en flux, sans connaître le total à l'avance.
+"""
+import json
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+MAGIC = b"VSTORE01"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_MISSING = "__missing__"
+
+
+def _encode_column(values: List[Any]) -> bytes:
+    return zlib.compress(json.dumps(values, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def _decode_column(raw: bytes) -> List[Any]:
+    return json.loads(zlib.decompress(raw).decode("utf-8"))
+
+
+class VectorArchiveWriter:
+    """Écrit une archive bloc par bloc"""
+
+    def __init__(self, path: Union[str, Path], model: str, dimension: int, user_id: str):
+        """
+        Args:
+            path: Fichier de sortie
+            model: Modèle d'embedding ayant produit les vecteurs
+            dimension: Dimension des vecteurs
+            user_id: Utilisateur exporté
+        """
+        self.path = Path(path)
+        self.footer: Dict[str, Any] = {
+            "version": FORMAT_VERSION,
+            "user_id": user_id,
+            "model": model,
+            "dimension": dimension,
+            "dtype": "float32",
+            "count": 0,
+            "created_at": datetime.now().isoformat(),
+            "blocks": [],
+        }
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+
+    def _write(self, data: bytes, align: bool = False) -> Dict[str, int]:
+        if align:
+            padding = -self._file.tell() % ALIGNMENT
+            self._file.write(b"\0" * padding)
+        offset = self._file.tell()
+        self._file.write(data)
+        return {"offset": offset, "nbytes": len(data)}
+
+    def write_block(self, ids: List[str], embeddings, documents: List[str],
+                    metadatas: List[Optional[Dict[str, Any]]]) -> None:
+        """
+        Args:
+            ids: IDs des chunks
+            embeddings: Vecteurs (lignes x dimension)
+            documents: Textes des chunks
+            metadatas: Métadonnées des chunks
+        """
+        if not ids:
+            return
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if vectors.shape != (len(ids), self.footer["dimension"]):
+            raise ValueError(f"Vecteurs de forme {vectors.shape}, attendu ({len(ids)}, {self.footer['dimension']})")
+
+        keys = sorted({key for metadata in metadatas if metadata for key in metadata})
+        columns = {key: [(metadata or {}).get(key, _MISSING) for metadata in metadatas] for key in keys}
+
+        self.footer["blocks"].append({
+            "rows": len(ids),
+            "embeddings": self._write(vectors.tobytes(), align=True),
+            "ids": self._write(_encode_column(ids)),
+            "documents": self._write(_encode_column(documents)),
+            "metadatas": self._write(_encode_column(columns)),
+        })
+        self.footer["count"] += len(ids)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Pied de l'archive (description des blocs)
+        """
+        footer = json.dumps(self.footer).encode("utf-8")
+        self._file.write(footer)
+        self._file.write(struct.pack("<Q", len(footer)))
+        self._file.write(MAGIC)
+        self._file.close()
+        return self.footer
+
+    def __enter__(self) -> "VectorArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self.path.unlink(missing_ok=True)
+
+
+class VectorArchiveReader:
+    """Lit une archive bloc par bloc, vecteurs en memory-map"""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Fichier d'archive
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} n'est pas une archive vectorielle")
+            f.seek(-(len(MAGIC) + 8), 2)
+            footer_size = struct.unpack("<Q", f.read(8))[0]
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path}: archive tronquée")
+            f.seek(-(len(MAGIC) + 8 + footer_size), 2)
+            self.footer: Dict[str, Any] = json.loads(f.read(footer_size).decode("utf-8"))
+
+        if self.footer.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Version d'archive non supportée: {self.footer.get('version')}")
+
+    @property
+    def count(self) -> int:
+        return self.footer["count"]
+
+    def iter_blocks(self) -> Iterator[Dict[str, Any]]:
+        """
+        Returns:
+            Par bloc: ids, embeddings (memmap float32), documents, metadatas
+        """
+        dimension = self.footer["dimension"]
+        with open(self.path, "rb") as f:
+            for block in self.footer["blocks"]:
+                def read(column: str) -> bytes:
+                    f.seek(block[column]["offset"])
+                    return f.read(block[column]["nbytes"])
+
+                columns = _decode_column(read("metadatas"))
+                metadatas = [
+                    {key: values[row] for key, values in columns.items() if values[row] != _MISSING}
+                    for row in range(block["rows"])
+                ]
+                yield {
+                    "ids": _decode_column(read("ids")),
+                    "embeddings": np.memmap(self.path, dtype=np.float32, mode="r",
+                                            offset=block["embeddings"]["offset"], shape=(block["rows"], dimension)),
+                    "documents": _decode_column(read("documents")),
+                    "metadatas": metadatas,
+                }
@@ -1,10 +1,31 @@
 import chromadb
 from pathlib import Path
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Union, Optional, Callable
 import logging
+import os
 import time
+import numpy as np
 from src.tools.document_processor import DocumentProcessor
 from src.domain.ports.embeding import EmbeddingPort
+from src.domain.services.bulk_writer import ChromaBulkWriter
+from src.domain.services.document_summaries import (
+    SUMMARY_MODES, DocumentSummaryIndex, align_summaries_space, summarize_document
+)
+from src.domain.services.embedding_projection import (
+    PROJECTION_METADATA_KEY, EmbeddingProjection, ProjectedEmbeddingPort, load_projection
+)
+from src.domain.services.embedding_scheduler import BULK, embedding_priority
+from src.domain.services.exact_index import ExactTenantIndex
+from src.domain.services.file_index import FileChunkIndex
+from src.domain.services.mmr import mmr_select
+from src.domain.services.near_duplicates import NearDuplicateIndex
+from src.domain.services.parent_store import ParentStore
+from src.domain.services.relevance import RelevanceGate, calibration_path
+from src.domain.services.vector_archive import VectorArchiveReader, VectorArchiveWriter
+from src.domain.services.hnsw_index import (
+    apply_hnsw_params, current_hnsw_params, hnsw_params_from_env, rebuild_collection
+)
+from src.tools.metrics import stage, INGESTED_CHUNKS, RELEVANCE_GATE
 
 
 class VectorStore:
@@ -12,7 +33,9 @@ class VectorStore:
     def __init__(self, 
                  embedding_port: EmbeddingPort,
                  collection_name: str = "documents", 
-                 persist_directory: str = "./chroma_db"
+                 persist_directory: str = "./chroma_db",
+                 hnsw_params: Optional[Dict[str, Any]] = None,
+                 summarizer: Optional[Callable[[str, str], str]] = None
         ):
         """
         Initialise le VectorStore
@@ -20,20 +43,118 @@ class VectorStore:
             embedding_port: Port d'embedding à utiliser
             collection_name: Nom de la collection Chroma
             persist_directory: Répertoire de persistance
+            hnsw_params: Paramètres HNSW (space, ef_construction, ef_search, max_neighbors),
+                prioritaires sur CHROMA_HNSW_*
+            summarizer: Fonction (fichier, texte) -> résumé pour DOCUMENT_SUMMARIES=llm (AiService.summarize)
         """
         self.persist_directory = persist_directory
         self.client = chromadb.PersistentClient(path=persist_directory)
-        self.collection = self.client.get_or_create_collection(name=collection_name)
+        self.collection_name = collection_name
+        self.hnsw_params = hnsw_params_from_env(**(hnsw_params or {}))
+        collection_kwargs = {"configuration": {"hnsw": self.hnsw_params}} if self.hnsw_params else {}
+        self.collection = apply_hnsw_params(
+            self.client.get_or_create_collection(name=collection_name, **collection_kwargs),
+            self.hnsw_params
+        )
+        # Collection réduite (ACP ou troncature): les vecteurs du modèle sont projetés à l'ingestion et à la requête
+        self.projection = self._load_projection(embedding_port)
+        if self.projection is not None:
+            embedding_port = ProjectedEmbeddingPort(embedding_port, self.projection)
         self.embedding_port = embedding_port
-
-        self.document_processor = DocumentProcessor(
-            chunk_size=1000,
-            chunk_overlap=200
+        self.relevance_gate = RelevanceGate.load(calibration_path(persist_directory), embedding_port.get_model_name(),
+                                                 current_hnsw_params(self.collection)["space"] or "l2")
+        self.file_index = FileChunkIndex(self.collection)
+        self.exact_index = self._create_exact_index()
+        self.delete_page_size = int(os.getenv("CHROMA_DELETE_PAGE_SIZE", "1000"))
+        # Rappels (user_id, fichier ou None pour tout l'utilisateur) après suppression: points de reprise, watcher...
+        self.delete_listeners: List[Callable[[str, Optional[str]], None]] = []
+        self.bulk_writer = ChromaBulkWriter(
+            self.collection,
+            embedding_port,
+            max_batch_size=self.client.get_max_batch_size(),
+            initial_batch_size=int(os.getenv("CHROMA_WRITE_BATCH_SIZE", "128")),
+            target_batch_seconds=float(os.getenv("CHROMA_WRITE_TARGET_SECONDS", "1.0"))
         )
 
+        self.parent_store = ParentStore(str(Path(persist_directory) / "parents.sqlite3"))
+        # Quasi-doublons (en-têtes, avertissements répétés à chaque page) écartés avant vectorisation
+        near_duplicate_threshold = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0"))
+        self.near_duplicates = NearDuplicateIndex(
+            str(Path(persist_directory) / "near_duplicates.sqlite3"),
+            threshold=near_duplicate_threshold,
+            num_perm=int(os.getenv("NEAR_DUPLICATE_NUM_PERM", "128")),
+            bands=int(os.getenv("NEAR_DUPLICATE_BANDS", "16"))
+        ) if near_duplicate_threshold > 0 else None
+        self.document_processor = self._create_document_processor()
+        # Enfants récupérés par résultat attendu: plusieurs enfants d'un même parent ne comptent qu'une fois
+        self.parent_fanout = int(os.getenv("PARENT_CHILD_FANOUT", "3")) if self.document_processor.parent_splitter else 1
+
+        # Résumés par document (routage des questions vers les documents les plus proches)
+        self.summary_mode = os.getenv("DOCUMENT_SUMMARIES", "off").lower()
+        if self.summary_mode not in SUMMARY_MODES:
+            raise ValueError(f"DOCUMENT_SUMMARIES inconnu: {self.summary_mode} (attendu: {', '.join(SUMMARY_MODES)})")
+        self.summary_max_chars = int(os.getenv("SUMMARY_MAX_CHARS", "8000"))
+        self.routing_top_k = int(os.getenv("DOCUMENT_ROUTING_TOP_K", "20"))
+        self.summarizer = summarizer
+        self.summary_index = DocumentSummaryIndex(self.client, collection_name, embedding_port,
+                                                  space=current_hnsw_params(self.collection)["space"] or "l2")
+
+        # Diversification MMR du contexte (1 = désactivée: ordre de pertinence seul)
+        self.mmr_lambda = float(os.getenv("MMR_LAMBDA", "1.0"))
+        self.mmr_fetch_k = max(1, int(os.getenv("MMR_FETCH_K", "4")))
+
         logging.info(f"VectorStore initialisé avec collection '{collection_name}' et modèle '{embedding_port.get_model_name()}'")
 
-    def add_documents_from_files(self, file_paths: List[Union[Path, str]], user_id: str) -> Dict[str, Any]:
+    def _create_document_processor(self) -> DocumentProcessor:
+        """
+        Chunks de 1000 caractères, ou dimensionnés en tokens du modèle avec CHUNK_SIZE_UNIT=tokens
+
+        Avec PARENT_CHUNK_SIZE > 0, les pages sont découpées en sections parentes et les chunks
+        vectorisés, plus petits (CHILD_CHUNK_SIZE), sont découpés dans chaque section.
+        """
+        parent_chunk_size = int(os.getenv("PARENT_CHUNK_SIZE", "0"))
+        token_counter = self.embedding_port.get_token_counter()
+        if os.getenv("CHUNK_SIZE_UNIT", "chars").lower() != "tokens" or token_counter is None:
+            if parent_chunk_size > 0:
+                return DocumentProcessor(chunk_size=int(os.getenv("CHILD_CHUNK_SIZE", "400")),
+                                         chunk_overlap=int(os.getenv("CHILD_CHUNK_OVERLAP", "50")),
+                                         parent_chunk_size=parent_chunk_size)
+            return DocumentProcessor(chunk_size=1000, chunk_overlap=200)
+
+        # Par défaut la fenêtre du modèle, moins ses tokens spéciaux ([CLS], [SEP])
+        max_tokens = self.embedding_port.get_max_tokens() or 256
+        chunk_size = int(os.getenv("CHUNK_SIZE_TOKENS", max_tokens - 2))
+        chunk_overlap = int(os.getenv("CHUNK_OVERLAP_TOKENS", chunk_size // 5))
+        logging.info(f"✂️ Chunks de {chunk_size} tokens (chevauchement {chunk_overlap})")
+        return DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=token_counter,
+                                 parent_chunk_size=parent_chunk_size)
+
+    def _load_projection(self, embedding_port: EmbeddingPort) -> Optional[EmbeddingProjection]:
+        """Projection enregistrée de la collection, vérifiée contre ses métadonnées et le modèle"""
+        expected = (self.collection.metadata or {}).get(PROJECTION_METADATA_KEY)
+        projection = load_projection(self.persist_directory, self.collection_name, expected)
+        found = projection.name if projection is not None else None
+        if found != expected:
+            raise RuntimeError(f"Collection '{self.collection_name}' projetée avec {expected}, "
+                               f"projection enregistrée: {found}")
+        if projection is not None:
+            if projection.source_model != embedding_port.get_model_name():
+                raise RuntimeError(f"Projection {projection.name} apprise pour '{projection.source_model}', "
+                                   f"modèle courant '{embedding_port.get_model_name()}'")
+            logging.info(f"📉 Vecteurs projetés en {projection.dimension} dimensions ({projection.name})")
+        return projection
+
+    def _create_exact_index(self) -> ExactTenantIndex:
+        return ExactTenantIndex(
+            self.collection,
+            self.file_index,
+            directory=str(Path(self.persist_directory) / "exact_index" / self.collection_name),
+            max_chunks=int(os.getenv("EXACT_SEARCH_MAX_CHUNKS", "5000")),
+            space=current_hnsw_params(self.collection)["space"] or "l2"
+        )
+
+    def add_documents_from_files(self, file_paths: List[Union[Path, str]], user_id: str,
+                                 root: Optional[Union[Path, str]] = None) -> Dict[str, Any]:
         """
         MÉTHODE MISE À JOUR: Ajoute des documents via LangChain
         Compatible avec votre code existant
@@ -41,6 +162,8 @@ class VectorStore:
         Args:
             file_paths: Liste des chemins de fichiers (Path objects ou strings)
             user_id: ID unique de l'utilisateur
+            root: Dossier de référence: les fichiers sont nommés par leur chemin relatif
+                (défaut: nom du fichier)
 
         Returns:
             Statistiques du traitement
@@ -56,7 +179,7 @@ class VectorStore:
         logging.info(f"🚀 Traitement de {len(path_objects)} fichier(s) avec LangChain...")
 
         # Traitement avec LangChain
-        chunks = self.document_processor.process_files(path_objects)
+        chunks = self.document_processor.process_files(path_objects, Path(root) if root is not None else None)
 
         if not chunks:
             logging.warning("Aucun chunk à traiter")
@@ -67,157 +190,645 @@ class VectorStore:
             }
 
         # Ajout à la collection avec l'ID utilisateur
-        self._add_chunks_to_collection(chunks, user_id)
+        report = self.add_chunks(chunks, user_id)
 
         # Statistiques
         stats = self.document_processor.get_chunk_info(chunks)
+        stats['added_chunks'] = report['added']
+        stats['dropped_chunks'] = report['dropped']
+        stats['duplicate_chunks'] = report['duplicates']
         logging.info(f"✅ Terminé! {stats}")
 
         return stats
 
-    def _add_chunks_to_collection(self, chunks: List, user_id: str) -> None:
+    @staticmethod
+    def _clean_metadatas(metadatas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Méthode interne pour ajouter des chunks à la collection
+        Nettoie les chaînes des métadonnées (caractères Unicode non encodables en UTF-8)
+
+        Les valeurs se répètent d'un chunk à l'autre (fichier, chemin, hash...):
+        chaque chaîne distincte n'est vérifiée qu'une fois.
+
+        Args:
+            metadatas: Métadonnées des chunks
+
+        Returns:
+            Copies nettoyées des métadonnées
+        """
+        cleaned: Dict[str, str] = {}
+
+        def clean(value: str) -> str:
+            result = cleaned.get(value)
+            if result is None:
+                try:
+                    value.encode('utf-8')
+                    result = value
+                except UnicodeEncodeError:
+                    result = value.encode('utf-8', 'ignore').decode('utf-8')
+                cleaned[value] = result
+            return result
+
+        return [
+            {key: clean(value) if isinstance(value, str) else value for key, value in metadata.items()}
+            for metadata in metadatas
+        ]
+
+    def add_chunks(self, chunks: List, user_id: str) -> Dict[str, Any]:
+        """
+        Ajoute des chunks déjà découpés (DocumentProcessor) à la collection
 
         Args:
             chunks: Liste des chunks LangChain
             user_id: ID unique de l'utilisateur
+
+        Returns:
+            Rapport d'écriture: added, dropped (chunks perdus avec l'erreur), batches, batch_sizes
         """
         # Préparation des données pour Chroma avec IDs uniques
         texts = [chunk.page_content for chunk in chunks]
         metadatas = [chunk.metadata for chunk in chunks]
 
-        # Ajout de l'ID utilisateur aux métadonnées
+        # Ajout de l'ID utilisateur aux métadonnées; les sections parentes vont dans le parent_store
+        parents: Dict[str, tuple] = {}
         for metadata in metadatas:
             metadata['user_id'] = user_id
+            parent_text = metadata.pop('parent_text', None)
+            if parent_text is not None and metadata['parent_id'] not in parents:
+                parent_metadata = {key: value for key, value in metadata.items()
+                                   if key not in ('chunk_id', 'chunk_size', 'chunk_hash', 'parent_id')}
+                parents[metadata['parent_id']] = (metadata['parent_id'], parent_text, parent_metadata)
+        if parents:
+            # Parents écrits avant les enfants: un enfant trouvé a toujours son parent
+            self.parent_store.put(user_id, parents.values())
 
         # Génération d'IDs uniques pour éviter les conflits
         timestamp = int(time.time())
         ids = [f"{user_id}_{chunk.metadata['source_file']}_{chunk.metadata['chunk_id']}_{timestamp}_{idx}"
                for idx, chunk in enumerate(chunks)]
 
-        # Vectorisation via le port d'embedding
-        logging.info(f"🔄 Vectorisation de {len(texts)} chunks...")
-        embeddings = self.embedding_port.encode(texts)
+        clean_metadatas = self._clean_metadatas(metadatas)
 
-        # Ajout à Chroma avec gestion robuste des gros volumes
-        batch_size = 50  # Réduit pour éviter les timeouts
-        total_batches = (len(texts) + batch_size - 1) // batch_size
+        logging.info(f"🔄 Vectorisation et ajout de {len(texts)} chunks...")
+        # Ingestion: cède le modèle d'embedding aux questions entre deux tranches
+        with embedding_priority(BULK, user_id):
+            report = self._write_chunks(user_id, ids, texts, clean_metadatas)
+            if self.summary_mode != "off" and report["added"]:
+                self._summarize_documents(texts, metadatas, user_id)
+        return report
 
-        logging.info(f"💾 Ajout en {total_batches} batch(s) de {batch_size} chunks...")
+    def _write_chunks(self, user_id: str, ids: List[str], texts: List[str],
+                      metadatas: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Vectorise et écrit des chunks; les quasi-doublons d'un chunk de l'utilisateur sont liés, pas écrits
 
-        for i in range(0, len(texts), batch_size):
-            batch_num = i // batch_size + 1
-            batch_texts = texts[i:i+batch_size]
-            batch_embeddings = embeddings[i:i+batch_size]
-            batch_metadatas = metadatas[i:i+batch_size]
-            batch_ids = ids[i:i+batch_size]
+        Returns:
+            Rapport de l'écrivain, plus duplicates (chunks écartés comme quasi-doublons)
+        """
+        # Matrice exacte invalidée une fois pour toute l'écriture, pas à chaque lot
+        with self.exact_index.writing(user_id):
+            if self.near_duplicates is None:
+                report = self.bulk_writer.write(ids, texts, metadatas, on_written=self._on_written(user_id))
+                report['duplicates'] = 0
+                return report
+
+            with stage("near_duplicates"):
+                kept, plan = self.near_duplicates.filter(user_id, ids, texts, metadatas)
+            report = self.bulk_writer.write([ids[i] for i in kept], [texts[i] for i in kept],
+                                            [metadatas[i] for i in kept], on_written=self._on_written(user_id))
+            dropped = {item['id'] for item in report['dropped']}
+            self.near_duplicates.register(user_id, plan, {ids[i] for i in kept if ids[i] not in dropped})
+
+            report['duplicates'] = len(plan['links'])
+            if plan['links']:
+                INGESTED_CHUNKS.inc(len(plan['links']), status="duplicate")
+                logging.info(f"♻️ {len(plan['links'])}/{len(ids)} chunks quasi identiques à des chunks existants, "
+                             f"non vectorisés")
+            return report
+
+    def _restore_duplicates(self, user_id: str, orphans: List[tuple]) -> None:
+        """Réingère les doublons liés à des chunks supprimés: leur contenu reste cherchable"""
+        if not orphans:
+            return
+        logging.info(f"♻️ {len(orphans)} chunk(s) liés à des chunks supprimés réingérés")
+        with embedding_priority(BULK, user_id):
+            self._write_chunks(user_id, [orphan[0] for orphan in orphans], [orphan[1] for orphan in orphans],
+                               [orphan[2] for orphan in orphans])
+
+    def _summarize_documents(self, texts: List[str], metadatas: List[Dict[str, Any]], user_id: str) -> None:
+        """
+        Résume chaque document ingéré et l'ajoute à l'index des résumés
 
-            try:
-                # Nettoyage des métadonnées pour éviter les caractères problématiques
-                clean_metadatas = []
-                for metadata in batch_metadatas:
-                    clean_metadata = {}
-                    for key, value in metadata.items():
-                        if isinstance(value, str):
-                            # Nettoie les caractères Unicode problématiques
-                            clean_value = value.encode('utf-8', 'ignore').decode('utf-8')
-                            clean_metadata[key] = clean_value
-                        else:
-                            clean_metadata[key] = value
-                    clean_metadatas.append(clean_metadata)
-
-                self.collection.add(
-                    documents=batch_texts,
-                    embeddings=batch_embeddings,
-                    metadatas=clean_metadatas,
-                    ids=batch_ids
-                )
-
-                if batch_num % 10 == 0 or batch_num == total_batches:
-                    logging.info(f"   📊 Batch {batch_num}/{total_batches} ajouté ({len(batch_texts)} chunks)")
+        Un échec n'interrompt pas l'ingestion: le document reste cherché comme s'il n'était pas résumé.
 
+        Args:
+            texts: Textes des chunks, dans l'ordre du document
+            metadatas: Métadonnées des chunks
+            user_id: ID unique de l'utilisateur
+        """
+        documents: Dict[str, List[str]] = {}
+        hashes: Dict[str, Optional[str]] = {}
+        for text, metadata in zip(texts, metadatas):
+            source_file = metadata.get('source_file')
+            parts = documents.setdefault(source_file, [])
+            # Le début du document suffit: le LLM et l'extrait sont bornés à summary_max_chars
+            if sum(len(part) for part in parts) < self.summary_max_chars:
+                parts.append(text)
+            hashes.setdefault(source_file, metadata.get('file_hash'))
+
+        for source_file, parts in documents.items():
+            try:
+                with stage("document_summary"):
+                    summary, method = summarize_document(source_file, "\n".join(parts), self.summary_mode,
+                                                         self.summary_max_chars, self.summarizer)
+                    self.summary_index.add(user_id, source_file, summary, hashes[source_file], method)
+                logging.info(f"📝 Résumé ({method}) de {source_file} indexé")
             except Exception as e:
-                logging.error(f"❌ Erreur batch {batch_num}: {e}")
-                # Continue avec le batch suivant plutôt que d'échouer complètement
-                continue
+                logging.warning(f"⚠️ Résumé de {source_file} non indexé: {e}")
+
+    def _on_written(self, user_id: str):
+        """Rappel de l'écrivain: maintient l'index fichiers (la matrice exacte est invalidée en fin d'écriture)"""
+        def on_written(batch_ids: List[str], batch_metadatas: List[Dict[str, Any]]) -> None:
+            self.file_index.add(user_id, [metadata.get('source_file') for metadata in batch_metadatas], batch_ids)
+        return on_written
+
+    def export_user(self, user_id: str, path: Union[Path, str], block_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Exporte les chunks de l'utilisateur (textes, métadonnées et vecteurs) dans une archive colonnaire
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            path: Fichier de sortie
+            block_rows: Chunks par bloc (défaut: max batch du client Chroma)
+
+        Returns:
+            Description de l'archive (modèle, dimension, nombre de chunks et de blocs)
+        """
+        block_rows = block_rows or self.client.get_max_batch_size()
+        where_clause = {"user_id": {"$eq": user_id}}
+
+        def fetch(offset: int) -> Dict[str, Any]:
+            return self.collection.get(where=where_clause, limit=block_rows, offset=offset,
+                                       include=["embeddings", "documents", "metadatas"])
+
+        with stage("export"):
+            page = fetch(0)
+            dimension = len(page["embeddings"][0]) if page["ids"] else 0
+            with VectorArchiveWriter(path, self.embedding_port.get_model_name(), dimension, user_id) as writer:
+                offset = 0
+                while page["ids"]:
+                    writer.write_block(page["ids"], page["embeddings"], page["documents"], page["metadatas"])
+                    offset += len(page["ids"])
+                    page = fetch(offset)
+            footer = writer.footer
+
+        logging.info(f"📦 {footer['count']} chunks de {user_id} exportés vers {path}")
+        return {key: value for key, value in footer.items() if key != "blocks"} | {"blocks": len(footer["blocks"])}
+
+    def import_archive(self, path: Union[Path, str], user_id: Optional[str] = None,
+                       force: bool = False) -> Dict[str, Any]:
+        """
+        Importe une archive en flux, bloc par bloc, sans passer par le modèle d'embedding
+
+        Args:
+            path: Fichier d'archive
+            user_id: Utilisateur cible (défaut: celui de l'archive)
+            force: Importe même si le modèle d'embedding de l'archive diffère du modèle courant
+
+        Returns:
+            Rapport: user_id, count, added, dropped
+        """
+        reader = VectorArchiveReader(path)
+        source_user = reader.footer["user_id"]
+        target_user = user_id or source_user
+
+        model = self.embedding_port.get_model_name()
+        # Archive en pleine dimension du même modèle: ses vecteurs sont projetés à l'import
+        project = self.projection is not None and reader.footer["model"] == self.projection.source_model
+        if reader.footer["model"] != model and not project and not force:
+            raise ValueError(f"Archive vectorisée avec '{reader.footer['model']}', modèle courant '{model}'")
+
+        report: Dict[str, Any] = {"user_id": target_user, "count": reader.count, "added": 0, "dropped": []}
+        prefix = f"{source_user}_"
+        with stage("import"), self.exact_index.writing(target_user):
+            for block in reader.iter_blocks():
+                ids = block["ids"]
+                metadatas = block["metadatas"]
+                if target_user != source_user:
+                    # Nouveaux IDs préfixés par l'utilisateur cible: pas de collision avec ceux de la source
+                    ids = [f"{target_user}_{chunk_id.removeprefix(prefix)}" for chunk_id in ids]
+                for metadata in metadatas:
+                    metadata['user_id'] = target_user
+
+                block_report = self.bulk_writer.write(ids, block["documents"], metadatas,
+                                                      on_written=self._on_written(target_user),
+                                                      embeddings=self.projection.apply(block["embeddings"])
+                                                      if project else block["embeddings"])
+                report["added"] += block_report["added"]
+                report["dropped"].extend(block_report["dropped"])
+
+        logging.info(f"📥 {report['added']}/{reader.count} chunks importés pour {target_user}")
+        return report
+
+    def set_search_ef(self, ef_search: int) -> None:
+        """
+        Args:
+            ef_search: Taille de la liste de candidats HNSW à la recherche (rappel vs latence)
+
+        Persisté immédiatement; si l'index est déjà chargé, effectif au prochain démarrage.
+        """
+        self.hnsw_params["ef_search"] = ef_search
+        apply_hnsw_params(self.collection, {"ef_search": ef_search})
+
+    def rebuild_index(self, **hnsw_params) -> Dict[str, Any]:
+        """
+        Reconstruit l'index HNSW avec de nouveaux paramètres (ou à l'identique pour compacter)
+
+        Args:
+            **hnsw_params: space, ef_construction, ef_search, max_neighbors
+                (prioritaires sur CHROMA_HNSW_*, les autres paramètres sont conservés)
+
+        Returns:
+            Paramètres HNSW effectifs après reconstruction
+        """
+        params = hnsw_params_from_env(**hnsw_params)
+        previous_space = current_hnsw_params(self.collection)["space"] or "l2"
+        self.collection = rebuild_collection(self.client, self.collection_name, params)
+        self.hnsw_params.update(params)
+        self.file_index = FileChunkIndex(self.collection)
+        self.exact_index = self._create_exact_index()
+        self.bulk_writer.collection = self.collection
+
+        space = current_hnsw_params(self.collection)["space"] or "l2"
+        if space != previous_space:
+            # Résumés comparés dans la même distance que les chunks, seuils calibrés pour cette distance
+            align_summaries_space(self.client, self.collection_name, space)
+            self.summary_index = DocumentSummaryIndex(self.client, self.collection_name, self.embedding_port,
+                                                      space=space)
+            self.relevance_gate = RelevanceGate.load(calibration_path(self.persist_directory),
+                                                     self.embedding_port.get_model_name(), space)
+        return current_hnsw_params(self.collection)
+
+    def _route(self, query_embeddings: List[List[float]], user_id: str) -> Optional[List[str]]:
+        """
+        Premier étage de la recherche: les documents dont le résumé est le plus proche des requêtes
+
+        Args:
+            query_embeddings: Vecteurs des requêtes
+            user_id: ID unique de l'utilisateur
+
+        Returns:
+            Fichiers candidats (union sur les requêtes, plus les fichiers sans résumé),
+            ou None si l'utilisateur a trop peu de documents résumés pour que le routage serve
+        """
+        if self.routing_top_k <= 0:
+            return None
+        summarized = self.summary_index.files(user_id)
+        if len(summarized) <= self.routing_top_k:
+            return None
+
+        files = set()
+        for routed in self.summary_index.route(user_id, query_embeddings, self.routing_top_k):
+            files.update(routed)
+        # Fichiers ingérés sans résumé (avant activation, import d'archive, échec du résumé): toujours candidats
+        files.update(file for file in self.file_index.get_files(user_id) if file not in summarized)
+        logging.info(f"🧭 Routage: {len(files)} document(s) candidat(s) sur {len(summarized)} résumés")
+        return sorted(files)
+
+    def _query(self, query_embeddings: List[List[float]], user_id: str, n_results: int,
+               file_filter: Optional[str] = None, files: Optional[List[str]] = None,
+               include_embeddings: bool = False) -> Dict[str, Any]:
+        """
+        Recherche restreinte à l'utilisateur et, optionnellement, à un ou plusieurs fichiers
+
+        Le filtre fichier passe par l'index fichier -> chunks: seuls les IDs des
+        fichiers sont candidats, sans parcourir tout le corpus de l'utilisateur.
+        Les petits utilisateurs sont servis par la recherche exacte en mémoire,
+        les autres par l'index HNSW de Chroma.
+
+        Args:
+            query_embeddings: Vecteurs des requêtes
+            user_id: ID unique de l'utilisateur
+            n_results: Nombre de résultats par requête
+            file_filter: Nom du fichier auquel restreindre la recherche
+            files: Fichiers auxquels restreindre la recherche (routage par résumés)
+            include_embeddings: Ajoute les vecteurs des résultats (diversification MMR)
+
+        Returns:
+            Résultats bruts de Chroma (une liste par requête)
+        """
+        query_kwargs: Dict[str, Any] = {"where": {"user_id": {"$eq": user_id}}}
+
+        if file_filter:
+            files = [file_filter]
+
+        chunk_ids = None
+        if files is not None:
+            chunk_ids = list(dict.fromkeys(chunk_id for file in files
+                                           for chunk_id in self.get_file_chunk_ids(user_id, file)))
+            if not chunk_ids:
+                empty = [[] for _ in query_embeddings]
+                return {"ids": empty, "documents": empty, "metadatas": empty, "distances": empty,
+                        "embeddings": empty if include_embeddings else None}
+            query_kwargs["ids"] = chunk_ids
+            n_results = min(n_results, len(chunk_ids))
+
+        exact_results = self.exact_index.search(user_id, query_embeddings, n_results, chunk_ids, include_embeddings)
+        if exact_results is not None:
+            return exact_results
+
+        include = ["documents", "metadatas", "distances"] + (["embeddings"] if include_embeddings else [])
+        return self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            include=include,
+            **query_kwargs
+        )
+
+    @staticmethod
+    def _format_context_part(doc: str, metadata: Optional[Dict[str, Any]]) -> tuple:
+        """
+        Args:
+            doc: Texte du chunk
+            metadata: Métadonnées du chunk
+
+        Returns:
+            Tuple (bloc de contexte formaté, fichier source ou None)
+        """
+        source_info = ""
+        source_file = None
+        if metadata:
+            source_file = metadata.get('source_file', 'Unknown')
+            page_info = metadata.get('page', '')
+            if page_info:
+                source_info = f"[Source: {source_file}, Page: {page_info}]"
+            else:
+                source_info = f"[Source: {source_file}]"
+
+        return f"{source_info}\n{doc}\n---", source_file
+
+    def _load_parents(self, results: Dict[str, Any], user_id: str) -> Dict[str, tuple]:
+        """Sections parentes des chunks trouvés, lues en une requête (parent_id -> (texte, métadonnées))"""
+        parent_ids = [
+            metadata['parent_id']
+            for query_metadatas in results.get("metadatas") or []
+            for metadata in query_metadatas
+            if metadata and metadata.get('parent_id')
+        ]
+        return self.parent_store.get_many(user_id, parent_ids) if parent_ids else {}
+
+    def _gate(self, results: Dict[str, Any]) -> tuple:
+        """
+        Applique le seuil de pertinence: seuls les premiers résultats pertinents de chaque requête restent
 
-    def get_context_for_query(self, query: str, user_id: str, max_context_length: int = 4000, n_results: int = 5) -> dict:
+        Returns:
+            Tuple (résultats tronqués, nombre de résultats gardés par requête, meilleure distance par requête)
+        """
+        distances = results.get("distances") or [[] for _ in results["ids"]]
+        counts = [self.relevance_gate.keep(query_distances) for query_distances in distances]
+        best = [query_distances[0] if query_distances else None for query_distances in distances]
+        for count in counts:
+            RELEVANCE_GATE.inc(result="relevant" if count else "irrelevant")
+        # `is not None`: les vecteurs arrivent en tableaux NumPy, sans valeur de vérité
+        trimmed = {
+            key: [values[:count] for values, count in zip(results[key], counts)]
+            if results.get(key) is not None else None
+            for key in ("ids", "documents", "metadatas", "distances", "embeddings")
+        }
+        return trimmed, counts, best
+
+    @property
+    def mmr_enabled(self) -> bool:
+        return self.mmr_lambda < 1.0
+
+    def _fetch_count(self, n_results: int) -> int:
+        """Candidats à récupérer par requête: sur-échantillonnés quand la MMR doit choisir parmi eux"""
+        return n_results * self.parent_fanout * (self.mmr_fetch_k if self.mmr_enabled else 1)
+
+    def _diversify(self, results: Dict[str, Any], query_embeddings: List[List[float]], n_results: int,
+                   max_context_length: int) -> Dict[str, Any]:
+        """
+        Réordonne les candidats de chaque requête par pertinence marginale maximale (voir mmr_select)
+
+        Sans sections parentes, le coût d'un chunk est sa place dans le contexte et le budget est
+        max_context_length: la sélection maximise l'information distincte par caractère de contexte.
+        Avec les sections parentes, le coût réel n'est connu qu'à l'assemblage: pas de budget.
+
+        Args:
+            results: Résultats filtrés par _gate, avec leurs vecteurs
+            query_embeddings: Vecteurs des requêtes
+            n_results: Nombre de résultats attendus par requête
+            max_context_length: Longueur max du contexte
+
+        Returns:
+            Résultats réordonnés (et réduits aux candidats retenus)
+        """
+        embeddings = results.get("embeddings")
+        if not self.mmr_enabled or embeddings is None:
+            return results
+
+        use_budget = self.parent_fanout == 1
+        selected = []
+        for query_index, candidates in enumerate(embeddings):
+            costs = None
+            if use_budget:
+                documents = results["documents"][query_index]
+                metadatas = results["metadatas"][query_index] if results["metadatas"] else [None] * len(documents)
+                costs = np.array([len(self._format_context_part(doc, metadata)[0])
+                                  for doc, metadata in zip(documents, metadatas)])
+            selected.append(mmr_select(query_embeddings[query_index], candidates, k=n_results * self.parent_fanout,
+                                       lambda_mult=self.mmr_lambda, costs=costs,
+                                       budget=max_context_length if use_budget else None))
+        return {
+            key: [[values[position] for position in positions] for values, positions in zip(results[key], selected)]
+            if results.get(key) is not None else None
+            for key in ("ids", "documents", "metadatas", "distances", "embeddings")
+        }
+
+    @staticmethod
+    def _no_relevant_context(best_distance: Optional[float]) -> Dict[str, Any]:
+        return {"context": "", "sources": [], "chunk_ids": [], "relevant": False, "best_distance": best_distance}
+
+    def _build_context(self, results: Dict[str, Any], query_index: int, max_context_length: int,
+                       part_cache: Optional[Dict[str, tuple]] = None, parents: Optional[Dict[str, tuple]] = None,
+                       max_parts: Optional[int] = None,
+                       used_chunks: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Assemble le contexte d'une requête à partir des résultats Chroma
+
+        Un chunk enfant est remplacé par sa section parente (si elle tient dans le budget);
+        une section n'est ajoutée qu'une fois, même si plusieurs de ses enfants sont trouvés.
+
+        Args:
+            results: Résultats bruts de Chroma
+            query_index: Index de la requête dans les résultats
+            max_context_length: Longueur max du contexte
+            part_cache: Cache ID -> bloc formaté, partagé entre requêtes d'un même lot
+            parents: Sections parentes des résultats (voir _load_parents)
+            max_parts: Nombre max de blocs (chunks ou sections) dans le contexte
+            used_chunks: Rempli avec le texte effectivement utilisé pour chaque chunk retenu
+
+        Returns:
+            Dictionnaire context / sources / chunk_ids
+        """
+        if not results["documents"] or not results["documents"][query_index]:
+            return {
+                "context": "Aucun contexte trouvé.",
+                "sources": [],
+                "chunk_ids": []
+            }
+
+        if part_cache is None:
+            part_cache = {}
+        parents = parents or {}
+
+        context_parts = []
+        chunk_ids = []
+        sources = set()
+        expanded = set()
+        current_length = 0
+
+        ids = results["ids"][query_index]
+        documents = results["documents"][query_index]
+        metadatas = results["metadatas"][query_index] if results["metadatas"] else [None] * len(documents)
+
+        for chunk_id, doc, metadata in zip(ids, documents, metadatas):
+            if max_parts is not None and len(context_parts) >= max_parts:
+                break
+
+            part_key, text, part_metadata = chunk_id, doc, metadata
+            parent_id = metadata.get('parent_id') if metadata else None
+            if parent_id:
+                if parent_id in expanded:
+                    continue
+                parent = parents.get(parent_id)
+                if parent is not None and current_length + len(parent[0]) <= max_context_length:
+                    part_key, text, part_metadata = f"parent:{parent_id}", parent[0], parent[1]
+                    expanded.add(parent_id)
+
+            if current_length + len(text) > max_context_length:
+                break
+
+            if part_key not in part_cache:
+                part_cache[part_key] = self._format_context_part(text, part_metadata)
+            context_part, source_file = part_cache[part_key]
+
+            if source_file:
+                sources.add(source_file)
+            context_parts.append(context_part)
+            chunk_ids.append(chunk_id)
+            current_length += len(context_part)
+            if used_chunks is not None and chunk_id not in used_chunks:
+                used_chunks[chunk_id] = {"document": text, "metadata": metadata}
+
+        return {
+            "context": "\n".join(context_parts),
+            "sources": list(sources),
+            "chunk_ids": chunk_ids
+        }
+
+    def get_context_for_query(self, query: str, user_id: str, max_context_length: int = 4000, n_results: int = 5,
+                              file_filter: Optional[str] = None) -> dict:
         """
         Args:
             query: Question de l'utilisateur
             user_id: ID unique de l'utilisateur
             max_context_length: Longueur max du contexte
             n_results: Nombre de résultats à récupérer
+            file_filter: Restreint la recherche à un fichier (optionnel)
 
         Returns:
             Dictionnaire contenant:
             - context: Contexte formaté pour le LLM
             - sources: Liste des sources utilisées
+            - chunk_ids: IDs des chunks utilisés
+            - relevant: False si aucun résultat ne passe le seuil de pertinence (ne pas appeler le LLM)
+            - best_distance: Distance du résultat le plus proche
+            - error: Message d'erreur de la recherche (jamais transmis comme contexte)
         """
         try:
-            query_embedding = self.embedding_port.encode([query])
-
-            where_clause = {"user_id": {"$eq": user_id}}
-
-            results = self.collection.query(
-                query_embeddings=query_embedding,
-                n_results=n_results,
-                where=where_clause,
-                include=["documents", "metadatas", "distances"]
-            )
-
-            if not results["documents"] or not results["documents"][0]:
-                return {
-                    "context": "Aucun contexte trouvé.",
-                    "sources": []
-                }
-
-            context_parts = []
-            sources = set()
-            current_length = 0
-
-            documents = results["documents"][0]
-            metadatas = results["metadatas"][0] if results["metadatas"] else []
-            distances = results["distances"][0] if results["distances"] else []
-
-            for i, (doc, metadata, distance) in enumerate(zip(documents, metadatas, distances)):
-                if current_length + len(doc) > max_context_length:
-                    break
-
-                source_info = ""
-                if metadata:
-                    source_file = metadata.get('source_file', 'Unknown')
-                    page_info = metadata.get('page', '')
-                    sources.add(source_file)
-                    if page_info:
-                        source_info = f"[Source: {source_file}, Page: {page_info}]"
-                    else:
-                        source_info = f"[Source: {source_file}]"
-
-                context_part = f"{source_info}\n{doc}\n---"
-                context_parts.append(context_part)
-                current_length += len(context_part)
-
-            context = "\n".join(context_parts)
-
-            logging.info(f"🔍 Contexte généré: {len(context)} caractères, {len(context_parts)} sources")
-            return {
-                "context": context,
-                "sources": list(sources)
-            }
+            with stage("query_embedding"):
+                query_embedding = self.embedding_port.encode([query])
+
+            with stage("vector_search"):
+                routed_files = None if file_filter else self._route(query_embedding, user_id)
+                results = self._query(query_embedding, user_id, self._fetch_count(n_results), file_filter,
+                                      routed_files, include_embeddings=self.mmr_enabled)
+
+            with stage("context_packing"):
+                results, counts, best = self._gate(results)
+                if not counts[0]:
+                    logging.info(f"🚫 Aucun résultat pertinent (meilleure distance: {best[0]})")
+                    return self._no_relevant_context(best[0])
+                results = self._diversify(results, query_embedding, n_results, max_context_length)
+                context_result = self._build_context(results, 0, max_context_length,
+                                                     parents=self._load_parents(results, user_id),
+                                                     max_parts=n_results)
+
+            logging.info(f"🔍 Contexte généré: {len(context_result['context'])} caractères, "
+                         f"{len(context_result['chunk_ids'])} sources")
+            return {**context_result, "relevant": True, "best_distance": best[0]}
 
         except Exception as e:
             logging.error(f"❌ Erreur lors de la recherche: {e}")
             return {
-                "context": f"Erreur lors de la recherche: {str(e)}",
-                "sources": []
+                "context": "",
+                "sources": [],
+                "chunk_ids": [],
+                "relevant": False,
+                "best_distance": None,
+                "error": str(e)
             }
 
-    def search_with_metadata(self, query: str, n_results: int = 5, file_filter: str = None) -> Dict[str, Any]:
+    def get_contexts_for_queries(self, queries: List[str], user_id: str, max_context_length: int = 4000,
+                                 n_results: int = 5, file_filter: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Version lot de get_context_for_query: un seul encode et une seule requête Chroma multi-vecteurs
+
+        Args:
+            queries: Questions de l'utilisateur
+            user_id: ID unique de l'utilisateur
+            max_context_length: Longueur max du contexte par question
+            n_results: Nombre de résultats à récupérer par question
+            file_filter: Restreint la recherche à un fichier (optionnel)
+
+        Returns:
+            Dictionnaire contenant:
+            - results: Un dictionnaire context / sources / chunk_ids / relevant / best_distance par question
+            - chunks: Chunks distincts utilisés, par ID (dédupliqués entre questions)
+        """
+        if not queries:
+            return {"results": [], "chunks": {}}
+
+        with stage("query_embedding"):
+            query_embeddings = self.embedding_port.encode(queries)
+
+        with stage("vector_search"):
+            routed_files = None if file_filter else self._route(query_embeddings, user_id)
+            results = self._query(query_embeddings, user_id, self._fetch_count(n_results), file_filter,
+                                  routed_files, include_embeddings=self.mmr_enabled)
+
+        part_cache: Dict[str, tuple] = {}
+        chunks: Dict[str, Dict[str, Any]] = {}
+        with stage("context_packing"):
+            results, counts, best = self._gate(results)
+            results = self._diversify(results, query_embeddings, n_results, max_context_length)
+            parents = self._load_parents(results, user_id)
+            contexts = [
+                {**self._build_context(results, i, max_context_length, part_cache, parents, n_results, chunks),
+                 "relevant": True, "best_distance": best[i]}
+                if counts[i] else self._no_relevant_context(best[i])
+                for i in range(len(queries))
+            ]
+
+        logging.info(f"🔍 Contextes générés pour {len(queries)} questions, {len(chunks)} chunks distincts")
+        return {"results": contexts, "chunks": chunks}
+
+    def search_with_metadata(self, query: str, user_id: str, n_results: int = 5,
+                             file_filter: Optional[str] = None) -> Dict[str, Any]:
         """
         Args:
             query: Requête de recherche
+            user_id: ID unique de l'utilisateur
             n_results: Nombre de résultats
             file_filter: Filtrer par nom de fichier
 
@@ -227,49 +838,50 @@ class VectorStore:
         try:
             query_embedding = self.embedding_port.encode([query])
 
-            # Filtrage optionnel par fichier
-            where_clause = {}
-            if file_filter:
-                where_clause["source_file"] = {"$eq": file_filter}
-
-            results = self.collection.query(
-                query_embeddings=query_embedding,
-                n_results=n_results,
-                where=where_clause if where_clause else None,
-                include=["documents", "metadatas", "distances"]
-            )
-
-            return results
+            return self._query(query_embedding, user_id, n_results, file_filter)
         except Exception as e:
             logging.error(f"❌ Erreur recherche avec métadonnées: {e}")
             return {"error": str(e)}
 
+    def get_file_chunk_ids(self, user_id: str, file_name: str) -> List[str]:
+        """
+        Chunks couvrant un fichier: les siens, plus les canoniques (parfois d'autres fichiers) de ses quasi-doublons
+
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Nom du fichier
+
+        Returns:
+            IDs des chunks (liste vide si inconnu)
+        """
+        chunk_ids = self.file_index.get_chunk_ids(user_id, file_name)
+        if self.near_duplicates is None:
+            return chunk_ids
+        return list(dict.fromkeys(chunk_ids + self.near_duplicates.canonical_ids(user_id, file_name)))
+
     def get_file_list(self, user_id: str) -> List[str]:
         try:
-            # Filtre par utilisateur
-            where_clause = {"user_id": {"$eq": user_id}}
-            all_data = self.collection.get(where=where_clause, include=["metadatas"])
-            files = set()
-            for metadata in all_data["metadatas"]:
-                if metadata and "source_file" in metadata:
-                    files.add(metadata["source_file"])
-            return sorted(list(files))
+            files = self.file_index.get_files(user_id)
+            if self.near_duplicates is None:
+                return files
+            # Un fichier dont tous les chunks sont des doublons d'autres fichiers reste listé
+            return sorted(set(files) | set(self.near_duplicates.linked_files(user_id)))
         except Exception as e:
             logging.error(f"❌ Erreur récupération liste fichiers: {e}")
             return []
 
     def get_collection_stats(self, user_id: str) -> Dict[str, Any]:
         try:
-            where_clause = {"user_id": {"$eq": user_id}}
-            results = self.collection.get(where=where_clause)
-            count = len(results["ids"]) if results["ids"] else 0
             files = self.get_file_list(user_id)
 
-            return {
-                "total_chunks": count,
+            stats = {
+                "total_chunks": self.file_index.count(user_id),
                 "total_files": len(files),
                 "files": files
             }
+            if self.near_duplicates is not None:
+                stats["duplicate_chunks"] = self.near_duplicates.count_links(user_id)
+            return stats
         except Exception as e:
             logging.error(f"❌ Erreur statistiques collection: {e}")
             return {
@@ -279,14 +891,81 @@ class VectorStore:
                 "error": str(e)
             }
 
+    @staticmethod
+    def _where(user_id: str, file_name: Optional[str] = None) -> Dict[str, Any]:
+        if file_name is None:
+            return {"user_id": {"$eq": user_id}}
+        return {
+            "$and": [
+                {"source_file": {"$eq": file_name}},
+                {"user_id": {"$eq": user_id}}
+            ]
+        }
+
+    def _delete_where(self, where_clause: Dict[str, Any], known_ids: Optional[List[str]] = None) -> int:
+        """
+        Supprime par pages bornées: seuls les IDs d'une page transitent (include=[]), jamais les documents
+
+        Args:
+            where_clause: Filtre des chunks à supprimer
+            known_ids: IDs déjà connus (index fichiers): supprimés sans lecture préalable,
+                une dernière page vérifie qu'il ne reste rien
+
+        Returns:
+            Nombre de chunks supprimés
+        """
+        deleted = 0
+        if known_ids is not None:
+            for start in range(0, len(known_ids), self.delete_page_size):
+                page_ids = known_ids[start:start + self.delete_page_size]
+                self.collection.delete(ids=page_ids)
+                deleted += len(page_ids)
+
+        while True:
+            page = self.collection.get(where=where_clause, limit=self.delete_page_size, include=[])
+            if not page["ids"]:
+                return deleted
+            self.collection.delete(ids=page["ids"])
+            deleted += len(page["ids"])
+
+    def count_chunks(self, user_id: str, file_name: Optional[str] = None, limit: Optional[int] = None) -> int:
+        """
+        Args:
+            user_id: ID unique de l'utilisateur
+            file_name: Restreint le compte à un fichier (avec les canoniques de ses quasi-doublons)
+            limit: Arrête le compte à `limit` (sonde bornée pour décider d'un traitement en tâche de fond)
+
+        Returns:
+            Nombre de chunks (au plus `limit`)
+        """
+        if file_name is not None and self.near_duplicates is not None:
+            count = len(self.get_file_chunk_ids(user_id, file_name))
+            return count if limit is None else min(count, limit)
+        known = self.file_index.peek_count(user_id, file_name)
+        if known is not None:
+            return known if limit is None else min(known, limit)
+        results = self.collection.get(where=self._where(user_id, file_name), limit=limit, include=[])
+        return len(results["ids"])
+
+    def _notify_deleted(self, user_id: str, file_name: Optional[str]) -> None:
+        for listener in self.delete_listeners:
+            try:
+                listener(user_id, file_name)
+            except Exception as e:
+                logging.warning(f"⚠️ Mise à jour après suppression en échec: {e}")
+
     def clear_collection(self, user_id: str) -> bool:
         try:
             # Supprime uniquement les documents de l'utilisateur
-            where_clause = {"user_id": {"$eq": user_id}}
-            results = self.collection.get(where=where_clause)
-            if results["ids"]:
-                self.collection.delete(ids=results["ids"])
-            logging.info(f"🗑️ Documents de l'utilisateur {user_id} supprimés avec succès")
+            with self.exact_index.writing(user_id):
+                deleted = self._delete_where(self._where(user_id))
+                self.file_index.clear(user_id)
+            self.parent_store.delete(user_id)
+            self.summary_index.delete(user_id)
+            if self.near_duplicates is not None:
+                self.near_duplicates.delete(user_id)
+            self._notify_deleted(user_id, None)
+            logging.info(f"🗑️ {deleted} chunks de l'utilisateur {user_id} supprimés avec succès")
             return True
         except Exception as e:
             logging.error(f"❌ Erreur lors du vidage: {e}")
@@ -294,9 +973,7 @@ class VectorStore:
 
     def get_collection_size(self, user_id: str) -> int:
         try:
-            where_clause = {"user_id": {"$eq": user_id}}
-            results = self.collection.get(where=where_clause)
-            return len(results["ids"]) if results["ids"] else 0
+            return self.file_index.count(user_id)
         except Exception as e:
             logging.error(f"❌ Erreur lors du comptage: {e}")
             return 0
@@ -311,26 +988,22 @@ class VectorStore:
             True si succès
         """
         try:
-            where_clause = {
-                "$and": [
-                    {"source_file": {"$eq": file_name}},
-                    {"user_id": {"$eq": user_id}}
-                ]
-            }
-            
-            results = self.collection.get(
-                where=where_clause,
-                include=["metadatas"]
-            )
-
-            if results["ids"]:
-                self.collection.delete(ids=results["ids"])
-                logging.info(f"🗑️ Supprimé {len(results['ids'])} chunks du fichier {file_name}")
-                return True
+            with self.exact_index.writing(user_id):
+                deleted = self._delete_where(self._where(user_id, file_name),
+                                             known_ids=self.file_index.peek_chunk_ids(user_id, file_name))
+                self.file_index.remove_file(user_id, file_name)
+                self.parent_store.delete(user_id, file_name)
+                self.summary_index.delete(user_id, file_name)
+                if self.near_duplicates is not None:
+                    self._restore_duplicates(user_id, self.near_duplicates.delete(user_id, file_name))
+            self._notify_deleted(user_id, file_name)
+
+            if deleted:
+                logging.info(f"🗑️ Supprimé {deleted} chunks du fichier {file_name}")
             else:
                 logging.info(f"Aucun chunk trouvé pour le fichier {file_name}")
-                return True
+            return True
 
         except Exception as e:
             logging.error(f"❌ Erreur suppression fichier {file_name}: {e}")
-            return False
\ No newline at end of file
+            return False
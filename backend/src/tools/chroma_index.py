@@ -0,0 +1,67 @@
+"""Administration de l'index HNSW d'une base Chroma persistée
+
+    uv run python -m src.tools.chroma_index show
+    uv run python -m src.tools.chroma_index rebuild --ef-construction 200 --m 32
+    uv run python -m src.tools.chroma_index set-ef --ef-search 64
+
+`rebuild` recopie les vecteurs dans un index neuf (sans re-vectorisation): nouveaux
+paramètres de construction et/ou compaction après ingestions et suppressions massives.
+Un changement de distance (`--space`) s'applique aussi aux résumés de documents; les seuils
+de pertinence calibrés pour la nouvelle distance sont repris au démarrage.
+Arrêter le serveur pendant la reconstruction; `set-ef` est pris en compte au prochain
+démarrage (ou via CHROMA_HNSW_EF_SEARCH).
+"""
+import argparse
+import json
+import logging
+
+import chromadb
+
+from src.domain.services.document_summaries import align_summaries_space
+from src.domain.services.hnsw_index import (
+    HNSW_SPACES, apply_hnsw_params, current_hnsw_params, hnsw_params_from_env, rebuild_collection
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Paramètres et reconstruction de l'index HNSW")
+    parser.add_argument("command", choices=("show", "rebuild", "set-ef"))
+    parser.add_argument("--persist-dir", default="./chroma_db", help="Répertoire de la base Chroma")
+    parser.add_argument("--collection", default="documents", help="Nom de la collection")
+    parser.add_argument("--space", choices=HNSW_SPACES, default=None, help="Distance (rebuild)")
+    parser.add_argument("--ef-construction", type=int, default=None, help="ef_construction (rebuild)")
+    parser.add_argument("--m", type=int, default=None, help="M, voisins max par nœud (rebuild)")
+    parser.add_argument("--ef-search", type=int, default=None, help="ef_search (rebuild, set-ef)")
+    parser.add_argument("--page-size", type=int, default=None, help="Enregistrements copiés par page (rebuild)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    client = chromadb.PersistentClient(path=args.persist_dir)
+    collection = client.get_collection(args.collection)
+
+    if args.command == "rebuild":
+        params = hnsw_params_from_env(
+            space=args.space,
+            ef_construction=args.ef_construction,
+            max_neighbors=args.m,
+            ef_search=args.ef_search
+        )
+        collection = rebuild_collection(client, args.collection, params, page_size=args.page_size)
+        # Résumés de documents (routage) dans la même distance que les chunks
+        align_summaries_space(client, args.collection, current_hnsw_params(collection)["space"] or "l2",
+                              page_size=args.page_size)
+    elif args.command == "set-ef":
+        if args.ef_search is None:
+            parser.error("--ef-search est requis")
+        collection = apply_hnsw_params(collection, {"ef_search": args.ef_search})
+
+    print(json.dumps({
+        "collection": collection.name,
+        "count": collection.count(),
+        "hnsw": current_hnsw_params(collection),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
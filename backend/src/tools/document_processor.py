@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import Callable, Iterable, List, Dict, Any, Optional
 from pathlib import Path
 import hashlib
 import re
@@ -9,41 +9,43 @@ from langchain_community.document_loaders import (
     UnstructuredWordDocumentLoader,
     TextLoader
 )
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
+from src.tools.metrics import stage
+from src.tools.text_splitter import DEFAULT_SEPARATORS, RecursiveSpanSplitter
+
 
 class DocumentProcessor:
     """Processeur de documents ultra-robuste avec LangChain"""
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 length_function: Optional[Callable[[str], int]] = None, parent_chunk_size: int = 0):
         """
         Initialize the document processor
 
         Args:
-            chunk_size: Taille des chunks en caractères
+            chunk_size: Taille des chunks (en caractères, ou dans l'unité de length_function)
             chunk_overlap: Chevauchement entre chunks
+            length_function: Mesure de longueur des chunks (ex: tokens du modèle d'embedding), défaut len
+            parent_chunk_size: Taille en caractères des sections parentes (0 = pas de parents):
+                les chunks sont alors découpés dans chaque section et pointent vers elle (parent_id)
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
 
         # Splitter intelligent qui respecte la structure du texte
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        # (paragraphes, lignes, phrases, ponctuation, espaces, caractères)
+        self.text_splitter = RecursiveSpanSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            separators=[
-                "\n\n",  # Paragraphes
-                "\n",  # Lignes
-                ".",  # Phrases
-                "!",  # Exclamations
-                "?",  # Questions
-                ";",  # Points-virgules
-                ",",  # Virgules
-                " ",  # Espaces
-                ""  # Caractères
-            ],
-            length_function=len,
+            separators=DEFAULT_SEPARATORS,
+            length_function=length_function,
         )
+        self.parent_splitter = RecursiveSpanSplitter(
+            chunk_size=parent_chunk_size,
+            chunk_overlap=0,
+            separators=DEFAULT_SEPARATORS,
+        ) if parent_chunk_size > 0 else None
 
         # Mapping des extensions vers les loaders
         self.loaders = {
@@ -83,7 +85,18 @@ class DocumentProcessor:
                          f"   Extension brute: '{file_path.suffix}'\n"
                          f"   Nom nettoyé: '{file_name}'")
 
-    def load_document(self, file_path: Path) -> List[Document]:
+    @staticmethod
+    def source_name(file_path: Path, root: Optional[Path] = None) -> str:
+        """
+        Nom du fichier dans la base (source_file): chemin relatif à `root`, sinon nom du fichier
+
+        Deux fichiers de même nom dans des sous-dossiers différents restent distincts.
+        """
+        if root is None:
+            return file_path.name
+        return Path(file_path).relative_to(root).as_posix()
+
+    def load_document(self, file_path: Path, root: Optional[Path] = None) -> List[Document]:
         if not file_path.exists():
             raise FileNotFoundError(f"Fichier non trouvé: {file_path}")
 
@@ -105,17 +118,21 @@ class DocumentProcessor:
             else:
                 loader = loader_class(file_path_str)
 
-            documents = loader.load()
+            with stage("load"):
+                documents = loader.load()
             print(f"     ✅ {len(documents)} page(s) chargée(s)")
 
+            with stage("hash"):
+                file_hash = self.get_file_hash(file_path)
+
             for doc in documents:
                 doc.metadata.update({
-                    'source_file': file_path.name,
+                    'source_file': self.source_name(file_path, root),
                     'source_path': str(file_path.absolute()),
                     'file_type': extension,
                     'file_size': file_path.stat().st_size,
                     'processed_at': datetime.now().isoformat(),
-                    'file_hash': self._get_file_hash(file_path)
+                    'file_hash': file_hash
                 })
 
             return documents
@@ -124,26 +141,51 @@ class DocumentProcessor:
             print(f"     ❌ Erreur de chargement: {e}")
             raise Exception(f"Erreur lors du chargement de {file_path.name}: {str(e)}")
 
-    def split_documents(self, documents: List[Document]) -> List[Document]:
-        if not documents:
-            return []
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        """
+        Découpe les pages en chunks et calcule leur hash dans la même passe
 
-        chunks = self.text_splitter.split_documents(documents)
+        Avec des sections parentes, chaque chunk porte parent_id et le texte de sa section
+        (parent_text, partagé entre les chunks de la section, retiré avant l'écriture Chroma).
 
-        for i, chunk in enumerate(chunks):
-            chunk.metadata.update({
-                'chunk_id': i,
-                'chunk_size': len(chunk.page_content),
-                'chunk_hash': hashlib.md5(chunk.page_content.encode()).hexdigest()
-            })
+        Args:
+            documents: Pages (liste ou flux)
+
+        Returns:
+            Chunks numérotés dans l'ordre des pages
+        """
+        chunks = []
+        parents = 0
+        with stage("split"):
+            for document in documents:
+                page = document.page_content
+                sections = self.parent_splitter.split_text(page) if self.parent_splitter else [page]
+                for section in sections:
+                    parent = {}
+                    if self.parent_splitter:
+                        parent = {
+                            'parent_id': f"{document.metadata.get('source_file')}:"
+                                         f"{document.metadata.get('file_hash')}:{parents}",
+                            'parent_text': section
+                        }
+                        parents += 1
+                    for text in self.text_splitter.split_text(section):
+                        # Champs déjà valides: pas de validation pydantic par chunk
+                        chunks.append(Document.model_construct(page_content=text, metadata={
+                            **document.metadata,
+                            'chunk_id': len(chunks),
+                            'chunk_size': len(text),
+                            'chunk_hash': hashlib.md5(text.encode()).hexdigest(),
+                            **parent
+                        }))
 
         return chunks
 
-    def process_file(self, file_path: Path) -> List[Document]:
+    def process_file(self, file_path: Path, root: Optional[Path] = None) -> List[Document]:
         print(f"📄 Traitement de {file_path.name}...")
 
         try:
-            documents = self.load_document(file_path)
+            documents = self.load_document(file_path, root)
 
             if not documents:
                 print(f"     ⚠️  Aucun contenu extrait")
@@ -158,12 +200,12 @@ class DocumentProcessor:
             print(f"     ❌ Échec du traitement: {e}")
             return []
 
-    def process_files(self, file_paths: List[Path]) -> List[Document]:
+    def process_files(self, file_paths: List[Path], root: Optional[Path] = None) -> List[Document]:
         all_chunks = []
         successful_files = 0
 
         for file_path in file_paths:
-            chunks = self.process_file(file_path)
+            chunks = self.process_file(file_path, root)
             if chunks:
                 all_chunks.extend(chunks)
                 successful_files += 1
@@ -172,7 +214,7 @@ class DocumentProcessor:
             f"🎉 Résumé: {len(all_chunks)} chunks de {successful_files}/{len(file_paths)} fichiers traités avec succès")
         return all_chunks
 
-    def _get_file_hash(self, file_path: Path) -> str:
+    def get_file_hash(self, file_path: Path) -> str:
         try:
             hash_md5 = hashlib.md5()
             with open(file_path, "rb") as f:
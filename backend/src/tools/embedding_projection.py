@@ -0,0 +1,143 @@
+"""Réduction de dimension des vecteurs d'une base Chroma persistée
+
+    uv run python -m src.tools.embedding_projection evaluate --user-id alice --method pca --dims 96,128,192
+    uv run python -m src.tools.embedding_projection apply --method pca --dim 192 --user-id alice
+    uv run python -m src.tools.embedding_projection show
+
+`evaluate` mesure, sans rien modifier, le rappel@k de la recherche exacte dans l'espace réduit
+par rapport à la pleine dimension, sur les vecteurs d'un utilisateur: l'ACP est apprise sur une
+partie des vecteurs, le rappel mesuré sur les autres (requêtes: ces vecteurs bruités), comme
+pour des documents ingérés après la projection. `apply` apprend la projection (ACP sur un échantillon, de l'utilisateur
+ou de toute la collection; ou troncature Matryoshka) puis réduit la collection: serveur arrêté.
+"""
+import argparse
+import json
+import logging
+from typing import List, Optional
+
+import chromadb
+import numpy as np
+
+from src.domain.services.embedding_projection import (
+    PROJECTION_METADATA_KEY, PROJECTION_METHODS, EmbeddingProjection, project_collection, projection_path,
+    recall_at_k
+)
+from src.domain.services.hnsw_index import current_hnsw_params
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def load_vectors(collection, user_id: Optional[str], page_size: int, limit: Optional[int] = None) -> np.ndarray:
+    """Vecteurs de l'utilisateur (ou de la collection), au plus `limit`"""
+    where = {"user_id": {"$eq": user_id}} if user_id else None
+    blocks = []
+    loaded = 0
+    while limit is None or loaded < limit:
+        size = page_size if limit is None else min(page_size, limit - loaded)
+        page = collection.get(where=where, limit=size, offset=loaded, include=["embeddings"])
+        if not page["ids"]:
+            break
+        blocks.append(np.asarray(page["embeddings"], dtype=np.float32))
+        loaded += len(page["ids"])
+    if not blocks:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.concatenate(blocks)
+
+
+def build_projection(method: str, vectors: np.ndarray, dimension: int, model: str) -> EmbeddingProjection:
+    if method == "truncate":
+        return EmbeddingProjection.truncate(vectors.shape[1], dimension, model)
+    return EmbeddingProjection.fit_pca(vectors, dimension, model)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Réduction de dimension des embeddings")
+    parser.add_argument("command", choices=("evaluate", "apply", "show"))
+    parser.add_argument("--persist-dir", default="./chroma_db", help="Répertoire de la base Chroma")
+    parser.add_argument("--collection", default="documents", help="Nom de la collection")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Modèle d'embedding des vecteurs")
+    parser.add_argument("--method", choices=PROJECTION_METHODS, default="pca")
+    parser.add_argument("--user-id", default=None, help="Utilisateur dont les vecteurs servent à l'ACP / l'évaluation")
+    parser.add_argument("--sample", type=int, default=50000, help="Vecteurs max pour apprendre l'ACP")
+    parser.add_argument("--dim", type=int, default=None, help="Dimension cible (apply)")
+    parser.add_argument("--dims", type=_int_list, default=[64, 96, 128, 192, 256], help="Dimensions évaluées")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes (evaluate)")
+    parser.add_argument("--k", type=int, default=5, help="Nombre de voisins (evaluate)")
+    parser.add_argument("--noise", type=float, default=0.1, help="Bruit relatif ajouté aux requêtes (evaluate)")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="Part des vecteurs écartée de l'ACP pour mesurer le rappel (evaluate)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    client = chromadb.PersistentClient(path=args.persist_dir)
+    collection = client.get_collection(args.collection)
+    projection = EmbeddingProjection.load(projection_path(args.persist_dir, args.collection))
+
+    if args.command == "show":
+        print(json.dumps({
+            "collection": collection.name,
+            "count": collection.count(),
+            PROJECTION_METADATA_KEY: (collection.metadata or {}).get(PROJECTION_METADATA_KEY),
+            "projection": projection.describe() if projection else None,
+        }, indent=2, ensure_ascii=False))
+        return
+
+    if projection is not None:
+        parser.error(f"Collection déjà projetée ({projection.name}): vecteurs en pleine dimension indisponibles")
+
+    vectors = load_vectors(collection, args.user_id, client.get_max_batch_size(), args.sample)
+    if not len(vectors):
+        parser.error("Aucun vecteur à utiliser")
+
+    if args.command == "apply":
+        if args.dim is None:
+            parser.error("--dim est requis")
+        projection = build_projection(args.method, vectors, args.dim, args.model)
+        project_collection(client, args.collection, projection, args.persist_dir)
+        print(json.dumps(projection.describe(), indent=2, ensure_ascii=False))
+        return
+
+    space = current_hnsw_params(collection)["space"] or "l2"
+    rng = np.random.default_rng(args.seed)
+    # Vecteurs d'évaluation jamais vus par l'ACP: le rappel n'est pas flatté par le surapprentissage
+    shuffled = rng.permutation(len(vectors))
+    held_out_count = int(len(vectors) * args.holdout)
+    if not 0 < held_out_count < len(vectors):
+        parser.error(f"--holdout {args.holdout}: aucun vecteur d'évaluation ou d'apprentissage sur {len(vectors)}")
+    held_out, fitted = vectors[shuffled[:held_out_count]], vectors[shuffled[held_out_count:]]
+    rows = rng.choice(len(held_out), size=min(args.queries, len(held_out)), replace=False)
+    queries = held_out[rows] + rng.standard_normal((len(rows), held_out.shape[1])).astype(np.float32) \
+        * args.noise * np.linalg.norm(held_out[rows], axis=1, keepdims=True) / np.sqrt(held_out.shape[1])
+
+    results = []
+    for dimension in args.dims:
+        if not 0 < dimension < vectors.shape[1] or (args.method == "pca" and len(fitted) < dimension):
+            continue
+        candidate = build_projection(args.method, fitted, dimension, args.model)
+        results.append({
+            "dimension": dimension,
+            f"recall@{args.k}": recall_at_k(held_out, queries, candidate, args.k, space),
+            "bytes_per_vector": dimension * 4,
+            "size_ratio": dimension / vectors.shape[1],
+            **{key: value for key, value in candidate.info.items() if key == "explained_variance"},
+        })
+
+    print(json.dumps({
+        "collection": collection.name,
+        "user_id": args.user_id,
+        "vectors": len(vectors),
+        "fitted_on": len(fitted),
+        "evaluated_on": len(held_out),
+        "source_dimension": int(vectors.shape[1]),
+        "method": args.method,
+        "space": space,
+        "results": results,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Serveur local compatible OpenAI pour tester les adaptateurs LLM sans upstream réel
+
+Expose `GET /v1/models` et `POST /v1/chat/completions` (avec ou sans streaming),
+avec latence, débit de tokens et pannes (429/5xx) configurables.
+
+    uv run python -m src.tools.fake_openai_server --port 1234 --latency 0.2 --fail-first 2
+
+Puis pointer OPENAI_BASE_URL / LM_STUDIO_URL sur http://127.0.0.1:1234/v1.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class FakeOpenAIServer:
+    """Serveur HTTP simulant une API OpenAI-compatible"""
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 model: str = "fake-model",
+                 latency: float = 0.0,
+                 tokens_per_second: float = 0.0,
+                 completion_tokens: int = 50,
+                 fail_first: int = 0,
+                 fail_status: int = 503,
+                 retry_after: Optional[float] = None
+        ):
+        """
+        Args:
+            host: Adresse d'écoute
+            port: Port d'écoute (0 = port libre choisi par l'OS)
+            model: Nom du modèle annoncé par /models
+            latency: Délai avant le premier token, en secondes
+            tokens_per_second: Débit de génération (0 = instantané)
+            completion_tokens: Nombre de tokens générés par réponse
+            fail_first: Nombre de requêtes de complétion à faire échouer au démarrage
+            fail_status: Statut HTTP renvoyé pour ces échecs
+            retry_after: Valeur de l'en-tête Retry-After sur les échecs (optionnel)
+        """
+        self.model = model
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+
+        self.requests_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _next_request(self) -> bool:
+        """Comptabilise une requête de complétion; retourne True si elle doit échouer"""
+        with self._lock:
+            self.requests_count += 1
+            return self.requests_count <= self.fail_first
+
+    def _completion_words(self, messages: List[Dict[str, Any]]) -> List[str]:
+        question = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        words = f"Réponse simulée à : {question[:80]}".split()
+        while len(words) < self.completion_tokens:
+            words.append("lorem")
+        return words[:self.completion_tokens]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": server.model, "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                if server._next_request():
+                    headers = {}
+                    if server.retry_after is not None:
+                        headers["Retry-After"] = str(server.retry_after)
+                    self._send_json(server.fail_status, {"error": {"message": "panne simulée"}}, headers)
+                    return
+
+                with server._lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.latency)
+                    messages = body.get("messages", [])
+                    words = server._completion_words(messages)
+                    prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+
+                    if body.get("stream"):
+                        self._stream(words)
+                    else:
+                        if server.tokens_per_second:
+                            time.sleep(len(words) / server.tokens_per_second)
+                        self._send_json(200, {
+                            "id": "chatcmpl-fake",
+                            "object": "chat.completion",
+                            "created": int(time.time()),
+                            "model": body.get("model", server.model),
+                            "choices": [{
+                                "index": 0,
+                                "message": {"role": "assistant", "content": " ".join(words)},
+                                "finish_reason": "stop"
+                            }],
+                            "usage": {
+                                "prompt_tokens": prompt_tokens,
+                                "completion_tokens": len(words),
+                                "total_tokens": prompt_tokens + len(words)
+                            }
+                        })
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def _stream(self, words: List[str]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def write_chunk(data: str) -> None:
+                    raw = data.encode("utf-8")
+                    self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+                    self.wfile.flush()
+
+                for i, word in enumerate(words):
+                    if server.tokens_per_second:
+                        time.sleep(1 / server.tokens_per_second)
+                    chunk = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": server.model,
+                        "choices": [{"index": 0, "delta": {"content": word if i == 0 else f" {word}"}, "finish_reason": None}]
+                    }
+                    write_chunk(f"data: {json.dumps(chunk)}\n\n")
+
+                write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur local compatible OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--model", default="fake-model")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=50)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--fail-status", type=int, default=503)
+    args = parser.parse_args()
+
+    fake_server = FakeOpenAIServer(
+        host=args.host,
+        port=args.port,
+        model=args.model,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        fail_first=args.fail_first,
+        fail_status=args.fail_status
+    )
+    print(f"🧪 Serveur OpenAI simulé sur {fake_server.base_url}")
+    fake_server.serve_forever()
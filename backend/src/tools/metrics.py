@@ -0,0 +1,250 @@
+"""Métriques au format Prometheus et chronométrage des étapes
+
+Registre minimal (compteurs, jauges, histogrammes avec labels) exposé en format texte
+Prometheus par `/metrics`. `stage(...)` chronomètre une étape: la durée alimente
+l'histogramme `chat_pdf_stage_duration_seconds`, le relevé de la requête en cours
+(`collect_timings`) et, si OpenTelemetry est installé et METRICS_TRACING=true, un span.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name}: labels attendus {self.label_names}, reçus {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.label_names, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        escaped = [f'{name}="{_escape(value)}"' for name, value in pairs]
+        return "{" + ",".join(escaped) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key in sorted(self._counts):
+                counts = self._counts[key]
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': str(bound)})} {count}")
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {counts[-1]}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {self._sums[key]}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registre des métriques exposées par /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    "chat_pdf_stage_duration_seconds", "Durée de chaque étape de traitement", ["stage"]
+)
+LLM_TOKENS = registry.counter(
+    "chat_pdf_llm_tokens_total", "Tokens envoyés (in) et générés (out) par les LLM", ["backend", "direction"]
+)
+IN_FLIGHT = registry.gauge(
+    "chat_pdf_in_flight", "Traitements en cours", ["job"]
+)
+CACHE_REQUESTS = registry.counter(
+    "chat_pdf_cache_requests_total", "Accès aux caches (hit/miss)", ["cache", "result"]
+)
+INGESTED_CHUNKS = registry.counter(
+    "chat_pdf_ingested_chunks_total",
+    "Chunks ajoutés (ok), perdus (failed) ou écartés comme quasi-doublons (duplicate) à l'ingestion", ["status"]
+)
+WATCHED_FILES = registry.counter(
+    "chat_pdf_watched_files_total", "Fichiers traités par le watcher de dossier", ["action", "status"]
+)
+RELEVANCE_GATE = registry.counter(
+    "chat_pdf_relevance_gate_total", "Questions avec (relevant) ou sans (irrelevant) résultat pertinent", ["result"]
+)
+EMBEDDING_TRUNCATED = registry.counter(
+    "chat_pdf_embedding_truncated_total", "Textes tronqués à la fenêtre du modèle d'embedding", ["model"]
+)
+EMBEDDING_QUEUE_WAIT = registry.histogram(
+    "chat_pdf_embedding_queue_wait_seconds", "Attente du modèle d'embedding par lot (interactive/bulk)", ["priority"]
+)
+
+_current_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("current_timings", default=None)
+
+
+def _tracer():
+    if otel_trace is None or os.getenv("METRICS_TRACING", "false").lower() != "true":
+        return None
+    return otel_trace.get_tracer("chat-with-ai-pdf")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Chronomètre une étape (histogramme, relevé de la requête en cours, span optionnel)
+
+    Args:
+        name: Nom de l'étape (ex: query_embedding, vector_search)
+    """
+    tracer = _tracer()
+    span_context = tracer.start_as_current_span(name) if tracer is not None else None
+    if span_context is not None:
+        span_context.__enter__()
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage=name)
+
+        timings = _current_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+        if span_context is not None:
+            span_context.__exit__(None, None, None)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Relève les durées des étapes exécutées dans le contexte courant (une requête)"""
+    timings: Dict[str, float] = {}
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_llm_usage(backend: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, backend=backend, direction="in")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, backend=backend, direction="out")
@@ -0,0 +1,145 @@
+"""Calibration du seuil de pertinence (distance max) pour le modèle d'embedding courant
+
+    uv run python -m src.tools.relevance_calibration --user-id alice
+    uv run python -m src.tools.relevance_calibration --user-id alice --questions questions.txt --negatives hors_sujet.txt
+
+Les questions pertinentes sont lues dans --questions (une par ligne) ou, à défaut, tirées des chunks
+de l'utilisateur (extraits de quelques mots); les questions hors sujet dans --negatives, complétées par
+une liste intégrée. Le seuil retenu est le plus large qui rejette encore --target-rejection des questions
+hors sujet, sauf s'il perd plus de (1 - --target-recall) des questions pertinentes. Il est enregistré
+dans relevance_calibration.json, à côté de la base, pour le modèle et la distance de la collection.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from src.application.adapters.embeding.factory import create_embedding_adapter
+from src.domain.services.hnsw_index import current_hnsw_params
+from src.domain.services.relevance import calibration_path, save_calibration
+from src.domain.services.vector_service import VectorStore
+
+OFF_TOPIC_QUESTIONS = [
+    "Quelle est la capitale de l'Australie ?",
+    "Donne-moi une recette de crêpes sans gluten",
+    "Qui a gagné la coupe du monde de football en 1998 ?",
+    "Écris un poème sur l'automne",
+    "Combien de temps faut-il pour apprendre le japonais ?",
+    "Quel est le meilleur film de science-fiction ?",
+    "Comment réserver un billet de train pour Lyon ?",
+    "Raconte-moi une blague",
+    "Quelle est la différence entre un crocodile et un alligator ?",
+    "Quels sont les horaires d'ouverture de la mairie ?",
+    "Comment changer le mot de passe de ma boîte mail ?",
+    "Quel temps fera-t-il demain à Marseille ?",
+    "Traduis 'bonjour' en espagnol",
+    "Qui a peint la Joconde ?",
+    "Quels sont les symptômes de la grippe ?",
+    "Comment faire pousser des tomates sur un balcon ?",
+    "Quelle est la population de la Chine ?",
+    "Conseille-moi un livre pour les vacances",
+    "Comment fonctionne la bourse ?",
+    "Quelle est la date de la fête nationale ?",
+]
+
+
+def _read_lines(path: Optional[Path]) -> List[str]:
+    if path is None:
+        return []
+    return [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def sample_questions(store: VectorStore, user_id: str, count: int, rng: random.Random) -> List[str]:
+    """Extraits de quelques mots tirés au hasard dans les chunks de l'utilisateur"""
+    chunk_ids = [chunk_id for file in store.get_file_list(user_id)
+                 for chunk_id in store.file_index.get_chunk_ids(user_id, file)]
+    if not chunk_ids:
+        return []
+    chunk_ids = rng.sample(chunk_ids, min(count, len(chunk_ids)))
+    documents = store.collection.get(ids=chunk_ids, include=["documents"])["documents"]
+    questions = []
+    for document in documents:
+        words = document.split()
+        if len(words) < 4:
+            continue
+        length = rng.randint(6, 14)
+        start = rng.randint(0, max(0, len(words) - length))
+        questions.append(" ".join(words[start:start + length]))
+    return questions
+
+
+def best_distances(store: VectorStore, user_id: str, questions: List[str], n_results: int) -> List[List[float]]:
+    """Distances des n plus proches chunks de l'utilisateur, par question"""
+    if not questions:
+        return []
+    results = store._query(store.embedding_port.encode(questions), user_id, n_results)
+    return results["distances"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibration du seuil de pertinence")
+    parser.add_argument("--persist-dir", default="./chroma_db", help="Répertoire de la base Chroma")
+    parser.add_argument("--collection", default="documents", help="Nom de la collection")
+    parser.add_argument("--user-id", required=True, help="Utilisateur dont les documents servent à la calibration")
+    parser.add_argument("--questions", type=Path, default=None, help="Questions pertinentes (une par ligne)")
+    parser.add_argument("--negatives", type=Path, default=None, help="Questions hors sujet (une par ligne)")
+    parser.add_argument("--samples", type=int, default=200, help="Questions tirées des chunks sans --questions")
+    parser.add_argument("--target-rejection", type=float, default=0.9, help="Part des hors sujet à rejeter")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="Part min des pertinentes à garder")
+    parser.add_argument("--n-results", type=int, default=5, help="Résultats par question (écarts au meilleur)")
+    parser.add_argument("--dry-run", action="store_true", help="Affiche le seuil sans l'enregistrer")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    store = VectorStore(create_embedding_adapter(os.getenv("EMBEDDING_BACKEND", "local")),
+                        collection_name=args.collection, persist_directory=args.persist_dir)
+    rng = random.Random(args.seed)
+
+    positives = _read_lines(args.questions) or sample_questions(store, args.user_id, args.samples, rng)
+    negatives = _read_lines(args.negatives) + OFF_TOPIC_QUESTIONS
+    positive_distances = best_distances(store, args.user_id, positives, args.n_results)
+    if not positive_distances or not positive_distances[0]:
+        parser.error(f"Aucun document pour {args.user_id}")
+    negative_distances = best_distances(store, args.user_id, negatives, 1)
+
+    positive_best = np.array([distances[0] for distances in positive_distances])
+    negative_best = np.array([distances[0] for distances in negative_distances])
+
+    # Seuil le plus large qui rejette encore la part voulue des questions hors sujet...
+    max_distance = float(np.quantile(negative_best, 1 - args.target_rejection))
+    # ...sans perdre plus de questions pertinentes que toléré
+    recall_bound = float(np.quantile(positive_best, args.target_recall))
+    if np.mean(positive_best <= max_distance) < args.target_recall:
+        logging.warning(f"⚠️ Rappel < {args.target_recall} au seuil {max_distance:.4f}: seuil élargi à {recall_bound:.4f}")
+        max_distance = recall_bound
+
+    gaps = np.array([distances[-1] - distances[0] for distances in positive_distances if len(distances) > 1])
+    values = {
+        "max_distance": max_distance,
+        "recall": float(np.mean(positive_best <= max_distance)),
+        "rejection": float(np.mean(negative_best > max_distance)),
+        "positives": len(positives),
+        "negatives": len(negatives),
+        "positive_best_quantiles": {q: float(np.quantile(positive_best, float(q))) for q in ("0.5", "0.9", "0.99")},
+        "negative_best_quantiles": {q: float(np.quantile(negative_best, float(q))) for q in ("0.01", "0.1", "0.5")},
+        # Aide au choix de RELEVANCE_DROP_OFF: écart entre le 1er et le n-ième résultat des questions pertinentes
+        f"gap_at_{args.n_results}_quantiles": {q: float(np.quantile(gaps, float(q))) for q in ("0.5", "0.9")}
+        if len(gaps) else {},
+    }
+
+    model_name = store.embedding_port.get_model_name()
+    space = current_hnsw_params(store.collection)["space"] or "l2"
+    if not args.dry_run:
+        save_calibration(calibration_path(args.persist_dir), model_name, space, values)
+    print(json.dumps({"model": model_name, "space": space, **values}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", ".", "!", "?", ";", ",", " ", ""]
+
+Span = Tuple[int, int]
+
+
+class RecursiveSpanSplitter:
+    """Découpage récursif par séparateurs, équivalent à RecursiveCharacterTextSplitter de LangChain
+
+    Mêmes règles (premier séparateur présent, séparateur conservé en tête du morceau suivant,
+    fusion jusqu'à chunk_size, chevauchement chunk_overlap, chunks nettoyés des espaces), mais
+    le texte n'est jamais recopié pendant le découpage: les morceaux sont des intervalles
+    (début, fin) dans le texte de la page, cherchés avec str.find, et chaque chunk n'est extrait
+    qu'une fois. Avec la longueur par défaut (caractères), aucune sous-chaîne n'est mesurée.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 separators: Optional[Sequence[str]] = None,
+                 length_function: Optional[Callable[[str], int]] = None):
+        """
+        Args:
+            chunk_size: Taille maximale des chunks (unité de length_function)
+            chunk_overlap: Chevauchement entre chunks
+            separators: Séparateurs par ordre de préférence (défaut: paragraphes, lignes, phrases...)
+            length_function: Mesure de longueur (défaut: nombre de caractères)
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"Chevauchement ({chunk_overlap}) plus grand que la taille des chunks ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators if separators is not None else DEFAULT_SEPARATORS)
+        self.length_function = length_function if length_function not in (None, len) else None
+
+    def _choose_separator(self, text: str, start: int, end: int, first: int) -> Tuple[str, int]:
+        """Premier séparateur présent dans l'intervalle, et indice des séparateurs restants"""
+        for index in range(first, len(self.separators)):
+            separator = self.separators[index]
+            if separator == "":
+                return separator, len(self.separators)
+            if text.find(separator, start, end) != -1:
+                return separator, index + 1
+        return self.separators[-1], len(self.separators)
+
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> Iterator[Span]:
+        """Morceaux de l'intervalle, chaque séparateur restant en tête du morceau qui le suit"""
+        if separator == "":
+            for position in range(start, end):
+                yield position, position + 1
+            return
+
+        piece_start = start
+        position = text.find(separator, start, end)
+        while position != -1:
+            if position > piece_start:
+                yield piece_start, position
+            piece_start = position
+            position = text.find(separator, position + len(separator), end)
+        if end > piece_start:
+            yield piece_start, end
+
+    def _emit(self, text: str, start: int, end: int, chunks: List[str]) -> None:
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+
+    def _merge(self, text: str, spans: List[Span], lengths: List[int], chunks: List[str]) -> None:
+        """Fusionne des morceaux contigus en chunks de chunk_size au plus, avec chevauchement"""
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        window: Deque[int] = deque()
+        total = 0
+        for index, length in enumerate(lengths):
+            if total + length > chunk_size and window:
+                # Les morceaux sont contigus: le chunk est l'intervalle de la fenêtre
+                self._emit(text, spans[window[0]][0], spans[window[-1]][1], chunks)
+                while total > chunk_overlap or (total + length > chunk_size and total > 0):
+                    total -= lengths[window.popleft()]
+            window.append(index)
+            total += length
+        if window:
+            self._emit(text, spans[window[0]][0], spans[window[-1]][1], chunks)
+
+    def _split(self, text: str, start: int, end: int, first: int, chunks: List[str]) -> None:
+        separator, remaining = self._choose_separator(text, start, end, first)
+        spans = list(self._pieces(text, start, end, separator))
+        if self.length_function is None:
+            lengths = [piece_end - piece_start for piece_start, piece_end in spans]
+        else:
+            lengths = [self.length_function(text[piece_start:piece_end]) for piece_start, piece_end in spans]
+
+        # Morceaux assez courts fusionnés par séries, les autres redécoupés au séparateur suivant
+        good_from = 0
+        for index, length in enumerate(lengths):
+            if length < self.chunk_size:
+                continue
+            if good_from < index:
+                self._merge(text, spans[good_from:index], lengths[good_from:index], chunks)
+            good_from = index + 1
+            piece_start, piece_end = spans[index]
+            if remaining >= len(self.separators):
+                chunks.append(text[piece_start:piece_end])
+            else:
+                self._split(text, piece_start, piece_end, remaining, chunks)
+        if good_from < len(spans):
+            if good_from == 0:
+                self._merge(text, spans, lengths, chunks)
+            else:
+                self._merge(text, spans[good_from:], lengths[good_from:], chunks)
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Args:
+            text: Texte à découper (une page)
+
+        Returns:
+            Chunks du texte, dans l'ordre
+        """
+        chunks: List[str] = []
+        self._split(text, 0, len(text), 0, chunks)
+        return chunks
@@ -0,0 +1,62 @@
+"""Export / import des chunks d'un utilisateur entre deux bases Chroma
+
+    uv run python -m src.tools.vector_transfer export --user-id alice --output alice.vstore
+    uv run python -m src.tools.vector_transfer import --input alice.vstore [--user-id bob]
+
+Les vecteurs sont copiés tels quels: aucun PDF n'est relu et le modèle d'embedding
+n'est pas chargé (seul son nom est comparé à celui de l'archive).
+"""
+import argparse
+import json
+import logging
+from typing import List
+
+from src.domain.ports.embeding import EmbeddingPort
+from src.domain.services.vector_service import VectorStore
+
+
+class _ModelNamePort(EmbeddingPort):
+    """Port d'embedding réduit au nom du modèle: l'export/import ne vectorise rien"""
+
+    def __init__(self, model_name: str):
+        self._model_name = model_name
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        raise RuntimeError("L'export/import de base vectorielle ne doit pas vectoriser")
+
+    def get_model_name(self) -> str:
+        return self._model_name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export / import de base vectorielle")
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("--persist-dir", default="./chroma_db", help="Répertoire de la base Chroma")
+    parser.add_argument("--collection", default="documents", help="Nom de la collection")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Modèle d'embedding de la base")
+    parser.add_argument("--user-id", default=None, help="Utilisateur exporté / cible de l'import")
+    parser.add_argument("--output", default=None, help="Archive à écrire (export)")
+    parser.add_argument("--input", default=None, help="Archive à lire (import)")
+    parser.add_argument("--force", action="store_true", help="Importe malgré un modèle différent")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    store = VectorStore(_ModelNamePort(args.model), collection_name=args.collection,
+                        persist_directory=args.persist_dir)
+
+    if args.command == "export":
+        if not args.user_id or not args.output:
+            parser.error("--user-id et --output sont requis")
+        result = store.export_user(args.user_id, args.output)
+    else:
+        if not args.input:
+            parser.error("--input est requis")
+        result = store.import_archive(args.input, user_id=args.user_id, force=args.force)
+        result["dropped"] = len(result["dropped"])
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import pytest
+
+from src.application.adapters.embeding.fakeEmbeding import FakeEmbeddingAdapter
+from src.domain.services.vector_service import VectorStore
+from src.tools.fake_openai_server import FakeOpenAIServer
+
+
+@pytest.fixture
+def fake_openai():
+    """Serveur OpenAI-compatible local; les tests ajustent pannes et latence via ses attributs"""
+    with FakeOpenAIServer() as server:
+        yield server
+
+
+@pytest.fixture
+def embedder():
+    """Embedder déterministe (hash du texte) et instantané"""
+    return FakeEmbeddingAdapter(dimension=16, cost_per_call=0, cost_per_text=0)
+
+
+@pytest.fixture
+def make_store(embedder, tmp_path):
+    """Fabrique de VectorStore sur une base temporaire (la configuration est lue dans l'environnement)"""
+    def make(persist_directory=None, **kwargs):
+        return VectorStore(embedder, persist_directory=str(persist_directory or tmp_path / "chroma"), **kwargs)
+    return make
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Écrit des documents texte: corpus({"a.txt": "..."}) -> chemins"""
+    directory = tmp_path / "documents"
+    directory.mkdir()
+
+    def write(files):
+        paths = []
+        for name, text in files.items():
+            path = directory / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+            paths.append(path)
+        return paths
+    return write
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Application FastAPI (main.py) avec LLM et embedder simulés, dans un dossier temporaire"""
+    import importlib
+    import sys
+
+    from chromadb.api.client import SharedSystemClient
+    from fastapi.testclient import TestClient
+
+    monkeypatch.chdir(tmp_path)
+    for name, value in {
+        "PDF_PATH": str(tmp_path / "pdfs"), "AI_BACKEND": "fake", "EMBEDDING_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": "0", "FAKE_LLM_TOKENS_PER_SECOND": "0", "FAKE_LLM_COMPLETION_TOKENS": "5",
+        "FAKE_EMBEDDING_COST_PER_CALL": "0", "FAKE_EMBEDDING_COST_PER_TEXT": "0", "SUMMARY_CACHE_PATH": "",
+    }.items():
+        monkeypatch.setenv(name, value)
+    sys.modules.pop("main", None)
+    main = importlib.import_module("main")
+    with TestClient(main.app) as client:
+        client.main = main
+        yield client
+    sys.modules.pop("main", None)
+    # main.py ouvre "./chroma_db": le client partagé de Chroma est indexé par ce chemin relatif
+    SharedSystemClient.clear_system_cache()
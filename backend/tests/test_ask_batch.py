@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+PASSAGE = "Le ballon d'eau chaude se détartre tous les deux ans, vanne d'arrivée fermée."
+OTHER = "Le groupe de sécurité doit goutter légèrement pendant la chauffe du ballon."
+
+
+@pytest.fixture
+def batch_api(api, monkeypatch):
+    # Embedder par hash du texte: seule une question identique à un chunk est pertinente
+    monkeypatch.setattr(api.main.vector_store.relevance_gate, "max_distance", 1e-6)
+    for name, text in {"entretien.txt": PASSAGE, "securite.txt": OTHER}.items():
+        response = api.post("/upload-documents", data={"user_id": "alice"},
+                            files=[("files", (name, text.encode("utf-8"), "text/plain"))])
+        assert response.status_code == 200
+    return api
+
+
+def ask_batch(client, questions, **options):
+    response = client.post("/ask/batch", json={"user_id": "alice", "questions": questions, **options})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_contexts_header_then_one_line_per_question(batch_api):
+    lines = ask_batch(batch_api, [PASSAGE, "Quelle est la capitale du Pérou ?", OTHER], max_concurrency=2)
+
+    header, results = lines[0], lines[1:]
+    assert header["type"] == "contexts"
+    assert all(line["type"] == "result" for line in results)
+    by_index = {result["index"]: result for result in results}
+    assert sorted(by_index) == [0, 1, 2]
+
+    assert by_index[0]["relevant"] and by_index[0]["sources"] == ["entretien.txt"]
+    assert by_index[0]["response"].startswith("<p>Réponse simulée")
+    # Les chunks du contexte ne sont envoyés qu'une fois, dans l'en-tête
+    assert set(by_index[0]["chunk_ids"]) <= set(header["chunks"])
+    assert header["chunks"][by_index[0]["chunk_ids"][0]]["document"] == PASSAGE
+
+    assert by_index[1]["relevant"] is False and by_index[1]["chunk_ids"] == []
+    assert by_index[1]["response"] == batch_api.main.NO_RELEVANT_ANSWER
+    assert by_index[2]["sources"] == ["securite.txt"]
+
+
+def test_file_filter_applies_to_the_whole_batch(batch_api):
+    lines = ask_batch(batch_api, [PASSAGE, OTHER], pdf_filter="securite.txt")
+
+    results = {line["index"]: line for line in lines[1:]}
+    assert results[0]["relevant"] is False
+    assert results[1]["sources"] == ["securite.txt"]
+
+
+def test_llm_error_is_reported_per_question(batch_api, monkeypatch):
+    def failing(question, context, history, domain=None):
+        raise RuntimeError("upstream indisponible")
+
+    monkeypatch.setattr(batch_api.main.ai_service, "response", failing)
+    lines = ask_batch(batch_api, [PASSAGE])
+
+    assert lines[1]["error"] == "upstream indisponible" and lines[1]["response"] is None
+
+
+@pytest.mark.parametrize("questions", [[], ["   "], ["x" * 251]])
+def test_invalid_batches_are_rejected(api, questions):
+    assert api.post("/ask/batch", json={"user_id": "alice", "questions": questions}).status_code == 422
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from src.domain.services.background_jobs import BackgroundJobs
+
+TEXT = "\n\n".join(f"Chapitre {i}. " + "Le filtre à particules se régénère à haute température. " * 10 for i in range(8))
+
+
+def wait(jobs, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    pytest.fail(f"tâche {job_id} non terminée")
+
+
+def test_job_result_and_failure():
+    jobs = BackgroundJobs()
+
+    done = wait(jobs, jobs.submit("clear_collection", lambda: {"user_id": "alice"}, user_id="alice"))
+    assert done["status"] == "done" and done["result"] == {"user_id": "alice"}
+    assert done["kind"] == "clear_collection" and done["user_id"] == "alice"
+    assert done["finished_at"] >= done["started_at"] >= done["submitted_at"]
+
+    def boom():
+        raise RuntimeError("Suppression en échec")
+
+    failed = wait(jobs, jobs.submit("delete_file", boom))
+    assert failed["status"] == "failed" and failed["error"] == "Suppression en échec"
+    assert jobs.get("inconnue") is None
+
+
+def test_jobs_run_one_at_a_time_in_order():
+    jobs = BackgroundJobs()
+    release = threading.Event()
+    order = []
+
+    first = jobs.submit("slow", lambda: (release.wait(5), order.append(1)))
+    second = jobs.submit("fast", lambda: order.append(2))
+    time.sleep(0.05)
+    assert jobs.get(first)["status"] == "running"
+    assert jobs.get(second)["status"] == "pending"
+
+    release.set()
+    wait(jobs, second)
+    assert order == [1, 2]
+
+
+def test_history_keeps_unfinished_jobs():
+    jobs = BackgroundJobs(history=2)
+    release = threading.Event()
+    blocked = jobs.submit("slow", lambda: release.wait(5))
+    later = [jobs.submit("fast", lambda: None) for _ in range(3)]
+
+    # La plus ancienne tâche n'est pas terminée: rien n'est évincé
+    assert jobs.get(blocked) is not None
+    release.set()
+    for job_id in later:
+        wait(jobs, job_id)
+
+    newest = jobs.submit("fast", lambda: None)
+    wait(jobs, newest)
+    assert jobs.get(blocked) is None
+    assert jobs.get(newest) is not None
+
+
+class CollectionSpy:
+    """Enregistre les get/delete faits sur la collection Chroma"""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.gets = []
+        self.deletes = []
+
+    def get(self, **kwargs):
+        self.gets.append(kwargs)
+        return self._collection.get(**kwargs)
+
+    def delete(self, **kwargs):
+        self.deletes.append(len(kwargs["ids"]))
+        return self._collection.delete(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+@pytest.fixture
+def paged_store(make_store, corpus, monkeypatch):
+    monkeypatch.setenv("CHROMA_DELETE_PAGE_SIZE", "3")
+    store = make_store()
+    store.add_documents_from_files(corpus({"a.txt": TEXT, "b.txt": TEXT.upper()}), "alice")
+    store.add_documents_from_files(corpus({"c.txt": TEXT}), "bob")
+    return store
+
+
+def test_clear_collection_deletes_by_pages_without_reading_documents(paged_store):
+    size = paged_store.get_collection_size("alice")
+    spy = CollectionSpy(paged_store.collection)
+    paged_store.collection = spy
+
+    assert paged_store.clear_collection("alice")
+
+    assert sum(spy.deletes) == size > 3
+    assert max(spy.deletes) <= 3
+    assert all(call["include"] == [] and call["limit"] == 3 for call in spy.gets)
+    assert paged_store.get_collection_size("alice") == 0
+    assert paged_store.get_file_list("bob") == ["c.txt"]
+
+
+def test_delete_file_uses_known_ids(paged_store):
+    chunk_ids = paged_store.file_index.get_chunk_ids("alice", "a.txt")
+    spy = CollectionSpy(paged_store.collection)
+    paged_store.collection = spy
+
+    assert paged_store.delete_file_chunks("a.txt", "alice")
+
+    assert sum(spy.deletes) == len(chunk_ids)
+    # IDs connus par l'index fichiers: une seule lecture, de vérification
+    assert len(spy.gets) == 1 and spy.gets[0]["include"] == []
+    assert paged_store.get_file_list("alice") == ["b.txt"]
+
+
+def test_count_chunks_is_bounded(paged_store):
+    total = paged_store.get_collection_size("alice")
+
+    assert paged_store.count_chunks("alice") == total
+    assert paged_store.count_chunks("alice", limit=2) == 2
+    assert paged_store.count_chunks("alice", "a.txt") == len(paged_store.file_index.get_chunk_ids("alice", "a.txt"))
@@ -0,0 +1,202 @@
+import os
+
+import pytest
+
+from src.domain.services import ingestion_quota
+from src.domain.services.bulk_ingestion import BulkIngestor
+from src.domain.services.ingestion_checkpoint import DONE, FAILED, PENDING, IngestionCheckpoint
+from src.domain.services.ingestion_quota import UserChunkQuota
+
+TEXT = "\n\n".join(f"Section {i}. " + "La pompe à chaleur réversible chauffe et rafraîchit. " * 10 for i in range(4))
+FILES = {name: f"{name}\n\n{TEXT}" for name in ("a.txt", "b.txt", "c.txt")}
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return IngestionCheckpoint(str(tmp_path / "checkpoint.sqlite"))
+
+
+@pytest.fixture
+def ingestor(make_store, checkpoint):
+    store = make_store()
+    store.delete_listeners.append(checkpoint.forget)
+    return BulkIngestor(store, checkpoint, UserChunkQuota(), extensions=("txt",))
+
+
+def statuses(checkpoint, run_id, paths):
+    return [checkpoint.get(run_id, path)["status"] for path in paths]
+
+
+def test_checkpoint_register_mark_and_summary(checkpoint, tmp_path):
+    run_id = IngestionCheckpoint.run_id("alice", tmp_path)
+    paths = [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+    checkpoint.register(run_id, paths)
+    checkpoint.mark(run_id, paths[0], DONE, size=10, mtime_ns=1, file_hash="h", chunks=7)
+    # Un nouvel enregistrement ne réinitialise pas les fichiers connus
+    checkpoint.register(run_id, paths + [tmp_path / "c.pdf"])
+    checkpoint.mark(run_id, paths[1], FAILED, error="illisible")
+
+    assert checkpoint.get(run_id, paths[0]) == {"status": DONE, "size": 10, "mtime_ns": 1, "file_hash": "h",
+                                                "chunks": 7, "error": None}
+    assert checkpoint.summary(run_id) == {
+        "files": {PENDING: 1, DONE: 1, FAILED: 1},
+        "chunks": 7,
+        "failed": [{"path": str(paths[1]), "error": "illisible"}],
+    }
+    # Persisté: une nouvelle connexion retrouve l'état
+    assert IngestionCheckpoint(str(checkpoint.path)).get(run_id, paths[0])["status"] == DONE
+
+
+def test_checkpoint_forget_is_scoped_to_user_and_file(checkpoint, tmp_path):
+    alice, bob = IngestionCheckpoint.run_id("alice", tmp_path), IngestionCheckpoint.run_id("bob", tmp_path)
+    checkpoint.register(alice, [tmp_path / "a.pdf", tmp_path / "b.pdf"])
+    checkpoint.register(bob, [tmp_path / "a.pdf"])
+
+    assert checkpoint.forget("alice", "a.pdf") == 1
+    assert checkpoint.get(alice, tmp_path / "a.pdf") is None
+    assert checkpoint.get(bob, tmp_path / "a.pdf") is not None
+    assert checkpoint.forget("alice") == 1
+
+
+def test_checkpoint_forget_matches_the_relative_path(checkpoint, tmp_path):
+    run_id = IngestionCheckpoint.run_id("alice", tmp_path)
+    checkpoint.register(run_id, [tmp_path / "pompe" / "manuel.pdf", tmp_path / "vanne" / "manuel.pdf"])
+
+    assert checkpoint.forget("alice", "manuel.pdf") == 0
+    assert checkpoint.forget("alice", "vanne/manuel.pdf") == 1
+    assert checkpoint.get(run_id, tmp_path / "pompe" / "manuel.pdf") is not None
+
+
+def test_run_ingests_then_skips_unchanged_files(ingestor, corpus):
+    paths = corpus(FILES)
+    folder = paths[0].parent
+
+    first = ingestor.run(folder, "alice")
+    assert first["processed"] == 3 and first["files"][DONE] == 3
+    size = ingestor.vector_store.get_collection_size("alice")
+    assert first["chunks"] == size > 0
+
+    second = ingestor.run(folder, "alice")
+    assert second["processed"] == 0 and second["results"] == []
+    assert ingestor.vector_store.get_collection_size("alice") == size
+
+
+def test_interrupted_run_resumes_at_pending_files(ingestor, corpus, checkpoint):
+    paths = sorted(corpus(FILES))
+    folder = paths[0].parent
+    run_id = IngestionCheckpoint.run_id("alice", folder)
+
+    assert ingestor.run(folder, "alice", max_files=1)["processed"] == 1
+    assert statuses(checkpoint, run_id, paths) == [DONE, PENDING, PENDING]
+
+    resumed = ingestor.run(folder, "alice")
+    assert [result["file"] for result in resumed["results"]] == ["b.txt", "c.txt"]
+    assert sorted(ingestor.vector_store.get_file_list("alice")) == ["a.txt", "b.txt", "c.txt"]
+
+
+def test_touched_file_is_rehashed_not_reingested(ingestor, corpus, checkpoint):
+    paths = corpus(FILES)
+    folder = paths[0].parent
+    ingestor.run(folder, "alice")
+    os.utime(paths[0], ns=(1_000, 1_000))
+
+    assert ingestor.run(folder, "alice")["processed"] == 0
+    # Nouvel état retenu: plus de hash à recalculer
+    assert checkpoint.get(IngestionCheckpoint.run_id("alice", folder), paths[0])["mtime_ns"] == 1_000
+
+
+def test_modified_file_replaces_its_chunks(ingestor, corpus):
+    paths = corpus(FILES)
+    folder = paths[0].parent
+    ingestor.run(folder, "alice")
+    store = ingestor.vector_store
+    before = len(store.file_index.get_chunk_ids("alice", "a.txt"))
+
+    paths[0].write_text("a.txt\n\nUne seule phrase.", encoding="utf-8")
+    result = ingestor.run(folder, "alice")
+
+    assert [item["file"] for item in result["results"]] == ["a.txt"]
+    chunk_ids = store.file_index.get_chunk_ids("alice", "a.txt")
+    assert 0 < len(chunk_ids) < before
+    assert store.get_collection_size("alice") == sum(
+        len(store.file_index.get_chunk_ids("alice", name)) for name in FILES
+    )
+
+
+def test_failed_file_is_retried_unless_disabled(ingestor, corpus, checkpoint, monkeypatch):
+    paths = corpus(FILES)
+    folder = paths[0].parent
+    processor = ingestor.vector_store.document_processor
+    load_document = processor.load_document
+
+    def failing(path, root=None):
+        if path.name == "b.txt":
+            raise OSError("disque indisponible")
+        return load_document(path, root)
+
+    monkeypatch.setattr(processor, "load_document", failing)
+    report = ingestor.run(folder, "alice")
+    assert report["files"] == {PENDING: 0, DONE: 2, FAILED: 1}
+    assert "disque indisponible" in report["failed"][0]["error"]
+
+    assert ingestor.run(folder, "alice", retry_failed=False)["processed"] == 0
+    monkeypatch.setattr(processor, "load_document", load_document)
+    retried = ingestor.run(folder, "alice")
+    assert [(result["file"], result["status"]) for result in retried["results"]] == [("b.txt", "done")]
+    assert retried["files"][FAILED] == 0
+
+
+def test_deleted_file_is_reingested_by_an_explicit_rerun(ingestor, corpus):
+    paths = corpus(FILES)
+    folder = paths[0].parent
+    ingestor.run(folder, "alice")
+
+    ingestor.vector_store.delete_file_chunks("a.txt", "alice")
+    assert "a.txt" not in ingestor.vector_store.get_file_list("alice")
+
+    assert [result["file"] for result in ingestor.run(folder, "alice")["results"]] == ["a.txt"]
+    assert "a.txt" in ingestor.vector_store.get_file_list("alice")
+
+
+def test_quota_waits_instead_of_truncating(monkeypatch):
+    class FakeClock:
+        now = 0.0
+
+        def monotonic(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.now += seconds
+
+    clock = FakeClock()
+    monkeypatch.setattr(ingestion_quota, "time", clock)
+    quota = UserChunkQuota(chunks_per_minute=60)
+
+    assert quota.acquire("alice", 60) == 0.0
+    assert quota.acquire("alice", 30) == pytest.approx(30.0)
+    # Seau propre à chaque utilisateur
+    assert quota.acquire("bob", 60) == 0.0
+    # Fichier plus gros que le seau: passe une fois le seau plein, en laissant une dette
+    assert quota.acquire("bob", 120) == pytest.approx(60.0)
+    assert quota.acquire("bob", 1) == pytest.approx(61.0)
+    assert UserChunkQuota().acquire("alice", 10_000) == 0.0
+
+
+def test_same_name_in_two_subfolders(ingestor, corpus, checkpoint):
+    paths = corpus({"pompe/manuel.txt": f"Pompe\n\n{TEXT}", "vanne/manuel.txt": f"Vanne\n\n{TEXT}"})
+    folder = paths[0].parent.parent
+    store = ingestor.vector_store
+
+    assert ingestor.run(folder, "alice")["processed"] == 2
+    assert store.get_file_list("alice") == ["pompe/manuel.txt", "vanne/manuel.txt"]
+    vanne = store.file_index.get_chunk_ids("alice", "vanne/manuel.txt")
+
+    # Réingérer l'un ne supprime pas les chunks de l'autre
+    paths[0].write_text("Pompe\n\nRévision B.", encoding="utf-8")
+    assert [result["file"] for result in ingestor.run(folder, "alice")["results"]] == ["pompe/manuel.txt"]
+    assert store.file_index.get_chunk_ids("alice", "vanne/manuel.txt") == vanne
+
+    store.delete_file_chunks("vanne/manuel.txt", "alice")
+    run_id = IngestionCheckpoint.run_id("alice", folder)
+    assert checkpoint.get(run_id, paths[1]) is None
+    assert checkpoint.get(run_id, paths[0])["status"] == DONE
@@ -0,0 +1,133 @@
+import threading
+
+import chromadb
+import pytest
+
+from src.domain.services.bulk_writer import ChromaBulkWriter
+
+
+class FakeCollection:
+    """Collection en mémoire; les IDs de `poisoned` font échouer tout batch qui les contient"""
+
+    def __init__(self, poisoned=(), failures_before_success=0):
+        self.records = {}
+        self.batches = []
+        self.poisoned = set(poisoned)
+        self.failures_before_success = failures_before_success
+        self.writer_threads = set()
+
+    def add(self, ids, documents, embeddings, metadatas):
+        self.writer_threads.add(threading.current_thread().name)
+        if self.failures_before_success:
+            self.failures_before_success -= 1
+            raise RuntimeError("écriture temporairement impossible")
+        if self.poisoned & set(ids):
+            raise ValueError("métadonnée invalide")
+        self.batches.append(len(ids))
+        for record_id, document, embedding, metadata in zip(ids, documents, embeddings, metadatas):
+            self.records[record_id] = (document, embedding, metadata)
+
+
+def chunks(count):
+    ids = [f"chunk-{i}" for i in range(count)]
+    texts = [f"texte {i}" for i in range(count)]
+    metadatas = [{"source_file": f"doc{i % 3}.pdf", "chunk_id": i} for i in range(count)]
+    return ids, texts, metadatas
+
+
+def test_writes_all_chunks_with_their_embeddings(embedder):
+    collection = FakeCollection()
+    writer = ChromaBulkWriter(collection, embedder, max_batch_size=64, initial_batch_size=16, retry_delay=0)
+    ids, texts, metadatas = chunks(100)
+    written = []
+
+    report = writer.write(ids, texts, metadatas, on_written=lambda batch_ids, _: written.extend(batch_ids))
+
+    assert report["added"] == 100 and report["dropped"] == []
+    assert sorted(written) == sorted(ids)
+    assert collection.records["chunk-7"][1] == embedder.encode(["texte 7"])[0]
+    assert sum(report["batch_sizes"]) == 100
+    # Écriture dans un thread dédié, pendant la vectorisation du batch suivant
+    assert all(name.startswith("chroma-writer") for name in collection.writer_threads)
+
+
+def test_batch_size_grows_when_writes_are_fast(embedder):
+    writer = ChromaBulkWriter(FakeCollection(), embedder, max_batch_size=64, initial_batch_size=16,
+                              target_batch_seconds=10.0, retry_delay=0)
+
+    report = writer.write(*chunks(300))
+
+    sizes = report["batch_sizes"]
+    assert sizes[0] == 16
+    assert sizes == sorted(sizes[:-1]) + sizes[-1:]
+    # Croissance au plus x2 par batch, jusqu'au max de Chroma
+    assert all(after <= 2 * before for before, after in zip(sizes, sizes[1:]))
+    assert max(sizes) == 64
+
+
+def test_next_batch_size_targets_write_duration(embedder):
+    writer = ChromaBulkWriter(FakeCollection(), embedder, max_batch_size=1000, initial_batch_size=100,
+                              min_batch_size=16, target_batch_seconds=1.0)
+
+    assert writer._next_batch_size(100, 2.0, failed=False) == 50
+    assert writer._next_batch_size(100, 0.1, failed=False) == 200
+    assert writer._next_batch_size(100, 0.5, failed=True) == 50
+    assert writer._next_batch_size(20, 5.0, failed=False) == 16
+
+
+def test_transient_failure_is_retried(embedder):
+    collection = FakeCollection(failures_before_success=1)
+    writer = ChromaBulkWriter(collection, embedder, max_batch_size=64, initial_batch_size=64, retry_delay=0)
+
+    report = writer.write(*chunks(10))
+
+    assert report["added"] == 10 and report["dropped"] == []
+
+
+def test_bisection_isolates_bad_records(embedder):
+    collection = FakeCollection(poisoned={"chunk-5", "chunk-41"})
+    writer = ChromaBulkWriter(collection, embedder, max_batch_size=64, initial_batch_size=64,
+                              max_retries=0, retry_delay=0)
+
+    report = writer.write(*chunks(64))
+
+    assert report["added"] == 62
+    assert sorted(item["id"] for item in report["dropped"]) == ["chunk-41", "chunk-5"]
+    assert report["dropped"][0]["source_file"] and "invalide" in report["dropped"][0]["error"]
+    assert len(collection.records) == 62
+
+
+def test_precomputed_embeddings_skip_the_model(embedder):
+    class NoModel:
+        def encode(self, texts):
+            raise AssertionError("vectorisation inattendue")
+
+    collection = FakeCollection()
+    ids, texts, metadatas = chunks(5)
+    writer = ChromaBulkWriter(collection, NoModel(), max_batch_size=64, retry_delay=0)
+
+    report = writer.write(ids, texts, metadatas, embeddings=[[float(i)] * 4 for i in range(5)])
+
+    assert report["added"] == 5
+    assert collection.records["chunk-3"][1] == [3.0] * 4
+
+
+def test_writes_into_chroma(embedder, tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    collection = client.get_or_create_collection("documents")
+    writer = ChromaBulkWriter(collection, embedder, max_batch_size=client.get_max_batch_size(), initial_batch_size=16)
+    ids, texts, metadatas = chunks(50)
+
+    report = writer.write(ids, texts, metadatas)
+
+    assert report["added"] == 50
+    assert collection.count() == 50
+    assert collection.get(ids=["chunk-9"])["documents"] == ["texte 9"]
+
+
+@pytest.mark.parametrize("count", [0, 1])
+def test_small_inputs(embedder, count):
+    report = ChromaBulkWriter(FakeCollection(), embedder, max_batch_size=64).write(*chunks(count))
+
+    assert report["added"] == count
+    assert report["batches"] == count
@@ -0,0 +1,78 @@
+import pytest
+
+TEXT = "Le circulateur fait tourner l'eau chaude dans les radiateurs du circuit de chauffage. " * 12
+FILES = {name: f"{name}\n\n{TEXT}" for name in ("a.txt", "b.txt", "c.txt")}
+
+
+class RecordingSummarizer:
+    """Résumé fixe par fichier; enregistre les fichiers résumés"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, file_name, text):
+        self.calls.append(file_name)
+        return f"Résumé de {file_name}"
+
+
+@pytest.fixture
+def summarizer():
+    return RecordingSummarizer()
+
+
+@pytest.fixture
+def store(make_store, summarizer, monkeypatch):
+    monkeypatch.setenv("DOCUMENT_SUMMARIES", "llm")
+    monkeypatch.setenv("DOCUMENT_ROUTING_TOP_K", "1")
+    return make_store(summarizer=summarizer)
+
+
+def summary_text(file_name):
+    # L'embedder de test hache le texte: une question identique au résumé indexé en est au plus proche
+    return f"{file_name}\nRésumé de {file_name}"
+
+
+def summary_query(store, file_name):
+    return store.embedding_port.encode([summary_text(file_name)])
+
+
+def test_question_is_routed_to_the_closest_summaries(store, summarizer, corpus):
+    store.add_documents_from_files(corpus(FILES), "alice")
+
+    assert sorted(summarizer.calls) == ["a.txt", "b.txt", "c.txt"]
+    assert store.summary_index.files("alice") == {"a.txt", "b.txt", "c.txt"}
+    assert store._route(summary_query(store, "b.txt"), "alice") == ["b.txt"]
+    # Plusieurs requêtes: union des documents retenus pour chacune
+    queries = summary_query(store, "a.txt") + summary_query(store, "c.txt")
+    assert store._route(queries, "alice") == ["a.txt", "c.txt"]
+
+
+def test_unsummarized_files_stay_searchable(store, summarizer, corpus):
+    store.add_documents_from_files(corpus(FILES), "alice")
+    # Fichier ingéré sans résumé (avant activation des résumés)
+    store.summary_mode = "off"
+    store.add_documents_from_files(corpus({"d.txt": f"d.txt\n\n{TEXT}"}), "alice")
+
+    assert "d.txt" not in summarizer.calls
+    assert store._route(summary_query(store, "b.txt"), "alice") == ["b.txt", "d.txt"]
+    context = store.get_context_for_query(summary_text("b.txt"), "alice", n_results=20, max_context_length=100_000)
+    assert sorted(context["sources"]) == ["b.txt", "d.txt"]
+
+
+def test_few_summarized_documents_are_not_routed(store, corpus):
+    store.add_documents_from_files(corpus({"a.txt": FILES["a.txt"]}), "alice")
+
+    assert store._route(summary_query(store, "a.txt"), "alice") is None
+
+
+def test_failed_summary_falls_back_to_the_extract(make_store, corpus, monkeypatch):
+    monkeypatch.setenv("DOCUMENT_SUMMARIES", "llm")
+
+    def failing(file_name, text):
+        raise RuntimeError("LLM indisponible")
+
+    store = make_store(summarizer=failing)
+    store.add_documents_from_files(corpus({"a.txt": FILES["a.txt"]}), "alice")
+
+    stored = store.summary_index.collection.get(include=["metadatas"])["metadatas"]
+    assert [metadata["summary_method"] for metadata in stored] == ["extract"]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.domain.services import embedding_projection
+from src.domain.services.embedding_projection import (
+    EmbeddingProjection, pending_projection_path, project_collection, projection_path
+)
+
+TEXT = "\n\n".join(f"Chapitre {i}. " + f"Le circulateur {i} alimente le plancher chauffant de la zone {i}. " * 8
+                   for i in range(12))
+
+
+@pytest.fixture
+def store(make_store, corpus):
+    store = make_store()
+    store.add_documents_from_files(corpus({"plancher.txt": TEXT}), "alice")
+    return store
+
+
+def fit(store, dimension=4):
+    vectors = np.asarray(store.collection.get(include=["embeddings"])["embeddings"])
+    return EmbeddingProjection.fit_pca(vectors, dimension, store.embedding_port.get_model_name())
+
+
+def test_projected_store_is_reloaded(store, make_store, tmp_path):
+    projection = fit(store)
+
+    project_collection(store.client, store.collection_name, projection, store.persist_directory)
+
+    assert projection_path(store.persist_directory, store.collection_name).exists()
+    assert not pending_projection_path(store.persist_directory, store.collection_name).exists()
+    reloaded = make_store()
+    assert reloaded.projection.name == projection.name
+    assert reloaded.search_with_metadata("circulateur", "alice", n_results=3)["ids"][0]
+
+
+@pytest.mark.parametrize("crash_after_swap", [True, False])
+def test_interrupted_projection_is_recovered(store, make_store, monkeypatch, crash_after_swap):
+    projection = fit(store)
+    rebuild = embedding_projection.rebuild_collection
+
+    def crashing(client, name, **kwargs):
+        if crash_after_swap:
+            rebuild(client, name, **kwargs)
+        raise KeyboardInterrupt("arrêt pendant la projection")
+
+    monkeypatch.setattr(embedding_projection, "rebuild_collection", crashing)
+    with pytest.raises(KeyboardInterrupt):
+        project_collection(store.client, store.collection_name, projection, store.persist_directory)
+    assert pending_projection_path(store.persist_directory, store.collection_name).exists()
+
+    # Au redémarrage: la projection suit toujours les vecteurs de la collection
+    reloaded = make_store()
+    assert (reloaded.projection is not None) == crash_after_swap
+    assert not pending_projection_path(store.persist_directory, store.collection_name).exists()
+    assert reloaded.search_with_metadata("circulateur", "alice", n_results=3)["ids"][0]
+
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from src.domain.services.embedding_scheduler import BULK, INTERACTIVE, EmbeddingScheduler, embedding_priority
+
+
+class SteppedEmbedder:
+    """Modèle piloté par le test: chaque appel à encode attend `step()` pour se terminer"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = []
+        self._started = threading.Semaphore(0)
+        self._proceed = threading.Semaphore(0)
+
+    def encode(self, texts):
+        self.calls.append(texts)
+        self._started.release()
+        assert self._proceed.acquire(timeout=5), "appel jamais libéré"
+        return self.inner.encode(texts)
+
+    def wait_started(self):
+        assert self._started.acquire(timeout=5), "aucun appel démarré"
+
+    def step(self):
+        self._proceed.release()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition jamais atteinte"
+        time.sleep(0.001)
+
+
+class Harness:
+    """Lance des appels à encode dans des threads et sert le modèle appel par appel"""
+
+    def __init__(self, embedder, **kwargs):
+        self.model = SteppedEmbedder(embedder)
+        self.scheduler = EmbeddingScheduler(self.model, **kwargs)
+        self.threads = []
+        self.results = {}
+
+    def submit(self, name, texts, priority=INTERACTIVE, tenant=None):
+        def run():
+            with embedding_priority(priority, tenant):
+                self.results[name] = self.scheduler.encode(texts)
+
+        waiting, calls = len(self.scheduler._waiters), len(self.model.calls)
+        thread = threading.Thread(target=run, daemon=True)
+        self.threads.append(thread)
+        thread.start()
+        # En file (ou servi) avant l'appel suivant: l'ordre de soumission est fixé
+        wait_for(lambda: len(self.scheduler._waiters) > waiting or len(self.model.calls) > calls)
+
+    def _settled(self):
+        # Tous les threads encore vivants, sauf celui servi, attendent leur prochain lot
+        alive = [thread for thread in self.threads if thread.is_alive()]
+        return len(self.scheduler._waiters) >= len(alive) - 1
+
+    def run(self):
+        """Sert tous les appels; retourne le premier texte de chaque lot, dans l'ordre de service"""
+        def running():
+            return any(thread.is_alive() for thread in self.threads)
+
+        while running():
+            wait_for(self._settled)
+            served = len(self.model.calls)
+            self.model.step()
+            wait_for(lambda: len(self.model.calls) > served or not running())
+        return [texts[0] for texts in self.model.calls]
+
+
+def texts(prefix, count):
+    return [f"{prefix}{i}" for i in range(count)]
+
+
+def test_results_match_the_model(embedder):
+    scheduler = EmbeddingScheduler(embedder, bulk_slice_size=3)
+    batch = texts("chunk ", 10)
+
+    with embedding_priority(BULK, "alice"):
+        assert scheduler.encode(batch) == embedder.encode(batch)
+    assert scheduler.encode(["question"]) == embedder.encode(["question"])
+    assert scheduler.encode([]) == []
+    assert scheduler.get_model_name() == embedder.get_model_name()
+
+
+def test_question_preempts_ingestion_at_slice_boundary(embedder):
+    harness = Harness(embedder, bulk_slice_size=2)
+    harness.submit("ingestion", texts("b", 6), BULK, "alice")
+    harness.model.wait_started()
+    harness.submit("question", ["q"])
+
+    order = harness.run()
+
+    # La question passe dès la fin de la tranche en cours, pas à la fin de l'ingestion
+    assert order == ["b0", "q", "b2", "b4"]
+    assert [len(call) for call in harness.model.calls] == [2, 1, 2, 2]
+    assert harness.results["ingestion"] == embedder.encode(texts("b", 6))
+
+
+def test_tenants_share_the_model_fairly(embedder):
+    harness = Harness(embedder, bulk_slice_size=2)
+    harness.submit("blocker", ["q"])
+    harness.model.wait_started()
+    # alice ingère deux fichiers en parallèle, bob un seul
+    harness.submit("alice-1", texts("a", 4), BULK, "alice")
+    harness.submit("alice-2", texts("c", 4), BULK, "alice")
+    harness.submit("bob", texts("b", 4), BULK, "bob")
+
+    order = harness.run()
+
+    # Part égale par utilisateur, pas par fichier: bob a une tranche sur deux tant que les deux ingèrent
+    assert order == ["q", "a0", "b0", "c0", "b2", "a2", "c2"]
+
+
+def test_interactive_streak_lets_a_slice_through(embedder):
+    harness = Harness(embedder, bulk_slice_size=2, max_interactive_streak=2)
+    harness.submit("ingestion", texts("b", 4), BULK, "alice")
+    harness.model.wait_started()
+    for i in range(4):
+        harness.submit(f"q{i}", [f"q{i}"])
+
+    order = harness.run()
+
+    assert order == ["b0", "q0", "q1", "b2", "q2", "q3"]
+
+
+def test_priority_context():
+    with pytest.raises(ValueError):
+        with embedding_priority("urgent"):
+            pass
+
+
+def test_from_env(embedder, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_BULK_SLICE_SIZE", "8")
+    monkeypatch.setenv("EMBEDDING_MAX_INTERACTIVE_STREAK", "0")
+
+    scheduler = EmbeddingScheduler.from_env(embedder)
+
+    assert scheduler.bulk_slice_size == 8
+    assert scheduler.max_interactive_streak == 1
@@ -0,0 +1,180 @@
+import threading
+import time
+
+import chromadb
+import numpy as np
+import pytest
+
+from src.domain.services.exact_index import ExactTenantIndex
+from src.domain.services.file_index import FileChunkIndex
+
+
+def add_chunks(collection, user_id, start, count, file_name="doc.pdf", dimension=8):
+    rng = np.random.default_rng(start)
+    ids = [f"{user_id}-{i}" for i in range(start, start + count)]
+    vectors = rng.normal(size=(count, dimension)).astype(np.float32)
+    collection.add(ids=ids, embeddings=vectors.tolist(), documents=[f"texte {chunk_id}" for chunk_id in ids],
+                   metadatas=[{"user_id": user_id, "source_file": file_name} for _ in ids])
+    return ids, vectors
+
+
+def make_index(client, name, tmp_path, space="l2", max_chunks=100):
+    collection = client.get_or_create_collection(name, configuration={"hnsw": {"space": space}})
+    index = ExactTenantIndex(collection, FileChunkIndex(collection), directory=str(tmp_path / "exact" / name),
+                             max_chunks=max_chunks, space=space)
+    return collection, index
+
+
+@pytest.fixture
+def client(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+
+
+@pytest.mark.parametrize("space", ["l2", "cosine", "ip"])
+def test_results_match_chroma(client, tmp_path, space):
+    collection, index = make_index(client, f"docs-{space}", tmp_path, space)
+    add_chunks(collection, "alice", 0, 40)
+    add_chunks(collection, "bob", 100, 40)
+    queries = np.random.default_rng(7).normal(size=(3, 8)).tolist()
+
+    exact = index.search("alice", queries, 5)
+    expected = collection.query(query_embeddings=queries, n_results=5, where={"user_id": "alice"},
+                                include=["documents", "metadatas", "distances"])
+
+    assert exact["ids"] == expected["ids"]
+    assert exact["documents"] == expected["documents"]
+    np.testing.assert_allclose(np.array(exact["distances"]), np.array(expected["distances"]), rtol=1e-4, atol=1e-4)
+
+
+def test_file_filter_and_embeddings(client, tmp_path):
+    collection, index = make_index(client, "docs", tmp_path)
+    add_chunks(collection, "alice", 0, 20, file_name="a.pdf")
+    b_ids, b_vectors = add_chunks(collection, "alice", 20, 5, file_name="b.pdf")
+
+    results = index.search("alice", [b_vectors[2].tolist()], 3, chunk_ids=b_ids, include_embeddings=True)
+
+    assert set(results["ids"][0]) <= set(b_ids)
+    assert results["ids"][0][0] == b_ids[2]
+    np.testing.assert_allclose(results["embeddings"][0][0], b_vectors[2], rtol=1e-6)
+
+
+def test_large_or_unknown_users_fall_back_to_chroma(client, tmp_path):
+    collection, index = make_index(client, "docs", tmp_path, max_chunks=10)
+    add_chunks(collection, "alice", 0, 11)
+
+    assert index.search("alice", [[0.0] * 8], 3) is None
+    assert index.search("nobody", [[0.0] * 8], 3) is None
+
+
+def test_persisted_matrix_is_reused(client, tmp_path, monkeypatch):
+    collection, index = make_index(client, "docs", tmp_path)
+    add_chunks(collection, "alice", 0, 20)
+    first = index.search("alice", [[0.1] * 8], 5)
+
+    # Nouveau processus: même dossier, index fichiers rechargé depuis la collection
+    _, reloaded = make_index(client, "docs", tmp_path)
+    builds = []
+    monkeypatch.setattr(reloaded, "_build", lambda user_id: builds.append(user_id))
+
+    assert reloaded.search("alice", [[0.1] * 8], 5)["ids"] == first["ids"]
+    assert builds == []
+
+
+def test_stale_matrix_with_same_count_is_rebuilt(client, tmp_path):
+    collection, index = make_index(client, "docs", tmp_path)
+    ids, _ = add_chunks(collection, "alice", 0, 20)
+    index.search("alice", [[0.1] * 8], 5)
+
+    # Un autre processus supprime 3 chunks et en ajoute 3 autres: même nombre, contenu différent
+    collection.delete(ids=ids[:3])
+    new_ids, new_vectors = add_chunks(collection, "alice", 500, 3)
+
+    _, reloaded = make_index(client, "docs", tmp_path)
+    results = reloaded.search("alice", [new_vectors[0].tolist()], 20)
+
+    assert results["ids"][0][0] == new_ids[0]
+    assert results["documents"][0][0] == f"texte {new_ids[0]}"
+    assert not set(ids[:3]) & set(results["ids"][0])
+
+
+def test_invalidate_rebuilds_after_write(client, tmp_path):
+    collection, index = make_index(client, "docs", tmp_path)
+    add_chunks(collection, "alice", 0, 10)
+    index.search("alice", [[0.1] * 8], 5)
+
+    new_ids, new_vectors = add_chunks(collection, "alice", 10, 2)
+    index.file_index.add("alice", ["doc.pdf"] * 2, new_ids)
+    index.invalidate("alice")
+
+    assert index.search("alice", [new_vectors[1].tolist()], 1)["ids"] == [[new_ids[1]]]
+
+
+def test_old_versions_stay_readable_until_the_next_build(client, tmp_path):
+    collection, index = make_index(client, "docs", tmp_path)
+    add_chunks(collection, "alice", 0, 10)
+    index.search("alice", [[0.1] * 8], 5)
+    old = index._tenants["alice"]
+
+    new_ids, _ = add_chunks(collection, "alice", 10, 2)
+    index.file_index.add("alice", ["doc.pdf"] * 2, new_ids)
+    index.invalidate("alice")
+    # Invalidation: rien n'est supprimé sur disque
+    assert old.directory.exists()
+
+    index.search("alice", [[0.1] * 8], 5)
+
+    # Nouvelle version publiée à côté, l'ancienne supprimée mais encore lisible par qui la tenait
+    assert [entry.name for entry in index._user_dir("alice").iterdir()] == [index._tenants["alice"].directory.name]
+    assert not old.directory.exists()
+    assert old.read_records([0])[0]["document"] == "texte alice-0"
+
+
+def test_writing_defers_rebuild_to_the_end(client, tmp_path, monkeypatch):
+    collection, index = make_index(client, "docs", tmp_path)
+    add_chunks(collection, "alice", 0, 10)
+    builds = []
+    build = index._build
+    monkeypatch.setattr(index, "_build", lambda user_id: builds.append(user_id) or build(user_id))
+    index.search("alice", [[0.1] * 8], 5)
+
+    with index.writing("alice"):
+        for start in (10, 12, 14):
+            ids, _ = add_chunks(collection, "alice", start, 2)
+            index.file_index.add("alice", ["doc.pdf"] * 2, ids)
+            # Écriture en cours: Chroma répond
+            assert index.search("alice", [[0.1] * 8], 5) is None
+
+    assert len(index.search("alice", [[0.1] * 8], 20)["ids"][0]) == 16
+    assert builds == ["alice", "alice"]
+
+
+def test_concurrent_searches_during_rebuilds(client, tmp_path):
+    collection, index = make_index(client, "docs", tmp_path)
+    add_chunks(collection, "alice", 0, 10)
+    errors, answered = [], []
+    stop = threading.Event()
+
+    def search():
+        while not stop.is_set():
+            try:
+                results = index.search("alice", [[0.1] * 8], 5)
+                if results is not None:
+                    answered.append(len(results["ids"][0]))
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for start in range(10, 40, 2):
+        with index.writing("alice"):
+            ids, _ = add_chunks(collection, "alice", start, 2)
+            index.file_index.add("alice", ["doc.pdf"] * 2, ids)
+        time.sleep(0.01)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert answered and set(answered) == {5}
+    assert len(list(index._user_dir("alice").iterdir())) <= 1 + len(threads)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.application.adapters.ai_chat import fake
+from src.application.adapters.ai_chat.factory import create_ai_connector
+from src.application.adapters.ai_chat.fake import FakeAiConnector
+from src.application.adapters.embeding import fakeEmbeding
+from src.application.adapters.embeding.factory import create_embedding_adapter
+from src.application.adapters.embeding.fakeEmbeding import FakeEmbeddingAdapter
+from src.tools.metrics import LLM_TOKENS
+
+
+class SleepRecorder:
+    """Remplace le module time des adaptateurs simulés: les attentes sont relevées, pas subies"""
+
+    def __init__(self):
+        self.sleeps = []
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorder = SleepRecorder()
+    monkeypatch.setattr(fake, "time", recorder)
+    monkeypatch.setattr(fakeEmbeding, "time", recorder)
+    return recorder.sleeps
+
+
+def test_fake_llm_is_deterministic_and_paced(sleeps):
+    connector = FakeAiConnector(latency=0.2, tokens_per_second=10, completion_tokens=10)
+    out_tokens = LLM_TOKENS.get(backend="fake", direction="out")
+
+    tokens = list(connector.stream_response_with_context("Pression du circuit ?", "contexte"))
+
+    assert "".join(tokens) == connector.response_with_context("Pression du circuit ?", "contexte")
+    assert "".join(tokens) == "<p>Réponse simulée à : Pression du circuit ?</p> lorem lorem"
+    assert len(tokens) == 10
+    # Latence avant le premier token puis un token tous les 1/débit
+    assert sleeps[:11] == [0.2] + [0.1] * 10
+    assert LLM_TOKENS.get(backend="fake", direction="out") == out_tokens + 20
+
+
+def test_fake_llm_truncates_to_completion_tokens(sleeps):
+    connector = FakeAiConnector(latency=0, tokens_per_second=0, completion_tokens=2)
+
+    assert connector.summarize_text("notice.pdf", "texte") == "Résumé de"
+    assert sleeps == [0]
+
+
+def test_fake_llm_reads_env(monkeypatch):
+    monkeypatch.setenv("FAKE_LLM_LATENCY", "0.01")
+    monkeypatch.setenv("FAKE_LLM_COMPLETION_TOKENS", "3")
+
+    connector = create_ai_connector("fake")
+
+    assert isinstance(connector, FakeAiConnector)
+    assert (connector.latency, connector.completion_tokens) == (0.01, 3)
+    with pytest.raises(Exception):
+        FakeAiConnector(completion_tokens=0)
+
+
+def test_fake_embeddings_are_deterministic_unit_vectors(sleeps):
+    embedder = FakeEmbeddingAdapter(dimension=32, cost_per_call=0.01, cost_per_text=0.002)
+
+    vectors = np.array(embedder.encode(["vanne", "pompe", "vanne"]))
+
+    assert vectors.shape == (3, 32)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert (vectors[0] == vectors[2]).all() and not np.allclose(vectors[0], vectors[1])
+    # Même texte, autre instance: même vecteur
+    assert FakeEmbeddingAdapter(dimension=32).encode(["vanne"])[0] == vectors[0].tolist()
+    assert sleeps[0] == pytest.approx(0.016)
+
+
+def test_fake_embedding_model_info(monkeypatch):
+    monkeypatch.setenv("FAKE_EMBEDDING_DIM", "24")
+
+    embedder = create_embedding_adapter("fake")
+
+    assert isinstance(embedder, FakeEmbeddingAdapter)
+    assert embedder.get_model_name() == "fake-24d"
+    assert embedder.get_token_counter()("un deux  trois") == 3
+    assert embedder.get_max_tokens() == 256
+
+
+@pytest.mark.parametrize("factory", [create_ai_connector, create_embedding_adapter])
+def test_unknown_backend_is_rejected(factory):
+    with pytest.raises(ValueError):
+        factory("inconnu")
@@ -0,0 +1,84 @@
+import chromadb
+import pytest
+
+from src.domain.services.file_index import FileChunkIndex, ids_fingerprint
+
+TEXT = "\n\n".join(f"Chapitre {i}. " + f"Le thermostat {i} commande la vanne trois voies du circuit. " * 12
+                   for i in range(4))
+
+
+@pytest.fixture
+def collection(tmp_path):
+    collection = chromadb.PersistentClient(path=str(tmp_path / "chroma")).get_or_create_collection("documents")
+    collection.add(ids=["a1", "a2", "b1", "x1"], embeddings=[[float(i), 0.0] for i in range(4)],
+                   documents=["a", "a", "b", "x"],
+                   metadatas=[{"user_id": "alice", "source_file": "a.pdf"}, {"user_id": "alice", "source_file": "a.pdf"},
+                              {"user_id": "alice", "source_file": "b.pdf"}, {"user_id": "bob", "source_file": "a.pdf"}])
+    return collection
+
+
+def test_index_is_built_from_the_collection_on_demand(collection):
+    index = FileChunkIndex(collection)
+    assert index.peek_count("alice") is None and index.peek_chunk_ids("alice", "a.pdf") is None
+
+    assert sorted(index.get_chunk_ids("alice", "a.pdf")) == ["a1", "a2"]
+    assert index.get_files("alice") == ["a.pdf", "b.pdf"]
+    assert index.count("alice") == 3 and index.peek_count("alice", "b.pdf") == 1
+    assert index.get_chunk_ids("alice", "inconnu.pdf") == []
+    assert index.get_chunk_ids("bob", "a.pdf") == ["x1"]
+
+
+def test_add_and_remove_keep_a_loaded_index_up_to_date(collection):
+    index = FileChunkIndex(collection)
+    # Index non chargé: l'ajout est ignoré, la prochaine lecture part de la collection
+    index.add("alice", ["c.pdf"], ["c1"])
+    assert index.get_files("alice") == ["a.pdf", "b.pdf"]
+
+    index.add("alice", ["c.pdf", "c.pdf"], ["c1", "c2"])
+    assert sorted(index.peek_chunk_ids("alice", "c.pdf")) == ["c1", "c2"]
+    index.remove_file("alice", "a.pdf")
+    assert index.get_files("alice") == ["b.pdf", "c.pdf"]
+
+    index.clear("alice")
+    assert index.peek_count("alice") is None
+    assert index.count("alice") == 3
+
+
+def test_fingerprint_depends_on_ids_not_order(collection):
+    index = FileChunkIndex(collection)
+
+    assert index.fingerprint("alice") == ids_fingerprint(["b1", "a2", "a1"])
+    assert ids_fingerprint(["a", "bc"]) != ids_fingerprint(["ab", "c"])
+    index.add("alice", ["b.pdf"], ["b2"])
+    assert index.fingerprint("alice") != ids_fingerprint(["a1", "a2", "b1"])
+
+
+@pytest.fixture(params=["exact", "chroma"])
+def filtered_store(request, make_store, corpus, monkeypatch):
+    # Recherche exacte en mémoire ou index HNSW de Chroma: même filtre par fichier
+    monkeypatch.setenv("EXACT_SEARCH_MAX_CHUNKS", "5000" if request.param == "exact" else "0")
+    store = make_store()
+    store.add_documents_from_files(corpus({"a.txt": TEXT, "b.txt": TEXT.upper()}), "alice")
+    store.add_documents_from_files(corpus({"c.txt": TEXT}), "bob")
+    return store
+
+
+def test_file_filter_restricts_candidates(filtered_store):
+    query = filtered_store.embedding_port.encode(["thermostat"])
+    b_ids = filtered_store.file_index.get_chunk_ids("alice", "b.txt")
+
+    results = filtered_store._query(query, "alice", 50, file_filter="b.txt")
+
+    # n_results ramené au nombre de chunks du fichier
+    assert sorted(results["ids"][0]) == sorted(b_ids)
+    assert {metadata["source_file"] for metadata in results["metadatas"][0]} == {"b.txt"}
+
+
+def test_routed_files_and_unknown_file(filtered_store):
+    query = filtered_store.embedding_port.encode(["thermostat"])
+
+    routed = filtered_store._query(query, "alice", 50, files=["a.txt", "b.txt"])
+    assert len(routed["ids"][0]) == filtered_store.get_collection_size("alice")
+
+    empty = filtered_store._query(query, "alice", 5, file_filter="c.txt", include_embeddings=True)
+    assert empty["ids"] == [[]] and empty["embeddings"] == [[]]
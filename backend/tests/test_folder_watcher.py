@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+from src.domain.services.folder_watcher import FolderWatcher
+
+TEXT = "Le compresseur aspire le fluide frigorigène et le refoule vers le condenseur. " * 20
+
+
+@pytest.fixture
+def folder(tmp_path):
+    directory = tmp_path / "watched"
+    directory.mkdir()
+    return directory
+
+
+@pytest.fixture
+def make_watcher(make_store, folder, tmp_path):
+    store = make_store()
+
+    def make():
+        watcher = FolderWatcher(folder, store, "alice", tmp_path / "watcher_state.json",
+                                extensions=("txt",), debounce=0, use_inotify=False)
+        store.delete_listeners.append(watcher.exclude)
+        # Comme start(), sans le thread de surveillance: les tests appellent sync() eux-mêmes
+        watcher._load_state()
+        return watcher
+    return make
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_added_modified_and_deleted_files(make_watcher, folder):
+    watcher = make_watcher()
+    store = watcher.vector_store
+    write(folder / "a.txt", TEXT)
+    (folder / "sub").mkdir()
+    write(folder / "sub" / "b.txt", TEXT)
+    write(folder / "ignored.md", TEXT)
+
+    assert watcher.sync() == {"added": 2, "modified": 0, "deleted": 0}
+    assert sorted(store.get_file_list("alice")) == ["a.txt", "sub/b.txt"]
+
+    write(folder / "a.txt", TEXT + " Nouvelle section.", mtime_ns=1_000)
+    (folder / "sub" / "b.txt").unlink()
+    assert watcher.sync() == {"added": 0, "modified": 1, "deleted": 1}
+    assert store.get_file_list("alice") == ["a.txt"]
+    assert watcher.sync() == {"added": 0, "modified": 0, "deleted": 0}
+
+
+def test_restart_does_not_reingest(make_watcher, folder):
+    write(folder / "a.txt", TEXT)
+    make_watcher().sync()
+
+    restarted = make_watcher()
+    assert restarted.sync() == {"added": 0, "modified": 0, "deleted": 0}
+
+
+def test_api_deletion_is_not_reingested(make_watcher, folder):
+    watcher = make_watcher()
+    store = watcher.vector_store
+    write(folder / "a.txt", TEXT)
+    write(folder / "b.txt", TEXT)
+    watcher.sync()
+
+    store.delete_file_chunks("a.txt", "alice")
+    assert watcher.sync() == {"added": 0, "modified": 0, "deleted": 0}
+    assert store.get_file_list("alice") == ["b.txt"]
+    assert watcher.status()["excluded_files"] == ["a.txt"]
+
+    # Exclusion persistée: un redémarrage ne réingère pas non plus
+    store.clear_collection("alice")
+    restarted = make_watcher()
+    assert restarted.sync() == {"added": 0, "modified": 0, "deleted": 0}
+    assert store.get_file_list("alice") == []
+
+    # Réingestion explicite
+    assert restarted.reingest("b.txt")["added"] == 1
+    assert store.get_file_list("alice") == ["b.txt"]
+    assert restarted.status()["excluded_files"] == ["a.txt"]
+
+
+def test_modified_excluded_file_is_ingested_again(make_watcher, folder):
+    watcher = make_watcher()
+    write(folder / "a.txt", TEXT)
+    watcher.sync()
+    watcher.vector_store.delete_file_chunks("a.txt", "alice")
+
+    write(folder / "a.txt", TEXT + " Révision B.", mtime_ns=1_000)
+
+    assert watcher.sync()["modified"] == 1
+    assert watcher.vector_store.get_file_list("alice") == ["a.txt"]
+    assert watcher.status()["excluded_files"] == []
+
+
+def test_other_users_deletions_are_ignored(make_watcher, folder):
+    watcher = make_watcher()
+    write(folder / "a.txt", TEXT)
+    watcher.sync()
+
+    watcher.exclude("bob", "a.txt")
+
+    assert watcher.status()["excluded_files"] == []
+
+
+def test_same_name_in_two_subfolders(make_watcher, folder):
+    watcher = make_watcher()
+    store = watcher.vector_store
+    for sub in ("pompe", "vanne"):
+        (folder / sub).mkdir()
+        write(folder / sub / "manuel.txt", f"Manuel {sub}. " + TEXT)
+    watcher.sync()
+    assert store.get_file_list("alice") == ["pompe/manuel.txt", "vanne/manuel.txt"]
+
+    # Modifier l'un ne retire pas les chunks de l'autre
+    write(folder / "pompe" / "manuel.txt", "Manuel pompe, révision B. " + TEXT, mtime_ns=1_000)
+    assert watcher.sync()["modified"] == 1
+    assert store.count_chunks("alice", "vanne/manuel.txt") > 0
+    pompe = store.collection.get(where={"$and": [{"user_id": "alice"}, {"source_file": "pompe/manuel.txt"}]},
+                                 include=["documents"])
+    assert pompe["documents"][0].startswith("Manuel pompe, révision B.")
+
+    # Suppression par l'API: seul le fichier visé est exclu
+    store.delete_file_chunks("vanne/manuel.txt", "alice")
+    assert watcher.status()["excluded_files"] == ["vanne/manuel.txt"]
+    assert store.get_file_list("alice") == ["pompe/manuel.txt"]
+    assert watcher.reingest("vanne/manuel.txt")["added"] == 1
+    assert store.get_file_list("alice") == ["pompe/manuel.txt", "vanne/manuel.txt"]
@@ -0,0 +1,51 @@
+import chromadb
+import pytest
+
+from src.domain.services.hnsw_index import (
+    apply_hnsw_params, current_hnsw_params, hnsw_params_from_env, rebuild_collection
+)
+
+
+@pytest.fixture
+def client(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path))
+
+
+def test_params_from_env_with_overrides(monkeypatch):
+    monkeypatch.setenv("CHROMA_HNSW_SPACE", "cosine")
+    monkeypatch.setenv("CHROMA_HNSW_EF_SEARCH", "50")
+
+    assert hnsw_params_from_env(ef_search=80) == {"space": "cosine", "ef_search": 80}
+
+
+def test_unknown_space_is_rejected():
+    with pytest.raises(ValueError):
+        hnsw_params_from_env(space="manhattan")
+
+
+def test_collection_configuration_round_trip(client):
+    collection = client.get_or_create_collection(
+        "documents", configuration={"hnsw": {"space": "cosine", "ef_construction": 64, "max_neighbors": 8}}
+    )
+
+    params = current_hnsw_params(collection)
+    assert (params["space"], params["ef_construction"], params["max_neighbors"]) == ("cosine", 64, 8)
+
+    apply_hnsw_params(collection, {"ef_search": 42})
+    assert current_hnsw_params(client.get_collection("documents"))["ef_search"] == 42
+
+
+def test_rebuild_changes_construction_params_and_keeps_records(client):
+    collection = client.get_or_create_collection("documents", configuration={"hnsw": {"space": "l2"}})
+    collection.add(ids=[f"id-{i}" for i in range(30)], embeddings=[[float(i), 1.0, 0.0] for i in range(30)],
+                   documents=[f"doc {i}" for i in range(30)], metadatas=[{"user_id": "u"}] * 30)
+
+    rebuilt = rebuild_collection(client, "documents", params={"space": "cosine"}, page_size=7)
+
+    assert rebuilt.name == "documents"
+    assert current_hnsw_params(rebuilt)["space"] == "cosine"
+    assert rebuilt.count() == 30
+    assert rebuilt.get(ids=["id-12"])["documents"] == ["doc 12"]
+    # Recherche restreinte à des IDs (recherche par fichier)
+    found = rebuilt.query(query_embeddings=[[3.0, 1.0, 0.0]], n_results=2, ids=["id-3", "id-20"])
+    assert found["ids"][0][0] == "id-3"
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from sentence_transformers import SentenceTransformer, models
+from transformers import BertConfig, BertModel, BertTokenizer, BertTokenizerFast
+
+from src.application.adapters.embeding.localEmbeding import LocalEmbeddingAdapter
+from src.tools.metrics import EMBEDDING_TRUNCATED
+
+# Sans accents: le tokenizer BERT les retire avant de chercher les mots dans le vocabulaire
+WORDS = "la pompe a chaleur chauffe et refroidit le circuit vanne de purge du radiateur sous pression".split()
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+MAX_SEQ_LENGTH = 16
+TEXTS = [
+    "la pompe",
+    "la pompe a chaleur chauffe et refroidit le circuit",
+    "vanne",
+    "purge du radiateur sous pression",
+    # 14 mots + [CLS] et [SEP]: remplit exactement la fenêtre, sans troncature
+    " ".join(WORDS[:14]),
+    "le circuit de la pompe",
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """Petit modèle BERT aléatoire sauvegardé au format SentenceTransformer (sans téléchargement)"""
+    directory = tmp_path_factory.mktemp("tiny-bert")
+    vocab = list(dict.fromkeys(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *WORDS, *LETTERS,
+                                *(f"##{letter}" for letter in LETTERS)]))
+    (directory / "vocab.txt").write_text("\n".join(vocab), encoding="utf-8")
+
+    config = BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=64)
+    BertModel(config).save_pretrained(directory / "hf")
+    BertTokenizerFast(str(directory / "vocab.txt")).save_pretrained(directory / "hf")
+
+    transformer = models.Transformer(str(directory / "hf"), max_seq_length=MAX_SEQ_LENGTH)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension())
+    SentenceTransformer(modules=[transformer, pooling]).save(str(directory / "st"))
+    return directory
+
+
+@pytest.fixture
+def adapter(model_dir):
+    # Petit budget: plusieurs lots de longueurs différentes
+    return LocalEmbeddingAdapter(str(model_dir / "st"), token_budget=24)
+
+
+def reference(adapter, texts):
+    return adapter.model.encode(texts, convert_to_numpy=True)
+
+
+def test_bucketed_batches_match_sentence_transformer(adapter):
+    assert adapter.model.tokenizer.is_fast
+    features, truncated = adapter._tokenize(TEXTS)
+    assert truncated == 0 and len(features[4]["input_ids"]) == MAX_SEQ_LENGTH
+
+    lengths = [len(feature["input_ids"]) for feature in features]
+    batches = list(adapter._batches(np.argsort(lengths, kind="stable"), lengths))
+    assert len(batches) > 1
+
+    np.testing.assert_allclose(adapter.encode(TEXTS), reference(adapter, TEXTS), rtol=1e-4, atol=1e-5)
+
+
+def test_overflow_windows_keep_the_first_window(adapter):
+    long_text = " ".join(WORDS * 3)
+    texts = ["vanne", long_text, "la pompe"]
+    before = EMBEDDING_TRUNCATED.get(model=adapter.get_model_name())
+
+    features, truncated = adapter._tokenize(texts)
+
+    # Le texte long donne plusieurs fenêtres: seule la première est gardée, le texte compte une fois
+    windows = adapter.model.tokenizer(long_text, truncation=True, max_length=MAX_SEQ_LENGTH,
+                                      return_overflowing_tokens=True)["input_ids"]
+    assert len(windows) > 2 and truncated == 1
+    assert features[1]["input_ids"] == windows[0]
+    assert [len(feature["input_ids"]) for feature in features] == [3, MAX_SEQ_LENGTH, 4]
+
+    np.testing.assert_allclose(adapter.encode(texts), reference(adapter, texts), rtol=1e-4, atol=1e-5)
+    assert EMBEDDING_TRUNCATED.get(model=adapter.get_model_name()) == before + 1
+
+
+def test_slow_tokenizer_fallback(adapter, model_dir):
+    adapter.model.tokenizer = BertTokenizer(str(model_dir / "vocab.txt"))
+    texts = TEXTS + [" ".join(WORDS * 2)]
+
+    features, truncated = adapter._tokenize(texts)
+
+    assert not adapter.model.tokenizer.is_fast
+    assert truncated == 1 and len(features[-1]["input_ids"]) == MAX_SEQ_LENGTH
+    np.testing.assert_allclose(adapter.encode(texts), reference(adapter, texts), rtol=1e-4, atol=1e-5)
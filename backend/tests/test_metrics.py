@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+
+from src.tools import metrics
+from src.tools.metrics import MetricsRegistry, collect_timings, stage
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_and_gauge_render(registry):
+    requests = registry.counter("requests_total", "Requêtes", ["route"])
+    requests.inc(route="/ask")
+    requests.inc(2, route='/a"b')
+    in_flight = registry.gauge("in_flight", "En cours")
+    with in_flight.track_inprogress():
+        assert in_flight.get() == 1
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requêtes",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 2.0',
+        'requests_total{route="/ask"} 1.0',
+        "# HELP in_flight En cours",
+        "# TYPE in_flight gauge",
+        "in_flight 0.0",
+    ]
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = registry.histogram("duration_seconds", "Durée", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 3.0):
+        histogram.observe(value, stage="llm")
+
+    assert registry.render().splitlines()[2:] == [
+        'duration_seconds_bucket{stage="llm",le="0.1"} 1',
+        'duration_seconds_bucket{stage="llm",le="1.0"} 2',
+        'duration_seconds_bucket{stage="llm",le="+Inf"} 3',
+        'duration_seconds_sum{stage="llm"} 3.55',
+        'duration_seconds_count{stage="llm"} 3',
+    ]
+
+
+def test_labels_are_checked_and_metrics_registered_once(registry):
+    counter = registry.counter("hits_total", "Hits", ["cache"])
+
+    with pytest.raises(ValueError):
+        counter.inc(result="hit")
+    assert registry.counter("hits_total", "Autre doc", ["cache"]) is counter
+
+
+class Ticker:
+    """Remplace perf_counter: chaque lecture avance d'une seconde"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self) -> float:
+        self.now += 1.0
+        return self.now
+
+
+def test_stage_feeds_histogram_and_current_timings(monkeypatch):
+    monkeypatch.setattr(metrics, "time", Ticker())
+    before = metrics.STAGE_DURATION._counts.get(("test_stage",), [0])[-1]
+
+    with collect_timings() as timings:
+        with stage("test_stage"):
+            pass
+        with pytest.raises(RuntimeError):
+            with stage("test_stage"):
+                raise RuntimeError("échec")
+        with stage("other_stage"):
+            pass
+
+    # Durées cumulées par étape, y compris pour une étape en erreur
+    assert timings == {"test_stage": 2.0, "other_stage": 1.0}
+    assert metrics.STAGE_DURATION._counts[("test_stage",)][-1] == before + 2
+    # Hors relevé, l'étape alimente seulement l'histogramme
+    with stage("test_stage"):
+        pass
+    assert timings == {"test_stage": 2.0, "other_stage": 1.0}
+
+
+def test_timings_are_isolated_per_thread():
+    seen = {}
+
+    def request(name):
+        with collect_timings() as timings:
+            with stage(name):
+                pass
+            seen[name] = set(timings)
+
+    threads = [threading.Thread(target=request, args=(f"stage_{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == {f"stage_{i}": {f"stage_{i}"} for i in range(4)}
+
+
+def test_record_helpers():
+    hits = metrics.CACHE_REQUESTS.get(cache="test", result="hit")
+    tokens = metrics.LLM_TOKENS.get(backend="test", direction="out")
+
+    metrics.record_cache("test", True)
+    metrics.record_llm_usage("test", None, 7)
+
+    assert metrics.CACHE_REQUESTS.get(cache="test", result="hit") == hits + 1
+    assert metrics.LLM_TOKENS.get(backend="test", direction="out") == tokens + 7
+    assert metrics.LLM_TOKENS.get(backend="test", direction="in") == 0
+    assert 'chat_pdf_cache_requests_total{cache="test",result="hit"}' in metrics.registry.render()
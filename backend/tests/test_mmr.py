@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.domain.services.mmr import mmr_select
+
+QUERY = np.array([1.0, 0.0, 0.0])
+# Deux quasi-copies très proches de la question, puis un candidat moins proche mais différent
+CANDIDATES = np.array([
+    [0.95, 0.30, 0.0],
+    [0.94, 0.31, 0.01],
+    [0.80, 0.0, 0.60],
+    [0.10, 0.99, 0.0],
+])
+TEXT = "\n\n".join(f"Étape {i}. " + f"Remplacer le joint {i} et resserrer les colliers de la pompe. " * 12
+                   for i in range(2))
+
+
+def test_lambda_one_keeps_relevance_order():
+    assert mmr_select(QUERY, CANDIDATES, k=4, lambda_mult=1.0) == [0, 1, 2, 3]
+
+
+def test_diversity_skips_near_copies():
+    assert mmr_select(QUERY, CANDIDATES, k=2, lambda_mult=0.5) == [0, 2]
+    # Diversité seule: après le premier, le plus éloigné des retenus
+    assert mmr_select(QUERY, CANDIDATES, k=2, lambda_mult=0.0)[1] == 3
+
+
+def test_budget_excludes_candidates_that_no_longer_fit():
+    costs = np.array([500, 100, 450, 50])
+
+    assert mmr_select(QUERY, CANDIDATES, k=4, lambda_mult=1.0, costs=costs, budget=600) == [0, 1]
+    assert mmr_select(QUERY, CANDIDATES, k=4, lambda_mult=1.0, costs=costs, budget=300) == [1, 3]
+    # Sans coûts, le budget est ignoré
+    assert len(mmr_select(QUERY, CANDIDATES, k=4, budget=1)) == 4
+
+
+@pytest.mark.parametrize("candidates, k", [(np.zeros((0, 3)), 3), (CANDIDATES, 0)])
+def test_empty_selection(candidates, k):
+    assert mmr_select(QUERY, candidates, k=k) == []
+
+
+def test_k_larger_than_candidates():
+    assert sorted(mmr_select(QUERY, CANDIDATES, k=10, lambda_mult=0.5)) == [0, 1, 2, 3]
+
+
+@pytest.fixture
+def duplicated_store(make_store, corpus, monkeypatch):
+    # Même texte dans deux fichiers: chaque chunk existe en deux exemplaires de vecteur identique
+    def make(mmr_lambda):
+        monkeypatch.setenv("MMR_LAMBDA", str(mmr_lambda))
+        store = make_store()
+        if not store.get_collection_size("alice"):
+            store.add_documents_from_files(corpus({"a.txt": TEXT, "b.txt": TEXT}), "alice")
+        return store
+    return make
+
+
+def context_documents(store, result):
+    return store.collection.get(ids=result["chunk_ids"], include=["documents"])["documents"]
+
+
+def test_store_without_mmr_returns_both_copies(duplicated_store):
+    store = duplicated_store(1.0)
+    assert not store.mmr_enabled and store._fetch_count(2) == 2
+
+    result = store.get_context_for_query("joint de la pompe", "alice", n_results=2)
+
+    documents = context_documents(store, result)
+    assert len(documents) == 2 and documents[0] == documents[1]
+
+
+def test_store_with_mmr_returns_distinct_chunks(duplicated_store):
+    store = duplicated_store(0.1)
+    assert store.mmr_enabled and store._fetch_count(2) == 8
+
+    result = store.get_context_for_query("joint de la pompe", "alice", n_results=2)
+
+    documents = context_documents(store, result)
+    assert len(documents) == 2 and documents[0] != documents[1]
+    batch = store.get_contexts_for_queries(["joint de la pompe"], "alice", n_results=2)["results"][0]
+    assert batch["chunk_ids"] == result["chunk_ids"]
+
+
+def test_diversify_respects_context_budget(duplicated_store):
+    store = duplicated_store(0.5)
+    results = store._query(store.embedding_port.encode(["joint"]), "alice", 8, None, None, include_embeddings=True)
+
+    chunk = len(store._format_context_part(results["documents"][0][0], results["metadatas"][0][0])[0])
+    diversified = store._diversify(results, store.embedding_port.encode(["joint"]), 4, chunk + 1)
+
+    assert len(diversified["ids"][0]) == 1
+    assert len(diversified["embeddings"][0]) == 1
@@ -0,0 +1,141 @@
+import pytest
+
+from src.domain.services.near_duplicates import MinHasher, NearDuplicateIndex
+
+WARNING = ("Avertissement de sécurité: couper l'alimentation avant toute intervention sur le circuit, "
+           "porter des gants isolants et vérifier l'absence de tension avec un appareil adapté. ") * 3
+
+
+def section(topic):
+    return " ".join(f"{topic} paragraphe {i}: réglage {i * 7} du module {topic} et contrôle visuel." for i in range(10))
+
+
+@pytest.fixture
+def index(tmp_path):
+    return NearDuplicateIndex(str(tmp_path / "near_duplicates.sqlite3"), threshold=0.8)
+
+
+def chunk_batch(prefix, file_name, texts):
+    ids = [f"{prefix}-{i}" for i in range(len(texts))]
+    return ids, texts, [{"source_file": file_name, "chunk_id": i} for i in range(len(texts))]
+
+
+def test_minhash_estimates_similarity():
+    hasher = MinHasher()
+    base = section("pompe")
+
+    assert (hasher.signature(base) == MinHasher().signature(base)).all()
+    assert (hasher.signature(base) == hasher.signature(base.upper() + " !")).mean() == 1.0
+    edited = base.replace("réglage 35", "réglage 36")
+    assert (hasher.signature(base) == hasher.signature(edited)).mean() > 0.8
+    assert (hasher.signature(base) == hasher.signature(WARNING)).mean() < 0.1
+
+
+def test_duplicates_within_a_file_are_linked(index):
+    ids, texts, metadatas = chunk_batch("a", "a.pdf", [WARNING, section("pompe"), WARNING + " Page 2."])
+
+    kept, plan = index.filter("alice", ids, texts, metadatas)
+    index.register("alice", plan)
+
+    assert kept == [0, 1]
+    assert [(chunk_id, canonical) for chunk_id, canonical, _, _ in plan["links"]] == [("a-2", "a-0")]
+    # Contre l'index: le même avertissement du même fichier, ingéré plus tard
+    later_ids, later_texts, later_metadatas = chunk_batch("a2", "a.pdf", [WARNING])
+    assert index.filter("alice", later_ids, later_texts, later_metadatas)[0] == []
+    assert index.count_links("alice", "a.pdf") == 1
+
+
+def test_duplicates_across_files_are_linked(index):
+    index.register("alice", index.filter("alice", *chunk_batch("a", "a.pdf", [WARNING]))[1])
+
+    kept, plan = index.filter("alice", *chunk_batch("b", "b.pdf", [WARNING, section("filtre"), WARNING]))
+    index.register("alice", plan)
+
+    # Les deux avertissements de b.pdf sont liés au chunk de a.pdf, qui couvre désormais aussi b.pdf
+    assert kept == [1] and [link[1] for link in plan["links"]] == ["a-0", "a-0"]
+    assert index.canonical_ids("alice", "b.pdf") == ["a-0"]
+    assert index.linked_files("alice") == ["b.pdf"]
+    # Autre utilisateur: index séparé
+    assert index.filter("bob", *chunk_batch("a", "a.pdf", [WARNING]))[0] == [0]
+
+
+def test_links_to_unwritten_chunks_are_not_registered(index):
+    kept, plan = index.filter("alice", *chunk_batch("a", "a.pdf", [WARNING, WARNING]))
+
+    index.register("alice", plan, written_ids=set())
+
+    assert index.count_links("alice") == 0
+    assert index.filter("alice", *chunk_batch("c", "a.pdf", [WARNING]))[0] == [0]
+
+
+def test_delete_returns_cross_file_orphans(index):
+    index.register("alice", index.filter("alice", *chunk_batch("a", "a.pdf", [WARNING]))[1])
+    index.register("alice", index.filter("alice", *chunk_batch("b", "b.pdf", [WARNING]))[1])
+
+    orphans = index.delete("alice", "a.pdf")
+
+    assert orphans == [("b-0", WARNING, {"source_file": "b.pdf", "chunk_id": 0})]
+    assert index.count_links("alice") == 0
+    assert index.canonical_ids("alice", "b.pdf") == []
+    assert index.filter("alice", *chunk_batch("a", "a.pdf", [WARNING]))[0] == [0]
+
+
+def test_deleting_the_duplicate_file_keeps_the_canonical(index):
+    index.register("alice", index.filter("alice", *chunk_batch("a", "a.pdf", [WARNING]))[1])
+    index.register("alice", index.filter("alice", *chunk_batch("b", "b.pdf", [WARNING]))[1])
+
+    assert index.delete("alice", "b.pdf") == []
+    assert index.count_links("alice") == 0
+    assert index.filter("alice", *chunk_batch("c", "c.pdf", [WARNING]))[0] == []
+
+
+@pytest.fixture
+def dedup_store(make_store, corpus, monkeypatch):
+    monkeypatch.setenv("NEAR_DUPLICATE_THRESHOLD", "0.8")
+    store = make_store()
+    store.add_documents_from_files(corpus({
+        "a.txt": "\n\n".join([WARNING, section("pompe"), WARNING, section("vanne"), WARNING]),
+        "b.txt": "\n\n".join([WARNING, section("filtre")]),
+    }), "alice")
+    return store
+
+
+def warning_chunks(store, file_name):
+    stored = store.collection.get(where={"$and": [{"user_id": "alice"}, {"source_file": file_name}]},
+                                  include=["documents"])
+    return [document for document in stored["documents"] if document.startswith("Avertissement")]
+
+
+def test_file_scoped_search_keeps_shared_passages(dedup_store):
+    # Un seul avertissement vectorisé, dans a.txt: celui de b.txt y est lié
+    assert len(warning_chunks(dedup_store, "a.txt")) == 1
+    assert warning_chunks(dedup_store, "b.txt") == []
+    assert dedup_store.near_duplicates.count_links("alice", "a.txt") == 2
+    assert dedup_store.near_duplicates.count_links("alice", "b.txt") == 1
+
+    results = dedup_store.search_with_metadata(WARNING, "alice", n_results=5, file_filter="b.txt")
+    assert any(document.startswith("Avertissement") for document in results["documents"][0])
+    assert dedup_store.count_chunks("alice", "b.txt") == 2
+    assert dedup_store.count_chunks("alice", "a.txt") == 3
+
+
+def test_file_made_only_of_duplicates_stays_listed(dedup_store, corpus):
+    dedup_store.add_documents_from_files(corpus({"c.txt": WARNING}), "alice")
+
+    assert dedup_store.get_file_list("alice") == ["a.txt", "b.txt", "c.txt"]
+    assert dedup_store.count_chunks("alice", "c.txt") == 1
+    results = dedup_store.search_with_metadata(WARNING, "alice", n_results=5, file_filter="c.txt")
+    assert len(results["documents"][0]) == 1
+
+    dedup_store.delete_file_chunks("c.txt", "alice")
+    assert dedup_store.get_file_list("alice") == ["a.txt", "b.txt"]
+    assert len(warning_chunks(dedup_store, "a.txt")) == 1
+
+
+def test_deleting_a_file_keeps_the_other_files_chunks(dedup_store):
+    dedup_store.delete_file_chunks("a.txt", "alice")
+
+    # Le doublon de b.txt, lié au chunk supprimé, est réingéré dans b.txt
+    assert len(warning_chunks(dedup_store, "b.txt")) == 1
+    assert dedup_store.near_duplicates.count_links("alice") == 0
+    assert dedup_store.get_file_list("alice") == ["b.txt"]
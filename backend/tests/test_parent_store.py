@@ -0,0 +1,88 @@
+import pytest
+
+from src.domain.services.parent_store import ParentStore
+
+SECTIONS = [f"Section {i}. " + f"Le détendeur {i} régule la pression du circuit secondaire. " * 8 for i in range(6)]
+TEXT = "\n\n".join(SECTIONS)
+
+
+@pytest.fixture
+def parent_store(tmp_path):
+    return ParentStore(str(tmp_path / "parents.sqlite3"))
+
+
+def test_put_get_and_replace(parent_store):
+    parent_store.put("alice", [("p1", "texte 1", {"source_file": "a.pdf", "page": 2}),
+                               ("p2", "texte 2", {"source_file": "b.pdf"})])
+    parent_store.put("alice", [("p1", "texte 1 bis", {"source_file": "a.pdf", "page": 2})])
+
+    found = parent_store.get_many("alice", ["p1", "p1", "p2", "inconnu"])
+
+    assert found == {"p1": ("texte 1 bis", {"source_file": "a.pdf", "page": 2}),
+                     "p2": ("texte 2", {"source_file": "b.pdf"})}
+    assert parent_store.get_many("bob", ["p1"]) == {}
+    assert parent_store.get_many("alice", []) == {}
+
+
+def test_get_many_beyond_sqlite_parameter_limit(parent_store):
+    parent_store.put("alice", [(f"p{i}", f"texte {i}", {}) for i in range(1200)])
+
+    found = parent_store.get_many("alice", [f"p{i}" for i in range(1200)])
+
+    assert len(found) == 1200 and found["p1100"][0] == "texte 1100"
+
+
+def test_delete_by_file_and_user(parent_store):
+    parent_store.put("alice", [("p1", "a", {"source_file": "a.pdf"}), ("p2", "b", {"source_file": "b.pdf"})])
+    parent_store.put("bob", [("p1", "a", {"source_file": "a.pdf"})])
+
+    assert parent_store.delete("alice", "a.pdf") == 1
+    assert set(parent_store.get_many("alice", ["p1", "p2"])) == {"p2"}
+    assert parent_store.delete("alice") == 1
+    assert set(parent_store.get_many("bob", ["p1"])) == {"p1"}
+
+
+@pytest.fixture
+def parent_vector_store(make_store, corpus, monkeypatch):
+    monkeypatch.setenv("PARENT_CHUNK_SIZE", "600")
+    monkeypatch.setenv("CHILD_CHUNK_SIZE", "150")
+    monkeypatch.setenv("CHILD_CHUNK_OVERLAP", "0")
+    store = make_store()
+    store.add_documents_from_files(corpus({"manuel.txt": TEXT, "annexe.txt": TEXT.upper()}), "alice")
+    return store
+
+
+def test_children_point_to_stored_sections(parent_vector_store):
+    stored = parent_vector_store.collection.get(where={"user_id": "alice"}, include=["documents", "metadatas"])
+
+    assert all("parent_text" not in metadata for metadata in stored["metadatas"])
+    parent_ids = [metadata["parent_id"] for metadata in stored["metadatas"]]
+    # Plusieurs enfants par section
+    assert len(set(parent_ids)) < len(parent_ids)
+    parents = parent_vector_store.parent_store.get_many("alice", parent_ids)
+    assert set(parents) == set(parent_ids)
+    for document, parent_id in zip(stored["documents"], parent_ids):
+        assert document in parents[parent_id][0]
+        assert len(document) <= 150 < len(parents[parent_id][0]) <= 600
+
+
+def test_context_uses_each_section_once(parent_vector_store):
+    result = parent_vector_store.get_context_for_query("pression du détendeur", "alice", max_context_length=4000,
+                                                       n_results=4)
+
+    stored = parent_vector_store.collection.get(ids=result["chunk_ids"], include=["metadatas"])
+    parent_ids = [metadata["parent_id"] for metadata in stored["metadatas"]]
+    assert len(parent_ids) == len(set(parent_ids)) > 0
+    sections = parent_vector_store.parent_store.get_many("alice", parent_ids)
+    assert all(text in result["context"] for text, _ in sections.values())
+
+
+def test_deleting_a_file_deletes_its_sections(parent_vector_store):
+    stored = parent_vector_store.collection.get(where={"source_file": "manuel.txt"}, include=["metadatas"])
+    parent_ids = [metadata["parent_id"] for metadata in stored["metadatas"]]
+
+    parent_vector_store.delete_file_chunks("manuel.txt", "alice")
+
+    assert parent_vector_store.parent_store.get_many("alice", parent_ids) == {}
+    remaining = parent_vector_store.collection.get(where={"user_id": "alice"}, include=["metadatas"])
+    assert parent_vector_store.parent_store.get_many("alice", [m["parent_id"] for m in remaining["metadatas"]])
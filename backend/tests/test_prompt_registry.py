@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from src.domain.services.prompt_registry import DEFAULT_PROMPTS_DIR, PromptRegistry
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    write(tmp_path / "default" / "chat.txt", "Prompt chat par défaut\n")
+    write(tmp_path / "default" / "summary.txt", "Prompt résumé")
+    write(tmp_path / "juridique" / "chat.txt", "Prompt chat juridique")
+    return tmp_path
+
+
+def test_domain_template_and_fallback(prompts_dir):
+    registry = PromptRegistry(prompts_dir)
+
+    assert registry.get("chat") == "Prompt chat par défaut"
+    assert registry.get("chat", "juridique") == "Prompt chat juridique"
+    # Template absent du domaine, ou domaine inconnu: repli sur le domaine par défaut
+    assert registry.get("summary", "juridique") == "Prompt résumé"
+    assert registry.get("chat", "inconnu") == "Prompt chat par défaut"
+    assert registry.domains() == ["default", "juridique"]
+
+
+def test_missing_template_raises(prompts_dir):
+    with pytest.raises(KeyError):
+        PromptRegistry(prompts_dir).get("absent")
+
+
+def test_templates_are_loaded_once(prompts_dir, monkeypatch):
+    registry = PromptRegistry(prompts_dir, reload_interval=0)
+    registry.get("chat")
+
+    loads = []
+    monkeypatch.setattr(registry, "load", lambda: loads.append(1))
+    for _ in range(10):
+        registry.get("chat", "juridique")
+
+    # Fichiers inchangés: seule la signature (mtime, taille) est relue
+    assert loads == []
+
+
+def test_modified_template_is_reloaded(prompts_dir):
+    registry = PromptRegistry(prompts_dir, reload_interval=0)
+    assert registry.get("chat") == "Prompt chat par défaut"
+
+    path = prompts_dir / "default" / "chat.txt"
+    write(path, "Nouveau prompt chat")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    write(prompts_dir / "medical" / "chat.txt", "Prompt médical")
+
+    assert registry.get("chat") == "Nouveau prompt chat"
+    assert registry.get("chat", "medical") == "Prompt médical"
+
+
+def test_reload_is_throttled(prompts_dir):
+    registry = PromptRegistry(prompts_dir, reload_interval=3600)
+    registry.get("chat")
+
+    write(prompts_dir / "default" / "chat.txt", "Modifié")
+
+    assert registry.get("chat") == "Prompt chat par défaut"
+
+
+def test_shipped_prompts_are_complete():
+    registry = PromptRegistry(DEFAULT_PROMPTS_DIR)
+
+    for name in ("chat", "summary", "summary_map"):
+        assert registry.get(name)
@@ -0,0 +1,127 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.domain.services.hnsw_index import current_hnsw_params
+from src.domain.services.relevance import RelevanceGate, calibration_key, calibration_path, save_calibration
+
+TEXT = "\n\n".join(f"Procédure {i}. " + f"Purger le radiateur {i} puis contrôler la pression du circuit. " * 12
+                   for i in range(5))
+
+
+@pytest.mark.parametrize("max_distance, drop_off, distances, expected", [
+    (None, None, [0.1, 0.9, 5.0], 3),
+    (0.5, None, [0.1, 0.4, 0.6, 0.2], 2),
+    (None, 0.2, [0.3, 0.45, 0.55], 2),
+    (0.4, 0.5, [0.1, 0.35, 0.45], 2),
+    (0.5, None, [0.7, 0.8], 0),
+    (0.5, 0.1, [], 0),
+])
+def test_keep(max_distance, drop_off, distances, expected):
+    assert RelevanceGate(max_distance, drop_off).keep(distances) == expected
+
+
+def test_load_calibration_with_env_priority(tmp_path, monkeypatch):
+    monkeypatch.delenv("RELEVANCE_MAX_DISTANCE", raising=False)
+    monkeypatch.delenv("RELEVANCE_DROP_OFF", raising=False)
+    path = calibration_path(str(tmp_path))
+    save_calibration(path, "modèle-a", "cosine", {"max_distance": 0.42, "drop_off": 0.1})
+    save_calibration(path, "modèle-b", "cosine", {"max_distance": 0.9})
+
+    gate = RelevanceGate.load(path, "modèle-a", "cosine")
+    assert (gate.max_distance, gate.drop_off) == (0.42, 0.1)
+    # Calibration propre au modèle et à la distance
+    assert RelevanceGate.load(path, "modèle-a", "l2").max_distance is None
+    assert json.loads(path.read_text(encoding="utf-8"))[calibration_key("modèle-b", "cosine")]["max_distance"] == 0.9
+
+    monkeypatch.setenv("RELEVANCE_MAX_DISTANCE", "0.3")
+    gate = RelevanceGate.load(path, "modèle-a", "cosine")
+    assert (gate.max_distance, gate.drop_off) == (0.3, 0.1)
+
+
+def test_missing_calibration_keeps_everything(tmp_path, monkeypatch):
+    monkeypatch.delenv("RELEVANCE_MAX_DISTANCE", raising=False)
+    monkeypatch.delenv("RELEVANCE_DROP_OFF", raising=False)
+
+    gate = RelevanceGate.load(calibration_path(str(tmp_path)), "modèle", "l2")
+
+    assert gate.keep([10.0, 20.0]) == 2
+
+
+@pytest.fixture
+def gated_store(make_store, corpus, monkeypatch):
+    # Embedder par hash du texte: un chunk cherché avec son propre texte est à distance 0
+    monkeypatch.setenv("RELEVANCE_MAX_DISTANCE", "1e-6")
+    store = make_store()
+    store.add_documents_from_files(corpus({"radiateurs.txt": TEXT}), "alice")
+    return store
+
+
+def some_chunk(store):
+    return store.collection.get(where={"user_id": "alice"}, limit=1, include=["documents"])["documents"][0]
+
+
+def test_irrelevant_question_has_no_context(gated_store):
+    result = gated_store.get_context_for_query("Quelle est la capitale du Pérou ?", "alice")
+
+    assert result["relevant"] is False
+    assert result["context"] == "" and result["chunk_ids"] == []
+    assert result["best_distance"] > 1e-6
+
+
+def test_relevant_results_are_trimmed(gated_store):
+    chunk = some_chunk(gated_store)
+
+    result = gated_store.get_context_for_query(chunk, "alice", n_results=5)
+
+    assert result["relevant"] is True and result["best_distance"] == pytest.approx(0, abs=1e-6)
+    assert len(result["chunk_ids"]) == 1
+
+
+def test_batch_mixes_relevant_and_irrelevant_questions(gated_store):
+    chunk = some_chunk(gated_store)
+
+    results = gated_store.get_contexts_for_queries([chunk, "Quelle est la capitale du Pérou ?"], "alice")["results"]
+
+    assert [result["relevant"] for result in results] == [True, False]
+
+
+def test_gate_trims_numpy_embeddings(gated_store):
+    results = {
+        "ids": [["a", "b"], ["c"]],
+        "documents": [["doc a", "doc b"], ["doc c"]],
+        "metadatas": [[{}, {}], [{}]],
+        "distances": [[0.0, 0.5], [0.7]],
+        "embeddings": [np.ones((2, 4)), np.ones((1, 4))],
+    }
+
+    trimmed, counts, best = gated_store._gate(results)
+
+    assert counts == [1, 0] and best == [0.0, 0.7]
+    assert trimmed["ids"] == [["a"], []]
+    assert [len(embeddings) for embeddings in trimmed["embeddings"]] == [1, 0]
+
+
+def test_space_change_reloads_gate_and_summaries(make_store, corpus, monkeypatch):
+    monkeypatch.delenv("RELEVANCE_MAX_DISTANCE", raising=False)
+    monkeypatch.delenv("RELEVANCE_DROP_OFF", raising=False)
+    monkeypatch.setenv("DOCUMENT_SUMMARIES", "extract")
+    store = make_store()
+    path = calibration_path(store.persist_directory)
+    model_name = store.embedding_port.get_model_name()
+    save_calibration(path, model_name, "l2", {"max_distance": 0.8})
+    save_calibration(path, model_name, "cosine", {"max_distance": 0.05})
+    store = make_store()
+    store.add_documents_from_files(corpus({"radiateurs.txt": TEXT}), "alice")
+    assert store.relevance_gate.max_distance == 0.8
+
+    store.rebuild_index(space="cosine")
+
+    assert store.relevance_gate.max_distance == 0.05
+    assert current_hnsw_params(store.summary_index.collection)["space"] == "cosine"
+    assert store.summary_index.files("alice") == {"radiateurs.txt"}
+    # Persisté: un redémarrage retrouve la même distance pour les chunks et les résumés
+    restarted = make_store()
+    assert current_hnsw_params(restarted.summary_index.collection)["space"] == "cosine"
+    assert restarted.relevance_gate.max_distance == 0.05
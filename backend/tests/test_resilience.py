@@ -0,0 +1,269 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from src.application.adapters.ai_chat import resilience
+from src.application.adapters.ai_chat.resilience import UpstreamGuard, UpstreamUnavailableError
+
+
+class FakeClock:
+    """Remplace le module time de resilience: sleep avance l'horloge au lieu d'attendre"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", fake_clock)
+    return fake_clock
+
+
+@pytest.fixture
+def jitter_bounds(monkeypatch):
+    """Bornes demandées au tirage du backoff (la borne haute est renvoyée)"""
+    bounds = []
+
+    def uniform(low, high):
+        bounds.append((low, high))
+        return high
+
+    monkeypatch.setattr(resilience.random, "uniform", uniform)
+    return bounds
+
+
+def completion(server):
+    session = requests.Session()
+
+    def send():
+        response = session.post(f"{server.base_url}/chat/completions",
+                                json={"model": "fake-model", "messages": [{"role": "user", "content": "bonjour"}]},
+                                timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+    return send
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retryable_status_is_retried_with_full_jitter_backoff(fake_openai, clock, jitter_bounds, status):
+    fake_openai.fail_first, fake_openai.fail_status = 2, status
+    guard = UpstreamGuard("fake", max_retries=3, backoff_base=0.5, backoff_max=20.0)
+
+    result = guard.call(completion(fake_openai))
+
+    assert result["choices"][0]["message"]["content"]
+    assert fake_openai.requests_count == 3
+    assert jitter_bounds == [(0, 0.5), (0, 1.0)]
+    assert clock.sleeps == [0.5, 1.0]
+    assert guard.breaker.state == "closed"
+
+
+def test_backoff_is_capped(fake_openai, clock, jitter_bounds):
+    fake_openai.fail_first = 3
+    guard = UpstreamGuard("fake", max_retries=3, backoff_base=1.0, backoff_max=1.5)
+
+    guard.call(completion(fake_openai))
+
+    assert jitter_bounds == [(0, 1.0), (0, 1.5), (0, 1.5)]
+
+
+def test_retry_after_is_honoured(fake_openai, clock, jitter_bounds):
+    fake_openai.fail_first, fake_openai.fail_status, fake_openai.retry_after = 1, 429, 1.5
+    guard = UpstreamGuard("fake", max_retries=2, backoff_max=20.0)
+
+    guard.call(completion(fake_openai))
+
+    assert clock.sleeps == [1.5]
+    assert jitter_bounds == []
+
+
+def test_retry_after_is_capped_by_backoff_max(fake_openai, clock):
+    fake_openai.fail_first, fake_openai.fail_status, fake_openai.retry_after = 1, 503, 120
+    guard = UpstreamGuard("fake", max_retries=1, backoff_max=5.0)
+
+    guard.call(completion(fake_openai))
+
+    assert clock.sleeps == [5.0]
+
+
+def test_retries_exhausted_raise_last_error(fake_openai, clock):
+    fake_openai.fail_first = 10
+    guard = UpstreamGuard("fake", max_retries=2, failure_threshold=100)
+
+    with pytest.raises(requests.HTTPError):
+        guard.call(completion(fake_openai))
+
+    assert fake_openai.requests_count == 3
+
+
+@pytest.mark.parametrize("status", [400, 401, 404, 422])
+def test_client_error_is_not_retried_and_keeps_circuit_closed(fake_openai, clock, status):
+    fake_openai.fail_first, fake_openai.fail_status = 10, status
+    guard = UpstreamGuard("fake", max_retries=3, failure_threshold=1)
+
+    with pytest.raises(requests.HTTPError):
+        guard.call(completion(fake_openai))
+
+    assert fake_openai.requests_count == 1
+    assert clock.sleeps == []
+    assert guard.breaker.state == "closed"
+
+
+def test_breaker_opens_then_half_opens_then_closes(fake_openai, clock):
+    fake_openai.fail_first = 2
+    guard = UpstreamGuard("fake", max_retries=0, failure_threshold=2, reset_timeout=30.0)
+    send = completion(fake_openai)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            guard.call(send)
+    assert guard.breaker.state == "open"
+
+    # Circuit ouvert: rejet immédiat, sans appel à l'upstream
+    with pytest.raises(UpstreamUnavailableError):
+        guard.call(send)
+    assert fake_openai.requests_count == 2
+
+    clock.now += 30.0
+    assert guard.breaker.state == "half-open"
+    guard.call(send)
+    assert guard.breaker.state == "closed"
+    assert fake_openai.requests_count == 3
+
+
+def test_failed_trial_reopens_circuit(fake_openai, clock):
+    fake_openai.fail_first = 3
+    guard = UpstreamGuard("fake", max_retries=0, failure_threshold=2, reset_timeout=30.0)
+    send = completion(fake_openai)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            guard.call(send)
+    clock.now += 30.0
+
+    with pytest.raises(requests.HTTPError):
+        guard.call(send)
+    assert guard.breaker.state == "open"
+
+    clock.now += 30.0
+    guard.call(send)
+    assert guard.breaker.state == "closed"
+
+
+def test_concurrency_limit(fake_openai):
+    fake_openai.latency = 0.1
+    guard = UpstreamGuard("fake", max_concurrency=2)
+    send = completion(fake_openai)
+
+    threads = [threading.Thread(target=guard.call, args=(send,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake_openai.requests_count == 6
+    assert fake_openai.max_in_flight == 2
+
+
+def test_acquire_timeout_raises_unavailable(fake_openai):
+    fake_openai.latency = 0.5
+    guard = UpstreamGuard("fake", max_concurrency=1, acquire_timeout=0.05)
+    send = completion(fake_openai)
+
+    busy = threading.Thread(target=guard.call, args=(send,))
+    busy.start()
+    time.sleep(0.1)
+    with pytest.raises(UpstreamUnavailableError):
+        guard.call(send)
+    busy.join()
+
+    assert fake_openai.requests_count == 1
+    assert guard.breaker.state == "closed"
+
+
+def test_acquire_timeout_in_half_open_does_not_block_later_trials(fake_openai, clock):
+    guard = UpstreamGuard("fake", max_concurrency=1, acquire_timeout=0.05, failure_threshold=1, reset_timeout=30.0)
+    guard.breaker.record_failure()
+    clock.now += 30.0
+    assert guard.breaker.state == "half-open"
+
+    # Toutes les places sont prises: l'appel échoue sans consommer l'appel d'essai
+    guard._semaphore.acquire()
+    with pytest.raises(UpstreamUnavailableError):
+        guard.call(completion(fake_openai))
+    guard._semaphore.release()
+
+    guard.call(completion(fake_openai))
+    assert guard.breaker.state == "closed"
+    assert fake_openai.requests_count == 1
+
+
+def test_lm_studio_adapter_pools_connections_and_limits_concurrency(fake_openai, monkeypatch, tmp_path):
+    from src.application.adapters.ai_chat.LMStudio import LmStudioAdapter
+
+    monkeypatch.setenv("LM_MODEL", "fake-model")
+    monkeypatch.setenv("LM_STUDIO_URL", fake_openai.base_url)
+    monkeypatch.setenv("LM_STUDIO_API_KEY", "test")
+    monkeypatch.setenv("SUMMARY_CACHE_PATH", "")
+    fake_openai.latency = 0.1
+    adapter = LmStudioAdapter(max_concurrency=3)
+
+    assert adapter.session.get_adapter(fake_openai.base_url)._pool_maxsize == 3
+
+    answers = []
+    threads = [threading.Thread(target=lambda: answers.append(adapter.response_with_context("Question ?", "contexte")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(answers) == 8
+    assert all("Question" in answer for answer in answers)
+    assert fake_openai.max_in_flight == 3
+
+
+def test_client_error_leaves_breaker_state_unchanged(fake_openai, clock):
+    guard = UpstreamGuard("fake", max_retries=0, failure_threshold=2, reset_timeout=30.0)
+    send = completion(fake_openai)
+
+    # 500, 400, 500: l'erreur client ne remet pas le compteur d'échecs à zéro
+    for status in (500, 400, 500):
+        fake_openai.fail_first, fake_openai.fail_status = 1, status
+        fake_openai.requests_count = 0
+        with pytest.raises(requests.HTTPError):
+            guard.call(send)
+    assert guard.breaker.state == "open"
+
+    # Semi-ouvert: une erreur client libère l'essai sans refermer le circuit
+    clock.now += 30.0
+    fake_openai.fail_first, fake_openai.fail_status = 1, 404
+    fake_openai.requests_count = 0
+    with pytest.raises(requests.HTTPError):
+        guard.call(send)
+    assert guard.breaker.state == "half-open"
+    guard.call(send)
+    assert guard.breaker.state == "closed"
+
+
+def test_guard_from_env(monkeypatch):
+    monkeypatch.setenv("FAKE_MAX_CONCURRENCY", "3")
+    monkeypatch.setenv("FAKE_ACQUIRE_TIMEOUT", "2.5")
+
+    guard = resilience.guard_from_env("fake", "FAKE", max_retries=1)
+
+    assert (guard.max_concurrency, guard.max_retries, guard.acquire_timeout) == (3, 1, 2.5)
+    monkeypatch.delenv("FAKE_ACQUIRE_TIMEOUT")
+    assert resilience.guard_from_env("fake", "FAKE").acquire_timeout is None
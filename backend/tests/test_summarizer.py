@@ -0,0 +1,106 @@
+import hashlib
+import threading
+
+import pytest
+
+from src.domain.services.summarizer import MapReduceSummarizer, SummaryCache
+
+PARAGRAPHS = [" ".join(f"p{i}m{j}" for j in range(30)) for i in range(40)]
+TEXT = "\n\n".join(PARAGRAPHS)
+
+
+def word_count(text):
+    return len(text.split())
+
+
+class FakeLLM:
+    """Réponse déterministe de `words` mots par contenu (défaut: max_tokens); enregistre les appels"""
+
+    def __init__(self, words=None):
+        self.words = words
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, system_prompt, content, max_tokens):
+        with self._lock:
+            self.calls.append((content, max_tokens))
+            # Garde-fou: une réduction qui ne converge pas échoue au lieu de boucler
+            assert len(self.calls) < 500, "réduction sans fin"
+        tag = hashlib.sha1(content.encode("utf-8")).hexdigest()[:6]
+        return " ".join(f"{tag}-{n}" for n in range(self.words or max_tokens))
+
+    def contents(self, prefix):
+        return [content for content, _ in self.calls if content.startswith(prefix)]
+
+
+def make_summarizer(llm, cache=None, **kwargs):
+    settings = {"chunk_tokens": 50, "map_max_tokens": 10, "final_max_tokens": 20, **kwargs}
+    return MapReduceSummarizer(llm, namespace="fake:model", count_tokens=word_count, cache=cache, **settings)
+
+
+def test_short_text_is_summarized_in_one_call():
+    llm = FakeLLM()
+
+    make_summarizer(llm).summarize("court.pdf", "Un texte très court.")
+
+    assert len(llm.calls) == 1 and llm.calls[0][0].startswith("Résume ce document")
+
+
+def test_map_then_reduce_levels_within_budget():
+    llm = FakeLLM()
+
+    summary = make_summarizer(llm).summarize("long.pdf", TEXT)
+
+    sections = llm.contents("Section de long.pdf")
+    reductions = llm.contents("Résumés partiels consécutifs")
+    final = llm.contents("Résume ce document à partir")
+    assert len(sections) == 40
+    # 40 résumés de 10 mots -> paquets de 5 -> 8 résumés -> paquets de 5 -> 2 résumés: deux niveaux
+    assert len(reductions) == 8 + 2
+    assert len(final) == 1 and len(llm.calls) == len(sections) + len(reductions) + 1
+    assert all(word_count(content) <= 50 + 10 for content in reductions + final)
+    assert word_count(summary) == 20
+    assert llm.calls[-1][1] == 20
+
+
+def test_reduce_terminates_when_the_model_ignores_max_tokens():
+    # Le modèle répond toujours plus long que le budget d'entrée: sans troncature, aucun niveau ne progresse
+    llm = FakeLLM(words=120)
+
+    make_summarizer(llm).summarize("long.pdf", TEXT)
+
+    reductions = llm.contents("Résumés partiels consécutifs")
+    assert 0 < len(reductions) < 40
+    final = llm.contents("Résume ce document à partir")[0]
+    assert word_count(final) <= 50 + 10
+
+
+def test_budget_must_fit_two_partials():
+    with pytest.raises(ValueError):
+        make_summarizer(FakeLLM(), chunk_tokens=15, map_max_tokens=10)
+
+
+def test_cache_reuses_unchanged_sections(tmp_path):
+    cache = SummaryCache(str(tmp_path / "summaries.sqlite3"))
+    make_summarizer(FakeLLM(), cache=cache).summarize("long.pdf", TEXT)
+
+    # Même document: aucun appel
+    llm = FakeLLM()
+    make_summarizer(llm, cache=SummaryCache(str(cache.path))).summarize("long.pdf", TEXT)
+    assert llm.calls == []
+
+    # Un paragraphe modifié: seule sa section est résumée à nouveau, plus les réductions qui en dépendent
+    edited = PARAGRAPHS[:]
+    edited[7] = " ".join(f"nouveau{j}" for j in range(30))
+    llm = FakeLLM()
+    make_summarizer(llm, cache=cache).summarize("long.pdf", "\n\n".join(edited))
+
+    assert len(llm.contents("Section de long.pdf")) == 1
+    assert len(llm.contents("Résumés partiels consécutifs")) == 2
+    assert len(llm.contents("Résume ce document à partir")) == 1
+
+
+def test_cache_key_depends_on_model_and_prompt():
+    assert SummaryCache.key("openai:gpt-4o", "prompt", "800", "texte") != SummaryCache.key(
+        "lmstudio:mistral", "prompt", "800", "texte")
+    assert SummaryCache.key("a", "bc") != SummaryCache.key("ab", "c")
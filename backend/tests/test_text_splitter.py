@@ -0,0 +1,65 @@
+import random
+
+import pytest
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.tools.text_splitter import DEFAULT_SEPARATORS, RecursiveSpanSplitter
+
+MIXED = (
+    "Installation.\n\nBrancher l'appareil; vérifier la tension, puis démarrer!\n"
+    "Le voyant clignote? Attendre 30 s.\nContrôle:\n\n\n"
+    "  Nettoyer le filtre chaque mois, ou plus souvent en milieu poussiéreux.  \n\n"
+    "Garantie deux ans. Pièces, main-d'œuvre et déplacement compris; hors consommables."
+)
+LONG_WORD = "Référence " + "X" * 120 + " fin de ligne.\n\nSuite du texte normal, courte."
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def assert_parity(text, **kwargs):
+    expected = RecursiveCharacterTextSplitter(**kwargs).split_text(text)
+    assert RecursiveSpanSplitter(**kwargs).split_text(text) == expected
+    return expected
+
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(40, 0), (40, 10), (80, 30), (25, 25), (1000, 200)])
+def test_mixed_separators_with_overlap(chunk_size, chunk_overlap):
+    assert_parity(MIXED, chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=DEFAULT_SEPARATORS)
+
+
+def test_custom_length_function():
+    chunks = assert_parity(MIXED * 3, chunk_size=12, chunk_overlap=4, separators=DEFAULT_SEPARATORS,
+                           length_function=word_count)
+    assert len(chunks) > 3
+
+
+def test_pieces_longer_than_chunk_size_are_kept():
+    # Sans séparateur "", un mot trop long ne peut pas être redécoupé: chunk plus long que chunk_size
+    chunks = assert_parity(LONG_WORD, chunk_size=30, chunk_overlap=5, separators=["\n\n", "\n", " "])
+    assert max(len(chunk) for chunk in chunks) > 30
+
+    # Avec "", découpage au caractère
+    chunks = assert_parity(LONG_WORD, chunk_size=30, chunk_overlap=5, separators=DEFAULT_SEPARATORS)
+    assert max(len(chunk) for chunk in chunks) <= 30
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_texts(seed):
+    rng = random.Random(seed)
+    tokens = ["pompe", "chaleur", "a", "fluide-frigorigène", "X" * rng.randint(20, 60),
+              ". ", "! ", "? ", "; ", ", ", " ", " ", " ", "\n", "\n\n", "  \n  "]
+    text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 400)))
+    chunk_size = rng.randint(5, 120)
+    chunk_overlap = rng.randint(0, chunk_size)
+    separators = rng.choice([DEFAULT_SEPARATORS, ["\n\n", "\n", " "], [". ", ""], ["\n"]])
+    length_function = rng.choice([len, word_count, lambda piece: len(piece.encode("utf-8"))])
+
+    assert_parity(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators,
+                  length_function=length_function)
+
+
+def test_overlap_larger_than_chunk_size_is_rejected():
+    with pytest.raises(ValueError):
+        RecursiveSpanSplitter(chunk_size=10, chunk_overlap=20)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from src.domain.services.vector_archive import ALIGNMENT, VectorArchiveReader, VectorArchiveWriter
+
+TEXT = "\n\n".join(f"Paragraphe {i}. " + "Le compresseur aspire le fluide frigorigène. " * 12 for i in range(12))
+
+
+def write_archive(path, blocks, dimension=4):
+    with VectorArchiveWriter(path, "fake-model", dimension, "alice") as writer:
+        for ids, vectors, documents, metadatas in blocks:
+            writer.write_block(ids, vectors, documents, metadatas)
+    return writer.footer
+
+
+def test_round_trip_in_blocks(tmp_path):
+    path = tmp_path / "alice.vstore"
+    first = (["a", "b"], np.arange(8, dtype=np.float32).reshape(2, 4), ["doc a", "doc b"],
+             [{"source_file": "x.pdf", "page": 1}, {"source_file": "x.pdf"}])
+    second = (["c"], np.ones((1, 4)), ["doc c"], [None])
+
+    footer = write_archive(path, [first, second])
+    reader = VectorArchiveReader(path)
+    blocks = list(reader.iter_blocks())
+
+    assert footer["count"] == reader.count == 3
+    assert reader.footer["model"] == "fake-model" and reader.footer["user_id"] == "alice"
+    assert [block["ids"] for block in blocks] == [["a", "b"], ["c"]]
+    np.testing.assert_array_equal(blocks[0]["embeddings"], first[1])
+    # Clés absentes restituées absentes, pas à None
+    assert blocks[0]["metadatas"] == [{"source_file": "x.pdf", "page": 1}, {"source_file": "x.pdf"}]
+    assert blocks[1]["metadatas"] == [{}]
+    assert blocks[1]["documents"] == ["doc c"]
+    assert all(block["embeddings"]["offset"] % ALIGNMENT == 0 for block in reader.footer["blocks"])
+
+
+def test_wrong_vector_shape_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_archive(tmp_path / "bad.vstore", [(["a"], np.ones((1, 3)), ["doc"], [{}])])
+    # Export interrompu: pas d'archive partielle laissée sur le disque
+    assert not (tmp_path / "bad.vstore").exists()
+
+
+def test_invalid_and_truncated_files_are_rejected(tmp_path):
+    (tmp_path / "other.bin").write_bytes(b"pas une archive")
+    with pytest.raises(ValueError):
+        VectorArchiveReader(tmp_path / "other.bin")
+
+    path = tmp_path / "alice.vstore"
+    write_archive(path, [(["a"], np.ones((1, 4)), ["doc"], [{}])])
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        VectorArchiveReader(path)
+
+
+def test_export_import_without_reembedding(make_store, corpus, tmp_path, monkeypatch):
+    source = make_store(tmp_path / "source")
+    source.add_documents_from_files(corpus({"manuel.txt": TEXT}), "alice")
+    exported = source.export_user("alice", tmp_path / "alice.vstore", block_rows=5)
+    assert exported["count"] == source.get_collection_size("alice") and exported["blocks"] > 1
+
+    target = make_store(tmp_path / "target")
+    monkeypatch.setattr(target.embedding_port, "encode", lambda texts: pytest.fail("re-vectorisation"))
+    report = target.import_archive(tmp_path / "alice.vstore", user_id="bob")
+
+    assert report["added"] == exported["count"] and report["dropped"] == []
+    assert target.get_file_list("bob") == ["manuel.txt"]
+    assert target.get_collection_size("alice") == 0
+    original = source.collection.get(where={"user_id": "alice"}, include=["documents"])
+    imported = target.collection.get(where={"user_id": "bob"}, include=["documents"])
+    assert sorted(imported["documents"]) == sorted(original["documents"])
+    assert all(chunk_id.startswith("bob_") for chunk_id in imported["ids"])
+
+
+def test_import_refuses_another_model(make_store, corpus, tmp_path):
+    path = tmp_path / "other.vstore"
+    write_archive(path, [(["a"], np.ones((1, 16)), ["doc"], [{"source_file": "a.txt"}])], dimension=16)
+    store = make_store()
+
+    with pytest.raises(ValueError):
+        store.import_archive(path)
+    assert store.import_archive(path, user_id="alice", force=True)["added"] == 1